@@ -0,0 +1,118 @@
+"""
+Adaptive Polling-Intervalle für EHS-Sentinel
+Schätzt pro Sensor fortlaufend, wie schnell sich der Wert ändert, und wählt das Intervall so,
+dass sich der Wert zwischen zwei Abfragen um höchstens eine Toleranz ändert
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, Optional
+
+class AdaptiveIntervals:
+    """
+    Änderungsrate pro Sensor als zeitgewichteter EWMA von |Δ Wert| / Δ Sekunden.
+
+    Das Gewicht eines Messwerts ist 1 - exp(-Δt / horizon). Dadurch zählen seltene Abfragen und
+    dichte Broadcasts gleich viel pro Sekunde, und eine Stufe von 0,1 °C kurz nach dem letzten
+    Wert treibt die Schätzung nicht in die Höhe. Eine Schätzung gibt es erst, wenn der Sensor
+    mindestens horizon Sekunden beobachtet wurde, vorher gilt das Basisintervall.
+
+    Das Intervall ist toleranz / rate, begrenzt auf [min_interval, max(max_interval, Basis)], so
+    bleibt der erwartete Fehler zwischen zwei Abfragen etwa bei der Toleranz. Die Toleranz ist
+    max(tolerance, relative_tolerance * |Wert|), damit Leistungswerte in W nicht genauso
+    streng behandelt werden wie Temperaturen. Sensoren ohne Schätzung (nicht numerisch oder
+    erst ein Wert) behalten ihr Basisintervall, Sensoren ohne Änderung laufen auf der Obergrenze.
+
+    Ein Intervall wächst pro Abfrage höchstens um GROWTH, damit eine anfangs zu niedrige
+    Schätzung (z.B. erste Werte im Scheitelpunkt einer Schwingung) nicht sofort zu langen
+    Pausen führt. Kürzer wird es sofort.
+    """
+
+    GROWTH = 2.0  # größter Faktor zwischen zwei gewählten Intervallen
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            clock: Zeitquelle in Sekunden (monoton)
+        """
+        self.clock = clock
+        self.configure()
+
+    def configure(self, enabled: bool = False, min_interval: float = 10.0, max_interval: float = 600.0,
+                  tolerance: float = 0.5, relative_tolerance: float = 0.02, horizon: float = 600.0):
+        """(Neu-)Einstellung, verwirft alle Schätzungen."""
+        self.enabled = enabled
+        self.min_interval = float(min_interval)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.tolerance = float(tolerance)
+        self.relative_tolerance = float(relative_tolerance)
+        self.horizon = float(horizon)
+        # Sensor -> [letzter Wert, Zeitpunkt, EWMA der Rate, erster Zeitpunkt]
+        self._samples: Dict[str, list] = {}
+        # Sensor -> (gewähltes Intervall, Basisintervall)
+        self._chosen: Dict[str, tuple] = {}
+
+    def observe(self, sensor: str, value: Any, now: Optional[float] = None):
+        """Nimmt einen empfangenen Wert auf, nicht numerische Werte werden ignoriert."""
+        if not self.enabled or isinstance(value, bool) or not isinstance(value, (int, float)):
+            return
+        if now is None:
+            now = self.clock()
+        sample = self._samples.get(sensor)
+        if sample is None:
+            self._samples[sensor] = [value, now, 0.0, now]
+            return
+        elapsed = now - sample[1]
+        if elapsed > 0:
+            weight = 1.0 - math.exp(-elapsed / self.horizon)
+            sample[2] += weight * (abs(value - sample[0]) / elapsed - sample[2])
+            sample[1] = now
+        sample[0] = value
+
+    def rate(self, sensor: str) -> Optional[float]:
+        """Geschätzte Änderung pro Sekunde oder None, solange der Sensor kürzer als horizon beobachtet wurde."""
+        sample = self._samples.get(sensor)
+        if sample is None:
+            return None
+        span = sample[1] - sample[3]
+        if span < self.horizon:
+            return None
+        # der EWMA startet bei 0, durch das bisher erreichte Gesamtgewicht teilen
+        return sample[2] / (1.0 - math.exp(-span / self.horizon))
+
+    def interval(self, sensor: str, base: float) -> float:
+        """Intervall für einen Sensor, base gilt solange keine Schätzung vorliegt."""
+        rate = self.rate(sensor)
+        if rate is None:
+            return base
+        upper = max(self.max_interval, base)
+        tolerance = max(self.tolerance, self.relative_tolerance * abs(self._samples[sensor][0]))
+        chosen = upper if rate <= 0 else min(upper, max(self.min_interval, tolerance / rate))
+        # höchstens verdoppeln, kürzer werden sofort
+        previous = self._chosen.get(sensor, (base,))[0]
+        chosen = min(chosen, self.GROWTH * previous)
+        self._chosen[sensor] = (chosen, base)
+        return chosen
+
+    def get_stats(self) -> Dict:
+        """Gewähltes Intervall pro Sensor und geschätzte Abfragen pro Stunde gegenüber den Basisintervallen."""
+        fixed = sum(3600.0 / base for _, base in self._chosen.values())
+        adaptive = sum(3600.0 / chosen for chosen, _ in self._chosen.values())
+        return {
+            "enabled": self.enabled,
+            "tracked_sensors": len(self._samples),
+            "sensors": {
+                sensor: {
+                    "interval_s": round(chosen, 1),
+                    "base_s": base,
+                    "rate_per_s": round(self.rate(sensor) or 0.0, 5)
+                }
+                for sensor, (chosen, base) in sorted(self._chosen.items())
+            },
+            "polls_per_hour_fixed": round(fixed, 1),
+            "polls_per_hour_adaptive": round(adaptive, 1),
+            "saved_percent": round(100 * (fixed - adaptive) / fixed, 1) if fixed else 0.0
+        }
+
+# Globale Instanz, gefüllt vom MessageProcessor und gelesen vom PollingManager
+adaptive_intervals = AdaptiveIntervals()
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Callable, Dict, Optional
+
+from CustomLogger import logger
+
+class Lane(IntEnum):
+    """
+    Transmit lanes of the bus, lower value means higher priority.
+    """
+
+    CONTROL = 0
+    LIVE = 1
+    SETTINGS = 2
+    STATIC = 3
+
+class TokenBucket:
+    """Airtime budget of a lane, refilled with ``rate`` bus seconds per second up to ``burst``."""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'stamp')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self) -> float:
+        """Seconds until the budget is positive again."""
+        return 0.0 if self.tokens > 0 else -self.tokens / self.rate
+
+class LaneStats:
+    """Queueing delay and airtime counters of one lane."""
+
+    __slots__ = ('granted', 'throttled', 'airtime', 'max_delay_ms', 'delays')
+
+    def __init__(self, samples: int):
+        self.granted = 0
+        self.throttled = 0
+        self.airtime = 0.0
+        self.max_delay_ms = 0.0
+        self.delays = deque(maxlen=samples)
+
+    def to_dict(self, queued: int) -> Dict:
+        ordered = sorted(self.delays)
+        return {
+            "granted": self.granted,
+            "queued": queued,
+            "throttled": self.throttled,
+            "airtime_s": round(self.airtime, 3),
+            "avg_delay_ms": round(sum(ordered) / len(ordered), 1) if ordered else None,
+            "p95_delay_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1) if ordered else None,
+            "max_delay_ms": round(self.max_delay_ms, 1)
+        }
+
+class BusArbiter:
+    """
+    Serialises all transmissions on the NASA bus through one queue with priority lanes.
+
+    Every frame is sent inside a slot: ``async with bus_arbiter.slot(Lane.LIVE): ...``. Only one
+    slot is held at a time. When a slot is released the waiting request of the highest priority
+    lane gets the bus, so a control write waits for at most the frame that is on the bus, never
+    for the rest of a poll. Lanes of the same priority are served first come, first served.
+
+    Each polling lane has a token bucket of airtime: the time a slot is held is charged to it,
+    and a lane that used up its share waits until the bucket refills, even if the bus is free.
+    This keeps the bus free for the other bus members (wired controller, WiFi kit). The control
+    lane is not limited.
+    """
+
+    DEFAULT_AIRTIME = {
+        Lane.LIVE: 0.5,  # share of the bus time per second
+        Lane.SETTINGS: 0.25,
+        Lane.STATIC: 0.1
+    }
+    DELAY_SAMPLES = 200  # remembered queueing delays per lane
+
+    def __init__(self, airtime: Optional[Dict[Lane, float]] = None, burst: float = 3.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            airtime: share of bus time per lane (0-1], lanes not listed are not limited
+            burst: seconds of airtime a lane may use in one go after being idle
+            clock: monotonic time source in seconds
+        """
+        self.clock = clock
+        self.configure(airtime, burst)
+
+    def configure(self, airtime: Optional[Dict[Lane, float]] = None, burst: float = 3.0):
+        """(Re)applies the airtime limits and resets the statistics."""
+        now = self.clock()
+        self.burst = burst
+        limits = self.DEFAULT_AIRTIME if airtime is None else airtime
+        self._buckets = {Lane(lane): TokenBucket(share, burst, now) for lane, share in limits.items() if share}
+        self._queues = {lane: deque() for lane in Lane}
+        self._lane_stats = {lane: LaneStats(self.DELAY_SAMPLES) for lane in Lane}
+        self._throttled = set()  # lanes waiting for their bucket to refill
+        self._busy = False
+        self._timer = None
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane):
+        """Holds the bus for one frame (and its response) on behalf of the given lane."""
+        await self.acquire(lane)
+        granted_at = self.clock()
+        try:
+            yield
+        finally:
+            self.release(lane, self.clock() - granted_at)
+
+    async def acquire(self, lane: Lane):
+        lane = Lane(lane)
+        enqueued = self.clock()
+        if not self._busy and not any(self._queues.values()) and self._has_budget(lane, enqueued):
+            self._grant(lane, enqueued, enqueued)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, enqueued)
+        self._queues[lane].append(entry)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # granted just before the cancellation, hand the bus on
+                self.release(lane, 0.0)
+            else:
+                try:
+                    self._queues[lane].remove(entry)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self, lane: Lane, held: float):
+        """Frees the bus and charges the airtime to the lane."""
+        lane = Lane(lane)
+        bucket = self._buckets.get(lane)
+        if bucket is not None:
+            bucket.refill(self.clock())
+            bucket.tokens -= held
+        self._lane_stats[lane].airtime += held
+        self._busy = False
+        self._dispatch()
+
+    def _has_budget(self, lane: Lane, now: float) -> bool:
+        bucket = self._buckets.get(lane)
+        if bucket is None:
+            return True
+        bucket.refill(now)
+        return bucket.tokens > 0
+
+    def _grant(self, lane: Lane, enqueued: float, now: float):
+        self._busy = True
+        self._throttled.discard(lane)
+        stats = self._lane_stats[lane]
+        delay_ms = (now - enqueued) * 1000
+        stats.granted += 1
+        stats.delays.append(delay_ms)
+        if delay_ms > stats.max_delay_ms:
+            stats.max_delay_ms = delay_ms
+
+    def _dispatch(self):
+        """Hands the free bus to the first waiting request of the highest priority lane with budget."""
+        if self._busy:
+            return
+        now = self.clock()
+        refill_in = None
+        for lane, queue in self._queues.items():
+            while queue and queue[0][0].done():
+                queue.popleft()  # cancelled while waiting
+            if not queue:
+                continue
+            if not self._has_budget(lane, now):
+                if lane not in self._throttled:
+                    # counted once each time the lane runs dry, not on every dispatch while it waits
+                    self._throttled.add(lane)
+                    self._lane_stats[lane].throttled += 1
+                wait = self._buckets[lane].wait_time()
+                refill_in = wait if refill_in is None else min(refill_in, wait)
+                continue
+            future, enqueued = queue.popleft()
+            self._grant(lane, enqueued, now)
+            future.set_result(None)
+            return
+
+        if refill_in is not None:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = asyncio.get_running_loop().call_later(refill_in, self._dispatch)
+            logger.debug("Bus airtime used up, next lane in %.3fs", refill_in)
+
+    def get_stats(self) -> Dict:
+        """Queueing delay, airtime and budget per lane."""
+        now = self.clock()
+        lanes = {}
+        for lane in Lane:
+            entry = self._lane_stats[lane].to_dict(len(self._queues[lane]))
+            bucket = self._buckets.get(lane)
+            if bucket is not None:
+                bucket.refill(now)
+                entry["airtime_share"] = bucket.rate
+                entry["budget_s"] = round(bucket.tokens, 3)
+            lanes[lane.name.lower()] = entry
+        return {"busy": self._busy, "lanes": lanes}
+
+# Shared instance, used by the MessageProducer for every frame it sends
+bus_arbiter = BusArbiter()
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from CustomLogger import logger
+
+class BusPacer:
+    """
+    Sizes and paces the frames EHS-Sentinel sends on the shared NASA bus.
+
+    Packing: read requests are grouped by payload size (largest first) and filled up to the
+    current chunk limit and the largest frame the NASA size field allows. The unit answers with
+    a frame of the same layout, so a request that fits is also a response our reader accepts.
+    Structure messages (type 3) must be the only message of a packet and get a frame of their own.
+
+    Pacing: only one frame is on the bus at a time, the BusArbiter decides whose. Before sending,
+    the pacer waits until the bus has been idle for ``frame_gap`` seconds (bounded by
+    ``response_wait``), after sending the caller waits for the response before the next frame
+    goes out. How long it waits follows the measured response times (``RESPONSE_FACTOR`` times
+    their moving average), capped by ``response_wait``, so frames the unit never answers do not
+    stall the bus for long.
+
+    Calibration: when a frame is answered the pacer counts a success; after ``increase_after``
+    successes in a row the chunk limit grows by one and the gap shrinks. A NACK or a frame that
+    gets no answer at all halves the chunk limit and doubles the gap. A frame where only some
+    addresses stay unanswered is not treated as overload, those addresses are usually just not
+    supported by the unit.
+    """
+
+    FRAME_OVERHEAD = 16  # start + size(2) + header(10) + crc(2) + end
+    MAX_SIZE_FIELD = 255  # largest size field accepted by NASAFrameReader
+    RESPONSE_FACTOR = 4  # response timeout in multiples of the average response time
+    RESPONSE_SMOOTHING = 0.2  # weight of a new response time in the moving average
+
+    def __init__(self, chunk_size: int = 10, max_chunk_size: int = 20, frame_gap: float = 0.05,
+                 max_frame_gap: float = 0.5, response_wait: float = 1.0, adaptive: bool = True,
+                 increase_after: int = 5, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            chunk_size: initial number of messages per read request
+            max_chunk_size: upper bound for the self-calibrated chunk limit
+            frame_gap: initial bus idle time in seconds required before a frame is sent
+            max_frame_gap: upper bound for the self-calibrated gap
+            response_wait: seconds to wait for the response of a frame before the next one is sent
+            adaptive: calibrate chunk limit and gap from the observed responses
+            increase_after: answered frames in a row before the chunk limit grows
+            clock: monotonic time source in seconds
+        """
+        self.clock = clock
+        self._last_activity = 0.0
+        self.configure(chunk_size, max_chunk_size, frame_gap, max_frame_gap, response_wait, adaptive, increase_after)
+
+    def configure(self, chunk_size: int = 10, max_chunk_size: int = 20, frame_gap: float = 0.05,
+                  max_frame_gap: float = 0.5, response_wait: float = 1.0, adaptive: bool = True,
+                  increase_after: int = 5):
+        """(Re)applies the settings and resets the calibration."""
+        self.max_chunk_size = max(1, int(max_chunk_size))
+        self.chunk_limit = min(max(1, int(chunk_size)), self.max_chunk_size)
+        self.min_frame_gap = float(frame_gap)
+        self.max_frame_gap = max(float(max_frame_gap), self.min_frame_gap)
+        self.frame_gap = self.min_frame_gap
+        self.response_wait = float(response_wait)
+        self.adaptive = adaptive
+        self.increase_after = max(1, int(increase_after))
+        self.response_time = None
+        self._successes = 0
+        self._stats = {
+            "frames": 0,
+            "answered": 0,
+            "partial": 0,
+            "unanswered": 0,
+            "nacks": 0,
+            "limit_increases": 0,
+            "limit_decreases": 0
+        }
+
+    def pack(self, messages: Sequence[Tuple[str, int, int]], chunk_limit: int = None) -> List[Tuple[str, ...]]:
+        """
+        Groups (name, message type, message size) into chunks, the size is message number plus payload.
+
+        Messages are sorted by size (largest first, stable) and a chunk is closed when it reaches
+        the chunk limit or the next message would exceed the frame capacity.
+        """
+        if chunk_limit is None:
+            chunk_limit = self.chunk_limit
+        capacity = self.MAX_SIZE_FIELD + 2 - self.FRAME_OVERHEAD
+        chunks = [(name,) for name, message_type, _ in messages if message_type == 3]
+        chunk, used = [], 0
+        for name, _, size in sorted((m for m in messages if m[1] != 3), key=lambda message: -message[2]):
+            if chunk and (len(chunk) >= chunk_limit or used + size > capacity):
+                chunks.append(tuple(chunk))
+                chunk, used = [], 0
+            chunk.append(name)
+            used += size
+        if chunk:
+            chunks.append(tuple(chunk))
+        return chunks
+
+    def note_activity(self, now: float = None):
+        """Marks the bus as busy, called for every received chunk of bytes and every sent frame."""
+        self._last_activity = self.clock() if now is None else now
+
+    def idle_for(self) -> float:
+        return self.clock() - self._last_activity
+
+    async def wait_idle(self):
+        """Waits until the bus was idle for frame_gap seconds, at most response_wait seconds."""
+        deadline = self.clock() + self.response_wait
+        while True:
+            remaining = self.frame_gap - self.idle_for()
+            if remaining <= 0:
+                return
+            now = self.clock()
+            if now >= deadline:
+                return
+            await asyncio.sleep(min(remaining, deadline - now))
+
+    @property
+    def response_timeout(self) -> float:
+        """Seconds to wait for the response of a frame."""
+        if not self.adaptive or self.response_time is None:
+            return self.response_wait
+        return min(self.response_wait, max(self.RESPONSE_FACTOR * self.response_time, 2 * self.min_frame_gap, 0.05))
+
+    def observe_response(self, seconds: float):
+        """Feeds the time from sending a frame to its response into the moving average."""
+        if self.response_time is None:
+            self.response_time = seconds
+        else:
+            self.response_time += self.RESPONSE_SMOOTHING * (seconds - self.response_time)
+
+    def record(self, requested: int, unanswered: int, nacked: bool = False):
+        """Feeds the outcome of one frame into the calibration."""
+        self._stats["frames"] += 1
+        overloaded = nacked or (requested > 0 and unanswered >= requested)
+        if nacked:
+            self._stats["nacks"] += 1
+        if overloaded:
+            self._stats["unanswered"] += 1
+        elif unanswered:
+            self._stats["partial"] += 1
+        else:
+            self._stats["answered"] += 1
+
+        if not self.adaptive:
+            return
+        if overloaded:
+            self._successes = 0
+            if self.chunk_limit > 1:
+                self.chunk_limit = max(1, self.chunk_limit // 2)
+                self._stats["limit_decreases"] += 1
+            self.frame_gap = min(self.max_frame_gap, max(self.frame_gap, 0.01) * 2)
+            logger.info(f"Bus overloaded, reducing read requests to {self.chunk_limit} messages with {self.frame_gap:.3f}s gap")
+            return
+
+        self._successes += 1
+        if self._successes >= self.increase_after:
+            self._successes = 0
+            if self.chunk_limit < self.max_chunk_size:
+                self.chunk_limit += 1
+                self._stats["limit_increases"] += 1
+            self.frame_gap = max(self.min_frame_gap, self.frame_gap * 0.8)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self._stats,
+            "chunk_limit": self.chunk_limit,
+            "frame_gap_s": round(self.frame_gap, 4),
+            "response_time_s": round(self.response_time, 4) if self.response_time is not None else None,
+            "response_timeout_s": round(self.response_timeout, 4),
+            "adaptive": self.adaptive
+        }
+
+# Shared instance, configured by the MessageProducer and fed by the serial read loop
+bus_pacer = BusPacer()
@@ -1,5 +1,6 @@
 import logging
 import inspect 
+import sys
 
 class IndentFormatter(logging.Formatter):
     """
@@ -7,9 +8,13 @@ class IndentFormatter(logging.Formatter):
     and includes the function name in the log record.
     Attributes:
         baseline (int): The baseline stack depth when the formatter is initialized.
+        mode (str): How indentation and caller are determined:
+            'frame' walks the frame chain with sys._getframe (default, same output as 'stack'),
+            'flat' skips indentation entirely,
+            'stack' uses inspect.stack() like earlier versions (slow, kept for comparison).
     Methods:
-        __init__(fmt=None, datefmt=None):
-            Initializes the IndentFormatter with optional format and date format.
+        __init__(fmt=None, datefmt=None, mode='frame'):
+            Initializes the IndentFormatter with optional format, date format and mode.
         format(rec):
             Formats the specified record as text, adding indentation and function name.
     """
@@ -28,18 +33,47 @@ class IndentFormatter(logging.Formatter):
         logging.CRITICAL: bold_red + format + reset
     }
 
+    MODES = ('frame', 'flat', 'stack')
 
-    def __init__( self, fmt=None, datefmt=None ):
+    def __init__( self, fmt=None, datefmt=None, mode='frame' ):
         logging.Formatter.__init__(self, fmt, datefmt)
-        self.baseline = len(inspect.stack())
+        # same value as len(inspect.stack()) without materialising the frames
+        depth = 0
+        frame = sys._getframe()
+        while frame is not None:
+            depth += 1
+            frame = frame.f_back
+        self.baseline = depth
+        self.setMode(mode)
+
+    def setMode( self, mode ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown formatter mode {mode}, use one of {', '.join(self.MODES)}")
+        self.mode = mode
 
     def format( self, rec ):
-        log_fmt = self.FORMATS.get(rec.levelno)
-        formatter = logging.Formatter(log_fmt)
+        mode = self.mode
+        if mode == 'frame':
+            depth = 0
+            function = ''
+            frame = sys._getframe()
+            while frame is not None:
+                if depth == 8:
+                    function = frame.f_code.co_name
+                depth += 1
+                frame = frame.f_back
+            rec.indent = '    '*(depth-self.baseline-3)
+            rec.function = function
+        elif mode == 'flat':
+            rec.indent = ''
+            rec.function = rec.funcName
+        else:
+            log_fmt = self.FORMATS.get(rec.levelno)
+            formatter = logging.Formatter(log_fmt)
 
-        stack = inspect.stack()
-        rec.indent = '    '*(len(stack)-self.baseline-3)
-        rec.function = stack[8][3]
+            stack = inspect.stack()
+            rec.indent = '    '*(len(stack)-self.baseline-3)
+            rec.function = stack[8][3]
         out = logging.Formatter.format(self, rec)
         del rec.indent; del rec.function
         return out
@@ -59,3 +93,8 @@ logger.setLevel(logging.INFO)
 def setDebugMode():
     logger.setLevel(logging.DEBUG)
     logger.debug("Debug mode is on...")
+
+def setFormatterMode(mode):
+    """Selects how the IndentFormatter determines indentation: 'frame', 'flat' or 'stack'."""
+    formatter.setMode(mode)
+    logger.debug("Log formatter mode is %s", mode)
@@ -1,11 +1,13 @@
 from EHSExceptions import ConfigException
 from EHSArguments import EHSArguments
+from NASADecoder import build_decoders
+from NASAEncoder import build_encoders
 import yaml
 import os
 import re
 import json
 
-from CustomLogger import logger
+from CustomLogger import logger, setFormatterMode
 
 class EHSConfig():
     """
@@ -19,8 +21,16 @@ class EHSConfig():
     SERIAL = None
     TCP = None
     NASA_REPO = None
+    NASA_INDEX = {}
+    NASA_ADDRESSES = {}
+    NASA_DECODERS = {}
+    NASA_ENCODERS = {}
     LOGGING = {}
     POLLING = None
+    PIPELINE = {}
+    MONITOR = {}
+    BUS = {}
+    PROTOCOL = {}
     NASA_VAL_STORE = {}
 
     def __new__(cls, *args, **kwargs):
@@ -68,7 +78,19 @@ class EHSConfig():
                 'client-id': addon_config.get('mqtt_client_id', 'ehs-sentinel'),
                 'topicPrefix': addon_config.get('mqtt_topic_prefix', 'ehsSentinel'),
                 'homeAssistantAutoDiscoverTopic': 'homeassistant' if addon_config.get('mqtt_homeassistant_discovery', True) else '',
-                'useCamelCaseTopicNames': addon_config.get('mqtt_camel_case_topics', True)
+                'useCamelCaseTopicNames': addon_config.get('mqtt_camel_case_topics', True),
+                'publish': {
+                    'window': addon_config.get('mqtt_sammelfenster', 1.0),
+                    'qos': addon_config.get('mqtt_qos', 2),
+                    'deadband': 0 if addon_config.get('mqtt_nur_aenderungen', True) else None,
+                    'heartbeat': addon_config.get('mqtt_heartbeat', 300)
+                },
+                'command': {
+                    'window': addon_config.get('mqtt_befehlsfenster', 0.3)
+                },
+                'analyzer': {
+                    'sampleRate': addon_config.get('mqtt_analyse_stichprobe', 0.1)
+                }
             },
             'logging': {
                 'deviceAdded': addon_config.get('log_geraet_hinzugefuegt', True),
@@ -77,7 +99,25 @@ class EHSConfig():
                 'proccessedMessage': addon_config.get('log_verarbeitete_nachricht', False),
                 'pollerMessage': addon_config.get('log_poller_nachricht', False),
                 'controlMessage': addon_config.get('log_steuerungs_nachricht', False),
-                'invalidPacket': addon_config.get('log_ungueltiges_paket', False)
+                'invalidPacket': addon_config.get('log_ungueltiges_paket', False),
+                'formatter': addon_config.get('log_formatierung', 'frame')
+            },
+            'protocol': {
+                'format': addon_config.get('protokoll_format', 'text'),
+                'rotation': addon_config.get('protokoll_rotation', 'none'),
+                'maxBytes': addon_config.get('protokoll_max_mb', 10) * 1024 * 1024
+            },
+            'pipeline': {
+                'workers': addon_config.get('pipeline_worker', 4),
+                'queueSize': addon_config.get('pipeline_warteschlange', 1000),
+                'overloadPolicy': addon_config.get('pipeline_ueberlast_strategie', 'block')
+            },
+            'bus': {
+                'maxChunkSize': addon_config.get('bus_max_nachrichten', 20),
+                'adaptive': addon_config.get('bus_adaptiv', True)
+            },
+            'monitor': {
+                'history': addon_config.get('sensor_verlauf', 100)
             }
         }
 
@@ -128,6 +168,9 @@ class EHSConfig():
             ],
             'groups': {
                 'all_sensors': all_sensors
+            },
+            'adaptive': {
+                'enable': addon_config.get('polling_adaptiv', False)
             }
         }
         
@@ -159,7 +202,27 @@ class EHSConfig():
         if 'polling' in config:
             self.POLLING = config.get('polling')
 
-        logger.debug(f"Configuration loaded: {config}")
+        if 'protocol' in config:
+            self.PROTOCOL = config.get('protocol') or {}
+        else:
+            self.PROTOCOL = {}
+
+        if 'pipeline' in config:
+            self.PIPELINE = config.get('pipeline') or {}
+        else:
+            self.PIPELINE = {}
+
+        if 'monitor' in config:
+            self.MONITOR = config.get('monitor') or {}
+        else:
+            self.MONITOR = {}
+
+        if 'bus' in config:
+            self.BUS = config.get('bus') or {}
+        else:
+            self.BUS = {}
+
+        logger.debug("Configuration loaded: %s", config)
     
     def parse_time_string(self, time_str: str) -> int:
         match = re.match(r'^(\d+)([smh])$', time_str.strip(), re.IGNORECASE)
@@ -176,7 +239,8 @@ class EHSConfig():
     
         return value * conversion_factors[unit]
 
-    def validate(self):
+    def load_nasa_repository(self):
+        """Lädt das NASA Repository und baut die Adress-Indizes neu auf."""
         if os.path.isfile(self.GENERAL['nasaRepositoryFile']):
              with open(self.GENERAL['nasaRepositoryFile'], mode='r') as file:
                 self.NASA_REPO = yaml.safe_load(file)
@@ -184,9 +248,57 @@ class EHSConfig():
         else:
             raise ConfigException(argument=self.GENERAL['nasaRepositoryFile'], message="NASA Repository File is missing")
 
+        self._build_nasa_index()
+
+    def _build_nasa_index(self):
+        """
+        Baut die Indizes Nachrichtennummer -> (Name, Eintrag, Decoder) und Name -> Nachrichtennummer auf
+        und kompiliert für jeden Eintrag einen Decoder und einen Encoder für den Schreibpfad.
+        Bei doppelten Adressen gewinnt, wie bei der früheren linearen Suche, der erste Eintrag.
+        """
+        decoders = build_decoders(self.NASA_REPO)
+        index = {}
+        addresses = {}
+        for name, entry in self.NASA_REPO.items():
+            try:
+                address = int(entry['address'], 16)
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"⚠️ Ungültige Adresse für {name} im NASA Repository - wird übersprungen")
+                continue
+            addresses[name] = address
+            if address not in index:
+                index[address] = (name, entry, decoders[name])
+
+        self.NASA_DECODERS = decoders
+        self.NASA_ENCODERS = build_encoders(addresses, self.NASA_REPO)
+        self.NASA_INDEX = index
+        self.NASA_ADDRESSES = addresses
+
+    def validate(self):
+        self.load_nasa_repository()
+
         if 'protocolFile' not in self.GENERAL:
             self.GENERAL['protocolFile'] = None
 
+        protocol_defaults = {
+            'format': 'text',
+            'rotation': 'none',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'flushInterval': 1.0,
+            'flushSize': 65536
+        }
+
+        for key, default_value in protocol_defaults.items():
+            if key not in self.PROTOCOL:
+                self.PROTOCOL[key] = default_value
+
+        if self.PROTOCOL['format'] not in ('text', 'csv', 'binary'):
+            raise ConfigException(argument=self.PROTOCOL['format'], message="protocol format must be text, csv or binary")
+
+        if self.PROTOCOL['rotation'] not in ('none', 'size', 'daily'):
+            raise ConfigException(argument=self.PROTOCOL['rotation'], message="protocol rotation must be none, size or daily")
+
         if 'allowControl' not in self.GENERAL:
             self.GENERAL['allowControl'] = False
 
@@ -246,6 +358,24 @@ class EHSConfig():
                 logger.info(f"📊 Polling-Validierung abgeschlossen: ")
                 logger.info(f"   ✅ {valid_sensors} gültige Sensoren gefunden")
                 logger.info(f"   📋 {total_sensors} Sensoren im NASA Repository verfügbar")
+
+            # Set default adaptive polling values
+            adaptive_defaults = {
+                'enable': False,
+                'minInterval': 10,
+                'maxInterval': 600,
+                'tolerance': 0.5,
+                'relativeTolerance': 0.02,
+                'horizon': 600
+            }
+
+            self.POLLING['adaptive'] = {**adaptive_defaults, **(self.POLLING.get('adaptive') or {})}
+            adaptive = self.POLLING['adaptive']
+            if not 0 < float(adaptive['minInterval']) <= float(adaptive['maxInterval']):
+                raise ConfigException(argument=adaptive['minInterval'], message="polling adaptive minInterval must be positive and at most maxInterval")
+
+            if float(adaptive['tolerance']) <= 0 or float(adaptive['relativeTolerance']) < 0 or float(adaptive['horizon']) <= 0:
+                raise ConfigException(argument=adaptive['tolerance'], message="polling adaptive tolerance and horizon must be positive, relativeTolerance not negative")
              
         if 'broker-url' not in self.MQTT:
             raise ConfigException(argument=self.MQTT['broker-url'], message="mqtt broker-url config parameter is missing")
@@ -264,6 +394,70 @@ class EHSConfig():
 
         if 'client-id' not in self.MQTT:
             self.MQTT['client-id'] = "ehsSentinel"
+
+        publish_defaults = {
+            'window': 1.0,
+            'qos': 2,
+            'sensorQos': {},
+            'deadband': 0,
+            'heartbeat': 300,
+            'sensorDeadband': {},
+            'groupDeadband': {}
+        }
+
+        if self.MQTT.get('publish') is None:
+            self.MQTT['publish'] = {}
+
+        for key, default_value in publish_defaults.items():
+            if key not in self.MQTT['publish'] or (key != 'deadband' and self.MQTT['publish'][key] is None):
+                self.MQTT['publish'][key] = default_value
+
+        if self.MQTT['publish']['heartbeat'] < 0:
+            raise ConfigException(argument=self.MQTT['publish']['heartbeat'], message="mqtt publish heartbeat must not be negative")
+
+        deadbands = [self.MQTT['publish']['deadband']] + list(self.MQTT['publish']['sensorDeadband'].values()) \
+            + list(self.MQTT['publish']['groupDeadband'].values())
+        for deadband in deadbands:
+            values = deadband.values() if isinstance(deadband, dict) else [deadband]
+            if any(v is not None and (not isinstance(v, (int, float)) or v < 0) for v in values):
+                raise ConfigException(argument=deadband, message="mqtt publish deadband must be a non-negative number or {absolute, relative}")
+
+        for name, qos in [(None, self.MQTT['publish']['qos'])] + list(self.MQTT['publish']['sensorQos'].items()):
+            if qos not in (0, 1, 2):
+                raise ConfigException(argument=name or qos, message="mqtt publish qos must be 0, 1 or 2")
+
+        command_defaults = {
+            'window': 0.3,
+            'skipConfirmed': True
+        }
+
+        if self.MQTT.get('command') is None:
+            self.MQTT['command'] = {}
+
+        for key, default_value in command_defaults.items():
+            if self.MQTT['command'].get(key) is None:
+                self.MQTT['command'][key] = default_value
+
+        if float(self.MQTT['command']['window']) < 0:
+            raise ConfigException(argument=self.MQTT['command']['window'], message="mqtt command window must not be negative")
+
+        analyzer_defaults = {
+            'sampleRate': 0.1,
+            'maxRecords': 1000
+        }
+
+        if self.MQTT.get('analyzer') is None:
+            self.MQTT['analyzer'] = {}
+
+        for key, default_value in analyzer_defaults.items():
+            if self.MQTT['analyzer'].get(key) is None:
+                self.MQTT['analyzer'][key] = default_value
+
+        if not 0 <= float(self.MQTT['analyzer']['sampleRate']) <= 1:
+            raise ConfigException(argument=self.MQTT['analyzer']['sampleRate'], message="mqtt analyzer sampleRate must be between 0 and 1")
+
+        if int(self.MQTT['analyzer']['maxRecords']) < 1:
+            raise ConfigException(argument=self.MQTT['analyzer']['maxRecords'], message="mqtt analyzer maxRecords must be at least 1")
         
         if 'user' not in self.MQTT and 'password' in self.MQTT:
             raise ConfigException(argument=self.SERIAL['device'], message="mqtt user parameter is missing")
@@ -271,6 +465,76 @@ class EHSConfig():
         if 'password' not in self.MQTT and 'user' in self.MQTT:
             raise ConfigException(argument=self.SERIAL['device'], message="mqtt password parameter is missing")
         
+        # Set default pipeline values
+        pipeline_defaults = {
+            'workers': 4,
+            'queueSize': 1000,
+            'overloadPolicy': 'block'
+        }
+
+        for key, default_value in pipeline_defaults.items():
+            if key not in self.PIPELINE:
+                self.PIPELINE[key] = default_value
+
+        if self.PIPELINE['overloadPolicy'] not in ('block', 'drop_oldest', 'coalesce'):
+            raise ConfigException(argument=self.PIPELINE['overloadPolicy'], message="pipeline overloadPolicy must be block, drop_oldest or coalesce")
+
+        if int(self.PIPELINE['workers']) < 1 or int(self.PIPELINE['queueSize']) < int(self.PIPELINE['workers']):
+            raise ConfigException(argument=self.PIPELINE['queueSize'], message="pipeline needs at least one worker and a queueSize of at least workers")
+
+        # Set default sensor monitor values
+        monitor_defaults = {
+            'history': 100,
+            'historySizes': {}
+        }
+
+        for key, default_value in monitor_defaults.items():
+            if key not in self.MONITOR:
+                self.MONITOR[key] = default_value
+
+        self.MONITOR['historySizes'] = self.MONITOR['historySizes'] or {}
+        if int(self.MONITOR['history']) < 1 or any(int(size) < 1 for size in self.MONITOR['historySizes'].values()):
+            raise ConfigException(argument=self.MONITOR['history'], message="monitor history sizes must be at least 1")
+
+        # Set default bus values
+        bus_defaults = {
+            'chunkSize': 10,
+            'maxChunkSize': 20,
+            'frameGap': 0.05,
+            'maxFrameGap': 0.5,
+            'responseWait': 1.0,
+            'adaptive': True,
+            'airtime': {}
+        }
+
+        chunk_size_set = 'chunkSize' in self.BUS
+
+        for key, default_value in bus_defaults.items():
+            if key not in self.BUS:
+                self.BUS[key] = default_value
+
+        # the addon only sets maxChunkSize, the default start size must not exceed it
+        if not chunk_size_set:
+            self.BUS['chunkSize'] = min(self.BUS['chunkSize'], int(self.BUS['maxChunkSize']))
+
+        # airtime share per polling lane, 0 disables the limit of a lane
+        airtime_defaults = {
+            'live': 0.5,
+            'settings': 0.25,
+            'static': 0.1
+        }
+
+        self.BUS['airtime'] = {**airtime_defaults, **(self.BUS['airtime'] or {})}
+        for lane, share in self.BUS['airtime'].items():
+            if lane not in airtime_defaults or not 0 <= float(share) <= 1:
+                raise ConfigException(argument=lane, message="bus airtime must map live, settings or static to a share between 0 and 1")
+
+        if not 1 <= int(self.BUS['chunkSize']) <= int(self.BUS['maxChunkSize']) <= 255:
+            raise ConfigException(argument=self.BUS['chunkSize'], message="bus chunkSize must be between 1 and maxChunkSize, maxChunkSize at most 255")
+
+        if float(self.BUS['frameGap']) < 0 or float(self.BUS['maxFrameGap']) < float(self.BUS['frameGap']) or float(self.BUS['responseWait']) <= 0:
+            raise ConfigException(argument=self.BUS['frameGap'], message="bus frameGap must not be negative, maxFrameGap at least frameGap and responseWait positive")
+
         # Set default logging values
         logging_defaults = {
             'messageNotFound': False,
@@ -279,13 +543,19 @@ class EHSConfig():
             'packetNotFromIndoorOutdoor': False,
             'proccessedMessage': False,
             'pollerMessage': False,
-            'controlMessage': False
+            'controlMessage': False,
+            'formatter': 'frame'
         }
         
         for key, default_value in logging_defaults.items():
             if key not in self.LOGGING:
                 self.LOGGING[key] = default_value
 
+        try:
+            setFormatterMode(self.LOGGING['formatter'])
+        except ValueError as e:
+            raise ConfigException(argument=self.LOGGING['formatter'], message="logging formatter must be frame, flat or stack")
+
         logger.info(f"Logging Config:")
         for key, value in self.LOGGING.items():
             logger.info(f"    {key}: {value}")
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Aktualitäts-Cache für EHS-Sentinel
+Merkt sich pro Nachrichtenadresse, wann die Wärmepumpe den Wert zuletzt von sich aus gesendet
+hat, damit der PollingManager Sensoren überspringen kann, die ohnehin aktuell sind
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+from NASAPacket import NASAPacket, AddressClassEnum, DataType
+
+class FreshnessCache:
+    """
+    Zeitpunkt des letzten Empfangs pro Adresse.
+
+    Gezählt werden alle Pakete der Innen- und Außeneinheit (Broadcasts, Notifications, Antworten
+    an andere Busteilnehmer wie Fernbedienung oder WiFi-Kit). Antworten auf unsere eigenen
+    Poll-Anfragen zählen nicht: sie sind das Polling selbst und würden den Zeitplan sonst bei
+    jedem Durchlauf um die Antwortzeit verschieben.
+    """
+
+    OWN_ADDRESS_CLASS = AddressClassEnum.JIGTester  # Absender unserer Anfragen
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            clock: Zeitquelle in Sekunden, muss zur Event-Loop passen (monoton)
+        """
+        self.clock = clock
+        self._heard: Dict[int, float] = {}
+        self._stats = {
+            "packets": 0,
+            "updates": 0,
+            "own_responses": 0
+        }
+
+    def record(self, packet: NASAPacket, now: Optional[float] = None):
+        """Merkt sich alle Adressen eines empfangenen Pakets."""
+        if packet.packet_data_type == DataType.Resposne and packet.packet_dest_address_class == self.OWN_ADDRESS_CLASS:
+            self._stats["own_responses"] += 1
+            return
+        if now is None:
+            now = self.clock()
+        heard = self._heard
+        for msg in packet.packet_messages:
+            heard[msg.packet_message] = now
+        self._stats["packets"] += 1
+        self._stats["updates"] += len(packet.packet_messages)
+
+    def heard(self, address: int, now: Optional[float] = None):
+        self._heard[address] = self.clock() if now is None else now
+
+    def last_heard(self, address: int) -> Optional[float]:
+        """Zeitpunkt des letzten Empfangs oder None."""
+        return self._heard.get(address)
+
+    def get_stats(self) -> Dict:
+        return {**self._stats, "addresses": len(self._heard)}
+
+    def reset(self):
+        self._heard.clear()
+        for key in self._stats:
+            self._stats[key] = 0
+
+# Globale Instanz, gefüllt vom MessageProcessor und gelesen vom PollingManager
+freshness_cache = FreshnessCache()
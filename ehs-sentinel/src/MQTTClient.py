@@ -13,6 +13,8 @@ from EHSArguments import EHSArguments
 from EHSConfig import EHSConfig
 from SensorMonitor import sensor_monitor, SensorStatus, ErrorType
 from MQTTCommunicationAnalyzer import mqtt_analyzer, MQTTMessageType, ConversionDirection
+from MQTTPublishScheduler import ChangeFilter, PublishScheduler
+from MQTTCommandCoalescer import CommandCoalescer
 
 class MQTTClient:
     """
@@ -60,6 +62,58 @@ class MQTTClient:
         self.known_devices_topic = "known/devices"  # Dedicated topic for storing known topics
         self.auto_discovery_completed = False  # Flag to track if auto-discovery is done
 
+        publish_config = self.config.MQTT['publish']
+        self.publish_scheduler = PublishScheduler(
+            self._publish_state,
+            window=publish_config['window'],
+            qos=publish_config['qos'],
+            sensor_qos=publish_config['sensorQos'],
+            change_filter=self._build_change_filter(publish_config)
+        )
+
+        command_config = self.config.MQTT['command']
+        self.command_coalescer = CommandCoalescer(
+            self._write_commands,
+            window=command_config['window'],
+            confirmed=self.config.NASA_VAL_STORE.get if command_config['skipConfirmed'] else None
+        )
+
+        analyzer_config = self.config.MQTT['analyzer']
+        mqtt_analyzer.configure(
+            sample_rate=analyzer_config['sampleRate'],
+            max_messages=analyzer_config['maxRecords'],
+            max_conversions=analyzer_config['maxRecords'],
+            max_flows=max(1, analyzer_config['maxRecords'] // 2)
+        )
+
+    def _build_change_filter(self, publish_config):
+        """Totzonen aus hass_opts (deadband, deadband_relative) mit Vorrang der Konfiguration"""
+        sensor_deadband = {}
+        sensor_groups = {}
+        for name, entry in self.config.NASA_REPO.items():
+            hass_opts = entry.get('hass_opts') or {}
+            if 'device_class' in hass_opts:
+                sensor_groups[name] = hass_opts['device_class']
+            if 'deadband' in hass_opts or 'deadband_relative' in hass_opts:
+                sensor_deadband[name] = {
+                    'absolute': hass_opts.get('deadband', 0),
+                    'relative': hass_opts.get('deadband_relative', 0)
+                }
+        sensor_deadband.update(publish_config['sensorDeadband'])
+
+        return ChangeFilter(
+            deadband=publish_config['deadband'],
+            heartbeat=publish_config['heartbeat'],
+            sensor_deadband=sensor_deadband,
+            group_deadband=publish_config['groupDeadband'],
+            sensor_groups=sensor_groups
+        )
+
+    async def _write_commands(self, commands):
+        """Schreibt die zusammengefassten SET-Befehle und liest die Werte danach zurück"""
+        if self.message_producer is not None:
+            await self.message_producer.write_requests(commands, read_request_after=True)
+
     def set_message_producer(self, producer):
         """Set the message producer instance with proper writer"""
         self.message_producer = producer
@@ -106,9 +160,9 @@ class MQTTClient:
                         
                         logger.info(f"   Device {idx:>3}/{len(self.known_topics)}: {devname}{description}")
                 else:
-                    logger.debug(f"Loaded devices from known devices Topic:")
+                    logger.debug("Loaded devices from known devices Topic:")
                     for idx, devname in enumerate(self.known_topics):
-                        logger.debug(f"Device added no. {idx:<3}:  {devname} ")
+                        logger.debug("Device added no. %-3d:  %s ", idx, devname)
 
         if f"{self.homeAssistantAutoDiscoverTopic}/status" == topic:
             logger.info(f"HASS Status Messages {topic} received: {payload.decode()}")
@@ -144,26 +198,20 @@ class MQTTClient:
                 # Start time for response time measurement
                 start_time = time.time()
                 
-                # Process the command
-                asyncio.create_task(self.message_producer.write_request(parts[2], payload.decode(), read_request_after=True))
+                # Process the command, bursts per entity are coalesced
+                self.command_coalescer.submit(parts[2], payload.decode())
                 
                 # Log the conversion if applicable
-                if sensor_name and sensor_name in self.config.NASA_REPO:
+                encoder = self.config.NASA_ENCODERS.get(sensor_name) if sensor_name else None
+                if encoder is not None:
                     try:
                         # Get original value
                         original_value = payload.decode()
                         
                         # Determine conversion type
-                        repo_entry = self.config.NASA_REPO[sensor_name]
-                        if 'type' in repo_entry and repo_entry['type'] == 'ENUM':
+                        if encoder.is_enum:
                             # For ENUM, convert string to number
-                            enum_values = repo_entry.get('enum', {})
-                            converted_value = None
-                            
-                            for key, val in enum_values.items():
-                                if val == original_value:
-                                    converted_value = key
-                                    break
+                            converted_value = encoder.enum_code(original_value)
                             
                             if converted_value is not None:
                                 mqtt_analyzer.log_value_conversion(
@@ -182,22 +230,10 @@ class MQTTClient:
                                     success=False,
                                     error_message=f"Enum value not found: {original_value}"
                                 )
-                        elif 'reverse-arithmetic' in repo_entry:
+                        elif encoder.reverse_arithmetic is not None:
                             # For numeric values with arithmetic
                             try:
-                                arithmetic = repo_entry['reverse-arithmetic']
-                                value = float(original_value)
-                                
-                                # Simple evaluation for common patterns
-                                if arithmetic == "value * 10":
-                                    converted_value = value * 10
-                                elif arithmetic == "value * 100":
-                                    converted_value = value * 100
-                                elif arithmetic == "value / 10":
-                                    converted_value = value / 10
-                                else:
-                                    # More complex arithmetic would need a safe evaluator
-                                    converted_value = value
+                                converted_value = encoder.apply_reverse(float(original_value))
                                 
                                 mqtt_analyzer.log_value_conversion(
                                     sensor_name=sensor_name,
@@ -252,7 +288,7 @@ class MQTTClient:
                 time.sleep(5)
 
     def _publish(self, topic, payload, qos=0, retain=False):        
-        logger.debug(f"MQTT Publish Topic: {topic} payload: {payload}")
+        logger.debug("MQTT Publish Topic: %s payload: %s", topic, payload)
         self.client.publish(f"{topic}", payload, qos, retain)
         #time.sleep(0.1)
 
@@ -298,7 +334,7 @@ class MQTTClient:
         if self.config.LOGGING['deviceAdded']:
             logger.info(f"📱 Device added {len(self.known_topics):>3}/{total_available}: {devname}{description}")
         else:
-            logger.debug(f"Device added no. {len(self.known_topics):<3}:  {devname} ")
+            logger.debug("Device added no. %-3d:  %s ", len(self.known_topics), devname)
         
         self._publish(f"{self.topicPrefix.replace('/', '')}/{self.known_devices_topic}", ",".join(self.known_topics), retain=True)
     
@@ -330,16 +366,6 @@ class MQTTClient:
         if isinstance(value, (int, float)) and not isinstance(value, bool):
             value = round(value, 2) if isinstance(value, float) and "." in f"{value}" else value
 
-        # Log MQTT message for analysis
-        mqtt_analyzer.log_mqtt_message(
-            topic=topicname,
-            payload=value,
-            message_type=MQTTMessageType.STATE_UPDATE,
-            sensor_name=name,
-            qos=2,
-            retain=False
-        )
-        
         # Log sensor reading
         try:
             # Convert value to bytes for raw_value
@@ -359,7 +385,21 @@ class MQTTClient:
         except Exception as e:
             logger.error(f"Error logging sensor reading: {e}")
         
-        self._publish(topicname, value, qos=2, retain=False)
+        # Updates innerhalb des Sammelfensters werden pro Topic zusammengefasst
+        self.publish_scheduler.submit(name, topicname, value)
+
+    def _publish_state(self, name, topicname, value, qos):
+        # Log MQTT message for analysis
+        mqtt_analyzer.log_mqtt_message(
+            topic=topicname,
+            payload=value,
+            message_type=MQTTMessageType.STATE_UPDATE,
+            sensor_name=name,
+            qos=qos,
+            retain=False
+        )
+
+        self._publish(topicname, value, qos=qos, retain=False)
 
     def clear_hass(self):
         entities = {}
@@ -385,8 +425,8 @@ class MQTTClient:
             "qos": 2
         }
 
-        logger.debug(f"Auto Discovery HomeAssistant Clear Message: ")
-        logger.debug(f"{device}")
+        logger.debug("Auto Discovery HomeAssistant Clear Message: ")
+        logger.debug("%s", device)
 
         self._publish(f"{self.config.MQTT['homeAssistantAutoDiscoverTopic']}/device/{self.DEVICE_ID}/config",
                       json.dumps(device, ensure_ascii=False),
@@ -482,8 +522,8 @@ class MQTTClient:
         }
         device.update(entity)
 
-        logger.debug(f"Auto Discovery HomeAssistant Message: ")
-        logger.debug(f"{device}")
+        logger.debug("Auto Discovery HomeAssistant Message: ")
+        logger.debug("%s", device)
 
         # Log MQTT message for analysis
         mqtt_analyzer.log_mqtt_message(
@@ -0,0 +1,122 @@
+"""
+MQTT Befehls-Zusammenfassung für EHS-Sentinel
+Fasst SET-Befehle aus Home Assistant pro Entität zusammen, verwirft Werte, die die
+Wärmepumpe bereits bestätigt hat, und schreibt gleichzeitige Befehle gemeinsam
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from CustomLogger import logger
+
+class CommandCoalescer:
+    """
+    Sammelt SET-Befehle für ein Zeitfenster und schreibt pro Entität nur den letzten Wert.
+
+    Das Fenster beginnt mit dem ersten Befehl nach einer Pause. Ein neuer Wert überschreibt den
+    noch nicht geschriebenen Wert derselben Entität, Befehle für verschiedene Entitäten werden
+    am Ende des Fensters gemeinsam an write übergeben (ein Request-Paket mit mehreren
+    Nachrichten). Entspricht ein Wert dem zuletzt von der Wärmepumpe gemeldeten Wert und läuft
+    für die Entität kein Schreibvorgang, wird er nicht geschrieben. Die Schreibvorgänge laufen
+    nacheinander, ein späteres Fenster überholt ein früheres nie.
+    """
+
+    def __init__(self, write: Callable[[List[Tuple[str, Any]]], Awaitable[None]], window: float = 0.3,
+                 confirmed: Optional[Callable[[str], Any]] = None):
+        """
+        Args:
+            write: Coroutine, die eine Liste (Entität, Wert) auf die Wärmepumpe schreibt
+            window: Sammelfenster in Sekunden, 0 schreibt jeden Befehl sofort
+            confirmed: liefert den zuletzt gemeldeten Wert einer Entität oder None
+        """
+        self.write = write
+        self.window = window
+        self.confirmed = confirmed
+
+        self._pending: Dict[str, Any] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writing: Optional[asyncio.Task] = None
+        # Entitäten mit laufendem Schreibvorgang, ihr gemeldeter Wert ist noch nicht aktuell
+        self._in_flight: Dict[str, int] = {}
+
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'batches': 0,
+            'coalesced': 0,
+            'skipped_confirmed': 0,
+            'errors': 0
+        }
+
+    def submit(self, name: str, value: Any) -> bool:
+        """Nimmt einen SET-Befehl entgegen, False wenn der Wert bereits bestätigt ist."""
+        self.stats['submitted'] += 1
+        if isinstance(value, str):
+            value = value.strip()
+
+        if name in self._pending:
+            self.stats['coalesced'] += 1
+        elif self._is_confirmed(name, value):
+            self.stats['skipped_confirmed'] += 1
+            logger.debug("SET %s=%s übersprungen, Wert bereits bestätigt", name, value)
+            return False
+        self._pending[name] = value
+
+        if self.window <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return True
+
+    def flush(self):
+        """Übergibt alle gesammelten Befehle an write."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        # zurückgesetzte Regler: Wert entspricht wieder dem bestätigten Wert
+        batch = [(name, value) for name, value in pending.items() if not self._is_confirmed(name, value)]
+        self.stats['skipped_confirmed'] += len(pending) - len(batch)
+        if batch:
+            for name, _ in batch:
+                self._in_flight[name] = self._in_flight.get(name, 0) + 1
+            self._writing = asyncio.get_running_loop().create_task(self._write(batch, self._writing))
+
+    async def _write(self, batch: List[Tuple[str, Any]], previous: Optional[asyncio.Task]):
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+        try:
+            await self.write(batch)
+            self.stats['written'] += len(batch)
+            self.stats['batches'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Fehler beim Schreiben von {', '.join(name for name, _ in batch)}: {e}")
+        finally:
+            for name, _ in batch:
+                if self._in_flight[name] > 1:
+                    self._in_flight[name] -= 1
+                else:
+                    del self._in_flight[name]
+
+    async def drain(self):
+        """Schreibt offene Befehle sofort und wartet, bis alle Schreibvorgänge fertig sind."""
+        self.flush()
+        if self._writing is not None:
+            await asyncio.wait([self._writing])
+
+    def _is_confirmed(self, name: str, value: Any) -> bool:
+        if self.confirmed is None or name in self._in_flight:
+            return False
+        current = self.confirmed(name)
+        if current is None:
+            return False
+        try:
+            return float(value) == float(current)
+        except (TypeError, ValueError):
+            return str(value) == str(current)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['pending'] = len(self._pending)
+        return stats
@@ -6,8 +6,10 @@ MQTT-Kommunikationsanalysator für EHS-Sentinel
 import json
 import time
 import asyncio
+from bisect import bisect_left
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -65,32 +67,67 @@ class MQTTCommunicationAnalyzer:
     """
     Analysiert MQTT-Kommunikation zwischen Home Assistant und EHS-Sentinel.
     Überwacht Datenkonvertierung und Übertragungsfehler.
+
+    Alle Kennzahlen sind Zähler, die pro Nachricht in O(1) fortgeschrieben werden: Summen pro
+    Nachrichten- und Konvertierungstyp, Nachrichten pro Minute der letzten Stunde und ein
+    Histogramm der SET→STATE-Antwortzeiten. Einzelne Nachrichten, Konvertierungen und Flows
+    werden nur stichprobenartig (sample_rate) in begrenzten Deques aufbewahrt, Fehler immer.
+    Offene SET-Kommandos liegen in einem Dict pro Sensor in Reihenfolge ihres Eingangs, eine
+    STATE-Nachricht findet ihren Flow direkt, abgelaufene Kommandos werden von vorne entfernt.
     """
+
+    RESPONSE_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)  # obere Grenzen
     
     def __init__(self):
-        self.messages: List[MQTTMessage] = []
-        self.conversions: List[ValueConversion] = []
-        self.communication_flows: List[CommunicationFlow] = []
-        self.pending_commands: Dict[str, MQTTMessage] = {}
-        
-        # Konfiguration
-        self.max_messages = 1000
-        self.max_flows = 500
-        self.command_timeout = 30  # Sekunden
+        self.pending_commands: Dict[str, CommunicationFlow] = {}
+        self.configure()
         
+        # Wir starten den Cleanup-Task nicht im Konstruktor
+        # sondern werden ihn später im Event-Loop starten
+        self._cleanup_task = None
+
+    def configure(self, sample_rate: float = 0.1, max_messages: int = 1000, max_conversions: int = 1000,
+                  max_flows: int = 500, max_errors: int = 100, command_timeout: float = 30):
+        """
+        (Neu-)Einstellung, setzt alle Zähler und Aufzeichnungen zurück.
+
+        Args:
+            sample_rate: Anteil der Nachrichten, Konvertierungen und Flows, die einzeln
+                aufbewahrt werden (1 = alle, 0 = nur Zähler und Fehler)
+            max_messages, max_conversions, max_flows, max_errors: Größe der Deques
+            command_timeout: Sekunden, nach denen ein SET ohne STATE als fehlgeschlagen gilt
+        """
+        self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self.command_timeout = command_timeout
+        self.messages: Deque[MQTTMessage] = deque(maxlen=max_messages)
+        self.conversions: Deque[ValueConversion] = deque(maxlen=max_conversions)
+        self.communication_flows: Deque[CommunicationFlow] = deque(maxlen=max_flows)
+        self.errors: Deque[Dict[str, Any]] = deque(maxlen=max_errors)
+        self.pending_commands.clear()
+        # eigener Stichproben-Zähler je Aufzeichnungsart, die Aufrufe wechseln sich in festem Muster ab
+        self._sample_credit = {"messages": 0.0, "conversions": 0.0}
+
         # Statistiken
         self.stats = {
             "total_messages": 0,
             "successful_conversions": 0,
             "failed_conversions": 0,
+            "command_flows": 0,
+            "spontaneous_flows": 0,
             "successful_flows": 0,
             "failed_flows": 0,
-            "avg_response_time": 0.0
+            "superseded_commands": 0,
+            "sampled_records": 0
         }
-        
-        # Wir starten den Cleanup-Task nicht im Konstruktor
-        # sondern werden ihn später im Event-Loop starten
-        self._cleanup_task = None
+        self.message_types: Dict[MQTTMessageType, int] = dict.fromkeys(MQTTMessageType, 0)
+        self.conversion_types: Dict[ConversionDirection, int] = dict.fromkeys(ConversionDirection, 0)
+        # Sensor -> [Nachrichten, Konvertierungen, fehlgeschlagene Konvertierungen]
+        self.sensor_counts: Dict[str, List[int]] = {}
+        # Nachrichten pro Minute, Index Minute % 60: [Minute seit Epoche, Anzahl]
+        self._minutes = [[-1, 0] for _ in range(60)]
+        self._response_histogram = [0] * (len(self.RESPONSE_BUCKETS_MS) + 1)
+        self._response_total_ms = 0.0
+        self._response_count = 0
     
     def start_cleanup_task(self, loop=None):
         """Startet den Cleanup-Task im angegebenen Event-Loop"""
@@ -104,67 +141,109 @@ class MQTTCommunicationAnalyzer:
         if self._cleanup_task is None:
             self._cleanup_task = loop.create_task(self._cleanup_old_data())
             logger.debug("MQTT-Analyzer Cleanup-Task gestartet")
+
+    def _sample(self, kind: str) -> bool:
+        """Gleichmäßige Stichprobe: jede 1/sample_rate-te Aufzeichnung wird aufbewahrt."""
+        credit = self._sample_credit[kind] + self.sample_rate
+        sampled = credit >= 1.0 - 1e-9  # Rundung, 10 x 0.1 ergibt 0.9999999999999999
+        self._sample_credit[kind] = credit - 1.0 if sampled else credit
+        if sampled:
+            self.stats["sampled_records"] += 1
+        return sampled
+
+    def _sensor_count(self, sensor_name: str) -> List[int]:
+        counts = self.sensor_counts.get(sensor_name)
+        if counts is None:
+            counts = self.sensor_counts[sensor_name] = [0, 0, 0]
+        return counts
     
     def log_mqtt_message(self, topic: str, payload: Any, message_type: MQTTMessageType,
                         sensor_name: str = None, qos: int = 0, retain: bool = False):
         """Protokolliert eine MQTT-Nachricht"""
-        message = MQTTMessage(
-            topic=topic,
-            payload=payload,
-            timestamp=datetime.now(),
-            message_type=message_type,
-            sensor_name=sensor_name,
-            qos=qos,
-            retain=retain
-        )
-        
-        self.messages.append(message)
+        now = time.time()
         self.stats["total_messages"] += 1
-        
-        # Begrenze Anzahl der Nachrichten
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages:]
+        self.message_types[message_type] += 1
+        bucket = self._minutes[int(now // 60) % 60]
+        if bucket[0] != int(now // 60):
+            bucket[0] = int(now // 60)
+            bucket[1] = 0
+        bucket[1] += 1
+        if sensor_name:
+            self._sensor_count(sensor_name)[0] += 1
+        if self.pending_commands:
+            self._expire_pending(now)
+
+        # SET-Kommandos werden immer aufgezeichnet, sie sind selten und Teil eines Flows
+        if message_type == MQTTMessageType.SET_COMMAND or self._sample("messages"):
+            message = MQTTMessage(
+                topic=topic,
+                payload=payload,
+                timestamp=datetime.fromtimestamp(now),
+                message_type=message_type,
+                sensor_name=sensor_name,
+                qos=qos,
+                retain=retain
+            )
+            self.messages.append(message)
+        else:
+            message = None
         
         # Verarbeite Nachricht je nach Typ
         if message_type == MQTTMessageType.SET_COMMAND:
             self._handle_set_command(message)
         elif message_type == MQTTMessageType.STATE_UPDATE:
-            self._handle_state_update(message)
+            self._handle_state_update(sensor_name, topic, payload, now, message)
         
-        logger.debug(f"📨 MQTT {message_type.value}: {topic} = {payload}")
+        logger.debug("📨 MQTT %s: %s = %s", message_type, topic, payload)
     
     def log_value_conversion(self, sensor_name: str, original_value: Any, 
                            converted_value: Any, conversion_type: ConversionDirection,
                            success: bool = True, error_message: str = None):
         """Protokolliert eine Wertkonvertierung"""
-        conversion = ValueConversion(
+        self.conversion_types[conversion_type] += 1
+        counts = self._sensor_count(sensor_name)
+        counts[1] += 1
+        
+        if success:
+            self.stats["successful_conversions"] += 1
+            if self._sample("conversions"):
+                self.conversions.append(ValueConversion(
+                    original_value=original_value,
+                    converted_value=converted_value,
+                    conversion_type=conversion_type,
+                    timestamp=datetime.now(),
+                    sensor_name=sensor_name
+                ))
+            logger.debug("🔄 Konvertierung %s: %s → %s", conversion_type, original_value, converted_value)
+            return
+
+        self.stats["failed_conversions"] += 1
+        counts[2] += 1
+        timestamp = datetime.now()
+        self.conversions.append(ValueConversion(
             original_value=original_value,
             converted_value=converted_value,
             conversion_type=conversion_type,
-            timestamp=datetime.now(),
+            timestamp=timestamp,
             sensor_name=sensor_name,
-            success=success,
+            success=False,
             error_message=error_message
-        )
-        
-        self.conversions.append(conversion)
-        
-        if success:
-            self.stats["successful_conversions"] += 1
-        else:
-            self.stats["failed_conversions"] += 1
-        
-        # Detailliertes Logging
-        if success:
-            logger.debug(f"🔄 Konvertierung {conversion_type.value}: {original_value} → {converted_value}")
-        else:
-            logger.error(f"❌ Konvertierung fehlgeschlagen {conversion_type.value}: {original_value} | Fehler: {error_message}")
+        ))
+        self.errors.append({
+            "type": "conversion_error",
+            "timestamp": timestamp.isoformat(),
+            "sensor": sensor_name,
+            "message": error_message,
+            "details": f"{conversion_type.value}: {original_value}"
+        })
+        logger.error(f"❌ Konvertierung fehlgeschlagen {conversion_type.value}: {original_value} | Fehler: {error_message}")
     
     def _handle_set_command(self, message: MQTTMessage):
         """Verarbeitet SET-Kommandos von Home Assistant"""
         if message.sensor_name:
-            # Speichere als ausstehenden Befehl
-            self.pending_commands[message.sensor_name] = message
+            # Ein neueres SET ersetzt das offene, ans Ende der Eingangsreihenfolge
+            if self.pending_commands.pop(message.sensor_name, None) is not None:
+                self.stats["superseded_commands"] += 1
             
             # Starte neuen Communication Flow
             flow = CommunicationFlow(
@@ -172,48 +251,81 @@ class MQTTCommunicationAnalyzer:
                 initiated_by="home_assistant",
                 set_command=message
             )
+            self.pending_commands[message.sensor_name] = flow
             self.communication_flows.append(flow)
+            self.stats["command_flows"] += 1
             
             logger.info(f"🎛️ SET-Kommando empfangen: {message.sensor_name} = {message.payload}")
     
-    def _handle_state_update(self, message: MQTTMessage):
+    def _handle_state_update(self, sensor_name: Optional[str], topic: str, payload: Any, now: float,
+                             message: Optional[MQTTMessage]):
         """Verarbeitet STATE-Updates von EHS-Sentinel"""
-        if message.sensor_name:
-            # Suche nach passendem ausstehenden Befehl
-            if message.sensor_name in self.pending_commands:
-                set_command = self.pending_commands.pop(message.sensor_name)
-                
-                # Finde passenden Communication Flow
-                for flow in reversed(self.communication_flows):
-                    if (flow.sensor_name == message.sensor_name and 
-                        flow.set_command and 
-                        flow.set_command.timestamp == set_command.timestamp):
-                        
-                        # Vervollständige Flow
-                        flow.state_update = message
-                        flow.response_time_ms = (message.timestamp - set_command.timestamp).total_seconds() * 1000
-                        
-                        # Prüfe Erfolg (vereinfacht)
-                        flow.success = self._verify_command_success(set_command, message)
-                        
-                        if flow.success:
-                            self.stats["successful_flows"] += 1
-                            logger.info(f"✅ Kommando erfolgreich: {message.sensor_name} ({flow.response_time_ms:.1f}ms)")
-                        else:
-                            self.stats["failed_flows"] += 1
-                            flow.error_message = "Wert-Mismatch zwischen SET und STATE"
-                            logger.warning(f"⚠️ Kommando-Mismatch: {message.sensor_name}")
-                        
-                        break
-            else:
-                # Spontanes State-Update (nicht durch SET ausgelöst)
-                flow = CommunicationFlow(
-                    sensor_name=message.sensor_name,
+        if not sensor_name:
+            return
+        flow = self.pending_commands.pop(sensor_name, None)
+        if flow is None:
+            # Spontanes State-Update (nicht durch SET ausgelöst), nur als Stichprobe aufbewahrt
+            self.stats["spontaneous_flows"] += 1
+            if message is not None:
+                self.communication_flows.append(CommunicationFlow(
+                    sensor_name=sensor_name,
                     initiated_by="ehs_sentinel",
                     state_update=message,
                     success=True
-                )
-                self.communication_flows.append(flow)
+                ))
+            return
+
+        if message is None:
+            message = MQTTMessage(topic=topic, payload=payload, timestamp=datetime.fromtimestamp(now),
+                                  message_type=MQTTMessageType.STATE_UPDATE, sensor_name=sensor_name)
+        set_command = flow.set_command
+        
+        # Vervollständige Flow
+        flow.state_update = message
+        flow.response_time_ms = (message.timestamp - set_command.timestamp).total_seconds() * 1000
+        self._record_response_time(flow.response_time_ms)
+        
+        # Prüfe Erfolg (vereinfacht)
+        flow.success = self._verify_command_success(set_command, message)
+        
+        if flow.success:
+            self.stats["successful_flows"] += 1
+            logger.info(f"✅ Kommando erfolgreich: {sensor_name} ({flow.response_time_ms:.1f}ms)")
+        else:
+            self.stats["failed_flows"] += 1
+            flow.error_message = "Wert-Mismatch zwischen SET und STATE"
+            self._record_flow_error(flow)
+            logger.warning(f"⚠️ Kommando-Mismatch: {sensor_name}")
+
+    def _record_response_time(self, response_time_ms: float):
+        self._response_histogram[bisect_left(self.RESPONSE_BUCKETS_MS, response_time_ms)] += 1
+        self._response_total_ms += response_time_ms
+        self._response_count += 1
+
+    def _record_flow_error(self, flow: CommunicationFlow):
+        self.errors.append({
+            "type": "communication_error",
+            "timestamp": flow.set_command.timestamp.isoformat(),
+            "sensor": flow.sensor_name,
+            "message": flow.error_message,
+            "details": f"SET: {flow.set_command.payload}, STATE: {flow.state_update.payload if flow.state_update else 'None'}"
+        })
+
+    def _expire_pending(self, now: float):
+        """Markiert SET-Kommandos ohne STATE-Antwort nach command_timeout als fehlgeschlagen."""
+        cutoff = datetime.fromtimestamp(now - self.command_timeout)
+        pending = self.pending_commands
+        while pending:
+            sensor = next(iter(pending))
+            flow = pending[sensor]
+            if flow.set_command.timestamp >= cutoff:
+                break
+            del pending[sensor]
+            flow.success = False
+            flow.error_message = "Timeout - keine STATE-Antwort erhalten"
+            self.stats["failed_flows"] += 1
+            self._record_flow_error(flow)
+            logger.warning(f"⏰ SET-Kommando Timeout: {sensor} (nach {self.command_timeout}s)")
     
     def _verify_command_success(self, set_command: MQTTMessage, state_update: MQTTMessage) -> bool:
         """Überprüft, ob ein SET-Kommando erfolgreich war"""
@@ -242,49 +354,57 @@ class MQTTCommunicationAnalyzer:
     
     def get_communication_stats(self) -> Dict[str, Any]:
         """Gibt Kommunikationsstatistiken zurück"""
-        # Berechne durchschnittliche Antwortzeit
-        response_times = [
-            flow.response_time_ms for flow in self.communication_flows 
-            if flow.response_time_ms is not None
-        ]
+        self._expire_pending(time.time())
+        avg_response_time = self._response_total_ms / self._response_count if self._response_count else 0
         
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        
-        # Aktualisiere Statistiken
-        self.stats["avg_response_time"] = round(avg_response_time, 2)
-        
-        # Berechne Erfolgsraten
-        total_flows = len(self.communication_flows)
-        success_rate = (self.stats["successful_flows"] / total_flows * 100) if total_flows > 0 else 0
+        # Erfolgsrate über abgeschlossene SET-Flows
+        completed_flows = self.stats["successful_flows"] + self.stats["failed_flows"]
+        success_rate = (self.stats["successful_flows"] / completed_flows * 100) if completed_flows > 0 else 0
         
         conversion_total = self.stats["successful_conversions"] + self.stats["failed_conversions"]
         conversion_rate = (self.stats["successful_conversions"] / conversion_total * 100) if conversion_total > 0 else 0
         
+        bounds = [f"<={bound}" for bound in self.RESPONSE_BUCKETS_MS] + [f">{self.RESPONSE_BUCKETS_MS[-1]}"]
         return {
             "message_stats": {
                 "total_messages": self.stats["total_messages"],
                 "messages_last_hour": self._count_messages_last_hour(),
-                "pending_commands": len(self.pending_commands)
+                "pending_commands": len(self.pending_commands),
+                "by_type": {message_type.value: count for message_type, count in self.message_types.items()}
             },
             "conversion_stats": {
                 "successful_conversions": self.stats["successful_conversions"],
                 "failed_conversions": self.stats["failed_conversions"],
-                "conversion_success_rate": round(conversion_rate, 2)
+                "conversion_success_rate": round(conversion_rate, 2),
+                "by_type": {direction.value: count for direction, count in self.conversion_types.items()}
             },
             "flow_stats": {
-                "total_flows": total_flows,
+                "total_flows": self.stats["command_flows"] + self.stats["spontaneous_flows"],
+                "command_flows": self.stats["command_flows"],
+                "spontaneous_flows": self.stats["spontaneous_flows"],
                 "successful_flows": self.stats["successful_flows"],
                 "failed_flows": self.stats["failed_flows"],
+                "superseded_commands": self.stats["superseded_commands"],
                 "success_rate": round(success_rate, 2),
-                "avg_response_time_ms": self.stats["avg_response_time"]
+                "avg_response_time_ms": round(avg_response_time, 2),
+                "response_time_histogram_ms": dict(zip(bounds, self._response_histogram))
+            },
+            "sampling": {
+                "sample_rate": self.sample_rate,
+                "sampled_records": self.stats["sampled_records"],
+                "stored": {
+                    "messages": len(self.messages),
+                    "conversions": len(self.conversions),
+                    "flows": len(self.communication_flows),
+                    "errors": len(self.errors)
+                }
             },
             "recent_errors": self._get_recent_errors()
         }
     
     def get_sensor_communication_history(self, sensor_name: str, hours: int = 24) -> Dict[str, Any]:
-        """Gibt die Kommunikationshistorie für einen Sensor zurück"""
+        """Gibt die Kommunikationshistorie für einen Sensor zurück (Stichprobe, Fehler vollständig)"""
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        
         # Filtere Nachrichten
         sensor_messages = [
             msg for msg in self.messages 
@@ -305,9 +425,16 @@ class MQTTCommunicationAnalyzer:
             if conv.sensor_name == sensor_name and conv.timestamp > cutoff_time
         ]
         
+        counts = self.sensor_counts.get(sensor_name, [0, 0, 0])
         return {
             "sensor_name": sensor_name,
             "time_period_hours": hours,
+            "sample_rate": self.sample_rate,
+            "counters": {
+                "messages": counts[0],
+                "conversions": counts[1],
+                "failed_conversions": counts[2]
+            },
             "messages": [
                 {
                     "timestamp": msg.timestamp.isoformat(),
@@ -344,87 +471,25 @@ class MQTTCommunicationAnalyzer:
     
     def _count_messages_last_hour(self) -> int:
         """Zählt Nachrichten der letzten Stunde"""
-        cutoff_time = datetime.now() - timedelta(hours=1)
-        return sum(1 for msg in self.messages if msg.timestamp > cutoff_time)
+        current = int(time.time() // 60)
+        return sum(count for minute, count in self._minutes if current - minute < 60)
     
     def _get_recent_errors(self, hours: int = 1) -> List[Dict[str, Any]]:
         """Gibt aktuelle Fehler zurück"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        errors = []
-        
-        # Konvertierungsfehler
-        for conv in self.conversions:
-            if not conv.success and conv.timestamp > cutoff_time:
-                errors.append({
-                    "type": "conversion_error",
-                    "timestamp": conv.timestamp.isoformat(),
-                    "sensor": conv.sensor_name,
-                    "message": conv.error_message,
-                    "details": f"{conv.conversion_type.value}: {conv.original_value}"
-                })
-        
-        # Flow-Fehler
-        for flow in self.communication_flows:
-            if not flow.success and flow.error_message and \
-               (flow.set_command and flow.set_command.timestamp > cutoff_time):
-                errors.append({
-                    "type": "communication_error",
-                    "timestamp": flow.set_command.timestamp.isoformat(),
-                    "sensor": flow.sensor_name,
-                    "message": flow.error_message,
-                    "details": f"SET: {flow.set_command.payload}, STATE: {flow.state_update.payload if flow.state_update else 'None'}"
-                })
-        
+        cutoff_time = (datetime.now() - timedelta(hours=hours)).isoformat()
+        errors = [error for error in self.errors if error["timestamp"] > cutoff_time]
         return sorted(errors, key=lambda x: x["timestamp"], reverse=True)[:10]
     
     async def _cleanup_old_data(self):
-        """Bereinigt alte Daten"""
+        """Prüft offene SET-Kommandos auf Timeout, auch wenn keine Nachrichten eingehen"""
         while True:
             try:
-                await asyncio.sleep(3600)  # Stündliche Bereinigung
-                
-                cutoff_time = datetime.now() - timedelta(hours=24)
-                
-                # Bereinige alte Nachrichten
-                self.messages = [msg for msg in self.messages if msg.timestamp > cutoff_time]
-                
-                # Bereinige alte Konvertierungen
-                self.conversions = [conv for conv in self.conversions if conv.timestamp > cutoff_time]
-                
-                # Bereinige alte Flows
-                self.communication_flows = [
-                    flow for flow in self.communication_flows 
-                    if (flow.set_command and flow.set_command.timestamp > cutoff_time) or
-                       (flow.state_update and flow.state_update.timestamp > cutoff_time)
-                ]
-                
-                # Bereinige abgelaufene ausstehende Befehle
-                timeout_cutoff = datetime.now() - timedelta(seconds=self.command_timeout)
-                expired_commands = [
-                    sensor for sensor, cmd in self.pending_commands.items()
-                    if cmd.timestamp < timeout_cutoff
-                ]
-                
-                for sensor in expired_commands:
-                    cmd = self.pending_commands.pop(sensor)
-                    logger.warning(f"⏰ SET-Kommando Timeout: {sensor} (nach {self.command_timeout}s)")
-                    
-                    # Markiere Flow als fehlgeschlagen
-                    for flow in reversed(self.communication_flows):
-                        if (flow.sensor_name == sensor and 
-                            flow.set_command and 
-                            flow.set_command.timestamp == cmd.timestamp):
-                            flow.success = False
-                            flow.error_message = "Timeout - keine STATE-Antwort erhalten"
-                            self.stats["failed_flows"] += 1
-                            break
-                
-                logger.debug(f"🧹 MQTT-Daten bereinigt: {len(self.messages)} Nachrichten, {len(self.communication_flows)} Flows")
+                await asyncio.sleep(self.command_timeout)
+                self._expire_pending(time.time())
                 
             except Exception as e:
                 logger.error(f"Fehler bei MQTT-Datenbereinigung: {e}")
                 await asyncio.sleep(3600)
 
 # Globale Instanz
-mqtt_analyzer = MQTTCommunicationAnalyzer()
\ No newline at end of file
+mqtt_analyzer = MQTTCommunicationAnalyzer()
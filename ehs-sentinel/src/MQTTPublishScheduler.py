@@ -0,0 +1,196 @@
+"""
+MQTT Publish-Scheduler für EHS-Sentinel
+Fasst wiederholte Zustands-Updates pro Topic zusammen, veröffentlicht nur Änderungen
+und wählt die QoS pro Sensor
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from CustomLogger import logger
+
+DeadbandSpec = Union[None, int, float, Dict[str, float]]
+
+class ChangeFilter:
+    """
+    Entscheidet, ob ein Wert gegenüber dem zuletzt veröffentlichten Wert desselben Topics
+    neu gesendet werden muss.
+
+    Ein numerischer Wert wird übersprungen, solange |neu - alt| <= max(absolut, relativ * |alt|)
+    gilt. Texte und Enums werden nur bei Gleichheit übersprungen. Nach heartbeat Sekunden ohne
+    Publish wird der Wert auch unverändert erneut gesendet, damit Home Assistant den Sensor nicht
+    als veraltet ansieht.
+
+    Die Totzone wird in dieser Reihenfolge gesucht: pro Sensor, pro Gruppe, Standard.
+    Eine Totzone ist None (Änderungserkennung aus), eine Zahl (absolut) oder ein Dict
+    {'absolute': x, 'relative': y}.
+    """
+
+    def __init__(self, deadband: DeadbandSpec = None, heartbeat: float = 0,
+                 sensor_deadband: Optional[Dict[str, DeadbandSpec]] = None,
+                 group_deadband: Optional[Dict[str, DeadbandSpec]] = None,
+                 sensor_groups: Optional[Dict[str, str]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            deadband: Standard-Totzone
+            heartbeat: maximale Sekunden ohne Publish, 0 schaltet den Heartbeat ab
+            sensor_deadband: Totzone pro Sensorname
+            group_deadband: Totzone pro Gruppe (z.B. device_class "temperature")
+            sensor_groups: Zuordnung Sensorname -> Gruppe
+            clock: Zeitquelle in Sekunden
+        """
+        self.default = self._parse_spec(deadband)
+        self.heartbeat = heartbeat
+        self.sensor_deadband = {name: self._parse_spec(spec) for name, spec in (sensor_deadband or {}).items()}
+        self.group_deadband = {group: self._parse_spec(spec) for group, spec in (group_deadband or {}).items()}
+        self.sensor_groups = sensor_groups or {}
+        self.clock = clock
+
+        self._resolved: Dict[str, Optional[Tuple[float, float]]] = {}
+        self._last: Dict[str, Tuple[Any, float]] = {}
+
+    @staticmethod
+    def _parse_spec(spec: DeadbandSpec) -> Optional[Tuple[float, float]]:
+        if spec is None:
+            return None
+        if isinstance(spec, dict):
+            return (float(spec.get('absolute', 0) or 0), float(spec.get('relative', 0) or 0))
+        return (float(spec), 0.0)
+
+    def deadband_for(self, name: str) -> Optional[Tuple[float, float]]:
+        """Liefert (absolut, relativ) für einen Sensor oder None ohne Änderungserkennung."""
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+
+        if name in self.sensor_deadband:
+            deadband = self.sensor_deadband[name]
+        elif self.sensor_groups.get(name) in self.group_deadband:
+            deadband = self.group_deadband[self.sensor_groups[name]]
+        else:
+            deadband = self.default
+        self._resolved[name] = deadband
+        return deadband
+
+    def check(self, topic: str, name: str, value: Any) -> Optional[str]:
+        """
+        Prüft einen Wert, ohne ihn zu speichern.
+
+        Returns:
+            'change' bei neuem oder geändertem Wert, 'heartbeat' bei unverändertem Wert nach
+            Ablauf des Heartbeats, None wenn der Wert übersprungen werden kann
+        """
+        deadband = self.deadband_for(name)
+        if deadband is None or topic not in self._last:
+            return 'change'
+
+        last_value, last_time = self._last[topic]
+        if not self._within_deadband(last_value, value, deadband):
+            return 'change'
+        if self.heartbeat > 0 and self.clock() - last_time >= self.heartbeat:
+            return 'heartbeat'
+        return None
+
+    def mark_published(self, topic: str, value: Any):
+        """Merkt sich einen erfolgreich veröffentlichten Wert."""
+        self._last[topic] = (value, self.clock())
+
+    @staticmethod
+    def _within_deadband(last: Any, value: Any, deadband: Tuple[float, float]) -> bool:
+        numeric = (int, float)
+        if isinstance(last, numeric) and isinstance(value, numeric) \
+                and not isinstance(last, bool) and not isinstance(value, bool):
+            absolute, relative = deadband
+            return abs(value - last) <= max(absolute, relative * abs(last))
+        return last == value
+
+class PublishScheduler:
+    """
+    Sammelt Zustands-Updates für ein Zeitfenster und veröffentlicht pro Topic nur den letzten Wert.
+
+    Innerhalb des Fensters überschreibt ein neuer Wert den noch nicht gesendeten Wert desselben
+    Topics. Beim Senden entscheidet der ChangeFilter, ob sich der Wert gegenüber dem zuletzt
+    veröffentlichten Wert ausreichend geändert hat.
+    """
+
+    def __init__(self, publish: Callable[[str, str, Any, int], None], window: float = 1.0,
+                 qos: int = 2, sensor_qos: Optional[Dict[str, int]] = None,
+                 change_filter: Optional[ChangeFilter] = None):
+        """
+        Args:
+            publish: Funktion (name, topic, value, qos), die den Wert tatsächlich veröffentlicht
+            window: Sammelfenster in Sekunden, 0 veröffentlicht sofort
+            qos: Standard-QoS für Zustands-Updates
+            sensor_qos: abweichende QoS pro Sensorname
+            change_filter: Änderungserkennung, ohne Filter wird jeder Wert veröffentlicht
+        """
+        self.publish = publish
+        self.window = window
+        self.qos = qos
+        self.sensor_qos = sensor_qos or {}
+        self.change_filter = change_filter or ChangeFilter()
+
+        self._pending: Dict[str, tuple] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.stats = {
+            'submitted': 0,
+            'published': 0,
+            'coalesced': 0,
+            'skipped_deadband': 0,
+            'heartbeats': 0,
+            'published_by_qos': {0: 0, 1: 0, 2: 0},
+        }
+
+    def submit(self, name: str, topic: str, value: Any):
+        """Nimmt einen neuen Wert für ein Topic entgegen."""
+        self.stats['submitted'] += 1
+
+        if self.window <= 0:
+            self._send(topic, name, value)
+            return
+
+        if topic in self._pending:
+            self.stats['coalesced'] += 1
+        self._pending[topic] = (name, value)
+
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self):
+        """Veröffentlicht alle gesammelten Werte."""
+        self._timer = None
+        pending, self._pending = self._pending, {}
+        for topic, (name, value) in pending.items():
+            self._send(topic, name, value)
+
+    def qos_for(self, name: str) -> int:
+        return self.sensor_qos.get(name, self.qos)
+
+    def _send(self, topic: str, name: str, value: Any):
+        reason = self.change_filter.check(topic, name, value)
+        if reason is None:
+            self.stats['skipped_deadband'] += 1
+            return
+
+        qos = self.qos_for(name)
+        try:
+            self.publish(name, topic, value, qos)
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Veröffentlichen von {topic}: {e}")
+            return
+
+        self.change_filter.mark_published(topic, value)
+        self.stats['published'] += 1
+        if reason == 'heartbeat':
+            self.stats['heartbeats'] += 1
+        self.stats['published_by_qos'][qos] = self.stats['published_by_qos'].get(qos, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['published_by_qos'] = dict(self.stats['published_by_qos'])
+        stats['pending'] = len(self._pending)
+        return stats
@@ -8,12 +8,15 @@ from EHSArguments import EHSArguments
 from EHSConfig import EHSConfig
 from EHSExceptions import MessageWarningException
 from MQTTClient import MQTTClient
-from SafeArithmetic import safe_eval_arithmetic
 from SensorMonitor import sensor_monitor, SensorStatus, ErrorType
 from MQTTCommunicationAnalyzer import mqtt_analyzer, ConversionDirection
+from ProtocolWriter import protocol_writer
+from PollCorrelator import poll_correlator
+from FreshnessCache import freshness_cache
+from AdaptiveIntervals import adaptive_intervals
 
 from NASAMessage import NASAMessage
-from NASAPacket import NASAPacket
+from NASAPacket import NASAPacket, DataType
 
 class MessageProcessor:
     """
@@ -30,15 +33,24 @@ class MessageProcessor:
         self.mqtt = MQTTClient()
 
     async def process_message(self, packet: NASAPacket):
+        if packet.packet_data_type == DataType.Resposne:
+            poll_correlator.match_response(packet)
+        elif packet.packet_data_type == DataType.Nack:
+            poll_correlator.match_nack(packet)
+        elif packet.packet_data_type == DataType.Ack:
+            poll_correlator.match_ack(packet)
+        freshness_cache.record(packet)
+
+        nasa_index = self.config.NASA_INDEX
         for msg in packet.packet_messages:
-            hexmsg = f"0x{msg.packet_message:04x}" #hex(msg.packet_message)
-            msgname = self.search_nasa_table(hexmsg)
-            if msgname is not None:
+            repo_match = nasa_index.get(msg.packet_message)
+            if repo_match is not None:
+                msgname, _, decode = repo_match
                 try:
                     # Measure processing time
                     start_time = time.time()
                     
-                    msgvalue = self.determine_value(msg.packet_payload, msgname, msg.packet_message_type)
+                    msgvalue = decode(msg.packet_payload)
                     
                     # Calculate processing time
                     processing_time_ms = (time.time() - start_time) * 1000
@@ -53,7 +65,7 @@ class MessageProcessor:
                         response_time_ms=processing_time_ms
                     )
                 except Exception as e:
-                    logger.warning(f"Value of {hexmsg} couldn't be determined, using raw value: {e}")
+                    logger.warning(f"Value of 0x{msg.packet_message:04x} couldn't be determined, using raw value: {e}")
                     # Use raw value as fallback
                     msgvalue = int.from_bytes(msg.packet_payload, byteorder='big', signed=True)
                     
@@ -66,7 +78,8 @@ class MessageProcessor:
                     )
                     
                     await self.protocolMessage(msg, msgname, msgvalue)
-            else:
+            elif self.config.LOGGING['messageNotFound'] or logger.isEnabledFor(logging.DEBUG):
+                hexmsg = f"0x{msg.packet_message:04x}"
                 packedval = int.from_bytes(msg.packet_payload, byteorder='big', signed=True)
                 if self.config.LOGGING['messageNotFound']:
                     logger.info(f"Message not Found in NASA repository: {hexmsg:<6} Type: {msg.packet_message_type} Payload: {msg.packet_payload} = {packedval}")
@@ -77,19 +90,18 @@ class MessageProcessor:
 
         if self.config.LOGGING['proccessedMessage']:
             logger.info(f"Message number: {hex(msg.packet_message):<6} {msgname:<50} Type: {msg.packet_message_type} Payload: {msgvalue} ({msg.packet_payload})")
-        else:
+        elif logger.isEnabledFor(logging.DEBUG):
             logger.debug(f"Message number: {hex(msg.packet_message):<6} {msgname:<50} Type: {msg.packet_message_type} Payload: {msgvalue}")
 
         if self.config.GENERAL['protocolFile'] is not None:
-            try:
-                with open(self.config.GENERAL['protocolFile'], "a") as protWriter:
-                    protWriter.write(f"{hex(msg.packet_message):<6},{msg.packet_message_type},{msgname:<50},{msgvalue}\n")
-            except Exception as e:
-                logger.warning(f"Could not write to protocol file: {e}")
+            if not protocol_writer.enabled:
+                self._configure_protocol_writer()
+            protocol_writer.write(msg.packet_message, msg.packet_message_type, msgname, msgvalue)
 
         await self.mqtt.publish_message(msgname, msgvalue)
 
         self.config.NASA_VAL_STORE[msgname] = msgvalue
+        adaptive_intervals.observe(msgname, msgvalue)
 
         if msgname in ['NASA_OUTDOOR_TW2_TEMP', 'NASA_OUTDOOR_TW1_TEMP', 'VAR_IN_FLOW_SENSOR_CALC']:
             if all(k in self.config.NASA_VAL_STORE for k in ['NASA_OUTDOOR_TW2_TEMP', 'NASA_OUTDOOR_TW1_TEMP', 'VAR_IN_FLOW_SENSOR_CALC']):
@@ -164,112 +176,24 @@ class MessageProcessor:
                                                 value
                                                 )
 
+    def _configure_protocol_writer(self):
+        protocol = self.config.PROTOCOL
+        protocol_writer.configure(
+            self.config.GENERAL['protocolFile'],
+            file_format=protocol['format'],
+            flush_interval=protocol['flushInterval'],
+            flush_size=protocol['flushSize'],
+            rotation=protocol['rotation'],
+            max_bytes=protocol['maxBytes'],
+            backup_count=protocol['backupCount']
+        )
+
     def search_nasa_table(self, address):
-        for key, value in self.config.NASA_REPO.items():
-            if value['address'].lower() == address:
-                return key
+        if isinstance(address, str):
+            address = int(address, 16)
+        repo_match = self.config.NASA_INDEX.get(address)
+        if repo_match is not None:
+            return repo_match[0]
             
-    def is_valid_rawvalue(self, rawvalue: bytes) -> bool:
-        return all(0x20 <= b <= 0x7E or b in (0x00, 0xFF) for b in rawvalue)
-
     def determine_value(self, rawvalue, msgname, packet_message_type):
-        if packet_message_type == 3:
-            value = ""
-
-            if self.is_valid_rawvalue(rawvalue[1:-1]):
-                for byte in rawvalue[1:-1]:
-                    if byte != 0x00 and byte != 0xFF:
-                        char = chr(byte) if 32 <= byte <= 126 else f"{byte}"
-                        value += char
-                    else:
-                        value += " "
-                value = value.strip()
-            else:
-                value = "".join([f"{int(x)}" for x in rawvalue])
-            
-            # Log data conversion for string values
-            mqtt_analyzer.log_value_conversion(
-                sensor_name=msgname,
-                original_value=rawvalue.hex(),
-                converted_value=value,
-                conversion_type=ConversionDirection.BYTES_TO_STRING,
-                success=True
-            )
-        else:
-            # Sichere arithmetische Auswertung statt eval()
-            if 'arithmetic' in self.config.NASA_REPO[msgname]:
-                arithmetic = self.config.NASA_REPO[msgname]['arithmetic']
-                # Fix arithmetic replacement issue - nur 'value' ersetzen, nicht 'packed_value'
-                if 'packed_value' not in arithmetic:
-                    arithmetic = arithmetic.replace("value", 'packed_value')
-            else: 
-                arithmetic = ''
-
-            packed_value = int.from_bytes(rawvalue, byteorder='big', signed=True)
-
-            if len(arithmetic) > 0:
-                try:
-                    # Verwende sichere arithmetische Auswertung
-                    value = safe_eval_arithmetic(arithmetic, packed_value=packed_value)
-                    
-                    # Log data conversion
-                    mqtt_analyzer.log_value_conversion(
-                        sensor_name=msgname,
-                        original_value=packed_value,
-                        converted_value=value,
-                        conversion_type=ConversionDirection.HEX_TO_DECIMAL,
-                        success=True
-                    )
-                except Exception as e:
-                    logger.warning(f"Arithmetic Function couldn't been applied for Message {msgname}, using raw value: arithmetic = {arithmetic} {e} {packed_value} {rawvalue}")
-                    value = packed_value
-                    
-                    # Log failed conversion
-                    mqtt_analyzer.log_value_conversion(
-                        sensor_name=msgname,
-                        original_value=packed_value,
-                        converted_value=value,
-                        conversion_type=ConversionDirection.HEX_TO_DECIMAL,
-                        success=False,
-                        error_message=f"Arithmetic error: {e}"
-                    )
-            else:
-                value = packed_value
-
-            value = round(value, 3)
-
-            if 'type' in self.config.NASA_REPO[msgname]:
-                if self.config.NASA_REPO[msgname]['type'] == 'ENUM':
-                    if 'enum' in self.config.NASA_REPO[msgname]:
-                        raw_value = int.from_bytes(rawvalue, byteorder='big')
-                        if raw_value in self.config.NASA_REPO[msgname]['enum']:
-                            enum_value = self.config.NASA_REPO[msgname]['enum'][raw_value]
-                            
-                            # Log enum conversion
-                            mqtt_analyzer.log_value_conversion(
-                                sensor_name=msgname,
-                                original_value=raw_value,
-                                converted_value=enum_value,
-                                conversion_type=ConversionDirection.HEX_TO_DECIMAL,
-                                success=True
-                            )
-                            
-                            value = enum_value
-                        else:
-                            # Handle unknown enum values gracefully
-                            logger.warning(f"Unknown enum value {raw_value} for {msgname}, using raw value")
-                            value = raw_value
-                            
-                            # Log failed conversion
-                            mqtt_analyzer.log_value_conversion(
-                                sensor_name=msgname,
-                                original_value=raw_value,
-                                converted_value=value,
-                                conversion_type=ConversionDirection.HEX_TO_DECIMAL,
-                                success=False,
-                                error_message=f"Unknown enum value: {raw_value}"
-                            )
-                    else:
-                        value = f"Unknown enum value: {value}"
-                
-        return value
\ No newline at end of file
+        return self.config.NASA_DECODERS[msgname](rawvalue)
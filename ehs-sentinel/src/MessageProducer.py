@@ -1,13 +1,17 @@
 from CustomLogger import logger
 from EHSArguments import EHSArguments
 from EHSConfig import EHSConfig
-from EHSExceptions import MessageWarningException
-from SafeArithmetic import safe_eval_arithmetic
 import asyncio
+import logging
 import traceback
 
+from BusArbiter import Lane, bus_arbiter
+from BusPacer import bus_pacer
+from NASAEncoder import SensorEncoder
+from NASAFrameEncoder import NASAFrameEncoder
 from NASAMessage import NASAMessage
 from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
+from PollCorrelator import poll_correlator
 
 class MessageProducer:
     """
@@ -18,7 +22,7 @@ class MessageProducer:
     """
 
     _instance = None
-    _CHUNKSIZE = 10 # message requests list will be split into this chunks, experience have shown that more then 10 are too much for an packet
+    _FRAME_CACHE_SIZE = 256 # distinct message lists whose read request frames are kept
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -32,6 +36,21 @@ class MessageProducer:
         self._initialized = True
         self.writer = writer
         self.config = EHSConfig()
+        self._read_encoder = NASAFrameEncoder.from_packet(self._build_default_read_packet())
+        self._request_encoder = NASAFrameEncoder.from_packet(self._build_default_request_packet())
+        self._read_frame_cache = {}
+        self._read_frame_cache_addresses = None
+        bus = self.config.BUS
+        if bus:
+            bus_pacer.configure(
+                chunk_size=bus['chunkSize'],
+                max_chunk_size=bus['maxChunkSize'],
+                frame_gap=bus['frameGap'],
+                max_frame_gap=bus['maxFrameGap'],
+                response_wait=bus['responseWait'],
+                adaptive=bus['adaptive']
+            )
+            bus_arbiter.configure(airtime={Lane[lane.upper()]: share for lane, share in bus['airtime'].items()})
         logger.info(f"🔧 MessageProducer initialized with writer: {'✅ Available' if writer else '❌ Not available'}")
 
     def set_writer(self, writer: asyncio.StreamWriter):
@@ -39,171 +58,185 @@ class MessageProducer:
         self.writer = writer
         logger.info(f"🔄 MessageProducer writer updated: {'✅ Available' if writer else '❌ Not available'}")
 
-    async def read_request(self, list_of_messages: list):
+    async def read_request(self, list_of_messages: list, lane: Lane = Lane.LIVE):
         if not self.writer:
             logger.error("❌ Cannot send read request - no writer available")
             return
             
         try:
-            chunks = [list_of_messages[i:i + self._CHUNKSIZE] for i in range(0, len(list_of_messages), self._CHUNKSIZE)]
-            for chunk in chunks:
-                await asyncio.sleep(0.5)
-                nasa_packet = self._build_default_read_packet()
-                nasa_packet.set_packet_messages([self._build_message(x) for x in chunk])
-                await self._write_packet_to_serial(nasa_packet)
-
-                if self.config.LOGGING['pollerMessage']:
-                    logger.info(f"Polling following NASAPacket: {nasa_packet}")
-                else:
-                    logger.debug(f"Sent data NASAPacket: {nasa_packet}")
+            remaining = list_of_messages
+            while remaining:
+                frames = self._read_frames(remaining)
+                remaining = None
+                for index, (chunk, frame) in enumerate(frames):
+                    chunk_limit = bus_pacer.chunk_limit
+                    packet_number = await self._send_read_frame(chunk, frame, lane)
+
+                    if self.config.LOGGING['pollerMessage']:
+                        logger.info(f"Polling following NASAPacket: {self._build_read_packet(chunk, packet_number)}")
+                    elif logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Sent data NASAPacket: %s", self._build_read_packet(chunk, packet_number))
+
+                    if bus_pacer.chunk_limit < chunk_limit and index + 1 < len(frames):
+                        # the bus pacer backed off, repack the rest instead of sending oversized frames
+                        remaining = [x for rest, _ in frames[index + 1:] for x in rest]
+                        break
         except Exception as e:
             logger.error(f"❌ Error in read_request: {e}")
             logger.error(traceback.format_exc())
 
+    async def _send_read_frame(self, chunk, frame, lane: Lane) -> int:
+        """
+        Sends one read request frame when the lane gets the bus and the bus is idle, then waits
+        for its response, so the next frame follows the answer instead of a fixed delay. Higher
+        priority lanes get the bus in between frames. Returns the packet number used.
+        """
+        async with bus_arbiter.slot(lane):
+            await bus_pacer.wait_idle()
+            # every request gets its own packet number so the responses can be correlated
+            packet_number = poll_correlator.next_packet_number()
+            known = {x for x in chunk if poll_correlator.has_answered(x)}
+            poll_correlator.register(packet_number, ((x, self.config.NASA_ADDRESSES.get(x, 0)) for x in chunk))
+            tracked = poll_correlator.pending(chunk)
+            await self._write_frame_to_serial(NASAFrameEncoder.renumber(frame, packet_number))
+            bus_pacer.note_activity()
+            sent_at = bus_pacer.clock()
+
+            unanswered, nacked = await poll_correlator.settle(chunk, bus_pacer.response_timeout)
+            answered = len(tracked) - len(unanswered)
+            if answered:
+                bus_pacer.observe_response(bus_pacer.clock() - sent_at)
+            if nacked or known or answered:
+                # addresses that never answered are likely unsupported, they say nothing about the bus
+                bus_pacer.record(len(known), sum(1 for x in unanswered if x in known), nacked > 0)
+        return packet_number
+
+    def _read_frames(self, list_of_messages: list) -> tuple:
+        """
+        Returns the (chunk, frame) pairs for a read request. The messages are packed by the bus
+        pacer's current chunk limit. Poll frames never change for the same message list and limit,
+        so they are encoded once and reused until the repository or the polling groups change.
+        """
+        if self._read_frame_cache_addresses is not self.config.NASA_ADDRESSES:
+            self.invalidate_frame_cache()
+            self._read_frame_cache_addresses = self.config.NASA_ADDRESSES
+
+        key = (tuple(list_of_messages), bus_pacer.chunk_limit)
+        frames = self._read_frame_cache.get(key)
+        if frames is None:
+            encoders = {x: self._encoder_for(x) for x in key[0]}
+            frames = []
+            for chunk in bus_pacer.pack([(x, encoder.message_type, 2 + len(encoder.payload())) for x, encoder in encoders.items()], key[1]):
+                frame = self._read_encoder.encode((encoders[x].address, encoders[x].message_type, encoders[x].payload()) for x in chunk)
+                frames.append((chunk, frame))
+            frames = tuple(frames)
+            if len(self._read_frame_cache) >= self._FRAME_CACHE_SIZE:
+                self._read_frame_cache.clear()
+            self._read_frame_cache[key] = frames
+        return frames
+
+    def invalidate_frame_cache(self):
+        """Drops all cached read request frames, e.g. after the polling groups changed."""
+        self._read_frame_cache.clear()
+
+    def _build_read_packet(self, chunk, packet_number=166) -> NASAPacket:
+        nasa_packet = self._build_default_read_packet()
+        nasa_packet.set_packet_number(packet_number)
+        nasa_packet.set_packet_messages([self._build_message(x) for x in chunk])
+        return nasa_packet
+
     async def write_request(self, message: str, value: str | int, read_request_after=False):
+        await self.write_requests([(message, value)], read_request_after)
+
+    async def write_requests(self, commands: list, read_request_after=False):
+        """
+        Writes (message, value) pairs in as few Request packets as possible. The messages are packed
+        like read requests, so a burst of commands for the indoor unit goes out as one multi-message
+        packet. The last value of a message wins.
+        """
+        if not commands:
+            return
         if not self.writer:
-            logger.error(f"❌ Error in write_request for {message} with value {value}: No writer available")
+            logger.error(f"❌ Error in write_request for {', '.join(f'{m}={v}' for m, v in commands)}: No writer available")
             return
-            
+
         try:
             # Ensure value is properly converted
-            if isinstance(value, str):
-                value = value.strip()
-            
-            decoded_value = self._decode_value(message.strip(), value)
-            nasa_packet = self._build_default_request_packet()
-            nasa_packet.set_packet_messages([self._build_message(message.strip(), decoded_value)])
-            nasa_packet.to_raw()
-            
-            if self.config.LOGGING['controlMessage']:
-                logger.info(f"Write request for {message} with value: {value}")
-                logger.info(f"Sending NASA packet: {nasa_packet}")
-            else:
-                logger.debug(f"Write request for {message} with value: {value}")
-                logger.debug(f"Sending NASA packet: {nasa_packet}")
-                
-            await self._write_packet_to_serial(nasa_packet)
-            await asyncio.sleep(1)
+            values = {}
+            for message, value in commands:
+                if isinstance(value, str):
+                    value = value.strip()
+                values[message.strip()] = value
+
+            encoded = {message: (self._encoder_for(message), self._decode_value(message, value)) for message, value in values.items()}
+            chunks = bus_pacer.pack([(message, encoder.message_type, 2 + len(encoder.payload(raw))) for message, (encoder, raw) in encoded.items()],
+                                    bus_pacer.max_chunk_size)
+            for chunk in chunks:
+                await self._send_request_frame(chunk, values, encoded)
+
             if read_request_after:
-                await self.read_request([message])
+                await self.read_request(list(values), Lane.CONTROL)
         except Exception as e:
-            logger.error(f"❌ Error in write_request for {message} with value {value}: {e}")
+            logger.error(f"❌ Error in write_request for {', '.join(f'{m}={v}' for m, v in commands)}: {e}")
             logger.error(traceback.format_exc())
 
+    async def _send_request_frame(self, chunk, values: dict, encoded: dict):
+        packet_number = poll_correlator.next_packet_number()
+        frame = self._request_encoder.encode([(encoded[x][0].address, encoded[x][0].message_type, encoded[x][0].payload(encoded[x][1])) for x in chunk], packet_number)
+        written = ", ".join(f"{x}={values[x]}" for x in chunk)
+
+        if self.config.LOGGING['controlMessage']:
+            logger.info(f"Write request for {written}")
+            logger.info(f"Sending NASA packet: {self._build_request_packet([(x, encoded[x][1]) for x in chunk], packet_number)}")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Write request for %s", written)
+            logger.debug("Sending NASA packet: %s", self._build_request_packet([(x, encoded[x][1]) for x in chunk], packet_number))
+
+        async with bus_arbiter.slot(Lane.CONTROL):
+            await bus_pacer.wait_idle()
+            await self._write_frame_to_serial(frame)
+            bus_pacer.note_activity()
+            # the read back only makes sense once the unit took the value
+            if not await poll_correlator.wait_ack(packet_number, bus_pacer.response_wait):
+                logger.debug("No ACK for write request of %s (packet number %d)", written, packet_number)
+
+    def _build_request_packet(self, messages, packet_number=166) -> NASAPacket:
+        nasa_packet = self._build_default_request_packet()
+        nasa_packet.set_packet_number(packet_number)
+        nasa_packet.set_packet_messages([self._build_message(message, value) for message, value in messages])
+        return nasa_packet
+
+    def _encoder_for(self, message) -> SensorEncoder:
+        """Returns the precompiled encoder, unknown messages fall back to address 0 as before."""
+        encoder = self.config.NASA_ENCODERS.get(message)
+        if encoder is None:
+            encoder = SensorEncoder(message, self._extract_address(message), {})
+        return encoder
+
     def _search_nasa_enumkey_for_value(self, message, value):
-        try:
-            if 'type' in self.config.NASA_REPO[message] and self.config.NASA_REPO[message]['type'] == 'ENUM':
-                if 'enum' in self.config.NASA_REPO[message]:
-                    for key, val in self.config.NASA_REPO[message]['enum'].items():
-                        if val == value:
-                            return key
-        except Exception as e:
-            logger.warning(f"Error searching enum key for {message} with value {value}: {e}")
-                
+        encoder = self.config.NASA_ENCODERS.get(message)
+        if encoder is not None and encoder.is_enum:
+            return encoder.enum_code(value)
         return None
-    
-    def is_number(self, s):
-        try:
-            float(s)
-            return True
-        except (ValueError, TypeError):
-            return False
 
     def _decode_value(self, message, value) -> int:  
         try:
-            # Convert value to string if it's not already
-            if not isinstance(value, str):
-                value = str(value)
-                
-            enumval = self._search_nasa_enumkey_for_value(message, value)
-            if enumval is None:
-                if self.is_number(value):
-                    try:
-                        numeric_value = int(float(value))
-                    except (ValueError, TypeError):
-                        logger.warning(f"Could not convert {value} to number, using 0")
-                        numeric_value = 0
-
-                    if 'reverse-arithmetic' in self.config.NASA_REPO[message]:
-                        arithmetic = self.config.NASA_REPO[message]['reverse-arithmetic']
-                        try:
-                            # Verwende sichere arithmetische Auswertung
-                            return int(safe_eval_arithmetic(arithmetic, value=numeric_value))
-                        except Exception as e:
-                            logger.warning(f"Arithmetic Function couldn't been applied for Message {message}, using raw value: reverse-arithmetic = {arithmetic} {e} {numeric_value}")
-                            return numeric_value
-                    else:
-                        return numeric_value
-                else:
-                    logger.warning(f"Value {value} is not a number and not an enum value, using 0")
-                    return 0
-            else:
-                return int(enumval)
+            return self._encoder_for(message).encode_value(value)
         except Exception as e:
             logger.error(f"Error decoding value {value} for message {message}: {e}")
             logger.error(traceback.format_exc())
             return 0
 
-        return 0
-
     def _build_message(self, message, value=None) -> NASAMessage:
-        try:
-            tmpmsg = NASAMessage()
-            tmpmsg.set_packet_message(self._extract_address(message))
-            if value is None:
-                value = 0
-            
-            # Ensure value is an integer
-            if not isinstance(value, int):
-                try:
-                    if isinstance(value, str):
-                        value = int(float(value))
-                    else:
-                        value = int(value)
-                except (ValueError, TypeError):
-                    logger.warning(f"Could not convert value {value} to int, using 0")
-                    value = 0
-            
-            try:
-                if tmpmsg.packet_message_type == 0:
-                    value_raw = value.to_bytes(1, byteorder='big', signed=True) 
-                elif tmpmsg.packet_message_type == 1:
-                    value_raw = value.to_bytes(2, byteorder='big', signed=True) 
-                elif tmpmsg.packet_message_type == 2:
-                    value_raw = value.to_bytes(4, byteorder='big', signed=True) 
-                elif tmpmsg.packet_message_type == 3:
-                    # STR-Typ: Erstelle einen leeren String-Payload für Polling
-                    # Für String-Typen verwenden wir einen minimalen Payload
-                    value_raw = b'\x00\x00\x00\x00'  # 4 Bytes für String-Polling
-                    logger.debug(f"Created STR-type message for {message} with minimal payload")
-                else:
-                    raise MessageWarningException(argument=tmpmsg.packet_message_type, message=f"Unknown Type for {message} type:")
-            except (OverflowError, ValueError) as e:
-                logger.warning(f"Value {value} too large for message type {tmpmsg.packet_message_type}, using 0")
-                value = 0
-                if tmpmsg.packet_message_type == 0:
-                    value_raw = value.to_bytes(1, byteorder='big', signed=True) 
-                elif tmpmsg.packet_message_type == 1:
-                    value_raw = value.to_bytes(2, byteorder='big', signed=True) 
-                elif tmpmsg.packet_message_type == 2:
-                    value_raw = value.to_bytes(4, byteorder='big', signed=True) 
-                elif tmpmsg.packet_message_type == 3:
-                    value_raw = b'\x00\x00\x00\x00'
-                    
-            tmpmsg.set_packet_payload_raw(value_raw)
-            return tmpmsg
-        except Exception as e:
-            logger.error(f"Error building message for {message} with value {value}: {e}")
-            logger.error(traceback.format_exc())
-            # Create a safe default message
-            tmpmsg = NASAMessage()
-            tmpmsg.set_packet_message(0)
-            tmpmsg.set_packet_payload_raw(b'\x00')
-            return tmpmsg
+        encoder = self._encoder_for(message)
+        tmpmsg = NASAMessage()
+        tmpmsg.set_packet_message(encoder.address)
+        tmpmsg.set_packet_payload_raw(encoder.payload(value))
+        return tmpmsg
 
     def _extract_address(self, messagename) -> int:
         try:
-            return int(self.config.NASA_REPO[messagename]['address'], 16)
+            return self.config.NASA_ADDRESSES[messagename]
         except Exception as e:
             logger.error(f"Error extracting address for {messagename}: {e}")
             return 0
@@ -245,9 +278,15 @@ class MessageProducer:
             logger.error("❌ Cannot write packet - no writer available")
             return
             
+        await self._write_frame_to_serial(packet.to_raw())
+
+    async def _write_frame_to_serial(self, frame: bytes):
+        if not self.writer:
+            logger.error("❌ Cannot write packet - no writer available")
+            return
+
         try:
-            final_packet = packet.to_raw()
-            self.writer.write(final_packet)
+            self.writer.write(frame)
             await self.writer.drain()
         except Exception as e:
             logger.error(f"❌ Error writing packet to serial: {e}")
@@ -0,0 +1,141 @@
+from typing import Any, Callable, Dict
+
+from CustomLogger import logger
+from SafeArithmetic import safe_arithmetic, safe_eval_arithmetic
+from MQTTCommunicationAnalyzer import mqtt_analyzer, ConversionDirection
+
+def message_type_of(address: int) -> int:
+    """Returns the NASA message type encoded in bits 9-10 of the message number."""
+    return (address & 1536) >> 9
+
+def is_valid_rawvalue(rawvalue: bytes) -> bool:
+    return all(0x20 <= b <= 0x7E or b in (0x00, 0xFF) for b in rawvalue)
+
+def decode_string(rawvalue: bytes) -> str:
+    value = ""
+    if is_valid_rawvalue(rawvalue[1:-1]):
+        for byte in rawvalue[1:-1]:
+            if byte != 0x00 and byte != 0xFF:
+                char = chr(byte) if 32 <= byte <= 126 else f"{byte}"
+                value += char
+            else:
+                value += " "
+        value = value.strip()
+    else:
+        value = "".join([f"{int(x)}" for x in rawvalue])
+    return value
+
+def compile_decoder(msgname: str, repo_entry: Dict[str, Any], message_type: int) -> Callable[[bytes], Any]:
+    """
+    Compiles one NASA repository entry into a specialised decode function.
+
+    Everything that only depends on the repository entry (arithmetic expression, enum table,
+    signedness, rounding) is resolved here once, so the returned function only has to convert
+    the payload. The result is identical to the former per-message interpretation in
+    MessageProcessor.determine_value, including the conversions logged to the mqtt_analyzer.
+    """
+    from_bytes = int.from_bytes
+    log_conversion = mqtt_analyzer.log_value_conversion
+
+    if message_type == 3:
+        def decode_str(rawvalue):
+            value = decode_string(rawvalue)
+            log_conversion(
+                sensor_name=msgname,
+                original_value=rawvalue.hex(),
+                converted_value=value,
+                conversion_type=ConversionDirection.BYTES_TO_STRING,
+                success=True
+            )
+            return value
+        return decode_str
+
+    arithmetic = repo_entry.get('arithmetic', '')
+    # nur 'value' ersetzen, nicht 'packed_value'
+    if arithmetic and 'packed_value' not in arithmetic:
+        arithmetic = arithmetic.replace("value", 'packed_value')
+
+    evaluate = None
+    if arithmetic:
+        try:
+            evaluate = safe_arithmetic.compile(arithmetic).evaluate
+        except ValueError:
+            # invalid expressions keep failing per message, exactly as before
+            evaluate = lambda variables: safe_eval_arithmetic(arithmetic, **variables)
+
+    def apply_arithmetic(rawvalue):
+        packed_value = from_bytes(rawvalue, byteorder='big', signed=True)
+        try:
+            value = evaluate({'packed_value': packed_value})
+            log_conversion(
+                sensor_name=msgname,
+                original_value=packed_value,
+                converted_value=value,
+                conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                success=True
+            )
+        except Exception as e:
+            logger.warning(f"Arithmetic Function couldn't been applied for Message {msgname}, using raw value: arithmetic = {arithmetic} {e} {packed_value} {rawvalue}")
+            value = packed_value
+            log_conversion(
+                sensor_name=msgname,
+                original_value=packed_value,
+                converted_value=value,
+                conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                success=False,
+                error_message=f"Arithmetic error: {e}"
+            )
+        return round(value, 3)
+
+    if repo_entry.get('type') == 'ENUM':
+        if 'enum' not in repo_entry:
+            if arithmetic:
+                return lambda rawvalue: f"Unknown enum value: {apply_arithmetic(rawvalue)}"
+            return lambda rawvalue: f"Unknown enum value: {from_bytes(rawvalue, byteorder='big', signed=True)}"
+
+        enum_table = repo_entry['enum']
+
+        def decode_enum(rawvalue):
+            if arithmetic:
+                apply_arithmetic(rawvalue)
+            raw_value = from_bytes(rawvalue, byteorder='big')
+            if raw_value in enum_table:
+                enum_value = enum_table[raw_value]
+                log_conversion(
+                    sensor_name=msgname,
+                    original_value=raw_value,
+                    converted_value=enum_value,
+                    conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                    success=True
+                )
+                return enum_value
+
+            # Handle unknown enum values gracefully
+            logger.warning(f"Unknown enum value {raw_value} for {msgname}, using raw value")
+            log_conversion(
+                sensor_name=msgname,
+                original_value=raw_value,
+                converted_value=raw_value,
+                conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                success=False,
+                error_message=f"Unknown enum value: {raw_value}"
+            )
+            return raw_value
+        return decode_enum
+
+    if arithmetic:
+        return apply_arithmetic
+
+    # integer payload without conversion, round(int, 3) would be a no-op
+    return lambda rawvalue: from_bytes(rawvalue, byteorder='big', signed=True)
+
+def build_decoders(nasa_repo: Dict[str, Dict[str, Any]]) -> Dict[str, Callable[[bytes], Any]]:
+    """Compiles a decode function for every entry of the NASA repository."""
+    decoders = {}
+    for msgname, repo_entry in nasa_repo.items():
+        try:
+            message_type = message_type_of(int(repo_entry['address'], 16))
+        except (KeyError, TypeError, ValueError):
+            continue
+        decoders[msgname] = compile_decoder(msgname, repo_entry, message_type)
+    return decoders
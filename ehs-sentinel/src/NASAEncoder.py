@@ -0,0 +1,111 @@
+from typing import Any, Dict, Optional, Tuple
+
+from CustomLogger import logger
+from NASADecoder import message_type_of
+from SafeArithmetic import ArithmeticProgram, safe_arithmetic, safe_eval_arithmetic
+
+class SensorEncoder:
+    """
+    Precompiled write path for one NASA repository entry.
+
+    Everything that only depends on the repository entry is resolved once: the value -> code
+    table of an enum (first key wins, like the former linear search), the compiled
+    reverse-arithmetic program, the payload width and the signed range of the payload. The
+    results are identical to the former MessageProducer._decode_value / _build_message pair.
+    """
+
+    __slots__ = ('name', 'address', 'message_type', 'width', 'minimum', 'maximum',
+                 'is_enum', 'enum_codes', 'reverse_arithmetic', 'reverse_program')
+
+    STRING_PAYLOAD = b'\x00\x00\x00\x00'  # minimal payload used to poll STR messages
+
+    def __init__(self, name: str, address: int, repo_entry: Dict[str, Any]):
+        self.name = name
+        self.address = address
+        self.message_type = message_type_of(address)
+        self.width = (1, 2, 4, 4)[self.message_type]
+        self.minimum = -(1 << (8 * self.width - 1))
+        self.maximum = (1 << (8 * self.width - 1)) - 1
+
+        self.is_enum = repo_entry.get('type') == 'ENUM'
+        self.enum_codes: Dict[Any, Any] = {}
+        if self.is_enum and isinstance(repo_entry.get('enum'), dict):
+            for key, val in repo_entry['enum'].items():
+                self.enum_codes.setdefault(val, key)
+
+        self.reverse_arithmetic: Optional[str] = repo_entry.get('reverse-arithmetic')
+        self.reverse_program: Optional[ArithmeticProgram] = None
+        if self.reverse_arithmetic:
+            try:
+                self.reverse_program = safe_arithmetic.compile(self.reverse_arithmetic)
+            except ValueError:
+                # invalid expressions keep failing per write, exactly as before
+                pass
+
+    def enum_code(self, value: str) -> Optional[Any]:
+        """Returns the enum key for a value or None."""
+        return self.enum_codes.get(value)
+
+    def apply_reverse(self, value):
+        """Applies the reverse arithmetic to a number. Raises ValueError for invalid expressions."""
+        if self.reverse_program is not None:
+            return self.reverse_program.evaluate({'value': value})
+        return safe_eval_arithmetic(self.reverse_arithmetic, value=value)
+
+    def encode_value(self, value) -> int:
+        """Converts an MQTT/control value into the raw integer sent to the unit."""
+        if not isinstance(value, str):
+            value = str(value)
+
+        code = self.enum_codes.get(value) if self.is_enum else None
+        if code is not None:
+            return int(code)
+
+        try:
+            numeric_value = float(value)
+        except (ValueError, TypeError):
+            logger.warning(f"Value {value} is not a number and not an enum value, using 0")
+            return 0
+        try:
+            numeric_value = int(numeric_value)
+        except ValueError:
+            logger.warning(f"Could not convert {value} to number, using 0")
+            numeric_value = 0
+        except OverflowError as e:
+            logger.error(f"Error decoding value {value} for message {self.name}: {e}")
+            return 0
+
+        if self.reverse_arithmetic is not None:
+            try:
+                return int(self.apply_reverse(numeric_value))
+            except Exception as e:
+                logger.warning(f"Arithmetic Function couldn't been applied for Message {self.name}, using raw value: reverse-arithmetic = {self.reverse_arithmetic} {e} {numeric_value}")
+        return numeric_value
+
+    def payload(self, value: Optional[int] = None) -> bytes:
+        """Packs a raw integer into the payload of this message, out of range values become 0."""
+        if self.message_type == 3:
+            return self.STRING_PAYLOAD
+        if value is None:
+            value = 0
+        elif not isinstance(value, int):
+            try:
+                value = int(float(value)) if isinstance(value, str) else int(value)
+            except (ValueError, TypeError, OverflowError):
+                logger.warning(f"Could not convert value {value} to int, using 0")
+                value = 0
+        if not self.minimum <= value <= self.maximum:
+            logger.warning(f"Value {value} too large for message type {self.message_type}, using 0")
+            value = 0
+        return value.to_bytes(self.width, byteorder='big', signed=True)
+
+    def encode(self, value) -> Tuple[int, int, bytes]:
+        """Returns (message number, message type, payload) for a control value."""
+        return self.address, self.message_type, self.payload(self.encode_value(value))
+
+    def __repr__(self):
+        return f"SensorEncoder({self.name!r}, 0x{self.address:04x})"
+
+def build_encoders(addresses: Dict[str, int], nasa_repo: Dict[str, Dict[str, Any]]) -> Dict[str, SensorEncoder]:
+    """Compiles an encoder for every repository entry with a valid address."""
+    return {name: SensorEncoder(name, address, nasa_repo[name]) for name, address in addresses.items()}
@@ -0,0 +1,103 @@
+import binascii
+import struct
+from typing import Iterable, Optional, Tuple
+
+from NASAPacket import NASAPacket
+
+class NASAFrameEncoder:
+    """
+    Encodes NASA frames from a fixed header template.
+
+    The header fields that never change for a producer (addresses, packet type, data type, packet
+    number) are written once into a preallocated buffer. ``encode`` only fills in the message
+    count, the messages, the size field, the CRC and the end byte, and returns the frame as
+    ``bytes``. The output is byte for byte identical to ``NASAPacket.to_raw()`` for a packet with
+    the same header and messages.
+    """
+
+    START_BYTE = 0x32
+    END_BYTE = 0x34
+    HEADER_SIZE = 13  # start + size(2) + addresses(6) + information + type + number + capacity
+    PACKET_NUMBER_OFFSET = 11
+    PAYLOAD_SIZES = (1, 2, 4)
+
+    _SIZE = struct.Struct(">H")
+    _TRAILER = struct.Struct(">HB")
+
+    def __init__(self, header: bytes, buffer_size: int = 1024):
+        """
+        Args:
+            header: the nine header bytes from source address class up to the packet number
+            buffer_size: initial size of the encode buffer, grows when a frame does not fit
+        """
+        if len(header) != 9:
+            raise ValueError(f"NASA header template must be 9 bytes, got {len(header)}")
+        self._buffer = bytearray(max(buffer_size, self.HEADER_SIZE + 3))
+        self._buffer[0] = self.START_BYTE
+        self._buffer[3:12] = header
+
+    @classmethod
+    def from_packet(cls, packet: NASAPacket) -> 'NASAFrameEncoder':
+        """Takes the header template from a packet built with the NASAPacket setters."""
+        header = bytes((
+            packet.packet_source_address_class.value,
+            packet.packet_source_channel,
+            packet.packet_source_address,
+            packet.packet_dest_address_class.value,
+            packet.packet_dest_channel,
+            packet.packet_dest_address,
+            (packet.packet_information << 7) | (packet.packet_version << 5) | (packet.packet_retry_count << 3),
+            (packet.packet_type.value << 4) | packet.packet_data_type.value,
+            packet.packet_number,
+        ))
+        return cls(header)
+
+    @classmethod
+    def message_size(cls, message_type: int, payload: bytes) -> int:
+        return cls.PAYLOAD_SIZES[message_type] if message_type < 3 else len(payload)
+
+    def encode(self, messages: Iterable[Tuple[int, int, bytes]], packet_number: Optional[int] = None) -> bytes:
+        """
+        Encodes (message number, message type, payload) tuples into a complete frame. A given
+        packet number replaces the one of the header template for this frame only.
+        """
+        messages = list(messages)
+        length = self.HEADER_SIZE + 3 + sum(2 + self.message_size(t, p) for _, t, p in messages)
+        if length > len(self._buffer):
+            self._buffer.extend(bytes(length - len(self._buffer)))
+
+        buffer = self._buffer
+        template_number = buffer[self.PACKET_NUMBER_OFFSET]
+        if packet_number is not None:
+            buffer[self.PACKET_NUMBER_OFFSET] = packet_number & 0xFF
+        buffer[12] = len(messages)
+        pos = self.HEADER_SIZE
+        for number, message_type, payload in messages:
+            size = self.message_size(message_type, payload)
+            # same truncation as NASAMessage.to_raw: the payload is read as signed integer
+            # and its lowest bytes are written
+            value = int.from_bytes(payload, byteorder='big', signed=True) & ((1 << (8 * size)) - 1)
+            self._SIZE.pack_into(buffer, pos, number & 0xFFFF)
+            buffer[pos + 2:pos + 2 + size] = value.to_bytes(size, byteorder='big')
+            pos += 2 + size
+
+        self._SIZE.pack_into(buffer, 1, length - 2)
+        with memoryview(buffer) as view:
+            crc = binascii.crc_hqx(view[3:pos], 0)
+            self._TRAILER.pack_into(buffer, pos, crc, self.END_BYTE)
+            frame = bytes(view[:length])
+        buffer[self.PACKET_NUMBER_OFFSET] = template_number
+        return frame
+
+    @classmethod
+    def renumber(cls, frame: bytes, packet_number: int) -> bytearray:
+        """
+        Returns a copy of an encoded frame with another packet number and its CRC recomputed.
+        The copy is handed to the writer as is: a transport may keep queued data by reference,
+        so it must not be a buffer that the next call overwrites.
+        """
+        buffer = bytearray(frame)
+        buffer[cls.PACKET_NUMBER_OFFSET] = packet_number & 0xFF
+        end = len(buffer) - 3
+        cls._TRAILER.pack_into(buffer, end, binascii.crc_hqx(buffer[3:end], 0), cls.END_BYTE)
+        return buffer
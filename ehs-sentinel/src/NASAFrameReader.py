@@ -0,0 +1,101 @@
+from typing import Callable, List, Optional
+
+class NASAFrameReader:
+    """
+    Splits a raw RS485/TCP byte stream into NASA frames.
+
+    The reader consumes chunks as returned by ``StreamReader.read(n)`` and locates frames by the
+    start byte (0x32) and the length field at bytes 1-2. Frames that lie completely inside one chunk
+    are returned as ``memoryview`` slices of that chunk, so no bytes are copied. Only a frame that
+    spans two chunks is assembled into a new ``bytes`` object.
+
+    When a candidate frame does not end with 0x34 the reader resynchronises one byte after the
+    rejected start byte, so a valid frame that follows garbage is not dropped.
+    """
+
+    START_BYTE = 0x32
+    END_BYTE = 0x34
+    CHUNK_SIZE = 4096
+    MIN_FRAME_LENGTH = 16  # start + size(2) + header(10) + crc(2) + end
+
+    def __init__(self, max_frame_size: int = 255, on_invalid: Optional[Callable[[memoryview, int], None]] = None):
+        """
+        Args:
+            max_frame_size: largest accepted value of the size field. The default keeps the behaviour
+                of the former byte-wise reader, which only accepted 0x32 0x00 as start marker.
+            on_invalid: called with the rejected candidate and its expected length whenever a
+                candidate frame does not end with 0x34.
+        """
+        self.max_frame_size = max_frame_size
+        self.on_invalid = on_invalid
+        self._pending = b''
+        self.frame_count = 0
+        self.invalid_count = 0
+        self.discarded_bytes = 0
+
+    def feed(self, chunk: bytes) -> List[memoryview]:
+        """Feeds a chunk of received bytes and returns all frames completed by it."""
+        frames = []
+        if not chunk:
+            return frames
+
+        pending = self._pending
+        if not pending:
+            self._pending = self._scan(chunk, 0, frames)
+            return frames
+
+        if len(pending) >= 3:
+            # fast path: complete the frame started in the previous chunk and scan the rest in place
+            missing = ((pending[1] << 8) | pending[2]) + 2 - len(pending)
+            if missing > len(chunk):
+                self._pending = pending + chunk
+                return frames
+            if chunk[missing - 1] == self.END_BYTE:
+                frames.append(memoryview(pending + chunk[:missing]))
+                self.frame_count += 1
+                self._pending = self._scan(chunk, missing, frames)
+                return frames
+
+        # slow path: header incomplete or the pending candidate is invalid
+        self._pending = self._scan(pending + chunk, 0, frames)
+        return frames
+
+    def reset(self):
+        """Drops any partially received frame, e.g. after a reconnect."""
+        self._pending = b''
+
+    def _scan(self, data: bytes, pos: int, frames: list) -> bytes:
+        view = memoryview(data)
+        end = len(data)
+
+        while True:
+            start = data.find(self.START_BYTE, pos)
+            if start < 0:
+                self.discarded_bytes += end - pos
+                return b''
+            self.discarded_bytes += start - pos
+
+            if end - start < 3:
+                return bytes(view[start:])
+
+            size = (data[start + 1] << 8) | data[start + 2]
+            length = size + 2
+            if size > self.max_frame_size or length < self.MIN_FRAME_LENGTH:
+                self.discarded_bytes += 1
+                pos = start + 1
+                continue
+
+            stop = start + length
+            if stop > end:
+                return bytes(view[start:])
+
+            if data[stop - 1] == self.END_BYTE:
+                frames.append(view[start:stop])
+                self.frame_count += 1
+                pos = stop
+            else:
+                self.invalid_count += 1
+                self.discarded_bytes += 1
+                if self.on_invalid is not None:
+                    self.on_invalid(view[start:stop], length)
+                pos = start + 1
@@ -2,12 +2,47 @@
 class NASAMessage:
     """
     A class to represent a NASA message.
+
+    Messages parsed from a frame keep a reference to the frame and the payload offsets instead of
+    a copy of the payload. ``packet_payload`` creates the ``bytes`` object on first access,
+    ``payload_view`` returns a zero-copy ``memoryview`` of the frame.
     """
+    __slots__ = ('packet_message', 'packet_message_type', '_payload', '_frame', '_start', '_end')
+
     def __init__(self, packet_message=0x000, packet_message_type=0, packet_payload=[0]):     
         self.packet_message: int = packet_message
         self.packet_message_type: int = packet_message_type
-        self.packet_payload: bytes = bytes([int(hex(x), 16) for x in packet_payload])
+        self._payload: bytes = bytes(packet_payload)
+        self._frame = None
+
+    @classmethod
+    def from_frame(cls, frame: memoryview, packet_message: int, packet_message_type: int, start: int, end: int) -> 'NASAMessage':
+        """Creates a message whose payload is frame[start:end] without copying it."""
+        msg = cls.__new__(cls)
+        msg.packet_message = packet_message
+        msg.packet_message_type = packet_message_type
+        msg._payload = None
+        msg._frame = frame
+        msg._start = start
+        msg._end = end
+        return msg
+
+    @property
+    def packet_payload(self) -> bytes:
+        if self._payload is None:
+            self._payload = bytes(self._frame[self._start:self._end])
+        return self._payload
+
+    @packet_payload.setter
+    def packet_payload(self, value: bytes):
+        self._payload = value
+        self._frame = None
 
+    @property
+    def payload_view(self) -> memoryview:
+        if self._payload is None:
+            return self._frame[self._start:self._end]
+        return memoryview(self._payload)
 
     def set_packet_message(self, value: int):
         self.packet_message = value
@@ -17,7 +52,7 @@ class NASAMessage:
         self.packet_message_type = value
 
     def set_packet_payload(self, value: list):
-        self.packet_payload = bytes([int(hex(x), 16) for x in value])
+        self.packet_payload = bytes(value)
 
     def set_packet_payload_raw(self, value: bytes):
         self.packet_payload = value
@@ -63,10 +63,27 @@ class DataType(Enum):
     Ack = 6
     Nack = 7
 
+def _lookup_table(enum_class, size: int) -> tuple:
+    """Maps every raw value to its enum member (aliases resolve like enum_class(value)) or None."""
+    members = {member.value: member for member in enum_class}
+    return tuple(members.get(value) for value in range(size))
+
+_HEADER = struct.Struct(">BHBBBBBBBBBB")
+_TRAILER = struct.Struct(">HB")
+_ADDRESS_CLASSES = _lookup_table(AddressClassEnum, 256)
+_PACKET_TYPES = _lookup_table(PacketType, 16)
+_DATA_TYPES = _lookup_table(DataType, 16)
+_PAYLOAD_SIZES = (1, 2, 4)
+
 class NASAPacket:
     """
     A class to represent a NASA Packet.
     """
+    __slots__ = ('_packet_raw', 'packet_start', 'packet_size', 'packet_source_address_class',
+                 'packet_source_channel', 'packet_source_address', 'packet_dest_address_class',
+                 'packet_dest_channel', 'packet_dest_address', 'packet_information', 'packet_version',
+                 'packet_retry_count', 'packet_type', 'packet_data_type', 'packet_number',
+                 'packet_capacity', 'packet_messages', 'packet_crc16', 'packet_end')
 
     def __init__(self):
         self._packet_raw: bytearray = None
@@ -93,69 +110,67 @@ class NASAPacket:
         self._packet_raw = packet
         if len(packet) < 14:
             raise ValueError("Data too short to be a valid NASAPacket")
-        
-        crc_checkusm=binascii.crc_hqx(bytearray(packet[3:-3]), 0)
 
-        self.packet_start = packet[0]
-        self.packet_size = ((packet[1] << 8) | packet[2])
+        # messages keep views into the frame, so a mutable buffer is copied once per frame
+        if isinstance(packet, bytes) or (isinstance(packet, memoryview) and packet.readonly):
+            view = memoryview(packet)
+        else:
+            view = memoryview(bytes(packet))
+        length = len(view)
+        crc_checkusm = binascii.crc_hqx(view[3:-3], 0)
+
+        (self.packet_start, self.packet_size, source_class, self.packet_source_channel,
+         self.packet_source_address, dest_class, self.packet_dest_channel, self.packet_dest_address,
+         information, types, self.packet_number, self.packet_capacity) = _HEADER.unpack_from(view)
 
-        if self.packet_size+2 != len(packet):
+        if self.packet_size+2 != length:
             logger.info(f"length not correct {self.packet_size+2} -> {len(packet)}")
             logger.info(f"{packet.hex()}")
             logger.info(f"{hex(packet[self.packet_size+1])}")
 
-        try:
-            self.packet_source_address_class = AddressClassEnum(packet[3])
-        except ValueError as e:
-            raise SkipInvalidPacketException(f"Source Adress Class out of enum {packet[3]}")
-        self.packet_source_channel = packet[4]
-        self.packet_source_address = packet[5]
-        try:
-            self.packet_dest_address_class = AddressClassEnum(packet[6])
-        except ValueError as e:
-            raise SkipInvalidPacketException(f"Destination Adress Class out of enum {packet[6]}")
-        self.packet_dest_channel = packet[7]
-        self.packet_dest_address = packet[8]
-        self.packet_information = (int(packet[9]) & 128) >> 7 == 1
-        self.packet_version = (int(packet[9]) & 96) >> 5
-        self.packet_retry_count = (int(packet[9]) & 24) >> 3
-        self.packet_type = PacketType((int(packet[10]) & 240) >> 4)
-        self.packet_data_type = DataType(int(packet[10]) & 15)
-        self.packet_number = packet[11]
-        self.packet_capacity = packet[12]
-        self.packet_crc16 = ((packet[-3] << 8) | packet[-2]) # + 2
-        self.packet_end = packet[-1]
-        self.packet_messages = self._extract_messages(0, self.packet_capacity, packet[13:-3], [])
+        self.packet_source_address_class = _ADDRESS_CLASSES[source_class]
+        if self.packet_source_address_class is None:
+            raise SkipInvalidPacketException(f"Source Adress Class out of enum {source_class}")
+        self.packet_dest_address_class = _ADDRESS_CLASSES[dest_class]
+        if self.packet_dest_address_class is None:
+            raise SkipInvalidPacketException(f"Destination Adress Class out of enum {dest_class}")
+        self.packet_information = (information & 128) >> 7 == 1
+        self.packet_version = (information & 96) >> 5
+        self.packet_retry_count = (information & 24) >> 3
+        self.packet_type = _PACKET_TYPES[types >> 4] or PacketType(types >> 4)
+        self.packet_data_type = _DATA_TYPES[types & 15] or DataType(types & 15)
+        self.packet_crc16, self.packet_end = _TRAILER.unpack_from(view, length - 3)
+        self.packet_messages = self._extract_messages(view, 13, length - 3, self.packet_capacity)
 
         if crc_checkusm != self.packet_crc16:
             raise SkipInvalidPacketException(f"Checksum for package could not be validated. Calculated: {crc_checkusm} in packet: {self.packet_crc16}: packet:{self}")
 
-    def _extract_messages(self, depth: int, capacity: int, msg_rest: bytearray, return_list: list):
-        if depth > capacity or len(msg_rest) <= 2:
-            return return_list
-        
-        message_number = (msg_rest[0] << 8) | msg_rest[1]
-        message_type = (message_number & 1536) >> 9
-
-        if message_type == 0:
-            payload_size = 1
-        elif message_type == 1:
-            payload_size = 2
-        elif message_type == 2:
-            payload_size = 4
-        elif message_type == 3:
-            payload_size = len(msg_rest)
-            if capacity != 1:
-                raise SkipInvalidPacketException("Message with structure type must have capacity of 1.")
-        else:
-            raise ValueError(f"Mssage type unknown: {message_type}")
-        
-        payload = msg_rest[2:2 + payload_size]
-        if len(payload) > 255:
-            raise ValueError(f"Payload for Submessage {hex(message_number)} too large at index {depth}: {len(payload)} bytes.")
-        
-        return_list.append(NASAMessage(packet_message=message_number, packet_message_type=message_type, packet_payload=payload))
-        return self._extract_messages(depth+1, capacity, msg_rest[2 + payload_size:], return_list)
+    def _extract_messages(self, view: memoryview, pos: int, end: int, capacity: int) -> list:
+        """Reads up to capacity+1 messages from view[pos:end] in a single pass."""
+        messages = []
+        append = messages.append
+        from_frame = NASAMessage.from_frame
+        depth = 0
+        while depth <= capacity and end - pos > 2:
+            message_number = (view[pos] << 8) | view[pos + 1]
+            message_type = (message_number & 1536) >> 9
+
+            if message_type == 3:
+                if capacity != 1:
+                    raise SkipInvalidPacketException("Message with structure type must have capacity of 1.")
+                payload_end = end
+            else:
+                payload_end = pos + 2 + _PAYLOAD_SIZES[message_type]
+                if payload_end > end:
+                    payload_end = end
+
+            if payload_end - pos - 2 > 255:
+                raise ValueError(f"Payload for Submessage {hex(message_number)} too large at index {depth}: {payload_end - pos - 2} bytes.")
+
+            append(from_frame(view, message_number, message_type, pos + 2, payload_end))
+            pos = payload_end
+            depth += 1
+        return messages
 
     def __str__(self):
         text =  f"NASAPacket(\n"
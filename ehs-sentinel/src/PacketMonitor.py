@@ -4,7 +4,7 @@ import os
 import time
 import traceback
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 
 from CustomLogger import logger
 
@@ -16,29 +16,22 @@ class PacketMonitor:
     - Protokollierung ungültiger Pakete
     - Stündliche und tägliche Statistiken
     - Warnungen bei hoher Fehlerrate
+
+    Stunden und Tage liegen in Ringen fester Größe, der Platz ergibt sich aus der Stunde bzw.
+    dem Tag seit Epoche (Ortszeit) modulo der Ringgröße. Ein Paket erhöht nur die Zähler der
+    aktuellen Stunde und des aktuellen Tages, der Wechsel in die nächste Stunde wird über einen
+    vorberechneten Zeitpunkt erkannt. Fehlerraten und die Schlüssel "%Y-%m-%d %H:00" bzw.
+    "%Y-%m-%d" entstehen erst beim Lesen, Berichte lesen direkt die Buckets.
     """
     
     _instance = None
     _initialized = False
     _stats_file = "/data/packet_stats.json"
     _report_file = "/data/packet_reports.json"
-    
-    # Vollständige Initialisierung der Statistik-Struktur mit Standardwerten
-    _stats = {
-        "total_packets": 0,
-        "valid_packets": 0,
-        "invalid_packets": 0,
-        "error_rate": 0.0,
-        "hourly": {},
-        "daily": {},
-        "last_reset": None
-    }
-    
-    _reports = {
-        "hourly": [],
-        "daily": [],
-        "weekly": []
-    }
+
+    HOURS_KEPT = 48  # Stunden-Buckets, die letzten 24 Stunden sind immer vollständig
+    DAYS_KEPT = 35   # Tages-Buckets, reicht für den Wochenbericht und 4 Wochen Rückblick
+    _EPOCH = datetime(1970, 1, 1)
     
     _error_threshold = 0.15  # 15% Fehlerrate als Warnschwelle (erhöht für bessere Toleranz)
     
@@ -47,11 +40,35 @@ class PacketMonitor:
             cls._instance = super(PacketMonitor, cls).__new__(cls)
         return cls._instance
     
-    def __init__(self):
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            clock: Zeitquelle in Sekunden seit Epoche
+        """
         if self._initialized:
             return
             
         self._initialized = True
+        self._clock = clock
+
+        self._stats = {
+            "total_packets": 0,
+            "valid_packets": 0,
+            "invalid_packets": 0,
+            "last_reset": None
+        }
+        self._reports = {
+            "hourly": [],
+            "daily": [],
+            "weekly": []
+        }
+
+        # Ringe mit Einträgen [Stunde bzw. Tag seit Epoche, gültig, ungültig]
+        self._hours = [[-1, 0, 0] for _ in range(self.HOURS_KEPT)]
+        self._days = [[-1, 0, 0] for _ in range(self.DAYS_KEPT)]
+        self._hour = self._hours[0]
+        self._day = self._days[0]
+        self._next_roll = 0.0
         
         # Lade vorhandene Statistiken, falls vorhanden
         self._load_stats()
@@ -63,86 +80,116 @@ class PacketMonitor:
     def _ensure_stats_structure(self):
         """Stellt sicher, dass alle erforderlichen Felder in den Statistiken vorhanden sind."""
         # Grundlegende Felder
-        if "total_packets" not in self._stats:
-            self._stats["total_packets"] = 0
-        if "valid_packets" not in self._stats:
-            self._stats["valid_packets"] = 0
-        if "invalid_packets" not in self._stats:
-            self._stats["invalid_packets"] = 0
-        if "error_rate" not in self._stats:
-            self._stats["error_rate"] = 0.0
+        for key in ("total_packets", "valid_packets", "invalid_packets"):
+            if key not in self._stats:
+                self._stats[key] = 0
         if "last_reset" not in self._stats or not self._stats["last_reset"]:
             self._stats["last_reset"] = datetime.now().isoformat()
-            
-        # Stündliche und tägliche Statistiken
-        if "hourly" not in self._stats:
-            self._stats["hourly"] = {}
-        if "daily" not in self._stats:
-            self._stats["daily"] = {}
+
+        # Gespeicherte Stunden und Tage in die Ringe übernehmen, Raten werden beim Lesen berechnet
+        self._roll(self._clock())
+        self._import_buckets(self._stats.pop("hourly", None), self._hours, "%Y-%m-%d %H:00", 3600)
+        self._import_buckets(self._stats.pop("daily", None), self._days, "%Y-%m-%d", 86400)
+        self._stats.pop("error_rate", None)
             
         # Berichte
-        if "hourly" not in self._reports:
-            self._reports["hourly"] = []
-        if "daily" not in self._reports:
-            self._reports["daily"] = []
-        if "weekly" not in self._reports:
-            self._reports["weekly"] = []
+        for period in ("hourly", "daily", "weekly"):
+            if period not in self._reports:
+                self._reports[period] = []
+
+    def _import_buckets(self, buckets: Optional[Dict[str, Dict]], ring: List[list], key_format: str, size: int):
+        """Übernimmt Buckets im alten Format {Schlüssel: {valid, invalid, ...}}, soweit sie im Ring Platz haben."""
+        if not isinstance(buckets, dict):
+            return
+        current = self._hour[0] if ring is self._hours else self._day[0]
+        for key, data in buckets.items():
+            try:
+                index = int((datetime.strptime(key, key_format) - self._EPOCH).total_seconds() // size)
+                if not 0 <= current - index < len(ring):
+                    continue
+                slot = self._slot(ring, index)
+                slot[1] += int(data.get("valid", 0))
+                slot[2] += int(data.get("invalid", 0))
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.debug("Gespeicherter Statistik-Bucket %s übersprungen: %s", key, e)
+
+    @staticmethod
+    def _local_index(timestamp: float, size: int) -> int:
+        """Stunde (size=3600) oder Tag (size=86400) seit Epoche in Ortszeit."""
+        return int((timestamp + time.localtime(timestamp).tm_gmtoff) // size)
+
+    def _roll(self, now: float):
+        """Wechselt in die Buckets der aktuellen Stunde und des aktuellen Tages (Ortszeit)."""
+        offset = time.localtime(now).tm_gmtoff
+        hour = int((now + offset) // 3600)
+        day = int((now + offset) // 86400)
+        self._hour = self._slot(self._hours, hour)
+        self._day = self._slot(self._days, day)
+        # nächste volle Stunde in Ortszeit, als Epoche-Sekunden
+        self._next_roll = (hour + 1) * 3600 - offset
+
+    @staticmethod
+    def _slot(ring: List[list], index: int) -> list:
+        slot = ring[index % len(ring)]
+        if slot[0] != index:
+            slot[0], slot[1], slot[2] = index, 0, 0
+        return slot
+
+    @staticmethod
+    def _bucket_data(ring: List[list], index: int) -> Dict[str, Any]:
+        """Zähler eines Buckets mit berechneter Fehlerrate, leer wenn er schon überschrieben wurde."""
+        slot = ring[index % len(ring)]
+        valid, invalid = (slot[1], slot[2]) if slot[0] == index else (0, 0)
+        total = valid + invalid
+        return {
+            "total": total,
+            "valid": valid,
+            "invalid": invalid,
+            "error_rate": invalid / total if total > 0 else 0.0
+        }
+
+    def _hour_key(self, index: int) -> str:
+        return (self._EPOCH + timedelta(hours=index)).strftime("%Y-%m-%d %H:00")
+
+    def _day_key(self, index: int) -> str:
+        return (self._EPOCH + timedelta(days=index)).strftime("%Y-%m-%d")
+
+    def _current_indexes(self):
+        """Stunde und Tag seit Epoche (Ortszeit) zum aktuellen Zeitpunkt."""
+        now = self._clock()
+        if now >= self._next_roll:
+            self._roll(now)
+        return self._hour[0], self._day[0]
     
     def log_invalid_packet(self, message: str, hex_data: List[str], raw_data: bytes):
         """Protokolliert ein ungültiges Paket und aktualisiert die Statistiken."""
         try:
             # Protokolliere das ungültige Paket nur bei Debug-Level
-            logger.debug(f"⚠️ Ungültiges Paket: {message}")
-            logger.debug(f"⚠️ Paket-Hex: {hex_data}")
-            logger.debug(f"⚠️ Paket-Rohdaten: {raw_data}")
+            logger.debug("⚠️ Ungültiges Paket: %s", message)
+            logger.debug("⚠️ Paket-Hex: %s", hex_data)
+            logger.debug("⚠️ Paket-Rohdaten: %s", raw_data)
             
+            now = self._clock()
+            if now >= self._next_roll:
+                self._roll(now)
+
             # Aktualisiere die Statistiken
-            self._stats["total_packets"] += 1
-            self._stats["invalid_packets"] += 1
-            
-            # Aktualisiere stündliche Statistiken
-            hour_key = datetime.now().strftime("%Y-%m-%d %H:00")
-            if "hourly" not in self._stats:
-                self._stats["hourly"] = {}
-                
-            if hour_key not in self._stats["hourly"]:
-                self._stats["hourly"][hour_key] = {
-                    "total": 0,
-                    "valid": 0,
-                    "invalid": 0,
-                    "error_rate": 0.0
-                }
-            
-            self._stats["hourly"][hour_key]["total"] += 1
-            self._stats["hourly"][hour_key]["invalid"] += 1
-            
-            # Aktualisiere tägliche Statistiken
-            day_key = datetime.now().strftime("%Y-%m-%d")
-            if "daily" not in self._stats:
-                self._stats["daily"] = {}
-                
-            if day_key not in self._stats["daily"]:
-                self._stats["daily"][day_key] = {
-                    "total": 0,
-                    "valid": 0,
-                    "invalid": 0,
-                    "error_rate": 0.0
-                }
-            
-            self._stats["daily"][day_key]["total"] += 1
-            self._stats["daily"][day_key]["invalid"] += 1
-            
-            # Berechne Fehlerraten
-            self._update_error_rates()
+            stats = self._stats
+            stats["total_packets"] += 1
+            stats["invalid_packets"] += 1
+            self._hour[2] += 1
+            self._day[2] += 1
             
             # Speichere die Statistiken alle 100 ungültigen Pakete
-            if self._stats["invalid_packets"] % 100 == 0:
+            if stats["invalid_packets"] % 100 == 0:
                 self._save_stats()
             
             # Prüfe, ob die Fehlerrate den Schwellwert überschreitet (nur alle 1000 Pakete)
-            if self._stats["total_packets"] % 1000 == 0 and self._stats["error_rate"] > self._error_threshold:
-                logger.warning(f"🚨 WARNUNG: Fehlerrate von {self._stats['error_rate']:.1%} überschreitet den Schwellwert von {self._error_threshold:.1%}!")
-                logger.warning("🚨 Bitte überprüfen Sie die physische Verbindung, WLAN-Kanäle und Modbus-Einstellungen.")
+            if stats["total_packets"] % 1000 == 0:
+                error_rate = stats["invalid_packets"] / stats["total_packets"]
+                if error_rate > self._error_threshold:
+                    logger.warning(f"🚨 WARNUNG: Fehlerrate von {error_rate:.1%} überschreitet den Schwellwert von {self._error_threshold:.1%}!")
+                    logger.warning("🚨 Bitte überprüfen Sie die physische Verbindung, WLAN-Kanäle und Modbus-Einstellungen.")
         except Exception as e:
             logger.error(f"Fehler in log_invalid_packet: {e}")
             logger.error(traceback.format_exc())
@@ -150,74 +197,24 @@ class PacketMonitor:
     def log_valid_packet(self):
         """Protokolliert ein gültiges Paket und aktualisiert die Statistiken."""
         try:
+            now = self._clock()
+            if now >= self._next_roll:
+                self._roll(now)
+
             # Aktualisiere die Statistiken
-            self._stats["total_packets"] += 1
-            self._stats["valid_packets"] += 1
-            
-            # Aktualisiere stündliche Statistiken
-            hour_key = datetime.now().strftime("%Y-%m-%d %H:00")
-            if "hourly" not in self._stats:
-                self._stats["hourly"] = {}
-                
-            if hour_key not in self._stats["hourly"]:
-                self._stats["hourly"][hour_key] = {
-                    "total": 0,
-                    "valid": 0,
-                    "invalid": 0,
-                    "error_rate": 0.0
-                }
-            
-            self._stats["hourly"][hour_key]["total"] += 1
-            self._stats["hourly"][hour_key]["valid"] += 1
-            
-            # Aktualisiere tägliche Statistiken
-            day_key = datetime.now().strftime("%Y-%m-%d")
-            if "daily" not in self._stats:
-                self._stats["daily"] = {}
-                
-            if day_key not in self._stats["daily"]:
-                self._stats["daily"][day_key] = {
-                    "total": 0,
-                    "valid": 0,
-                    "invalid": 0,
-                    "error_rate": 0.0
-                }
-            
-            self._stats["daily"][day_key]["total"] += 1
-            self._stats["daily"][day_key]["valid"] += 1
-            
-            # Berechne Fehlerraten
-            self._update_error_rates()
+            stats = self._stats
+            stats["total_packets"] += 1
+            stats["valid_packets"] += 1
+            self._hour[1] += 1
+            self._day[1] += 1
             
             # Speichere die Statistiken alle 1000 gültigen Pakete
-            if self._stats["valid_packets"] % 1000 == 0:
+            if stats["valid_packets"] % 1000 == 0:
                 self._save_stats()
         except Exception as e:
             logger.error(f"Fehler in log_valid_packet: {e}")
             logger.error(traceback.format_exc())
     
-    def _update_error_rates(self):
-        """Aktualisiert alle Fehlerraten in den Statistiken."""
-        try:
-            # Gesamtfehlerrate
-            if self._stats["total_packets"] > 0:
-                self._stats["error_rate"] = self._stats["invalid_packets"] / self._stats["total_packets"]
-            
-            # Stündliche Fehlerraten
-            if "hourly" in self._stats:
-                for hour, data in self._stats["hourly"].items():
-                    if data["total"] > 0:
-                        data["error_rate"] = data["invalid"] / data["total"]
-            
-            # Tägliche Fehlerraten
-            if "daily" in self._stats:
-                for day, data in self._stats["daily"].items():
-                    if data["total"] > 0:
-                        data["error_rate"] = data["invalid"] / data["total"]
-        except Exception as e:
-            logger.error(f"Fehler in _update_error_rates: {e}")
-            logger.error(traceback.format_exc())
-    
     def _load_stats(self):
         """Lädt Paketstatistiken aus der Datei, falls vorhanden."""
         try:
@@ -227,7 +224,7 @@ class PacketMonitor:
                     # Merge loaded stats with default structure
                     for key, value in loaded_stats.items():
                         self._stats[key] = value
-                logger.debug(f"Paketstatistiken geladen: {self._stats}")
+                logger.debug("Paketstatistiken geladen: %s", self._stats)
             else:
                 logger.info("📊 Keine vorhandenen Paketstatistiken gefunden, starte neue Aufzeichnung")
                 # Stelle sicher, dass last_reset initialisiert ist
@@ -241,7 +238,7 @@ class PacketMonitor:
         """Speichert Paketstatistiken in eine Datei."""
         try:
             with open(self._stats_file, 'w') as f:
-                json.dump(self._stats, f, indent=2)
+                json.dump(self.get_stats(), f, indent=2)
         except Exception as e:
             logger.warning(f"Fehler beim Speichern der Paketstatistiken: {e}")
     
@@ -254,7 +251,7 @@ class PacketMonitor:
                     # Merge loaded reports with default structure
                     for key, value in loaded_reports.items():
                         self._reports[key] = value
-                logger.debug(f"Paketberichte geladen: {self._reports}")
+                logger.debug("Paketberichte geladen: %s", self._reports)
             else:
                 logger.info("📊 Keine vorhandenen Paketberichte gefunden, starte neue Aufzeichnung")
         except Exception as e:
@@ -288,47 +285,7 @@ class PacketMonitor:
         
         while True:
             try:
-                # Generiere den stündlichen Bericht
-                hour_key = datetime.now().strftime("%Y-%m-%d %H:00")
-                
-                # Hole die Daten für die aktuelle Stunde
-                if "hourly" not in self._stats:
-                    self._stats["hourly"] = {}
-                    
-                hour_data = self._stats["hourly"].get(hour_key, {
-                    "total": 0,
-                    "valid": 0,
-                    "invalid": 0,
-                    "error_rate": 0.0
-                })
-                
-                # Erstelle den Bericht
-                report = {
-                    "timestamp": datetime.now().isoformat(),
-                    "period": "hourly",
-                    "data": hour_data,
-                    "threshold_exceeded": hour_data["error_rate"] > self._error_threshold
-                }
-                
-                # Füge den Bericht zur Liste hinzu
-                self._reports["hourly"].append(report)
-                
-                # Begrenze die Anzahl der Berichte auf die letzten 24
-                if len(self._reports["hourly"]) > 24:
-                    self._reports["hourly"] = self._reports["hourly"][-24:]
-                
-                # Speichere die Berichte
-                self._save_reports()
-                
-                # Protokolliere den Bericht nur bei signifikanten Daten
-                if hour_data["total"] > 100:
-                    logger.info(f"📊 Stündlicher Paketqualitäts-Bericht ({hour_key}):")
-                    logger.info(f"   Gesamt: {hour_data['total']} Pakete")
-                    logger.info(f"   Gültig: {hour_data['valid']} Pakete ({hour_data['valid']/hour_data['total']:.1%})")
-                    logger.info(f"   Ungültig: {hour_data['invalid']} Pakete ({hour_data['error_rate']:.1%})")
-                    
-                    if hour_data["error_rate"] > self._error_threshold:
-                        logger.warning(f"⚠️ Fehlerrate von {hour_data['error_rate']:.1%} überschreitet den Schwellwert!")
+                self._create_hourly_report()
                 
                 # Warte bis zur nächsten vollen Stunde
                 await asyncio.sleep(3600)
@@ -353,48 +310,7 @@ class PacketMonitor:
         
         while True:
             try:
-                # Generiere den täglichen Bericht
-                day_key = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-                
-                # Hole die Daten für den vorherigen Tag
-                if "daily" not in self._stats:
-                    self._stats["daily"] = {}
-                    
-                day_data = self._stats["daily"].get(day_key, {
-                    "total": 0,
-                    "valid": 0,
-                    "invalid": 0,
-                    "error_rate": 0.0
-                })
-                
-                # Erstelle den Bericht
-                report = {
-                    "timestamp": datetime.now().isoformat(),
-                    "period": "daily",
-                    "date": day_key,
-                    "data": day_data,
-                    "threshold_exceeded": day_data["error_rate"] > self._error_threshold
-                }
-                
-                # Füge den Bericht zur Liste hinzu
-                self._reports["daily"].append(report)
-                
-                # Begrenze die Anzahl der Berichte auf die letzten 30
-                if len(self._reports["daily"]) > 30:
-                    self._reports["daily"] = self._reports["daily"][-30:]
-                
-                # Speichere die Berichte
-                self._save_reports()
-                
-                # Protokolliere den Bericht nur bei signifikanten Daten
-                if day_data["total"] > 1000:
-                    logger.info(f"📊 Täglicher Paketqualitäts-Bericht ({day_key}):")
-                    logger.info(f"   Gesamt: {day_data['total']} Pakete")
-                    logger.info(f"   Gültig: {day_data['valid']} Pakete ({day_data['valid']/day_data['total']:.1%})")
-                    logger.info(f"   Ungültig: {day_data['invalid']} Pakete ({day_data['error_rate']:.1%})")
-                    
-                    if day_data["error_rate"] > self._error_threshold:
-                        logger.warning(f"⚠️ Fehlerrate von {day_data['error_rate']:.1%} überschreitet den Schwellwert!")
+                self._create_daily_report()
                 
                 # Warte bis zum nächsten Tag
                 await asyncio.sleep(86400)
@@ -424,68 +340,7 @@ class PacketMonitor:
         
         while True:
             try:
-                # Generiere den wöchentlichen Bericht
-                end_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-                start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-                
-                # Sammle die Daten für die letzte Woche
-                week_data = {
-                    "total": 0,
-                    "valid": 0,
-                    "invalid": 0,
-                    "error_rate": 0.0,
-                    "days": {}
-                }
-                
-                # Sammle die täglichen Daten der letzten Woche
-                if "daily" in self._stats:
-                    for i in range(7):
-                        day_key = (datetime.now() - timedelta(days=i+1)).strftime("%Y-%m-%d")
-                        day_data = self._stats["daily"].get(day_key, {
-                            "total": 0,
-                            "valid": 0,
-                            "invalid": 0,
-                            "error_rate": 0.0
-                        })
-                        
-                        week_data["total"] += day_data["total"]
-                        week_data["valid"] += day_data["valid"]
-                        week_data["invalid"] += day_data["invalid"]
-                        week_data["days"][day_key] = day_data
-                
-                # Berechne die wöchentliche Fehlerrate
-                if week_data["total"] > 0:
-                    week_data["error_rate"] = week_data["invalid"] / week_data["total"]
-                
-                # Erstelle den Bericht
-                report = {
-                    "timestamp": datetime.now().isoformat(),
-                    "period": "weekly",
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "data": week_data,
-                    "threshold_exceeded": week_data["error_rate"] > self._error_threshold
-                }
-                
-                # Füge den Bericht zur Liste hinzu
-                self._reports["weekly"].append(report)
-                
-                # Begrenze die Anzahl der Berichte auf die letzten 12
-                if len(self._reports["weekly"]) > 12:
-                    self._reports["weekly"] = self._reports["weekly"][-12:]
-                
-                # Speichere die Berichte
-                self._save_reports()
-                
-                # Protokolliere den Bericht nur bei signifikanten Daten
-                if week_data["total"] > 5000:
-                    logger.info(f"📊 Wöchentlicher Paketqualitäts-Bericht ({start_date} bis {end_date}):")
-                    logger.info(f"   Gesamt: {week_data['total']} Pakete")
-                    logger.info(f"   Gültig: {week_data['valid']} Pakete ({week_data['valid']/week_data['total']:.1%})")
-                    logger.info(f"   Ungültig: {week_data['invalid']} Pakete ({week_data['error_rate']:.1%})")
-                    
-                    if week_data["error_rate"] > self._error_threshold:
-                        logger.warning(f"⚠️ Fehlerrate von {week_data['error_rate']:.1%} überschreitet den Schwellwert!")
+                self._create_weekly_report()
                 
                 # Warte bis zum nächsten Montag
                 await asyncio.sleep(7 * 86400)
@@ -495,9 +350,131 @@ class PacketMonitor:
                 logger.error(traceback.format_exc())
                 await asyncio.sleep(3600)  # Bei Fehlern eine Stunde warten
     
+    def _create_hourly_report(self) -> Dict[str, Any]:
+        """Erstellt den Bericht der abgelaufenen Stunde aus ihrem Bucket."""
+        # eine halbe Stunde zurück, falls der Task kurz vor der vollen Stunde aufwacht
+        hour = self._local_index(self._clock() - 1800, 3600)
+        hour_key = self._hour_key(hour)
+        hour_data = self._bucket_data(self._hours, hour)
+        
+        # Erstelle den Bericht
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "period": "hourly",
+            "hour": hour_key,
+            "data": hour_data,
+            "threshold_exceeded": hour_data["error_rate"] > self._error_threshold
+        }
+        
+        # Füge den Bericht zur Liste hinzu, begrenzt auf die letzten 24
+        self._reports["hourly"] = (self._reports["hourly"] + [report])[-24:]
+        
+        # Speichere die Berichte
+        self._save_reports()
+        
+        # Protokolliere den Bericht nur bei signifikanten Daten
+        if hour_data["total"] > 100:
+            logger.info(f"📊 Stündlicher Paketqualitäts-Bericht ({hour_key}):")
+            self._log_report_data(hour_data)
+        return report
+
+    def _create_daily_report(self) -> Dict[str, Any]:
+        """Erstellt den Bericht des Vortags aus seinem Bucket."""
+        day = self._local_index(self._clock() - 43200, 86400)
+        day_key = self._day_key(day)
+        day_data = self._bucket_data(self._days, day)
+        
+        # Erstelle den Bericht
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "period": "daily",
+            "date": day_key,
+            "data": day_data,
+            "threshold_exceeded": day_data["error_rate"] > self._error_threshold
+        }
+        
+        # Füge den Bericht zur Liste hinzu, begrenzt auf die letzten 30
+        self._reports["daily"] = (self._reports["daily"] + [report])[-30:]
+        
+        # Speichere die Berichte
+        self._save_reports()
+        
+        # Protokolliere den Bericht nur bei signifikanten Daten
+        if day_data["total"] > 1000:
+            logger.info(f"📊 Täglicher Paketqualitäts-Bericht ({day_key}):")
+            self._log_report_data(day_data)
+        return report
+
+    def _create_weekly_report(self) -> Dict[str, Any]:
+        """Erstellt den Bericht der letzten sieben Tage aus den Tages-Buckets."""
+        last_day = self._local_index(self._clock() - 43200, 86400)
+        start_date = self._day_key(last_day - 6)
+        end_date = self._day_key(last_day)
+        
+        week_data = {
+            "total": 0,
+            "valid": 0,
+            "invalid": 0,
+            "error_rate": 0.0,
+            "days": {}
+        }
+        for index in range(last_day, last_day - 7, -1):
+            day_data = self._bucket_data(self._days, index)
+            week_data["total"] += day_data["total"]
+            week_data["valid"] += day_data["valid"]
+            week_data["invalid"] += day_data["invalid"]
+            week_data["days"][self._day_key(index)] = day_data
+        
+        # Berechne die wöchentliche Fehlerrate
+        if week_data["total"] > 0:
+            week_data["error_rate"] = week_data["invalid"] / week_data["total"]
+        
+        # Erstelle den Bericht
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "period": "weekly",
+            "start_date": start_date,
+            "end_date": end_date,
+            "data": week_data,
+            "threshold_exceeded": week_data["error_rate"] > self._error_threshold
+        }
+        
+        # Füge den Bericht zur Liste hinzu, begrenzt auf die letzten 12
+        self._reports["weekly"] = (self._reports["weekly"] + [report])[-12:]
+        
+        # Speichere die Berichte
+        self._save_reports()
+        
+        # Protokolliere den Bericht nur bei signifikanten Daten
+        if week_data["total"] > 5000:
+            logger.info(f"📊 Wöchentlicher Paketqualitäts-Bericht ({start_date} bis {end_date}):")
+            self._log_report_data(week_data)
+        return report
+
+    def _log_report_data(self, data: Dict[str, Any]):
+        logger.info(f"   Gesamt: {data['total']} Pakete")
+        logger.info(f"   Gültig: {data['valid']} Pakete ({data['valid']/data['total']:.1%})")
+        logger.info(f"   Ungültig: {data['invalid']} Pakete ({data['error_rate']:.1%})")
+        
+        if data["error_rate"] > self._error_threshold:
+            logger.warning(f"⚠️ Fehlerrate von {data['error_rate']:.1%} überschreitet den Schwellwert!")
+    
     def get_stats(self) -> Dict:
-        """Gibt die aktuellen Paketstatistiken zurück."""
-        return self._stats
+        """Gibt die aktuellen Paketstatistiken zurück, Fehlerraten und Buckets werden jetzt berechnet."""
+        hour, day = self._current_indexes()
+        stats = dict(self._stats)
+        stats["error_rate"] = stats["invalid_packets"] / stats["total_packets"] if stats["total_packets"] > 0 else 0.0
+        stats["hourly"] = {
+            self._hour_key(index): self._bucket_data(self._hours, index)
+            for index in range(hour - self.HOURS_KEPT + 1, hour + 1)
+            if self._hours[index % self.HOURS_KEPT][0] == index
+        }
+        stats["daily"] = {
+            self._day_key(index): self._bucket_data(self._days, index)
+            for index in range(day - self.DAYS_KEPT + 1, day + 1)
+            if self._days[index % self.DAYS_KEPT][0] == index
+        }
+        return stats
     
     def get_reports(self) -> Dict:
         """Gibt die Paketberichte zurück."""
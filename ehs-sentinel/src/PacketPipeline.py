@@ -0,0 +1,207 @@
+import asyncio
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from CustomLogger import logger
+
+class OverloadPolicy(Enum):
+    """Verhalten der Pipeline, wenn die Warteschlange eines Workers voll ist."""
+    BLOCK = "block"              # Leser wartet, bis wieder Platz ist (Backpressure)
+    DROP_OLDEST = "drop_oldest"  # ältestes wartendes Paket wird verworfen
+    COALESCE = "coalesce"        # wartendes Paket mit denselben Sensoren wird durch das neue ersetzt
+
+class PacketPipeline:
+    """
+    Begrenzte Verarbeitungspipeline für empfangene NASA-Pakete.
+
+    Jeder Worker besitzt eine eigene begrenzte asyncio.Queue. Pakete werden anhand der
+    Quelladresse (Klasse, Kanal, Adresse) einem festen Worker zugeordnet, dadurch bleibt
+    die Reihenfolge pro Quelle erhalten, während verschiedene Quellen parallel laufen.
+    """
+
+    DROP_LOG_INTERVAL = 100
+
+    def __init__(self, handler: Callable[[Any], Awaitable[None]], workers: int = 4, queue_size: int = 1000,
+                 overload_policy: OverloadPolicy = OverloadPolicy.BLOCK, report_interval: int = 300):
+        """
+        Args:
+            handler: Coroutine-Funktion, die ein einzelnes Paket verarbeitet
+            workers: Anzahl paralleler Worker
+            queue_size: Gesamtkapazität aller Warteschlangen
+            overload_policy: Verhalten bei voller Warteschlange
+            report_interval: Intervall in Sekunden für den Kennzahlen-Report im Log, 0 deaktiviert ihn
+        """
+        self.handler = handler
+        self.report_interval = report_interval
+        self.workers = max(1, int(workers))
+        self.queue_size = max(self.workers, int(queue_size))
+        self.overload_policy = OverloadPolicy(overload_policy)
+
+        per_worker = self.queue_size // self.workers
+        self._queues = [asyncio.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        # Nur für COALESCE: Signatur -> wartender Slot, je Worker
+        self._pending: List[Dict[tuple, list]] = [{} for _ in range(self.workers)]
+        self._tasks: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._lag_last = 0.0
+
+    def start(self):
+        """Startet die Worker-Tasks."""
+        if self._tasks:
+            return
+        for index, queue in enumerate(self._queues):
+            self._tasks.append(asyncio.create_task(self._worker(index, queue)))
+        if self.report_interval > 0:
+            self._tasks.append(asyncio.create_task(self._report_loop()))
+        logger.info(f"🧵 Paket-Pipeline gestartet: {self.workers} Worker, "
+                    f"Warteschlange {self.queue_size}, Überlast-Strategie {self.overload_policy.value}")
+
+    async def stop(self, timeout: float = 5.0):
+        """
+        Beendet alle Worker. Noch wartende Pakete werden vorher bis zu timeout Sekunden lang
+        verarbeitet, erst danach werden die übrigen verworfen.
+        """
+        if self._tasks and self.queue_depth:
+            try:
+                await asyncio.wait_for(self.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ Paket-Pipeline beendet, {self.queue_depth} wartende Pakete verworfen")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self):
+        """Wartet, bis alle eingereihten Pakete verarbeitet wurden."""
+        for queue in self._queues:
+            await queue.join()
+
+    async def submit(self, frame):
+        """
+        Reiht ein Paket ein. Bei voller Warteschlange greift die Überlast-Strategie,
+        mit BLOCK wartet der Aufrufer, bis der Worker wieder Platz hat.
+        """
+        self.submitted += 1
+        index = ((frame[3] << 16) | (frame[4] << 8) | frame[5]) % self.workers
+        queue = self._queues[index]
+        slot = [frame, asyncio.get_running_loop().time(), None]
+
+        if self.overload_policy is OverloadPolicy.COALESCE:
+            slot[2] = self._signature(frame)
+            if queue.full():
+                pending = self._pending[index].get(slot[2]) if slot[2] is not None else None
+                if pending is not None:
+                    # neuere Werte für dieselben Sensoren ersetzen das wartende Paket an seiner Position
+                    pending[0] = frame
+                    self.coalesced += 1
+                    return
+                self.blocked += 1
+            await queue.put(slot)
+            if slot[2] is not None:
+                self._pending[index][slot[2]] = slot
+        elif queue.full() and self.overload_policy is OverloadPolicy.DROP_OLDEST:
+            queue.get_nowait()
+            queue.task_done()
+            self.dropped += 1
+            if self.dropped % self.DROP_LOG_INTERVAL == 1:
+                logger.warning(f"⚠️ Paket-Pipeline überlastet, {self.dropped} Pakete verworfen")
+            queue.put_nowait(slot)
+        else:
+            if queue.full():
+                self.blocked += 1
+            await queue.put(slot)
+
+        depth = self.queue_depth
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    async def _worker(self, index: int, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        pending = self._pending[index]
+
+        while True:
+            slot = await queue.get()
+            try:
+                if slot[2] is not None and pending.get(slot[2]) is slot:
+                    del pending[slot[2]]
+
+                lag = loop.time() - slot[1]
+                self._lag_last = lag
+                self._lag_total += lag
+                if lag > self._lag_max:
+                    self._lag_max = lag
+
+                await self.handler(slot[0])
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"❌ Fehler in Paket-Worker {index}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _report_loop(self):
+        """Schreibt die Kennzahlen regelmäßig ins Log."""
+        while True:
+            await asyncio.sleep(self.report_interval)
+            metrics = self.get_metrics()
+            logger.info(f"📊 Paket-Pipeline: {metrics['processed']}/{metrics['submitted']} verarbeitet, "
+                        f"Warteschlange {metrics['queue_depth']} (max {metrics['max_queue_depth']}), "
+                        f"verworfen {metrics['dropped']}, zusammengefasst {metrics['coalesced']}, "
+                        f"Verzögerung Ø {metrics['lag_avg_ms']} ms / max {metrics['lag_max_ms']} ms")
+
+    @staticmethod
+    def _signature(frame) -> Optional[tuple]:
+        """
+        Ermittelt Quelle, Datentyp und enthaltene Nachrichtennummern eines Pakets.
+        Zwei Pakete mit gleicher Signatur tragen Werte für dieselben Sensoren.
+        """
+        try:
+            capacity = frame[12]
+            end = len(frame) - 3
+            pos = 13
+            numbers = []
+            while len(numbers) <= capacity and end - pos > 2:
+                number = (frame[pos] << 8) | frame[pos + 1]
+                message_type = (number & 1536) >> 9
+                numbers.append(number)
+                if message_type == 3:
+                    break
+                pos += 2 + (1, 2, 4)[message_type]
+            return (frame[3], frame[4], frame[5], frame[10] & 15, tuple(numbers))
+        except IndexError:
+            return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Gibt die aktuellen Kennzahlen der Pipeline zurück."""
+        started = self.processed + self.errors
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "overload_policy": self.overload_policy.value,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "blocked": self.blocked,
+            "errors": self.errors,
+            "lag_last_ms": round(self._lag_last * 1000, 2),
+            "lag_avg_ms": round(self._lag_total / started * 1000, 2) if started else 0.0,
+            "lag_max_ms": round(self._lag_max * 1000, 2),
+        }
@@ -0,0 +1,343 @@
+"""
+Request/Response-Korrelation für EHS-Sentinel
+Ordnet Antworten der Wärmepumpe den gesendeten Poll-Anfragen zu, misst die Antwortzeit
+pro Sensor und meldet Adressen, die innerhalb des Timeouts unbeantwortet bleiben
+"""
+
+import asyncio
+import bisect
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from CustomLogger import logger
+from NASAPacket import NASAPacket
+
+class SensorLatency:
+    """Antwortzeit-Histogramm und Zähler für einen Sensor."""
+
+    __slots__ = ('requests', 'responses', 'timeouts', 'retries', 'total_ms', 'min_ms', 'max_ms', 'buckets')
+
+    def __init__(self, bucket_count: int):
+        self.requests = 0
+        self.responses = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+        self.buckets = [0] * bucket_count
+
+    def add(self, latency_ms: float, bucket: int):
+        self.responses += 1
+        self.total_ms += latency_ms
+        self.min_ms = latency_ms if self.min_ms is None else min(self.min_ms, latency_ms)
+        self.max_ms = latency_ms if self.max_ms is None else max(self.max_ms, latency_ms)
+        self.buckets[bucket] += 1
+
+    def quantile(self, q: float, bounds: Tuple[float, ...]) -> Optional[float]:
+        """Obergrenze des Histogramm-Buckets, in dem das Quantil q liegt."""
+        if not self.responses:
+            return None
+        rank = q * self.responses
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return bounds[index] if index < len(bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self, bounds: Tuple[float, ...]) -> Dict:
+        labels = [f"<={bound:g}ms" for bound in bounds] + [f">{bounds[-1]:g}ms"]
+        return {
+            "requests": self.requests,
+            "responses": self.responses,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.responses, 1) if self.responses else None,
+            "min_ms": round(self.min_ms, 1) if self.min_ms is not None else None,
+            "max_ms": round(self.max_ms, 1) if self.max_ms is not None else None,
+            "p50_ms": self.quantile(0.5, bounds),
+            "p95_ms": self.quantile(0.95, bounds),
+            "histogram": dict(zip(labels, self.buckets))
+        }
+
+class PollCorrelator:
+    """
+    Verfolgt ausstehende Poll-Anfragen pro Nachrichtenadresse.
+
+    Jede gesendete Read-Anfrage bekommt eine fortlaufende Paketnummer (0-255) und meldet ihre
+    Adressen mit Sendezeitpunkt an. Antwort-Pakete der Wärmepumpe werden über die Adresse
+    zugeordnet; stimmt die Paketnummer nicht überein, zählt die Antwort trotzdem, wird aber als
+    number_mismatch gezählt. Antworten nach Ablauf des Timeouts gelten als verspätet und werden
+    nicht als Antwortzeit gewertet.
+
+    Die Wärmepumpe beantwortet eine Anfrage mit genau einem Paket. Fehlt eine Adresse in der
+    Antwort, wird sie nicht mehr nachgeliefert (meist vom Gerät nicht unterstützt) und gilt als
+    erledigt. Ein NACK markiert alle Adressen der Anfrage als abgelehnt. In beiden Fällen bleiben
+    die Adressen unbeantwortet, wartende Aufrufer müssen aber nicht mehr auf sie warten.
+
+    settle() wartet, bis die Adressen eines Frames beantwortet oder abgelehnt sind, höchstens
+    die angegebene Zeit, und lässt sie ausstehend (Taktung durch den MessageProducer).
+    wait_for() wartet, bis alle Adressen einer Gruppe beantwortet sind oder der Timeout der
+    zuletzt gesendeten Anfrage abgelaufen ist, und liefert die unbeantworteten Sensoren zurück.
+    Wiederholungen und die Meldung an den SensorMonitor übernimmt der PollingManager.
+
+    Schreib-Anfragen werden nicht als Sensoren geführt, wait_ack() wartet nur auf das ACK mit
+    ihrer Paketnummer.
+    """
+
+    LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 5000)
+    PENDING, NACKED, MISSING = 0, 1, 2  # Zustand einer ausstehenden Adresse
+    DERIVED_PREFIX = "NASA_EHSSENTINEL_"  # von EHS-Sentinel berechnet, die Wärmepumpe antwortet nie
+
+    def __init__(self, timeout: float = 3.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            timeout: Sekunden, die nach dem Senden auf eine Antwort gewartet wird
+            clock: Zeitquelle in Sekunden, muss zur Event-Loop passen (monoton)
+        """
+        self.timeout = timeout
+        self.clock = clock
+        self._packet_number = 0
+        # Adresse -> (Sensorname, Paketnummer, Sendezeit, Zustand)
+        self._outstanding: Dict[int, Tuple[str, int, float, int]] = {}
+        # offene wait_for-Aufrufe: (Adresse -> Sensorname, Future)
+        self._waiters: List[Tuple[Dict[int, str], asyncio.Future]] = []
+        # Paketnummer -> Future einer Schreib-Anfrage, die auf ihr ACK wartet
+        self._acks: Dict[int, asyncio.Future] = {}
+        self._sensors: Dict[str, SensorLatency] = {}
+        self._stats = {
+            "requested": 0,
+            "answered": 0,
+            "late": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "nacks": 0,
+            "acks": 0,
+            "ack_timeouts": 0,
+            "number_mismatch": 0
+        }
+
+    def next_packet_number(self) -> int:
+        """Liefert die nächste Paketnummer, nach 255 beginnt sie wieder bei 0."""
+        number = self._packet_number
+        self._packet_number = (number + 1) & 0xFF
+        return number
+
+    def _sensor(self, name: str) -> SensorLatency:
+        sensor = self._sensors.get(name)
+        if sensor is None:
+            sensor = self._sensors[name] = SensorLatency(len(self.LATENCY_BUCKETS_MS) + 1)
+        return sensor
+
+    def register(self, packet_number: int, sensors: Iterable[Tuple[str, int]], sent_at: Optional[float] = None):
+        """
+        Meldet die Adressen einer gesendeten Anfrage an. Eine noch ausstehende Anfrage derselben
+        Adresse wird ersetzt.
+
+        Args:
+            packet_number: Paketnummer des gesendeten Frames
+            sensors: (Sensorname, Adresse) Paare
+            sent_at: Sendezeitpunkt, Standard ist jetzt
+        """
+        if sent_at is None:
+            sent_at = self.clock()
+        for name, address in sensors:
+            if not address or name.startswith(self.DERIVED_PREFIX):
+                continue
+            self._outstanding[address] = (name, packet_number, sent_at, self.PENDING)
+            self._sensor(name).requests += 1
+            self._stats["requested"] += 1
+
+    def resolve(self, address: int, packet_number: Optional[int] = None, now: Optional[float] = None,
+                requests: Optional[set] = None) -> Optional[float]:
+        """
+        Ordnet eine empfangene Nachricht einer ausstehenden Anfrage zu.
+
+        Args:
+            requests: sammelt die Paketnummer der zugeordneten Anfrage
+
+        Returns:
+            Antwortzeit in Millisekunden oder None, wenn nichts ausstand oder die Antwort zu spät kam
+        """
+        entry = self._outstanding.pop(address, None)
+        if entry is None:
+            return None
+        name, number, sent_at, _ = entry
+        if requests is not None:
+            requests.add(number)
+        if now is None:
+            now = self.clock()
+        latency = now - sent_at
+        if latency > self.timeout:
+            self._stats["late"] += 1
+            self._wake()
+            return None
+
+        if packet_number is not None and packet_number != number:
+            self._stats["number_mismatch"] += 1
+        latency_ms = latency * 1000
+        self._sensor(name).add(latency_ms, bisect.bisect_left(self.LATENCY_BUCKETS_MS, latency_ms))
+        self._stats["answered"] += 1
+
+        for remaining, _ in self._waiters:
+            remaining.pop(address, None)
+        self._wake()
+        return latency_ms
+
+    def match_response(self, packet: NASAPacket) -> int:
+        """
+        Ordnet alle Nachrichten eines Antwort-Pakets zu und liefert die Anzahl der Treffer. Adressen
+        derselben Anfrage, die in der Antwort fehlen, gelten danach als erledigt.
+        """
+        if not self._outstanding:
+            return 0
+        now = self.clock()
+        matched = 0
+        requests = set()
+        for msg in packet.packet_messages:
+            if self.resolve(msg.packet_message, packet.packet_number, now, requests) is not None:
+                matched += 1
+        if requests and self._mark(requests, self.MISSING):
+            self._wake()
+        return matched
+
+    def _mark(self, packet_numbers: set, state: int) -> int:
+        """Setzt den Zustand aller ausstehenden Adressen der angegebenen Anfragen."""
+        marked = 0
+        for address, entry in self._outstanding.items():
+            if entry[1] in packet_numbers and entry[3] == self.PENDING:
+                self._outstanding[address] = entry[:3] + (state,)
+                marked += 1
+        return marked
+
+    def match_nack(self, packet: NASAPacket) -> int:
+        """Markiert die Adressen der abgelehnten Anfrage und liefert ihre Anzahl."""
+        rejected = self._mark({packet.packet_number}, self.NACKED)
+        if rejected:
+            self._stats["nacks"] += 1
+            self._wake()
+        return rejected
+
+    def match_ack(self, packet: NASAPacket) -> bool:
+        """Meldet das ACK einer Schreib-Anfrage, liefert True, wenn jemand darauf gewartet hat."""
+        future = self._acks.get(packet.packet_number)
+        if future is None or future.done():
+            return False
+        future.set_result(True)
+        self._stats["acks"] += 1
+        return True
+
+    async def wait_ack(self, packet_number: int, timeout: float) -> bool:
+        """Wartet höchstens timeout Sekunden auf das ACK der Schreib-Anfrage mit dieser Paketnummer."""
+        future = asyncio.get_running_loop().create_future()
+        self._acks[packet_number] = future
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._stats["ack_timeouts"] += 1
+            return False
+        finally:
+            if self._acks.get(packet_number) is future:
+                del self._acks[packet_number]
+
+    def has_answered(self, name: str) -> bool:
+        """Ob die Wärmepumpe diesen Sensor schon einmal beantwortet hat."""
+        sensor = self._sensors.get(name)
+        return sensor is not None and sensor.responses > 0
+
+    def _settled(self, remaining: Dict[int, str]) -> bool:
+        """Keine der Adressen wartet noch auf eine Antwort (beantwortet, verspätet oder abgelehnt)."""
+        for address in remaining:
+            entry = self._outstanding.get(address)
+            if entry is not None and entry[3] == self.PENDING:
+                return False
+        return True
+
+    def _wake(self):
+        for remaining, future in self._waiters:
+            if not future.done() and self._settled(remaining):
+                future.set_result(None)
+
+    async def _wait(self, remaining: Dict[int, str], deadline: float):
+        if self._settled(remaining):
+            return
+        waiter = (remaining, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], max(0.0, deadline - self.clock()))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters.remove(waiter)
+
+    def pending(self, names: Iterable[str]) -> Dict[int, str]:
+        """Ausstehende Adressen der angegebenen Sensoren."""
+        wanted = set(names)
+        return {address: entry[0] for address, entry in self._outstanding.items() if entry[0] in wanted}
+
+    async def wait_for(self, names: Iterable[str]) -> List[str]:
+        """
+        Wartet auf die Antworten der angegebenen Sensoren.
+
+        Returns:
+            Sensoren ohne rechtzeitige Antwort, ihre Anfragen werden verworfen
+        """
+        remaining = self.pending(names)
+        if remaining:
+            deadline = max(self._outstanding[address][2] for address in remaining) + self.timeout
+            await self._wait(remaining, deadline)
+
+        unanswered = []
+        for address, name in remaining.items():
+            entry = self._outstanding.get(address)
+            if entry is not None and entry[0] == name:
+                del self._outstanding[address]
+            self._sensor(name).timeouts += 1
+            self._stats["timeouts"] += 1
+            unanswered.append(name)
+        return unanswered
+
+    async def settle(self, names: Iterable[str], timeout: float) -> Tuple[List[str], int]:
+        """
+        Wartet höchstens timeout Sekunden auf die Antworten, ohne die Anfragen zu verwerfen.
+
+        Returns:
+            (noch unbeantwortete Sensoren, davon abgelehnt)
+        """
+        remaining = self.pending(names)
+        if remaining:
+            await self._wait(remaining, self.clock() + timeout)
+        nacked = 0
+        for address in remaining:
+            entry = self._outstanding.get(address)
+            if entry is not None and entry[3] == self.NACKED:
+                nacked += 1
+        return list(remaining.values()), nacked
+
+    def record_retry(self, names: Iterable[str]):
+        """Zählt eine erneute Anfrage für unbeantwortete Sensoren."""
+        for name in names:
+            self._sensor(name).retries += 1
+            self._stats["retries"] += 1
+
+    def get_stats(self) -> Dict:
+        """Zähler und Antwortzeit-Histogramme pro Sensor."""
+        return {
+            **self._stats,
+            "outstanding": len(self._outstanding),
+            "timeout_s": self.timeout,
+            "sensors": {name: sensor.to_dict(self.LATENCY_BUCKETS_MS) for name, sensor in self._sensors.items()}
+        }
+
+    def reset(self):
+        """Verwirft ausstehende Anfragen und Statistiken."""
+        self._outstanding.clear()
+        self._sensors.clear()
+        for key in self._stats:
+            self._stats[key] = 0
+        logger.debug("PollCorrelator zurückgesetzt")
+
+# Globale Instanz, geteilt von MessageProducer, MessageProcessor und PollingManager
+poll_correlator = PollCorrelator()
@@ -0,0 +1,240 @@
+"""
+Deadline-Scheduler für das Polling von EHS-Sentinel
+Führt für jeden Sensor eine nächste Fälligkeit auf der monotonen Event-Loop-Zeit und fasst
+Sensoren, die innerhalb eines Zeitfensters fällig werden, zu einem gemeinsamen Abruf zusammen
+"""
+
+import asyncio
+import heapq
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+class PollScheduler:
+    """
+    Min-Heap der nächsten Fälligkeit pro Sensor.
+
+    Ein Sensor, der in mehreren Gruppen steht, wird nur einmal geführt und mit dem kürzesten
+    Intervall seiner Gruppen abgefragt. pop_due() liefert alle Sensoren, die bis jetzt plus
+    merge_window fällig sind, damit gleichzeitig fällige Gruppen in gemeinsame Frames gepackt
+    werden. Die nächste Fälligkeit wird von der alten Fälligkeit aus berechnet, nicht vom
+    Abrufzeitpunkt, so summiert sich keine Drift auf. Wer mehr als ein Intervall zurückliegt,
+    überspringt die verpassten Termine.
+
+    Als Jitter gilt die Verspätung eines Abrufs gegenüber der frühesten Fälligkeit einer Gruppe.
+
+    Mit last_heard werden fällige Sensoren übersprungen, deren Wert innerhalb ihres Intervalls
+    schon anderweitig empfangen wurde (z.B. Broadcasts der Außeneinheit). Sie werden wieder
+    fällig, sobald der empfangene Wert ein Intervall alt ist, und pro Gruppe als gesparte
+    Abfrage gezählt.
+
+    Mit interval_for kann das Intervall pro Sensor beim Neuplanen angepasst werden (adaptive
+    Intervalle), es erhält den Sensor und das Intervall seiner Gruppen. Es wird nur für
+    abgefragte Sensoren aufgerufen; übersprungene behalten das zuletzt gewählte Intervall.
+    """
+
+    JITTER_SAMPLES = 100  # gemerkte Verspätungen pro Gruppe
+
+    def __init__(self, merge_window: float = 1.0, clock: Optional[Callable[[], float]] = None,
+                 last_heard: Optional[Callable[[str], Optional[float]]] = None,
+                 interval_for: Optional[Callable[[str, float], float]] = None):
+        """
+        Args:
+            merge_window: Sekunden, um die fast fällige Sensoren vorgezogen werden
+            clock: monotone Zeitquelle in Sekunden, Standard ist die Zeit der laufenden Event-Loop
+            last_heard: liefert den letzten Empfangszeitpunkt eines Sensors (gleiche Zeitbasis) oder None
+            interval_for: liefert das Intervall eines Sensors aus Sensor und Gruppenintervall
+        """
+        self.merge_window = merge_window
+        self._clock = clock
+        self.last_heard = last_heard
+        self.interval_for = interval_for
+        self._heap: List[Tuple[float, str]] = []
+        self._deadline: Dict[str, float] = {}
+        self._interval: Dict[str, float] = {}
+        # zuletzt von interval_for gewähltes Intervall, gilt bis zur nächsten Abfrage
+        self._adapted: Dict[str, float] = {}
+        self._groups: Dict[str, Tuple[str, ...]] = {}
+        self._group_interval: Dict[str, float] = {}
+        self._sensor_groups: Dict[str, Tuple[str, ...]] = {}
+        self._jitter: Dict[str, deque] = {}
+        self._saved: Dict[str, int] = {}
+        # ein übersprungener Sensor wird höchstens einmal pro Intervall als gespart gezählt
+        self._saved_until: Dict[str, float] = {}
+        self._stats = {
+            "dispatches": 0,
+            "polled_sensors": 0,
+            "merged_dispatches": 0,
+            "skipped_deadlines": 0,
+            "saved_polls": 0,
+            "duplicate_sensors": 0
+        }
+
+    def clock(self) -> float:
+        if self._clock is not None:
+            return self._clock()
+        return asyncio.get_running_loop().time()
+
+    def set_groups(self, groups: Dict[str, Tuple[float, Iterable[str]]], offsets: Dict[str, float] = None):
+        """
+        Baut den Zeitplan neu auf.
+
+        Args:
+            groups: Gruppenname -> (Intervall in Sekunden, Sensoren)
+            offsets: optionale Verzögerung des ersten Abrufs pro Gruppe in Sekunden
+        """
+        now = self.clock()
+        offsets = offsets or {}
+        self._groups = {}
+        self._group_interval = {}
+        self._interval = {}
+        self._adapted = {}
+        self._deadline = {}
+        memberships: Dict[str, List[str]] = {}
+        # kürzestes Intervall zuerst, so gehört ein doppelter Sensor zur häufigsten Gruppe
+        for group_name, (interval, sensors) in sorted(groups.items(), key=lambda item: item[1][0]):
+            sensors = tuple(dict.fromkeys(sensors))
+            self._groups[group_name] = sensors
+            self._group_interval[group_name] = float(interval)
+            self._jitter.setdefault(group_name, deque(maxlen=self.JITTER_SAMPLES))
+            first_due = now + offsets.get(group_name, 0.0)
+            for sensor in sensors:
+                memberships.setdefault(sensor, []).append(group_name)
+                if sensor not in self._interval or interval < self._interval[sensor]:
+                    self._interval[sensor] = float(interval)
+                self._deadline[sensor] = min(self._deadline.get(sensor, first_due), first_due)
+        self._sensor_groups = {sensor: tuple(names) for sensor, names in memberships.items()}
+        self._stats["duplicate_sensors"] = sum(1 for names in memberships.values() if len(names) > 1)
+        self._heap = [(deadline, sensor) for sensor, deadline in self._deadline.items()]
+        heapq.heapify(self._heap)
+
+    def set_group_intervals(self, intervals: Dict[str, float], pinned: Iterable[str] = ()):
+        """
+        Ändert die Intervalle der Gruppen im laufenden Betrieb (z.B. Polling-Profil).
+
+        Sensoren, deren Intervall kürzer wird, sind sofort fällig; bei längeren Intervallen gilt die
+        bereits geplante Fälligkeit, danach das neue Intervall. Sensoren in pinned behalten das
+        Basisintervall ihrer Gruppen.
+        """
+        now = self.clock()
+        pinned = set(pinned)
+        for sensor, groups in self._sensor_groups.items():
+            source = self._group_interval if sensor in pinned else intervals
+            interval = min(float(source.get(group, self._group_interval[group])) for group in groups)
+            if interval < self._interval[sensor] and self._deadline[sensor] > now:
+                self._deadline[sensor] = now
+                heapq.heappush(self._heap, (now, sensor))
+            if interval != self._interval[sensor]:
+                self._adapted.pop(sensor, None)
+            self._interval[sensor] = interval
+
+    def base_interval(self, sensor: str) -> float:
+        """Kürzestes konfiguriertes Intervall der Gruppen eines Sensors, ohne Profil."""
+        return min(self._group_interval[group] for group in self._sensor_groups[sensor])
+
+    def next_deadline(self) -> Optional[float]:
+        """Früheste Fälligkeit oder None, wenn keine Sensoren geplant sind."""
+        heap = self._heap
+        while heap and self._deadline.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)  # veralteter Eintrag nach set_groups
+        return heap[0][0] if heap else None
+
+    def time_until_due(self) -> Optional[float]:
+        deadline = self.next_deadline()
+        return None if deadline is None else max(0.0, deadline - self.clock())
+
+    def pop_due(self) -> Dict[str, List[str]]:
+        """
+        Entnimmt alle Sensoren, die bis jetzt plus merge_window fällig sind, und plant sie neu.
+        Liefert Gruppenname -> fällige Sensoren, jeder Sensor steht nur bei seiner häufigsten Gruppe.
+        """
+        now = self.clock()
+        horizon = now + self.merge_window
+        heap = self._heap
+        due: Dict[str, List[str]] = {}
+        earliest: Dict[str, float] = {}
+        # erst nach der Schleife einplanen, sonst würde eine Fälligkeit innerhalb des Fensters erneut entnommen
+        rescheduled = []
+        while heap and heap[0][0] <= horizon:
+            deadline, sensor = heapq.heappop(heap)
+            if self._deadline.get(sensor) != deadline:
+                continue
+            interval = self._adapted.get(sensor, self._interval[sensor])
+            groups = self._sensor_groups[sensor]
+
+            heard = self.last_heard(sensor) if self.last_heard is not None else None
+            if heard is not None and now - heard < interval:
+                # Wert ist noch frisch, erst wieder fällig, wenn er ein Intervall alt ist
+                self._deadline[sensor] = heard + interval
+                rescheduled.append((heard + interval, sensor))
+                if now >= self._saved_until.get(sensor, 0.0):
+                    self._saved_until[sensor] = now + interval
+                    self._saved[groups[0]] = self._saved.get(groups[0], 0) + 1
+                    self._stats["saved_polls"] += 1
+                continue
+
+            # nur bei einer echten Abfrage, interval_for darf sich die Wahl merken
+            interval = self._interval[sensor]
+            if self.interval_for is not None:
+                interval = self.interval_for(sensor, interval)
+                self._adapted[sensor] = interval
+            next_due = deadline + interval
+            if next_due <= now:
+                missed = int((now - next_due) // interval) + 1
+                next_due += missed * interval
+                self._stats["skipped_deadlines"] += missed
+            self._deadline[sensor] = next_due
+            rescheduled.append((next_due, sensor))
+
+            due.setdefault(groups[0], []).append(sensor)
+            for group_name in groups:
+                if deadline < earliest.get(group_name, horizon + 1):
+                    earliest[group_name] = deadline
+        for entry in rescheduled:
+            heapq.heappush(heap, entry)
+
+        if due:
+            self._stats["dispatches"] += 1
+            self._stats["polled_sensors"] += sum(len(sensors) for sensors in due.values())
+            if len(due) > 1:
+                self._stats["merged_dispatches"] += 1
+            for group_name, deadline in earliest.items():
+                if deadline <= now:
+                    self._jitter[group_name].append((now - deadline) * 1000)
+        return due
+
+    def get_stats(self, now: float = None) -> Dict:
+        """Statistiken mit den nächsten Fälligkeiten und dem Jitter pro Gruppe."""
+        if now is None:
+            now = self.clock()
+        upcoming = []
+        for group_name, sensors in self._groups.items():
+            # Sensoren, die mit einer anderen Gruppe häufiger abgefragt werden, zählen dort
+            deadlines = [self._deadline[s] for s in sensors if self._sensor_groups[s][0] == group_name]
+            if deadlines:
+                upcoming.append({
+                    "group": group_name,
+                    "due_in_s": round(max(0.0, min(deadlines) - now), 3),
+                    "sensors": len(sensors)
+                })
+        upcoming.sort(key=lambda entry: entry["due_in_s"])
+
+        jitter = {}
+        for group_name, samples in self._jitter.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            jitter[group_name] = {
+                "samples": len(ordered),
+                "avg_ms": round(sum(ordered) / len(ordered), 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1),
+                "max_ms": round(ordered[-1], 1)
+            }
+
+        return {
+            **self._stats,
+            "scheduled_sensors": len(self._deadline),
+            "merge_window_s": self.merge_window,
+            "upcoming": upcoming,
+            "jitter": jitter,
+            "saved_by_group": dict(self._saved)
+        }
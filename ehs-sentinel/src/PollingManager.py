@@ -1,14 +1,21 @@
 import asyncio
 import json
 import os
-import time
 import traceback
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from AdaptiveIntervals import adaptive_intervals
 from CustomLogger import logger
 from EHSConfig import EHSConfig
+from BusArbiter import Lane, bus_arbiter
+from BusPacer import bus_pacer
+from FreshnessCache import freshness_cache
 from MessageProducer import MessageProducer
+from PollCorrelator import poll_correlator
+from PollScheduler import PollScheduler
+from PollingProfiles import PollingProfiles
+from SensorMonitor import sensor_monitor, ErrorType
 
 class PollingManager:
     """
@@ -18,6 +25,18 @@ class PollingManager:
     1. live_data: Kritische Betriebsdaten alle 10-15 Sekunden
     2. fsv_settings: Veränderliche Einstellungen alle 5-10 Minuten
     3. static_data: Statische Informationen maximal stündlich
+
+    Alle Gruppen laufen über einen gemeinsamen PollScheduler: Sensoren, die innerhalb von
+    _merge_window Sekunden fällig werden, werden in einer Anfrage zusammengefasst, Sensoren in
+    mehreren Gruppen nur einmal abgefragt. Sensoren, deren Wert die Wärmepumpe innerhalb ihres
+    Intervalls ohnehin gesendet hat (FreshnessCache), werden übersprungen.
+
+    Polling-Profile passen die Intervalle an den Betriebszustand an (z.B. seltener bei
+    ausgeschalteter Wärmepumpe oder stehendem Kompressor), siehe _define_polling_profiles.
+
+    Im adaptiven Modus (polling.adaptive) bekommt jeder numerische Sensor ein eigenes Intervall
+    aus seiner beobachteten Änderungsrate (AdaptiveIntervals). Die Zustandssensoren der Profile
+    bleiben beim Gruppenintervall, ein langsameres Profil gilt als Untergrenze.
     """
     
     _instance = None
@@ -26,11 +45,18 @@ class PollingManager:
     _config = None
     _polling_groups = {}
     _polling_tasks = {}
+    _scheduler = None
+    _profiles = None
+    _polling_profiles = {}
+    _profile_hold = 120  # Sekunden, die ein langsameres Profil passen muss, bevor gewechselt wird
+    _merge_window = 2.0  # Sekunden, um die fast fällige Sensoren mit abgefragt werden
     _stats_file = "/data/polling_stats.json"
+    _max_retries = 2  # erneute Anfragen für unbeantwortete Sensoren pro Polling-Durchlauf
     _stats = {
         "last_run": {},
         "success_count": {},
         "error_count": {},
+        "timeout_count": {},
         "total_polls": 0
     }
     
@@ -49,8 +75,23 @@ class PollingManager:
         # Lade vorhandene Statistiken, falls vorhanden
         self._load_stats()
         
-        # Definiere die Polling-Gruppen
+        # Definiere die Polling-Gruppen und Profile
         self._define_polling_groups()
+        self._define_polling_profiles()
+        adaptive = (self._config.POLLING or {}).get('adaptive') or {}
+        adaptive_intervals.configure(
+            enabled=adaptive.get('enable', False),
+            min_interval=adaptive.get('minInterval', 10),
+            max_interval=adaptive.get('maxInterval', 600),
+            tolerance=adaptive.get('tolerance', 0.5),
+            relative_tolerance=adaptive.get('relativeTolerance', 0.02),
+            horizon=adaptive.get('horizon', 600)
+        )
+        self._scheduler = PollScheduler(
+            merge_window=self._merge_window,
+            last_heard=self._last_heard,
+            interval_for=self._adaptive_interval if adaptive_intervals.enabled else None
+        )
         
     def _load_stats(self):
         """Lädt Polling-Statistiken aus der Datei, falls vorhanden."""
@@ -58,7 +99,7 @@ class PollingManager:
             if os.path.exists(self._stats_file):
                 with open(self._stats_file, 'r') as f:
                     self._stats = json.load(f)
-                logger.debug(f"Polling-Statistiken geladen: {self._stats}")
+                logger.debug("Polling-Statistiken geladen: %s", self._stats)
             else:
                 logger.info("📊 Keine vorhandenen Polling-Statistiken gefunden, starte neue Aufzeichnung")
         except Exception as e:
@@ -77,6 +118,7 @@ class PollingManager:
         # Gruppe 1: Kritische Betriebsdaten (alle 15 Sekunden)
         self._polling_groups["live_data"] = {
             "interval": 15,  # Sekunden
+            "lane": Lane.LIVE,
             "sensors": [
                 "NASA_POWER",                          # Ein/Aus Status
                 "NASA_INDOOR_OPMODE",                  # Betriebsmodus
@@ -99,6 +141,7 @@ class PollingManager:
         # Gruppe 2: Veränderliche Einstellungen (alle 5 Minuten)
         self._polling_groups["fsv_settings"] = {
             "interval": 300,  # Sekunden (5 Minuten)
+            "lane": Lane.SETTINGS,
             "sensors": [
                 # FSV 10xx - Fernbedienung
                 "VAR_IN_FSV_1011", "VAR_IN_FSV_1012", "VAR_IN_FSV_1021", "VAR_IN_FSV_1022",
@@ -128,6 +171,7 @@ class PollingManager:
         # Gruppe 3: Statische Informationen (stündlich)
         self._polling_groups["static_data"] = {
             "interval": 3600,  # Sekunden (1 Stunde)
+            "lane": Lane.STATIC,
             "sensors": [
                 "STR_INDOOR_MODEL_NAME",               # Inneneinheit Modellname
                 "STR_OUTDOOR_MODEL_NAME",              # Außeneinheit Modellname
@@ -144,6 +188,46 @@ class PollingManager:
             ]
         }
     
+    def _define_polling_profiles(self):
+        """
+        Definiert die Polling-Profile nach Betriebszustand. Das erste passende Profil gewinnt,
+        ohne Treffer gilt "running" mit den Intervallen der Gruppen.
+        """
+        # Wärmepumpe ausgeschaltet: Messwerte ändern sich kaum
+        self._polling_profiles["off"] = {
+            "when": {"NASA_POWER": ["OFF"]},
+            "intervals": {"live_data": 120, "fsv_settings": 900}
+        }
+        
+        # eingeschaltet, aber Kompressor steht
+        self._polling_profiles["idle"] = {
+            "when": {"NASA_OUTDOOR_OPERATION_STATUS": ["STOP"]},
+            "intervals": {"live_data": 60}
+        }
+
+    def _update_profile(self):
+        """Wählt das Profil zum aktuellen Betriebszustand und überträgt die Intervalle in den Zeitplan."""
+        switched = self._profiles.update(self._config.NASA_VAL_STORE, self._scheduler.clock())
+        if switched is None:
+            return
+        intervals = self._profiles.intervals()
+        self._scheduler.set_group_intervals(intervals, self._profiles.watched)
+        logger.info(f"🔀 Polling-Profil '{switched}' aktiv: {', '.join(f'{group} alle {interval}s' for group, interval in intervals.items())}")
+
+    def _last_heard(self, sensor: str) -> Optional[float]:
+        """Letzter von der Wärmepumpe selbst gesendeter Wert eines Sensors (Broadcasts)."""
+        address = self._config.NASA_ADDRESSES.get(sensor)
+        return freshness_cache.last_heard(address) if address else None
+
+    def _adaptive_interval(self, sensor: str, interval: float) -> float:
+        """Intervall aus der Änderungsrate des Sensors, interval ist das Intervall laut Profil."""
+        if self._profiles is not None and sensor in self._profiles.watched:
+            return interval
+        base = self._scheduler.base_interval(sensor)
+        chosen = adaptive_intervals.interval(sensor, base)
+        # ein langsameres Profil (z.B. Wärmepumpe aus) wird nicht unterschritten
+        return max(chosen, interval) if interval > base else chosen
+
     def set_message_producer(self, producer: MessageProducer):
         """Setzt den MessageProducer für das Polling."""
         self._producer = producer
@@ -164,6 +248,10 @@ class PollingManager:
             # Aktualisiere die Liste der gültigen Sensoren
             self._polling_groups[group_name]["sensors"] = valid_sensors
             logger.info(f"✅ Polling-Gruppe '{group_name}' validiert: {len(valid_sensors)} gültige Sensoren")
+
+        # Gruppen können sich geändert haben, gecachte Poll-Frames neu aufbauen
+        if self._producer:
+            self._producer.invalidate_frame_cache()
         
         return valid
     
@@ -178,7 +266,9 @@ class PollingManager:
         
         logger.info("🚀 Starte dreistufiges Polling-System...")
         
-        # Starte die Polling-Tasks für jede Gruppe
+        # Baue den gemeinsamen Zeitplan für alle Gruppen auf
+        groups = {}
+        offsets = {}
         for group_name, group_data in self._polling_groups.items():
             interval = group_data["interval"]
             sensors = group_data["sensors"]
@@ -187,63 +277,123 @@ class PollingManager:
                 logger.warning(f"⚠️ Keine gültigen Sensoren in Gruppe {group_name} - überspringe")
                 continue
             
-            logger.info(f"🔄 Starte Polling für Gruppe '{group_name}' alle {interval} Sekunden ({len(sensors)} Sensoren)")
-            
-            # Starte den Polling-Task mit zufälliger Verzögerung (0-5 Sekunden)
-            # um die Last zu verteilen
-            delay = 0.1 * len(self._polling_tasks)
-            self._polling_tasks[group_name] = asyncio.create_task(
-                self._poll_group(group_name, sensors, interval, delay)
-            )
+            logger.info(f"🔄 Plane Polling für Gruppe '{group_name}' alle {interval} Sekunden ({len(sensors)} Sensoren)")
+            groups[group_name] = (interval, sensors)
+            # kleiner Versatz, gleichzeitig fällige Gruppen werden trotzdem zusammengefasst
+            offsets[group_name] = 0.1 * len(offsets)
+
+        if not groups:
+            return
+
+        self._scheduler.set_groups(groups, offsets)
+        self._profiles = PollingProfiles(
+            self._polling_profiles,
+            {group_name: interval for group_name, (interval, _) in groups.items()},
+            hold=self._profile_hold
+        )
+        stats = self._scheduler.get_stats()
+        if stats["duplicate_sensors"]:
+            logger.info(f"🔗 {stats['duplicate_sensors']} Sensoren stehen in mehreren Gruppen und werden nur einmal abgefragt")
+
+        task = self._polling_tasks.get("scheduler")
+        if task is None or task.done():
+            self._polling_tasks["scheduler"] = asyncio.create_task(self._run_scheduler())
     
-    async def _poll_group(self, group_name: str, sensors: List[str], interval: int, initial_delay: float = 0):
-        """Führt das Polling für eine Gruppe in regelmäßigen Abständen durch."""
-        # Initiale Verzögerung
-        if initial_delay > 0:
-            await asyncio.sleep(initial_delay)
-        
+    async def _run_scheduler(self):
+        """Wartet auf die nächste Fälligkeit und fragt alle fälligen Sensoren gemeinsam ab."""
         while True:
+            delay = self._scheduler.time_until_due()
+            if delay is None:
+                return
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Zustandswerte kommen auch per Broadcast, daher vor jedem Abruf prüfen
+            self._update_profile()
+            due = self._scheduler.pop_due()
+            if not due:
+                continue
             try:
-                start_time = time.time()
-                
-                # Führe das Polling durch
-                await self._producer.read_request(sensors)
-                
-                # Aktualisiere Statistiken
-                self._stats["total_polls"] += 1
-                self._stats["last_run"][group_name] = datetime.now().isoformat()
-                
-                if group_name not in self._stats["success_count"]:
-                    self._stats["success_count"][group_name] = 0
-                self._stats["success_count"][group_name] += 1
-                
-                # Speichere Statistiken alle 10 erfolgreichen Polls
-                if self._stats["total_polls"] % 10 == 0:
-                    self._save_stats()
-                
-                logger.info(f"✅ Polling für Gruppe '{group_name}' abgeschlossen ({len(sensors)} Sensoren)")
-                
-                # Berechne die verbleibende Zeit bis zum nächsten Polling
-                elapsed = time.time() - start_time
-                sleep_time = max(0.1, interval - elapsed)
-                
-                await asyncio.sleep(sleep_time)
-                
+                await self._poll_due(due)
             except Exception as e:
                 # Fehlerbehandlung
-                if group_name not in self._stats["error_count"]:
-                    self._stats["error_count"][group_name] = 0
-                self._stats["error_count"][group_name] += 1
+                for group_name in due:
+                    self._stats["error_count"][group_name] = self._stats["error_count"].get(group_name, 0) + 1
                 
-                logger.error(f"❌ Fehler beim Polling für Gruppe '{group_name}': {e}")
+                logger.error(f"❌ Fehler beim Polling für Gruppen {', '.join(due)}: {e}")
                 logger.error(traceback.format_exc())
                 
                 # Bei Fehlern kurz warten und dann fortsetzen
                 await asyncio.sleep(5)
-    
+
+    async def _poll_due(self, due: Dict[str, List[str]]):
+        """Fragt die fälligen Sensoren aller Gruppen in einer Anfrage ab und wertet pro Gruppe aus."""
+        label = "+".join(due)
+        sensors = [sensor for group_sensors in due.values() for sensor in group_sensors]
+        # gemeinsame Frames laufen auf der Spur der wichtigsten beteiligten Gruppe
+        lane = min(self._polling_groups[group_name]["lane"] for group_name in due)
+
+        # Führe das Polling durch und warte auf die Antworten
+        await self._producer.read_request(sensors, lane)
+        unanswered = set(await self._collect_responses(label, sensors, lane))
+
+        # Aktualisiere Statistiken
+        self._stats["total_polls"] += 1
+        now = datetime.now().isoformat()
+        for group_name, group_sensors in due.items():
+            self._stats["last_run"][group_name] = now
+            self._stats["success_count"][group_name] = self._stats["success_count"].get(group_name, 0) + 1
+            missing = sum(1 for sensor in group_sensors if sensor in unanswered)
+            if missing:
+                self._stats.setdefault("timeout_count", {})
+                self._stats["timeout_count"][group_name] = self._stats["timeout_count"].get(group_name, 0) + missing
+
+        # Speichere Statistiken alle 10 erfolgreichen Polls
+        if self._stats["total_polls"] % 10 == 0:
+            self._save_stats()
+
+        if unanswered:
+            logger.info(f"✅ Polling für '{label}' abgeschlossen ({len(sensors) - len(unanswered)}/{len(sensors)} Sensoren beantwortet)")
+        else:
+            logger.info(f"✅ Polling für '{label}' abgeschlossen ({len(sensors)} Sensoren)")
+
+    async def _collect_responses(self, group_name: str, sensors: List[str], lane: Lane = Lane.LIVE) -> List[str]:
+        """
+        Wartet auf die Antworten eines Polling-Durchlaufs und fragt unbeantwortete Sensoren
+        bis zu _max_retries mal erneut an. Danach noch fehlende Sensoren werden dem
+        SensorMonitor als Timeout gemeldet.
+        """
+        unanswered = await poll_correlator.wait_for(sensors)
+        for attempt in range(1, self._max_retries + 1):
+            if not unanswered:
+                return unanswered
+            logger.info(f"🔁 Gruppe '{group_name}': {len(unanswered)} Sensoren ohne Antwort, Wiederholung {attempt}/{self._max_retries}")
+            poll_correlator.record_retry(unanswered)
+            await self._producer.read_request(unanswered, lane)
+            unanswered = await poll_correlator.wait_for(unanswered)
+
+        if unanswered:
+            for sensor in unanswered:
+                sensor_monitor.log_sensor_error(
+                    sensor_name=sensor,
+                    error_type=ErrorType.TIMEOUT,
+                    error_message=f"Keine Antwort nach {self._max_retries + 1} Anfragen ({poll_correlator.timeout}s Timeout)"
+                )
+            logger.warning(f"⏰ Gruppe '{group_name}': keine Antwort von {', '.join(unanswered)}")
+        return unanswered
+
     def get_polling_stats(self) -> Dict:
-        """Gibt die aktuellen Polling-Statistiken zurück."""
-        return self._stats
+        """Gibt die aktuellen Polling-Statistiken inklusive Zeitplan, Antwortzeiten pro Sensor, adaptiver Intervalle, Bus-Taktung und Sendespuren zurück."""
+        return {
+            **self._stats,
+            "schedule": self._scheduler.get_stats(),
+            "profile": self._profiles.get_stats(self._scheduler.clock()) if self._profiles else None,
+            "correlation": poll_correlator.get_stats(),
+            "freshness": freshness_cache.get_stats(),
+            "adaptive": adaptive_intervals.get_stats(),
+            "bus": bus_pacer.get_stats(),
+            "lanes": bus_arbiter.get_stats()
+        }
     
     def get_polling_groups(self) -> Dict:
         """Gibt die konfigurierten Polling-Gruppen zurück."""
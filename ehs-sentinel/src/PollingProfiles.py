@@ -0,0 +1,108 @@
+"""
+Betriebszustandsabhängige Polling-Profile für EHS-Sentinel
+Wählt anhand der zuletzt gemeldeten Zustandswerte (NASA_VAL_STORE) ein Profil mit eigenen
+Intervallen pro Polling-Gruppe und wechselt mit Hysterese zwischen den Profilen
+"""
+
+from typing import Any, Dict, Mapping, Optional, Set
+
+class PollingProfiles:
+    """
+    Deklarative Polling-Profile.
+
+    Ein Profil ist {"when": {Sensor: [Werte]}, "intervals": {Gruppe: Sekunden}}. Es passt, wenn
+    jeder Sensor aus "when" einen der angegebenen Werte hat; das erste passende Profil gewinnt,
+    sonst gilt das Standardprofil mit den Basisintervallen der Gruppen.
+
+    Hysterese: Ein Wechsel zu einem Profil, das keine Gruppe schneller abfragt (z.B. Standby),
+    erfolgt erst, wenn es hold Sekunden ununterbrochen passt. Ein Wechsel, der eine Gruppe
+    schneller abfragt (z.B. Kompressor startet), erfolgt sofort.
+
+    Die Sensoren aus den Bedingungen (watched) behalten immer ihr Basisintervall, sonst würde
+    ein Anlaufen der Wärmepumpe erst nach dem verlangsamten Intervall bemerkt.
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, Any]], base_intervals: Dict[str, float],
+                 default: str = "running", hold: float = 120.0):
+        """
+        Args:
+            profiles: Profilname -> {"when": ..., "intervals": ...}, in Prüfreihenfolge
+            base_intervals: Gruppe -> Basisintervall in Sekunden (Standardprofil)
+            default: Name des Standardprofils
+            hold: Sekunden, die ein langsameres Profil passen muss, bevor gewechselt wird
+        """
+        self.profiles = profiles
+        self.base_intervals = dict(base_intervals)
+        self.default = default
+        self.hold = hold
+        self.watched: Set[str] = {sensor for profile in profiles.values() for sensor in profile.get("when", {})}
+
+        self.active = default
+        self._active_since: Optional[float] = None
+        self._candidate: Optional[str] = None
+        self._candidate_since = 0.0
+        self._time_in: Dict[str, float] = {}
+        self._stats = {
+            "switches": 0,
+            "held_back": 0
+        }
+
+    def intervals(self, name: Optional[str] = None) -> Dict[str, float]:
+        """Intervalle pro Gruppe für ein Profil (Standard: das aktive)."""
+        name = self.active if name is None else name
+        overrides = self.profiles.get(name, {}).get("intervals", {})
+        return {group: overrides.get(group, interval) for group, interval in self.base_intervals.items()}
+
+    def match(self, values: Mapping[str, Any]) -> str:
+        """Erstes Profil, dessen Bedingungen die Werte erfüllen, sonst das Standardprofil."""
+        for name, profile in self.profiles.items():
+            conditions = profile.get("when", {})
+            if conditions and all(values.get(sensor) in allowed for sensor, allowed in conditions.items()):
+                return name
+        return self.default
+
+    def _is_faster(self, name: str) -> bool:
+        current = self.intervals()
+        return any(interval < current[group] for group, interval in self.intervals(name).items())
+
+    def update(self, values: Mapping[str, Any], now: float) -> Optional[str]:
+        """
+        Prüft die aktuellen Zustandswerte.
+
+        Returns:
+            Name des neuen Profils bei einem Wechsel, sonst None
+        """
+        if self._active_since is None:
+            self._active_since = now
+        candidate = self.match(values)
+        if candidate == self.active:
+            self._candidate = None
+            return None
+
+        if not self._is_faster(candidate):
+            if candidate != self._candidate:
+                self._candidate = candidate
+                self._candidate_since = now
+                self._stats["held_back"] += 1
+                return None
+            if now - self._candidate_since < self.hold:
+                return None
+
+        self._time_in[self.active] = self._time_in.get(self.active, 0.0) + now - self._active_since
+        self.active = candidate
+        self._active_since = now
+        self._candidate = None
+        self._stats["switches"] += 1
+        return candidate
+
+    def get_stats(self, now: Optional[float] = None) -> Dict:
+        time_in = dict(self._time_in)
+        if now is not None and self._active_since is not None:
+            time_in[self.active] = time_in.get(self.active, 0.0) + now - self._active_since
+        return {
+            **self._stats,
+            "active": self.active,
+            "pending": self._candidate,
+            "intervals": self.intervals(),
+            "time_in_profile_s": {name: round(seconds, 1) for name, seconds in time_in.items()}
+        }
@@ -0,0 +1,305 @@
+"""
+Gepufferter Protokoll-Writer für EHS-Sentinel
+Schreibt dekodierte Nachrichten gebündelt in die Protokoll-Datei, ohne die Event-Loop zu blockieren
+"""
+
+import asyncio
+import csv
+import io
+import os
+import struct
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from CustomLogger import logger
+
+class ProtocolWriter:
+    """
+    Nimmt Protokollzeilen in der Event-Loop entgegen und schreibt sie gebündelt in einem
+    Worker-Thread. Die Datei bleibt dauerhaft geöffnet, geschrieben wird, sobald flush_size
+    Bytes gepuffert sind oder flush_interval Sekunden vergangen sind.
+
+    Formate:
+        text   - bisheriges Zeilenformat "0x4236,1,VAR_IN_TEMP_WATER_TANK_F   ,48.5"
+        csv    - CSV mit Kopfzeile und Zeitstempel
+        binary - kompakte Datensätze, lesbar mit read_binary_protocol()
+
+    Rotation:
+        none   - keine Rotation
+        size   - bei Überschreiten von max_bytes nach <datei>.1 ... <datei>.<backup_count>
+        daily  - beim Tageswechsel nach <datei>.<JJJJ-MM-TT>
+    """
+
+    FORMATS = ('text', 'csv', 'binary')
+    ROTATIONS = ('none', 'size', 'daily')
+    CSV_HEADER = ('timestamp', 'message', 'type', 'name', 'value')
+    BINARY_MAGIC = b'EHSP\x01'
+    BINARY_RECORD = struct.Struct('<dHBB')  # Zeitstempel, Nachrichtennummer, Typ, Werttyp
+    BINARY_INT = struct.Struct('<q')
+    BINARY_FLOAT = struct.Struct('<d')
+    BINARY_STR = struct.Struct('<H')
+
+    def __init__(self, path: Optional[str] = None, file_format: str = 'text', flush_interval: float = 1.0,
+                 flush_size: int = 65536, rotation: str = 'none', max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, max_buffered: int = 100000):
+        self.path = None
+        self._buffer: deque = deque()
+        self._buffered_bytes = 0
+        self._handle = None
+        self._size = 0
+        self._header_size = 0
+        self._file_day: Optional[date] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+
+        self.stats = {
+            'lines_written': 0,
+            'bytes_written': 0,
+            'flushes': 0,
+            'rotations': 0,
+            'dropped_lines': 0,
+            'write_errors': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+        }
+
+        self.configure(path, file_format, flush_interval, flush_size, rotation, max_bytes, backup_count, max_buffered)
+
+    def configure(self, path: Optional[str], file_format: str = 'text', flush_interval: float = 1.0,
+                  flush_size: int = 65536, rotation: str = 'none', max_bytes: int = 10 * 1024 * 1024,
+                  backup_count: int = 5, max_buffered: int = 100000):
+        """Setzt Ziel-Datei und Optionen. path=None deaktiviert das Protokoll."""
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Unbekanntes Protokoll-Format: {file_format}")
+        if rotation not in self.ROTATIONS:
+            raise ValueError(f"Unbekannte Protokoll-Rotation: {rotation}")
+
+        path = path or None
+        if self._handle is not None and path != self.path:
+            self._close_handle()
+
+        self.path = path
+        self.file_format = file_format
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.rotation = rotation
+        self.max_bytes = max_bytes
+        self.backup_count = max(1, backup_count)
+        self.max_buffered = max_buffered
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def write(self, message_number: int, message_type: int, name: str, value: Any):
+        """
+        Reiht einen Protokolleintrag ein, ohne zu blockieren.
+        Muss aus der Event-Loop aufgerufen werden, der Flush-Task startet beim ersten Aufruf.
+        """
+        if self.path is None:
+            return
+
+        if self._task is None:
+            self.start()
+
+        if len(self._buffer) >= self.max_buffered:
+            # Datenträger hängt, ältester Eintrag wird verworfen statt den Speicher zu füllen
+            self._buffer.popleft()
+            self.stats['dropped_lines'] += 1
+
+        self._buffer.append((time.time(), message_number, message_type, name, value))
+        self._buffered_bytes += 64 + len(name)
+        if self._buffered_bytes >= self.flush_size:
+            self._flush_event.set()
+
+    def start(self):
+        """Startet den Flush-Task in der laufenden Event-Loop."""
+        if self._task is not None:
+            return
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info(f"📝 Protokoll-Writer gestartet: {self.path} (Format {self.file_format}, Rotation {self.rotation})")
+
+    async def flush(self):
+        """Schreibt alle gepufferten Einträge im Worker-Thread."""
+        if not self._buffer or self._flush_lock is None:
+            return
+
+        async with self._flush_lock:
+            records, self._buffer = self._buffer, deque()
+            self._buffered_bytes = 0
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write_records, records)
+            except Exception as e:
+                self.stats['write_errors'] += 1
+                logger.warning(f"Could not write to protocol file: {e}")
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = round(elapsed, 2)
+            self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], round(elapsed, 2))
+
+    async def close(self):
+        """
+        Beendet den Flush-Task, schreibt den Rest und schließt die Datei.
+        Der Task wird nicht abgebrochen, sondern beendet sich nach einem laufenden Schreibvorgang
+        selbst, sonst liefe der Worker-Thread neben dem letzten Flush weiter.
+        """
+        if self._task is not None:
+            self._closing = True
+            self._flush_event.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._closing = False
+        await self.flush()
+        if self._handle is not None:
+            # die Datei wird nur in flush() geöffnet, der Lock existiert also
+            async with self._flush_lock:
+                await asyncio.to_thread(self._close_handle)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['buffered_lines'] = len(self._buffer)
+        return stats
+
+    async def _flush_loop(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    # --- ab hier nur im Worker-Thread ---
+
+    def _write_records(self, records: deque):
+        now = datetime.now()
+        if self._handle is None:
+            self._open()
+
+        data = self._encode(records)
+        if self.rotation == 'daily' and self._file_day != now.date():
+            self._rotate(f"{self.path}.{self._file_day.isoformat()}")
+        elif self.rotation == 'size' and self._size > self._header_size and self._size + len(data) > self.max_bytes:
+            self._rotate_numbered()
+
+        self._handle.write(data)
+        self._handle.flush()
+        self._size += len(data)
+        self.stats['lines_written'] += len(records)
+        self.stats['bytes_written'] += len(data)
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._handle = open(self.path, 'ab')
+        self._size = self._handle.tell()
+        self._header_size = 0
+        if self._size > 0:
+            self._file_day = date.fromtimestamp(os.path.getmtime(self.path))
+        else:
+            self._file_day = date.today()
+            self._write_file_header()
+
+    def _write_file_header(self):
+        if self.file_format == 'csv':
+            header = (','.join(self.CSV_HEADER) + '\r\n').encode('utf-8')
+        elif self.file_format == 'binary':
+            header = self.BINARY_MAGIC
+        else:
+            return
+        self._handle.write(header)
+        self._size += len(header)
+        self._header_size = len(header)
+
+    def _close_handle(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _rotate(self, target: str):
+        self._close_handle()
+        if os.path.exists(target):
+            counter = 1
+            while os.path.exists(f"{target}.{counter}"):
+                counter += 1
+            target = f"{target}.{counter}"
+        os.replace(self.path, target)
+        self.stats['rotations'] += 1
+        self._open()
+
+    def _rotate_numbered(self):
+        self._close_handle()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self.stats['rotations'] += 1
+        self._open()
+
+    def _encode(self, records: deque) -> bytes:
+        if self.file_format == 'text':
+            return ''.join(
+                f"{hex(number):<6},{message_type},{name:<50},{value}\n"
+                for _, number, message_type, name, value in records
+            ).encode('utf-8')
+
+        if self.file_format == 'csv':
+            out = io.StringIO()
+            writer = csv.writer(out)
+            for timestamp, number, message_type, name, value in records:
+                writer.writerow((datetime.fromtimestamp(timestamp).isoformat(timespec='milliseconds'),
+                                 f"0x{number:04x}", message_type, name, value))
+            return out.getvalue().encode('utf-8')
+
+        chunks = []
+        for timestamp, number, message_type, _, value in records:
+            if isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63:
+                chunks.append(self.BINARY_RECORD.pack(timestamp, number & 0xFFFF, message_type, 0))
+                chunks.append(self.BINARY_INT.pack(value))
+            elif isinstance(value, float):
+                chunks.append(self.BINARY_RECORD.pack(timestamp, number & 0xFFFF, message_type, 1))
+                chunks.append(self.BINARY_FLOAT.pack(value))
+            else:
+                encoded = str(value).encode('utf-8')[:0xFFFF]
+                chunks.append(self.BINARY_RECORD.pack(timestamp, number & 0xFFFF, message_type, 2))
+                chunks.append(self.BINARY_STR.pack(len(encoded)))
+                chunks.append(encoded)
+        return b''.join(chunks)
+
+def read_binary_protocol(path: str) -> Iterator[Tuple[float, int, int, Any]]:
+    """Liest eine binäre Protokoll-Datei und liefert (Zeitstempel, Nachrichtennummer, Typ, Wert)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if not data.startswith(ProtocolWriter.BINARY_MAGIC):
+        raise ValueError(f"{path} ist keine binäre EHS-Sentinel Protokoll-Datei")
+
+    record = ProtocolWriter.BINARY_RECORD
+    pos = len(ProtocolWriter.BINARY_MAGIC)
+    while pos < len(data):
+        timestamp, number, message_type, kind = record.unpack_from(data, pos)
+        pos += record.size
+        if kind == 0:
+            value = ProtocolWriter.BINARY_INT.unpack_from(data, pos)[0]
+            pos += ProtocolWriter.BINARY_INT.size
+        elif kind == 1:
+            value = ProtocolWriter.BINARY_FLOAT.unpack_from(data, pos)[0]
+            pos += ProtocolWriter.BINARY_FLOAT.size
+        else:
+            length = ProtocolWriter.BINARY_STR.unpack_from(data, pos)[0]
+            pos += ProtocolWriter.BINARY_STR.size
+            value = data[pos:pos + length].decode('utf-8')
+            pos += length
+        yield timestamp, number, message_type, value
+
+# Globale Instanz, wird beim ersten Protokolleintrag aus der Konfiguration eingerichtet
+protocol_writer = ProtocolWriter()
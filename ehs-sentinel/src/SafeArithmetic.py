@@ -4,13 +4,86 @@ Unterstützt nur grundlegende mathematische Operationen.
 """
 import re
 import operator
-from typing import Union, Dict, Any
+from functools import lru_cache
+from typing import Union, Dict, Any, Callable
 from CustomLogger import logger
 
+class ArithmeticProgram:
+    """
+    Vorkompilierter arithmetischer Ausdruck.
+    Tokenisierung und Shunting-Yard laufen nur einmal, die Auswertung ruft eine Kette von Closures auf.
+    """
+
+    __slots__ = ('expression', 'postfix', '_func')
+
+    def __init__(self, expression: str, postfix: list, func: Callable[[Dict[str, Union[int, float]]], float]):
+        self.expression = expression
+        self.postfix = postfix
+        self._func = func
+
+    def evaluate(self, variables: Dict[str, Union[int, float]] = None) -> Union[int, float]:
+        """
+        Wertet das Programm mit den übergebenen Variablen aus.
+
+        Raises:
+            ValueError: Bei Division durch Null oder unbekannten Variablen
+        """
+        try:
+            return self._func(variables if variables is not None else {})
+        except Exception as e:
+            logger.warning(f"Fehler bei der Auswertung von '{self.expression}': {e}")
+            raise ValueError(f"Ungültiger arithmetischer Ausdruck: {self.expression}")
+
+    def __call__(self, **variables) -> Union[int, float]:
+        return self.evaluate(variables)
+
+    def __repr__(self):
+        return f"ArithmeticProgram({self.expression!r})"
+
+def _constant(value: float):
+    return lambda variables: value
+
+def _variable(name: str):
+    def load(variables):
+        try:
+            value = variables[name]
+        except KeyError:
+            raise ValueError(f"Unbekanntes Token: {name}") from None
+        return float(value)
+    return load
+
+def _binary(token: str, left, right, left_node, right_node):
+    """Erzeugt die Closure für einen binären Operator, mit Spezialfall Variable op Konstante."""
+    op = SafeArithmetic.OPERATORS[token]
+
+    if left_node[0] == 'var' and right_node[0] == 'const' and not (token == '/' and right_node[1] == 0):
+        # häufigster Fall im NASA Repository, z.B. "packed_value / 10"
+        name, constant = left_node[1], right_node[1]
+        def var_op_const(variables):
+            try:
+                value = variables[name]
+            except KeyError:
+                raise ValueError(f"Unbekanntes Token: {name}") from None
+            return op(float(value), constant)
+        return var_op_const
+
+    if token == '/':
+        def divide(variables):
+            a = left(variables)
+            b = right(variables)
+            # Spezielle Behandlung für Division durch Null
+            if b == 0:
+                raise ValueError("Division durch Null")
+            return a / b
+        return divide
+
+    return lambda variables: op(left(variables), right(variables))
+
 class SafeArithmetic:
     """
     Sichere Auswertung von arithmetischen Ausdrücken ohne eval().
     Unterstützt: +, -, *, /, (), Variablen (packed_value, value)
+    Kompilierte Ausdrücke werden in einem begrenzten LRU-Cache vorgehalten.
     """
     
     # Erlaubte Operatoren
@@ -21,10 +94,37 @@ class SafeArithmetic:
         '/': operator.truediv,
     }
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 128):
         # Regex für Token-Parsing
         self.token_pattern = re.compile(r'(\d+\.?\d*|[+\-*/()]|[a-zA-Z_][a-zA-Z0-9_]*)')
-    
+        self.identifier_pattern = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+        # cache_size=0 deaktiviert den Cache, jeder Aufruf kompiliert neu
+        self._compile_cached = lru_cache(maxsize=cache_size)(self._compile)
+
+    def compile(self, expression: str) -> ArithmeticProgram:
+        """
+        Kompiliert einen Ausdruck in ein wiederverwendbares Programm.
+        Ergebnisse werden nach Ausdruckstext im LRU-Cache abgelegt.
+
+        Raises:
+            ValueError: Bei leeren oder syntaktisch ungültigen Ausdrücken
+        """
+        if not expression or not expression.strip():
+            raise ValueError("Leerer Ausdruck")
+
+        try:
+            return self._compile_cached(expression)
+        except Exception as e:
+            logger.warning(f"Fehler bei der Auswertung von '{expression}': {e}")
+            raise ValueError(f"Ungültiger arithmetischer Ausdruck: {expression}")
+
+    def cache_info(self):
+        """Gibt Treffer, Fehlschläge und Größe des Programm-Caches zurück."""
+        return self._compile_cached.cache_info()
+
+    def clear_cache(self):
+        self._compile_cached.cache_clear()
+
     def evaluate(self, expression: str, variables: Dict[str, Union[int, float]] = None) -> Union[int, float]:
         """
         Wertet einen arithmetischen Ausdruck sicher aus.
@@ -39,24 +139,15 @@ class SafeArithmetic:
         Raises:
             ValueError: Bei ungültigen Ausdrücken oder unbekannten Variablen
         """
-        if not expression or not expression.strip():
-            raise ValueError("Leerer Ausdruck")
-            
-        if variables is None:
-            variables = {}
-            
-        try:
-            # Tokenize den Ausdruck
-            tokens = self._tokenize(expression)
-            
-            # Parse und evaluiere
-            result = self._parse_expression(tokens, variables)
-            
-            return result
-            
-        except Exception as e:
-            logger.warning(f"Fehler bei der Auswertung von '{expression}': {e}")
-            raise ValueError(f"Ungültiger arithmetischer Ausdruck: {expression}")
+        return self.compile(expression).evaluate(variables)
+
+    def _compile(self, expression: str) -> ArithmeticProgram:
+        # Tokenize den Ausdruck
+        tokens = self._tokenize(expression)
+
+        # Konvertiere zu Postfix-Notation (RPN) und baue daraus die Closures
+        postfix = self._to_postfix(tokens)
+        return ArithmeticProgram(expression, postfix, self._build_program(postfix))
     
     def _tokenize(self, expression: str) -> list:
         """Zerlegt den Ausdruck in Token."""
@@ -66,19 +157,11 @@ class SafeArithmetic:
             raise ValueError("Keine gültigen Token gefunden")
         return tokens
     
-    def _parse_expression(self, tokens: list, variables: Dict[str, Union[int, float]]) -> Union[int, float]:
+    def _to_postfix(self, tokens: list) -> list:
         """
-        Parst und evaluiert den Ausdruck mit Operator-Präzedenz.
-        Verwendet den Shunting-Yard-Algorithmus für korrekte Präzedenz.
+        Konvertiert Infix zu Postfix-Notation (Shunting-Yard).
+        Zahlen werden zu float, Variablen bleiben als Namen erhalten und werden erst bei der Auswertung aufgelöst.
         """
-        # Konvertiere zu Postfix-Notation (RPN)
-        postfix = self._to_postfix(tokens, variables)
-        
-        # Evaluiere Postfix-Ausdruck
-        return self._evaluate_postfix(postfix)
-    
-    def _to_postfix(self, tokens: list, variables: Dict[str, Union[int, float]]) -> list:
-        """Konvertiert Infix zu Postfix-Notation (Shunting-Yard)."""
         output = []
         operator_stack = []
         
@@ -88,8 +171,6 @@ class SafeArithmetic:
         for token in tokens:
             if self._is_number(token):
                 output.append(float(token))
-            elif token in variables:
-                output.append(float(variables[token]))
             elif token in self.OPERATORS:
                 # Pop Operatoren mit höherer oder gleicher Präzedenz
                 while (operator_stack and 
@@ -107,6 +188,8 @@ class SafeArithmetic:
                 if not operator_stack:
                     raise ValueError("Unbalancierte Klammern")
                 operator_stack.pop()  # Entferne '('
+            elif self.identifier_pattern.match(token):
+                output.append(('var', token))
             else:
                 raise ValueError(f"Unbekanntes Token: {token}")
         
@@ -118,33 +201,29 @@ class SafeArithmetic:
         
         return output
     
-    def _evaluate_postfix(self, postfix: list) -> Union[int, float]:
-        """Evaluiert einen Postfix-Ausdruck."""
+    def _build_program(self, postfix: list) -> Callable[[Dict[str, Union[int, float]]], float]:
+        """Übersetzt einen Postfix-Ausdruck in eine Closure-Kette."""
         stack = []
         
         for token in postfix:
-            if isinstance(token, (int, float)):
-                stack.append(token)
+            if isinstance(token, float):
+                stack.append((('const', token), _constant(token)))
+            elif isinstance(token, tuple):
+                stack.append((token, _variable(token[1])))
             elif token in self.OPERATORS:
                 if len(stack) < 2:
                     raise ValueError("Ungültiger Ausdruck: Nicht genug Operanden")
                 
-                b = stack.pop()
-                a = stack.pop()
-                
-                # Spezielle Behandlung für Division durch Null
-                if token == '/' and b == 0:
-                    raise ValueError("Division durch Null")
-                
-                result = self.OPERATORS[token](a, b)
-                stack.append(result)
+                right_node, right = stack.pop()
+                left_node, left = stack.pop()
+                stack.append((('op', token), _binary(token, left, right, left_node, right_node)))
             else:
                 raise ValueError(f"Unbekanntes Token in Postfix: {token}")
         
         if len(stack) != 1:
             raise ValueError("Ungültiger Ausdruck: Falsche Anzahl von Operanden")
         
-        return stack[0]
+        return stack[0][1]
     
     def _is_number(self, token: str) -> bool:
         """Prüft, ob ein Token eine Zahl ist."""
@@ -160,6 +239,7 @@ safe_arithmetic = SafeArithmetic()
 def safe_eval_arithmetic(expression: str, **variables) -> Union[int, float]:
     """
     Convenience-Funktion für sichere arithmetische Auswertung.
+    Nutzt den Programm-Cache der globalen Instanz.
     
     Args:
         expression: Arithmetischer Ausdruck
@@ -168,4 +248,4 @@ def safe_eval_arithmetic(expression: str, **variables) -> Union[int, float]:
     Returns:
         Ergebnis der Berechnung
     """
-    return safe_arithmetic.evaluate(expression, variables)
\ No newline at end of file
+    return safe_arithmetic.evaluate(expression, variables)
@@ -0,0 +1,86 @@
+"""
+Sensor-Verlauf für EHS-Sentinel
+Ringpuffer mit Zeitstempel, Wert und Statuscode der letzten Messwerte eines Sensors
+"""
+
+import math
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+
+class SensorHistory:
+    """
+    Ringpuffer fester Größe mit den letzten Messwerten eines Sensors.
+
+    Zeitstempel (Unix-Sekunden), Werte und Statuscodes liegen in getrennten array-Spalten, ein
+    neuer Eintrag überschreibt den ältesten in O(1). Nicht numerische Werte und Fehler stehen
+    als NaN in der Wertespalte. Abfragen kopieren die Spalten in zeitlicher Reihenfolge und
+    rechnen mit den eingebauten Funktionen (sorted, fsum, count) in C.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = max(1, int(capacity))
+        self.times = array('d', bytes(8 * self.capacity))
+        self.values = array('d', [math.nan]) * self.capacity
+        self.status = array('b', bytes(self.capacity))
+        self._next = 0  # nächste Schreibposition
+        self._size = 0
+        self.count = 0  # alle jemals aufgenommenen Einträge
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, value: float, status: int = 0):
+        """Nimmt einen Eintrag auf, status ist ein frei gewählter Code von 0 bis 127."""
+        index = self._next
+        self.times[index] = timestamp
+        self.values[index] = value
+        self.status[index] = status
+        self._next = (index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        self.count += 1
+
+    def _column(self, column: array) -> array:
+        """Spalte in zeitlicher Reihenfolge (Kopie)."""
+        start = (self._next - self._size) % self.capacity
+        if start + self._size <= self.capacity:
+            return column[start:start + self._size]
+        return column[start:] + column[:self._next]
+
+    def prune(self, before: float) -> int:
+        """Verwirft Einträge, die älter als before sind, liefert die Anzahl."""
+        start = (self._next - self._size) % self.capacity
+        dropped = 0
+        while self._size and self.times[start] < before:
+            start = (start + 1) % self.capacity
+            self._size -= 1
+            dropped += 1
+        return dropped
+
+    def count_status(self, status: int) -> int:
+        """Anzahl der Einträge mit einem Statuscode im Puffer."""
+        return self._column(self.status).count(status)
+
+    def entries(self, limit: int = None) -> List[Tuple[float, float, int]]:
+        """Die letzten Einträge als (Zeitstempel, Wert, Statuscode), älteste zuerst."""
+        result = list(zip(self._column(self.times), self._column(self.values), self._column(self.status)))
+        return result[-limit:] if limit else result
+
+    def summary(self, since: float = None) -> Dict[str, Any]:
+        """min/max/Mittelwert/Perzentile der numerischen Werte, optional ab einem Zeitpunkt."""
+        values = self._column(self.values)
+        if since is not None:
+            values = values[bisect_left(self._column(self.times), since):]
+        numeric = sorted(v for v in values if v == v)  # NaN ist ungleich sich selbst
+        if not numeric:
+            return {"samples": 0}
+        n = len(numeric)
+        return {
+            "samples": n,
+            "min": numeric[0],
+            "max": numeric[-1],
+            "mean": round(math.fsum(numeric) / n, 4),
+            "p50": numeric[(n - 1) // 2],
+            "p95": numeric[min(n - 1, int(0.95 * n))]
+        }
@@ -5,17 +5,19 @@ Sensor-Monitoring System für EHS-Sentinel
 
 import asyncio
 import json
+import math
 import os
 import time
 import logging
 import traceback
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
 from CustomLogger import logger
 from EHSConfig import EHSConfig
+from SensorHistory import SensorHistory
 
 class SensorStatus(Enum):
     """Status-Enum für Sensoren"""
@@ -35,18 +37,17 @@ class ErrorType(Enum):
     MQTT_ERROR = "mqtt_error"
     COMMUNICATION_LOST = "communication_lost"
 
-@dataclass
-class SensorReading:
-    """Datenklasse für Sensor-Messwerte"""
-    sensor_name: str
-    raw_value: bytes
-    converted_value: Any
-    timestamp: datetime
-    status: SensorStatus
-    error_type: Optional[ErrorType] = None
-    error_message: Optional[str] = None
-    mqtt_topic: Optional[str] = None
-    response_time_ms: Optional[float] = None
+def _isoformat(timestamp: Optional[float]) -> str:
+    """Unix-Sekunden als ISO-Zeit, fehlende Zeitpunkte wie bisher als datetime.min."""
+    if not timestamp:
+        return datetime.min.isoformat()
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+# Statuscodes im SensorHistory-Verlauf, Index in dieses Tupel
+STATUS_CODES = tuple(SensorStatus)
+STATUS_INDEX = {status: index for index, status in enumerate(STATUS_CODES)}
+_ACTIVE = STATUS_INDEX[SensorStatus.ACTIVE]
+_ERROR = STATUS_INDEX[SensorStatus.ERROR]
 
 @dataclass
 class SensorConfig:
@@ -62,22 +63,44 @@ class SensorConfig:
     unit: str = ""
     writable: bool = False
 
+class _ReadingDetails:
+    """Details einer Ablesung für das Sensor-Log, erst bei der Ausgabe formatiert."""
+    __slots__ = ('value', 'raw', 'response_time_ms')
+
+    def __init__(self, value, raw, response_time_ms):
+        self.value = value
+        self.raw = raw
+        self.response_time_ms = response_time_ms
+
+    def __str__(self):
+        return f"Value: {self.value}, Raw: {self.raw.hex()}, Response: {self.response_time_ms}ms"
+
 class SensorMonitor:
     """
     Überwacht alle Sensoren und deren Kommunikation.
     Protokolliert Fehler, Status und Datenqualität.
+
+    Jeder Sensor aus dem NASA Repository hat einen SensorHistory-Ringpuffer, dessen Größe aus
+    monitor.history bzw. monitor.historySizes kommt. Zeitstempel werden als Unix-Sekunden
+    gespeichert und erst bei Abfragen in ISO-Zeit umgewandelt.
     """
     
+    OTHER_GROUP = "other"  # Sensoren des Repositorys ohne eigene Gruppe
+    
     def __init__(self):
         self.config = EHSConfig()
         self.sensors: Dict[str, SensorConfig] = {}
-        self.readings: Dict[str, List[SensorReading]] = {}
+        self.histories: Dict[str, SensorHistory] = {}
+        # letzter Messwert pro Sensor: (Zeitstempel, Wert, Antwortzeit in ms)
+        self.last_readings: Dict[str, Tuple[float, Any, Optional[float]]] = {}
         self.status_cache: Dict[str, SensorStatus] = {}
         self.error_counts: Dict[str, Dict[ErrorType, int]] = {}
-        self.last_successful: Dict[str, datetime] = {}
+        self.last_successful: Dict[str, float] = {}  # Unix-Sekunden
         
         # Konfiguration
-        self.max_readings_per_sensor = 100
+        monitor = getattr(self.config, 'MONITOR', None) or {}
+        self.history_size = int(monitor.get('history', 100))
+        self.history_sizes = monitor.get('historySizes') or {}
         self.status_file = "/data/sensor_status.json"
         self.log_file = "/data/sensor_communication.log"
         
@@ -172,11 +195,35 @@ class SensorMonitor:
                     )
                     
                     self.sensors[sensor_name] = sensor_config
-                    self.readings[sensor_name] = []
-                    self.status_cache[sensor_name] = SensorStatus.UNKNOWN
-                    self.error_counts[sensor_name] = {error_type: 0 for error_type in ErrorType}
         
-        logger.info(f"📊 Sensor-Monitor initialisiert: {len(self.sensors)} Sensoren in {len(sensor_groups)} Gruppen")
+        # Alle übrigen Sensoren des Repositorys werden ebenfalls überwacht, sie werden nicht abgefragt
+        # und haben daher keinen Timeout (polling_interval nur für die Anzeige)
+        for sensor_name, repo_entry in self.config.NASA_REPO.items():
+            if sensor_name not in self.sensors:
+                self.sensors[sensor_name] = SensorConfig(
+                    name=sensor_name,
+                    group=self.OTHER_GROUP,
+                    polling_interval=60,
+                    priority=5,
+                    description=repo_entry.get('description', ''),
+                    unit=repo_entry.get('unit', ''),
+                    writable=repo_entry.get('hass_opts', {}).get('writable', False)
+                )
+        
+        for sensor_name in self.sensors:
+            self._history(sensor_name)
+            self.status_cache[sensor_name] = SensorStatus.UNKNOWN
+            self.error_counts[sensor_name] = {error_type: 0 for error_type in ErrorType}
+        
+        logger.info(f"📊 Sensor-Monitor initialisiert: {len(self.sensors)} Sensoren in {len(sensor_groups) + 1} Gruppen")
+    
+    def _history(self, sensor_name: str) -> SensorHistory:
+        """Ringpuffer eines Sensors, wird beim ersten Zugriff angelegt."""
+        history = self.histories.get(sensor_name)
+        if history is None:
+            history = SensorHistory(self.history_sizes.get(sensor_name, self.history_size))
+            self.histories[sensor_name] = history
+        return history
     
     def _initialize_monitoring(self):
         """Initialisiert das Monitoring-System"""
@@ -187,29 +234,14 @@ class SensorMonitor:
                           converted_value: Any, response_time_ms: float = None,
                           mqtt_topic: str = None):
         """Protokolliert eine erfolgreiche Sensor-Ablesung"""
-        reading = SensorReading(
-            sensor_name=sensor_name,
-            raw_value=raw_value,
-            converted_value=converted_value,
-            timestamp=datetime.now(),
-            status=SensorStatus.ACTIVE,
-            mqtt_topic=mqtt_topic,
-            response_time_ms=response_time_ms
-        )
-        
-        # Füge Reading hinzu
-        if sensor_name not in self.readings:
-            self.readings[sensor_name] = []
-        
-        self.readings[sensor_name].append(reading)
-        
-        # Begrenze Anzahl der Readings
-        if len(self.readings[sensor_name]) > self.max_readings_per_sensor:
-            self.readings[sensor_name] = self.readings[sensor_name][-self.max_readings_per_sensor:]
+        now = time.time()
+        numeric = converted_value if isinstance(converted_value, (int, float)) and not isinstance(converted_value, bool) else math.nan
+        self._history(sensor_name).append(now, numeric, _ACTIVE)
+        self.last_readings[sensor_name] = (now, converted_value, response_time_ms)
         
         # Update Status
         self.status_cache[sensor_name] = SensorStatus.ACTIVE
-        self.last_successful[sensor_name] = reading.timestamp
+        self.last_successful[sensor_name] = now
         
         # Detailliertes Logging
         self.sensor_logger.info(
@@ -217,28 +249,14 @@ class SensorMonitor:
             extra={
                 'sensor': sensor_name,
                 'action': 'READ_SUCCESS',
-                'details': f"Value: {converted_value}, Raw: {raw_value.hex()}, Response: {response_time_ms}ms"
+                'details': _ReadingDetails(converted_value, raw_value, response_time_ms)
             }
         )
     
     def log_sensor_error(self, sensor_name: str, error_type: ErrorType, 
                         error_message: str, raw_data: bytes = None):
         """Protokolliert einen Sensor-Fehler"""
-        reading = SensorReading(
-            sensor_name=sensor_name,
-            raw_value=raw_data or b'',
-            converted_value=None,
-            timestamp=datetime.now(),
-            status=SensorStatus.ERROR,
-            error_type=error_type,
-            error_message=error_message
-        )
-        
-        # Füge Reading hinzu
-        if sensor_name not in self.readings:
-            self.readings[sensor_name] = []
-        
-        self.readings[sensor_name].append(reading)
+        self._history(sensor_name).append(time.time(), math.nan, _ERROR)
         
         # Update Fehler-Statistiken
         if sensor_name not in self.error_counts:
@@ -303,15 +321,14 @@ class SensorMonitor:
         
         config = self.sensors[sensor_name]
         status = self.status_cache.get(sensor_name, SensorStatus.UNKNOWN)
-        last_reading = None
+        last_reading = self.last_readings.get(sensor_name)
+        history = self._history(sensor_name)
         
-        if sensor_name in self.readings and self.readings[sensor_name]:
-            last_reading = self.readings[sensor_name][-1]
-        
-        # Berechne Statistiken
-        total_readings = len(self.readings.get(sensor_name, []))
+        # Berechne Statistiken, die Erfolgsquote bezieht sich auf den Verlauf im Puffer
+        total_readings = history.count
         error_count = sum(self.error_counts.get(sensor_name, {}).values())
-        success_rate = ((total_readings - error_count) / total_readings * 100) if total_readings > 0 else 0
+        buffered = len(history)
+        success_rate = (history.count_status(_ACTIVE) / buffered * 100) if buffered > 0 else 0
         
         return {
             "name": sensor_name,
@@ -324,16 +341,17 @@ class SensorMonitor:
             "unit": config.unit,
             "writable": config.writable,
             "last_reading": {
-                "value": last_reading.converted_value if last_reading else None,
-                "timestamp": last_reading.timestamp.isoformat() if last_reading else None,
-                "response_time_ms": last_reading.response_time_ms if last_reading else None
+                "value": last_reading[1],
+                "timestamp": _isoformat(last_reading[0]),
+                "response_time_ms": last_reading[2]
             } if last_reading else None,
-            "last_successful": self.last_successful.get(sensor_name, datetime.min).isoformat(),
+            "last_successful": _isoformat(self.last_successful.get(sensor_name)),
             "statistics": {
                 "total_readings": total_readings,
                 "error_count": error_count,
                 "success_rate": round(success_rate, 2),
-                "error_breakdown": {et.value: count for et, count in self.error_counts.get(sensor_name, {}).items()}
+                "error_breakdown": {et.value: count for et, count in self.error_counts.get(sensor_name, {}).items()},
+                "history": {**history.summary(), "capacity": history.capacity}
             }
         }
     
@@ -346,6 +364,7 @@ class SensorMonitor:
         
         # Sammle Gruppen-Statistiken
         total_sensors = len(group_sensors)
+        monitored = sum(1 for name in group_sensors if self._is_monitored(name))
         active_sensors = sum(1 for name in group_sensors if self.status_cache.get(name) == SensorStatus.ACTIVE)
         error_sensors = sum(1 for name in group_sensors if self.status_cache.get(name) in [SensorStatus.ERROR, SensorStatus.CRC_ERROR])
         
@@ -354,16 +373,22 @@ class SensorMonitor:
             "total_sensors": total_sensors,
             "active_sensors": active_sensors,
             "error_sensors": error_sensors,
-            "health_percentage": round((active_sensors / total_sensors * 100), 2),
+            "health_percentage": round((active_sensors / monitored * 100), 2) if monitored else 0,
             "sensors": [self.get_sensor_status(name) for name in group_sensors]
         }
     
+    def _is_monitored(self, sensor_name: str) -> bool:
+        return self.sensors[sensor_name].group != self.OTHER_GROUP or self.status_cache.get(sensor_name) != SensorStatus.UNKNOWN
+    
     def get_system_overview(self) -> Dict[str, Any]:
         """Gibt eine Systemübersicht zurück"""
         all_groups = set(config.group for config in self.sensors.values())
         
+        # Sensoren ohne eigene Gruppe zählen erst, wenn sie einmal gemeldet wurden
+        monitored = sum(1 for name in self.sensors if self._is_monitored(name))
         system_stats = {
             "total_sensors": len(self.sensors),
+            "monitored_sensors": monitored,
             "active_sensors": sum(1 for status in self.status_cache.values() if status == SensorStatus.ACTIVE),
             "error_sensors": sum(1 for status in self.status_cache.values() if status in [SensorStatus.ERROR, SensorStatus.CRC_ERROR]),
             "unknown_sensors": sum(1 for status in self.status_cache.values() if status == SensorStatus.UNKNOWN),
@@ -374,9 +399,9 @@ class SensorMonitor:
             system_stats["groups"][group] = self.get_group_status(group)
         
         # Berechne Gesamt-Gesundheit
-        if system_stats["total_sensors"] > 0:
+        if monitored > 0:
             system_stats["overall_health"] = round(
-                (system_stats["active_sensors"] / system_stats["total_sensors"] * 100), 2
+                (system_stats["active_sensors"] / monitored * 100), 2
             )
         else:
             system_stats["overall_health"] = 0
@@ -387,19 +412,21 @@ class SensorMonitor:
         """Überwacht kontinuierlich den Sensor-Status"""
         while True:
             try:
-                current_time = datetime.now()
+                current_time = time.time()
                 
                 # Prüfe Timeouts
                 for sensor_name, config in self.sensors.items():
-                    if not config.enabled:
+                    # Sensoren ohne Gruppe senden nur gelegentlich von sich aus, Schweigen ist kein Timeout
+                    if not config.enabled or config.group == self.OTHER_GROUP:
                         continue
                     
-                    last_success = self.last_successful.get(sensor_name, datetime.min)
-                    timeout_threshold = current_time - timedelta(seconds=config.timeout * 3)
+                    last_success = self.last_successful.get(sensor_name, 0.0)
+                    # mindestens zwei Abfrageintervalle, sonst gilt jeder langsam abgefragte Sensor als Timeout
+                    timeout_threshold = current_time - max(config.timeout * 3, config.polling_interval * 2)
                     
                     if last_success < timeout_threshold and self.status_cache.get(sensor_name) == SensorStatus.ACTIVE:
                         self.status_cache[sensor_name] = SensorStatus.TIMEOUT
-                        logger.warning(f"⏰ Sensor {sensor_name} Timeout - keine Daten seit {last_success}")
+                        logger.warning(f"⏰ Sensor {sensor_name} Timeout - keine Daten seit {_isoformat(last_success)}")
                 
                 # Speichere Status
                 self._save_status_cache()
@@ -414,14 +441,11 @@ class SensorMonitor:
         """Bereinigt alte Readings"""
         while True:
             try:
-                cutoff_time = datetime.now() - timedelta(hours=24)
+                cutoff_time = time.time() - 24 * 3600
                 
-                for sensor_name in self.readings:
-                    # Behalte nur Readings der letzten 24 Stunden
-                    self.readings[sensor_name] = [
-                        reading for reading in self.readings[sensor_name]
-                        if reading.timestamp > cutoff_time
-                    ]
+                # Behalte nur Readings der letzten 24 Stunden
+                for history in self.histories.values():
+                    history.prune(cutoff_time)
                 
                 await asyncio.sleep(3600)  # Bereinige stündlich
                 
@@ -472,7 +496,7 @@ class SensorMonitor:
                 "sensors": {
                     name: {
                         "status": status.value,
-                        "last_successful": self.last_successful.get(name, datetime.min).isoformat(),
+                        "last_successful": _isoformat(self.last_successful.get(name)),
                         "error_counts": {et.value: count for et, count in self.error_counts.get(name, {}).items()}
                     }
                     for name, status in self.status_cache.items()
@@ -500,9 +524,9 @@ class SensorMonitor:
                     
                     # Lade letzte erfolgreiche Zeit
                     try:
-                        self.last_successful[name] = datetime.fromisoformat(data["last_successful"])
+                        self.last_successful[name] = datetime.fromisoformat(data["last_successful"]).timestamp()
                     except:
-                        self.last_successful[name] = datetime.min
+                        self.last_successful[name] = 0.0
                     
                     # Lade Fehler-Counts
                     error_counts = {}
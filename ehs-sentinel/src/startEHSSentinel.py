@@ -1,4 +1,5 @@
 import asyncio
+import logging
 import serial
 import serial_asyncio
 import traceback
@@ -27,6 +28,10 @@ import random
 from CustomLogger import logger
 from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
 from NASAMessage import NASAMessage
+from NASAFrameReader import NASAFrameReader
+from BusPacer import bus_pacer
+from PacketPipeline import PacketPipeline, OverloadPolicy
+from ProtocolWriter import protocol_writer
 
 def get_version_from_config():
     """Lädt die Version aus der config.yaml"""
@@ -66,6 +71,8 @@ build_info = {
     ]
 }
 
+_pipeline = None
+
 def main():
     """
     Main function to start the EHS Sentinel application for Home Assistant Addon.
@@ -81,7 +88,10 @@ def main():
         logger.error(f"❌ Runtime error: {e}")
         logger.error(traceback.format_exc())
     finally:
-        # Clean up
+        # Clean up, frames still queued in the pipeline are processed before the protocol file is closed
+        if _pipeline is not None:
+            loop.run_until_complete(_pipeline.stop())
+        loop.run_until_complete(protocol_writer.close())
         loop.close()
 
 async def _async_main():
@@ -148,9 +158,19 @@ async def _async_main():
     # Initialisiere den PollingManager
     polling_manager = PollingManager()
 
+    # Initialisiere die Paket-Pipeline
+    global _pipeline
+    pipeline = _pipeline = PacketPipeline(
+        handler=lambda frame: process_buffer(frame, args, config, packet_monitor),
+        workers=config.PIPELINE['workers'],
+        queue_size=config.PIPELINE['queueSize'],
+        overload_policy=OverloadPolicy(config.PIPELINE['overloadPolicy'])
+    )
+    pipeline.start()
+
     # we are not in dryrun mode for addon, so we need to read from Serial Port
     try:
-        await serial_connection(config, args, mqtt, polling_manager, packet_monitor)
+        await serial_connection(config, args, mqtt, polling_manager, packet_monitor, pipeline)
     except Exception as e:
         logger.error(f"❌ Failed to establish connection: {e}")
         logger.error(traceback.format_exc())
@@ -165,16 +185,16 @@ async def process_buffer(buffer, args, config, packet_monitor):
             for i in range(0, len(buffer)):
                 if buffer[i] == 0x32:
                     if (len(buffer[i:]) > 14):
-                        asyncio.create_task(process_packet(buffer[i:], args, config))
                         # Protokolliere ein gültiges Paket
                         packet_monitor.log_valid_packet()
+                        await process_packet(buffer[i:], args, config)
                     else:
-                        logger.debug(f"Buffermessages to short for NASA {len(buffer)}")
+                        logger.debug("Buffermessages to short for NASA %d", len(buffer))
                     break
         else:
-            logger.debug(f"Buffer to short for NASA {len(buffer)}")
+            logger.debug("Buffer to short for NASA %d", len(buffer))
 
-async def serial_connection(config, args, mqtt, polling_manager, packet_monitor):
+async def serial_connection(config, args, mqtt, polling_manager, packet_monitor, pipeline):
     buffer = []
     loop = asyncio.get_running_loop()
 
@@ -201,7 +221,7 @@ async def serial_connection(config, args, mqtt, polling_manager, packet_monitor)
             
         logger.info("🔄 Starting read/write tasks...")
         await asyncio.gather(
-                serial_read(reader, args, config, packet_monitor),
+                serial_read(reader, config, packet_monitor, pipeline),
                 serial_write(writer, config, mqtt, polling_manager),
             )
     except Exception as e:
@@ -209,64 +229,55 @@ async def serial_connection(config, args, mqtt, polling_manager, packet_monitor)
         logger.error(traceback.format_exc())
         raise
 
-async def serial_read(reader: asyncio.StreamReader, args, config, packet_monitor):
-    prev_byte = 0x00
-    packet_started = False
-    data = bytearray()
-    packet_size = 0
-    
+async def serial_read(reader: asyncio.StreamReader, config, packet_monitor, pipeline: PacketPipeline):
+    def log_invalid_frame(frame, packet_size):
+        if config.LOGGING['invalidPacket']:
+            logger.warning(f"Packet does not end with an x34. Size {packet_size} length {len(frame)}")
+            logger.warning(f"Received hex: {[hex(x) for x in frame]}")
+            logger.warning(f"Received raw: {bytes(frame)}")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Packet does not end with an x34. Size {packet_size} length {len(frame)}")
+            logger.debug(f"Received hex: {[hex(x) for x in frame]}")
+            logger.debug(f"Received raw: {bytes(frame)}")
+
+        # Protokolliere ein ungültiges Paket
+        try:
+            packet_monitor.log_invalid_packet(
+                f"Packet does not end with an x34. Size {packet_size} length {len(frame)}",
+                [hex(x) for x in frame],
+                bytes(frame)
+            )
+        except Exception as e:
+            logger.error(f"Error in log_invalid_packet: {e}")
+            logger.error(traceback.format_exc())
+
+    frame_reader = NASAFrameReader(on_invalid=log_invalid_frame)
+
     logger.info("📥 Starting read loop...")
 
     while True:
         try:
-            current_byte = await reader.read(1)  # read bitewise
-            if current_byte:
-                if packet_started:
-                    data.extend(current_byte)
-                    if len(data) == 3:
-                        packet_size = ((data[1] << 8) | data[2]) + 2
-        
-                    if packet_size <= len(data):
-                        if current_byte == b'\x34':
-                            asyncio.create_task(process_buffer(data, args, config, packet_monitor))
-                            logger.debug(f"Received int: {data}")
-                            logger.debug(f"Received hex: {[hex(x) for x in data]}")
-                            data = bytearray()
-                            packet_started = False
-                        else:
-                            if config.LOGGING['invalidPacket']:
-                                logger.warning(f"Packet does not end with an x34. Size {packet_size} length {len(data)}")
-                                logger.warning(f"Received hex: {[hex(x) for x in data]}")
-                                logger.warning(f"Received raw: {data}")
-                            else:
-                                logger.debug(f"Packet does not end with an x34. Size {packet_size} length {len(data)}")
-                                logger.debug(f"Received hex: {[hex(x) for x in data]}")
-                                logger.debug(f"Received raw: {data}")
-                            
-                            # Protokolliere ein ungültiges Paket
-                            try:
-                                packet_monitor.log_invalid_packet(
-                                    f"Packet does not end with an x34. Size {packet_size} length {len(data)}",
-                                    [hex(x) for x in data],
-                                    data
-                                )
-                            except Exception as e:
-                                logger.error(f"Error in log_invalid_packet: {e}")
-                                logger.error(traceback.format_exc())
-                            
-                            data = bytearray()
-                            packet_started = False
-
-                # identify packet start
-                if current_byte == b'\x00' and prev_byte == b'\x32':
-                    packet_started = True
-                    data.extend(prev_byte)
-                    data.extend(current_byte)
+            chunk = await reader.read(NASAFrameReader.CHUNK_SIZE)
+            if not chunk:
+                if reader.at_eof():
+                    frame_reader.reset()
+                    raise ConnectionError("Connection closed by remote side")
+                continue
 
-                prev_byte = current_byte
+            # jede empfangene Aktivität verschiebt den nächsten Sendezeitpunkt
+            bus_pacer.note_activity()
+            for frame in frame_reader.feed(chunk):
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Received int: {bytes(frame)}")
+                    logger.debug(f"Received hex: {[hex(x) for x in frame]}")
+                # blockiert bei voller Warteschlange je nach Überlast-Strategie
+                await pipeline.submit(frame)
         except asyncio.CancelledError:
             logger.warning("Read task cancelled")
             break
+        except ConnectionError:
+            # geschlossene Verbindung nicht im Sekundentakt erneut lesen, sondern an den Aufrufer geben
+            raise
         except Exception as e:
             logger.error(f"Error in read loop: {e}")
             logger.error(traceback.format_exc())
@@ -293,14 +304,15 @@ async def serial_write(writer:asyncio.StreamWriter, config, mqtt, polling_manage
 async def process_packet(buffer, args, config):
     if args.DUMPFILE and not args.DRYRUN:
         async with aiofiles.open(args.DUMPFILE, "a") as dumpWriter:
-           await dumpWriter.write(f"{buffer}\n")
+           await dumpWriter.write(f"{bytearray(buffer)}\n")
     else:
         try:
             nasa_packet = NASAPacket()
             nasa_packet.parse(buffer)
-            logger.debug("Packet processed: ")
-            logger.debug(f"Packet raw: {[hex(x) for x in buffer]}")
-            logger.debug(nasa_packet)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Packet processed: ")
+                logger.debug(f"Packet raw: {[hex(x) for x in buffer]}")
+                logger.debug(nasa_packet)
             if nasa_packet.packet_source_address_class in (AddressClassEnum.Outdoor, AddressClassEnum.Indoor):
                 messageProcessor = MessageProcessor()
                 await messageProcessor.process_message(nasa_packet)    
@@ -314,7 +326,7 @@ async def process_packet(buffer, args, config):
                     logger.info(nasa_packet)
                     logger.info(f"Packet int: {[x for x in buffer]}")
                     logger.info(f"Packet hex: {[hex(x) for x in buffer]}")
-                else:
+                elif logger.isEnabledFor(logging.DEBUG):
                     logger.debug("Message not From Indoor or Outdoor") 
                     logger.debug(nasa_packet)
                     logger.debug(f"Packet int: {[x for x in buffer]}")
@@ -337,10 +349,11 @@ async def process_packet(buffer, args, config):
                 error_code="PACKET_PARSE_ERROR"
             )
         except SkipInvalidPacketException as e:
-            logger.debug("Warning occurred, Packet will be skipped")
-            logger.debug(f"Error processing message: {e}")
-            logger.debug(f"Complete Packet: {[hex(x) for x in buffer]}")
-            logger.debug(traceback.format_exc())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Warning occurred, Packet will be skipped")
+                logger.debug(f"Error processing message: {e}")
+                logger.debug(f"Complete Packet: {[hex(x) for x in buffer]}")
+                logger.debug(traceback.format_exc())
             
             # Log structured warning
             structured_logger.log_error(
@@ -1,4 +1,5 @@
 import asyncio
+import logging
 import serial
 import serial_asyncio
 import traceback
@@ -15,6 +16,9 @@ import json
 from CustomLogger import logger
 from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
 from NASAMessage import NASAMessage
+from NASAFrameReader import NASAFrameReader
+from BusPacer import bus_pacer
+from PacketPipeline import PacketPipeline
 
 version = "1.0.0 Home Assistant Addon"
 
@@ -71,12 +75,12 @@ async def process_buffer(buffer, args, config):
             for i in range(0, len(buffer)):
                 if buffer[i] == 0x32:
                     if (len(buffer[i:]) > 14):
-                        asyncio.create_task(process_packet(buffer[i:], args, config))
+                        await process_packet(buffer[i:], args, config)
                     else:
-                        logger.debug(f"Puffernachrichten zu kurz für NASA {len(buffer)}")
+                        logger.debug("Puffernachrichten zu kurz für NASA %d", len(buffer))
                     break
         else:
-            logger.debug(f"Puffer zu kurz für NASA {len(buffer)}")
+            logger.debug("Puffer zu kurz für NASA %d", len(buffer))
 
 async def serial_connection(config, args):
     """Stellt die Verbindung zur seriellen Schnittstelle oder TCP her."""
@@ -99,53 +103,44 @@ async def serial_connection(config, args):
                         timeout=1
         )
         
+    # Begrenzte Pipeline statt eines Tasks pro Paket, Standardwerte aus PacketPipeline
+    pipeline = PacketPipeline(handler=lambda frame: process_buffer(frame, args, config))
+    pipeline.start()
+
     await asyncio.gather(
-            serial_read(reader, args, config),
+            serial_read(reader, config, pipeline),
             serial_write(writer, config),
         )
 
-async def serial_read(reader: asyncio.StreamReader, args, config):
+async def serial_read(reader: asyncio.StreamReader, config, pipeline: PacketPipeline):
     """Liest Daten von der seriellen Schnittstelle oder TCP."""
-    prev_byte = 0x00
-    packet_started = False
-    data = bytearray()
-    packet_size = 0
+    def log_invalid_frame(frame, packet_size):
+        if config.LOGGING['invalidPacket']:
+            logger.warning(f"Paket endet nicht mit 0x34. Größe {packet_size} Länge {len(frame)}")
+            logger.warning(f"Empfangen hex: {[hex(x) for x in frame]}")
+            logger.warning(f"Empfangen raw: {bytes(frame)}")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Paket endet nicht mit 0x34. Größe {packet_size} Länge {len(frame)}")
+            logger.debug(f"Empfangen hex: {[hex(x) for x in frame]}")
+            logger.debug(f"Empfangen raw: {bytes(frame)}")
+
+    frame_reader = NASAFrameReader(on_invalid=log_invalid_frame)
 
     while True:
-        current_byte = await reader.read(1)
-        if current_byte:
-            if packet_started:
-                data.extend(current_byte)
-                if len(data) == 3:
-                    packet_size = ((data[1] << 8) | data[2]) + 2
-    
-                if packet_size <= len(data):
-                    if current_byte == b'\x34':
-                        asyncio.create_task(process_buffer(data, args, config))
-                        logger.debug(f"Empfangen int: {data}")
-                        logger.debug(f"Empfangen hex: {[hex(x) for x in data]}")
-                        data = bytearray()
-                        packet_started = False
-                    else:
-                        if config.LOGGING['invalidPacket']:
-                            logger.warning(f"Paket endet nicht mit 0x34. Größe {packet_size} Länge {len(data)}")
-                            logger.warning(f"Empfangen hex: {[hex(x) for x in data]}")
-                            logger.warning(f"Empfangen raw: {data}")
-                        else:
-                            logger.debug(f"Paket endet nicht mit 0x34. Größe {packet_size} Länge {len(data)}")
-                            logger.debug(f"Empfangen hex: {[hex(x) for x in data]}")
-                            logger.debug(f"Empfangen raw: {data}")
-                        
-                        data = bytearray()
-                        packet_started = False
-
-            # Paketstart identifizieren
-            if current_byte == b'\x00' and prev_byte == b'\x32':
-                packet_started = True
-                data.extend(prev_byte)
-                data.extend(current_byte)
-
-            prev_byte = current_byte
+        chunk = await reader.read(NASAFrameReader.CHUNK_SIZE)
+        if not chunk:
+            if reader.at_eof():
+                logger.error("Verbindung von der Gegenseite geschlossen")
+                break
+            continue
+
+        # jede empfangene Aktivität verschiebt den nächsten Sendezeitpunkt
+        bus_pacer.note_activity()
+        for frame in frame_reader.feed(chunk):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Empfangen int: {bytes(frame)}")
+                logger.debug(f"Empfangen hex: {[hex(x) for x in frame]}")
+            await pipeline.submit(frame)
 
 async def serial_write(writer: asyncio.StreamWriter, config):
     """Schreibt Daten zur seriellen Schnittstelle oder TCP (Polling)."""
@@ -185,14 +180,15 @@ async def process_packet(buffer, args, config):
     """Verarbeitet ein empfangenes Paket."""
     if args.DUMPFILE and not args.DRYRUN:
         async with aiofiles.open(args.DUMPFILE, "a") as dumpWriter:
-           await dumpWriter.write(f"{buffer}\n")
+           await dumpWriter.write(f"{bytearray(buffer)}\n")
     else:
         try:
             nasa_packet = NASAPacket()
             nasa_packet.parse(buffer)
-            logger.debug("Paket verarbeitet: ")
-            logger.debug(f"Paket raw: {[hex(x) for x in buffer]}")
-            logger.debug(nasa_packet)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Paket verarbeitet: ")
+                logger.debug(f"Paket raw: {[hex(x) for x in buffer]}")
+                logger.debug(nasa_packet)
             
             if nasa_packet.packet_source_address_class in (AddressClassEnum.Outdoor, AddressClassEnum.Indoor):
                 messageProcessor = MessageProcessor()
@@ -207,7 +203,7 @@ async def process_packet(buffer, args, config):
                     logger.info(nasa_packet)
                     logger.info(f"Paket int: {[x for x in buffer]}")
                     logger.info(f"Paket hex: {[hex(x) for x in buffer]}")
-                else:
+                elif logger.isEnabledFor(logging.DEBUG):
                     logger.debug("Nachricht nicht von Innen- oder Außengerät") 
                     logger.debug(nasa_packet)
                     logger.debug(f"Paket int: {[x for x in buffer]}")
@@ -219,10 +215,11 @@ async def process_packet(buffer, args, config):
             logger.warning(f"Komplettes Paket: {[hex(x) for x in buffer]}")
             logger.warning(traceback.format_exc())
         except SkipInvalidPacketException as e:
-            logger.debug("Warnung aufgetreten, Paket wird übersprungen")
-            logger.debug(f"Fehler beim Verarbeiten der Nachricht: {e}")
-            logger.debug(f"Komplettes Paket: {[hex(x) for x in buffer]}")
-            logger.debug(traceback.format_exc())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Warnung aufgetreten, Paket wird übersprungen")
+                logger.debug(f"Fehler beim Verarbeiten der Nachricht: {e}")
+                logger.debug(f"Komplettes Paket: {[hex(x) for x in buffer]}")
+                logger.debug(traceback.format_exc())
         except MessageWarningException as e:
             logger.warning("Warnung aufgetreten, Paket wird übersprungen")
             logger.warning(f"Fehler beim Verarbeiten der Nachricht: {e}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark für das Framing des seriellen Datenstroms.
+
+Spielt einen synthetischen Mitschnitt (mehrere MB, gültige NASA-Pakete mit eingestreutem Müll)
+durch den früheren byteweisen Leser und durch den NASAFrameReader und gibt Pakete pro Sekunde aus.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+from NASAFrameReader import NASAFrameReader
+from NASAMessage import NASAMessage
+from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
+
+def build_frame(rnd: random.Random) -> bytes:
+    """Erzeugt ein gültiges Notification-Paket mit 1-10 Nachrichten."""
+    packet = NASAPacket()
+    packet.set_packet_source_address_class(AddressClassEnum.Outdoor)
+    packet.set_packet_source_channel(0)
+    packet.set_packet_source_address(0)
+    packet.set_packet_dest_address_class(AddressClassEnum.BroadcastSelfLayer)
+    packet.set_packet_dest_channel(0)
+    packet.set_packet_dest_address(0xFF)
+    packet.set_packet_information(True)
+    packet.set_packet_version(2)
+    packet.set_packet_retry_count(0)
+    packet.set_packet_type(PacketType.Normal)
+    packet.set_packet_data_type(DataType.Notification)
+    packet.set_packet_number(rnd.randrange(256))
+
+    messages = []
+    for _ in range(rnd.randint(1, 10)):
+        msg = NASAMessage()
+        msg.set_packet_message(0x8200 | rnd.randrange(0x100))
+        msg.set_packet_payload_raw(rnd.randrange(-30000, 30000).to_bytes(2, byteorder='big', signed=True))
+        messages.append(msg)
+    packet.set_packet_messages(messages)
+    return bytes(packet.to_raw())
+
+def build_capture(size_mb: float, garbage_ratio: float, seed: int = 42):
+    rnd = random.Random(seed)
+    capture = bytearray()
+    frames = 0
+    target = int(size_mb * 1024 * 1024)
+    while len(capture) < target:
+        if rnd.random() < garbage_ratio:
+            capture += bytes(rnd.randrange(256) for _ in range(rnd.randint(1, 20)))
+        capture += build_frame(rnd)
+        frames += 1
+    return bytes(capture), frames
+
+async def legacy_reader(reader: asyncio.StreamReader) -> int:
+    """Nachbildung der früheren serial_read-Schleife (read(1) pro Byte)."""
+    prev_byte = 0x00
+    packet_started = False
+    data = bytearray()
+    packet_size = 0
+    count = 0
+
+    while True:
+        current_byte = await reader.read(1)
+        if not current_byte:
+            return count
+        if packet_started:
+            data.extend(current_byte)
+            if len(data) == 3:
+                packet_size = ((data[1] << 8) | data[2]) + 2
+
+            if packet_size <= len(data):
+                if current_byte == b'\x34':
+                    count += 1
+                data = bytearray()
+                packet_started = False
+
+        if current_byte == b'\x00' and prev_byte == b'\x32':
+            packet_started = True
+            data.extend(prev_byte)
+            data.extend(current_byte)
+
+        prev_byte = current_byte
+
+async def chunked_reader(reader: asyncio.StreamReader) -> int:
+    frame_reader = NASAFrameReader()
+    count = 0
+    while True:
+        chunk = await reader.read(NASAFrameReader.CHUNK_SIZE)
+        if not chunk:
+            return count
+        count += len(frame_reader.feed(chunk))
+
+async def replay(capture: bytes, read_func) -> tuple:
+    reader = asyncio.StreamReader(limit=len(capture) + 1)
+    reader.feed_data(capture)
+    reader.feed_eof()
+    start = time.perf_counter()
+    count = await read_func(reader)
+    return count, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark des NASA Frame-Readers')
+    parser.add_argument('--size-mb', type=float, default=4.0, help='Größe des synthetischen Mitschnitts in MB')
+    parser.add_argument('--garbage', type=float, default=0.05, help='Anteil der Pakete mit vorangestelltem Müll')
+    args = parser.parse_args()
+
+    capture, expected = build_capture(args.size_mb, args.garbage)
+    print(f"📦 Mitschnitt: {len(capture) / 1024 / 1024:.2f} MB, {expected} Pakete")
+
+    for name, func in (("byteweise (read(1))", legacy_reader), ("NASAFrameReader", chunked_reader)):
+        count, elapsed = asyncio.run(replay(capture, func))
+        print(f"   {name:<22} {count:>8} Pakete in {elapsed:7.3f}s -> {count / elapsed:>12,.0f} Pakete/s")
+
+if __name__ == "__main__":
+    main()
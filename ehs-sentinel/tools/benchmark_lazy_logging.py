@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Regressions-Benchmark für das Logging im Paket-Hotpath.
+
+Bildet die Debug-Ausgaben nach, die pro empfangenem Paket anfallen (serial_read, process_packet,
+protocolMessage, MQTTClient._publish, MQTTCommunicationAnalyzer.log_value_conversion), einmal in
+der früheren Form mit sofort ausgewerteten f-Strings und einmal in der aktuellen Form mit
+Level-Guards bzw. %-Argumenten. Der Logger steht wie im Betrieb auf INFO, es wird also keine der
+Debug-Zeilen ausgegeben. Gemessen werden die Kosten pro Paket inklusive NASAPacket.parse.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+from CustomLogger import logger
+from NASAMessage import NASAMessage
+from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
+
+def build_frame(rnd: random.Random) -> bytes:
+    """Erzeugt ein Notification-Paket der Außeneinheit mit 1-10 Nachrichten."""
+    packet = NASAPacket()
+    packet.set_packet_source_address_class(AddressClassEnum.Outdoor)
+    packet.set_packet_source_channel(0)
+    packet.set_packet_source_address(0)
+    packet.set_packet_dest_address_class(AddressClassEnum.BroadcastSelfLayer)
+    packet.set_packet_dest_channel(0)
+    packet.set_packet_dest_address(0xFF)
+    packet.set_packet_information(True)
+    packet.set_packet_version(2)
+    packet.set_packet_retry_count(0)
+    packet.set_packet_type(PacketType.Normal)
+    packet.set_packet_data_type(DataType.Notification)
+    packet.set_packet_number(rnd.randrange(256))
+
+    messages = []
+    for _ in range(rnd.randint(1, 10)):
+        msg = NASAMessage()
+        msg.set_packet_message(0x8200 | rnd.randrange(0x100))
+        msg.set_packet_payload_raw(rnd.randrange(-30000, 30000).to_bytes(2, byteorder='big', signed=True))
+        messages.append(msg)
+    packet.set_packet_messages(messages)
+    return bytes(packet.to_raw())
+
+def eager_path(frame: bytes):
+    """Frühere Form: alle Argumente werden auch bei deaktiviertem DEBUG formatiert."""
+    logger.debug(f"Received int: {bytes(frame)}")
+    logger.debug(f"Received hex: {[hex(x) for x in frame]}")
+
+    nasa_packet = NASAPacket()
+    nasa_packet.parse(frame)
+    logger.debug("Packet processed: ")
+    logger.debug(f"Packet raw: {[hex(x) for x in frame]}")
+    logger.debug(nasa_packet)
+
+    for msg in nasa_packet.packet_messages:
+        msgname = "NASA_OUTDOOR_TW1_TEMP"
+        msgvalue = int.from_bytes(msg.packet_payload, byteorder='big', signed=True) / 10
+        logger.debug(f"🔄 Konvertierung hex_to_decimal: {msgvalue * 10} → {msgvalue}")
+        logger.debug(f"Message number: {hex(msg.packet_message):<6} {msgname:<50} Type: {msg.packet_message_type} Payload: {msgvalue}")
+        logger.debug(f"MQTT Publish Topic: ehsSentinel/{msgname}/state payload: {msgvalue}")
+
+def lazy_path(frame: bytes):
+    """Aktuelle Form: Level-Guards und %-Argumente."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Received int: {bytes(frame)}")
+        logger.debug(f"Received hex: {[hex(x) for x in frame]}")
+
+    nasa_packet = NASAPacket()
+    nasa_packet.parse(frame)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Packet processed: ")
+        logger.debug(f"Packet raw: {[hex(x) for x in frame]}")
+        logger.debug(nasa_packet)
+
+    for msg in nasa_packet.packet_messages:
+        msgname = "NASA_OUTDOOR_TW1_TEMP"
+        msgvalue = int.from_bytes(msg.packet_payload, byteorder='big', signed=True) / 10
+        logger.debug("🔄 Konvertierung %s: %s → %s", "hex_to_decimal", msgvalue * 10, msgvalue)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Message number: {hex(msg.packet_message):<6} {msgname:<50} Type: {msg.packet_message_type} Payload: {msgvalue}")
+        logger.debug("MQTT Publish Topic: %s payload: %s", f"ehsSentinel/{msgname}/state", msgvalue)
+
+def measure(func, frames, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for frame in frames:
+            func(frame)
+    return (time.perf_counter() - start) / (rounds * len(frames))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark des Loggings im Paket-Hotpath')
+    parser.add_argument('--packets', type=int, default=2000, help='Anzahl unterschiedlicher Pakete')
+    parser.add_argument('--rounds', type=int, default=5, help='Durchläufe über alle Pakete')
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    frames = [build_frame(rnd) for _ in range(args.packets)]
+    logger.setLevel(logging.INFO)
+
+    eager = measure(eager_path, frames, args.rounds)
+    lazy = measure(lazy_path, frames, args.rounds)
+
+    print(f"⏱️ Kosten pro Paket bei Log-Level INFO ({args.packets} Pakete x {args.rounds}):")
+    print(f"   f-Strings (vorher):    {eager * 1e6:8.1f} µs")
+    print(f"   Guards/%-Args (jetzt): {lazy * 1e6:8.1f} µs ({eager / lazy:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark für den IndentFormatter aus CustomLogger.
+
+Schreibt Log-Records aus einer verschachtelten Aufruftiefe (ähnlich process_packet ->
+process_message -> protocolMessage) mit den Modi 'stack', 'frame' und 'flat' in einen
+Speicherpuffer und gibt Records pro Sekunde aus. Vorher wird geprüft, dass 'frame'
+dieselbe Einrückung und denselben Aufrufer liefert wie 'stack'.
+"""
+
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+from CustomLogger import IndentFormatter
+
+FORMAT = "%(asctime)s - (%(filename)30s:%(lineno)-3d) - [%(levelname)-7s]: %(indent)s%(message)s "
+
+def build_logger(mode: str, fmt: str = FORMAT):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(IndentFormatter(fmt, mode=mode))
+    bench_logger = logging.getLogger(f'benchmark.{mode}.{id(stream)}')
+    bench_logger.propagate = False
+    bench_logger.addHandler(handler)
+    bench_logger.setLevel(logging.INFO)
+    return bench_logger, stream
+
+def nested(depth: int, func, *args):
+    """Ruft func in der angegebenen zusätzlichen Aufruftiefe auf."""
+    if depth == 0:
+        return func(*args)
+    return nested(depth - 1, func, *args)
+
+def emit(bench_logger, records: int):
+    for i in range(records):
+        bench_logger.info(f"Message VAR_IN_TEMP_WATER_TANK_F with value {i / 10}")
+
+def check_parity():
+    """'frame' muss dieselbe Einrückung und denselben Aufrufer liefern wie 'stack'."""
+    fmt = "%(indent)s%(message)s|%(function)s"
+    outputs = {}
+    for mode in ('stack', 'frame'):
+        bench_logger, stream = build_logger(mode, fmt)
+        for depth in (0, 3, 10):
+            nested(depth, emit, bench_logger, 1)
+        outputs[mode] = stream.getvalue()
+    return outputs['stack'] == outputs['frame']
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark des IndentFormatter')
+    parser.add_argument('--records', type=int, default=20000, help='Anzahl Log-Records pro Modus')
+    parser.add_argument('--depth', type=int, default=12, help='zusätzliche Aufruftiefe beim Loggen')
+    args = parser.parse_args()
+
+    print(f"🔍 Ausgabe 'frame' identisch mit 'stack': {'✅' if check_parity() else '❌'}")
+    print(f"⏱️ {args.records} Records aus Aufruftiefe +{args.depth}:")
+
+    results = {}
+    for mode in ('stack', 'frame', 'flat'):
+        bench_logger, _ = build_logger(mode)
+        start = time.perf_counter()
+        nested(args.depth, emit, bench_logger, args.records)
+        results[mode] = time.perf_counter() - start
+        print(f"   {mode:<6} {args.records / results[mode]:>12,.0f} Records/s ({results['stack'] / results[mode]:.1f}x)")
+
+if __name__ == "__main__":
+    main()
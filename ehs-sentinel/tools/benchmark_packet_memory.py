@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Speicher-Benchmark für geparste NASA-Pakete.
+
+Misst mit tracemalloc, wie viel Speicher und wie viele Allokationen ein geparstes Paket samt
+Nachrichten belegt, einmal für die früheren Klassen mit Instanz-Dict und kopiertem Payload
+und einmal für die aktuellen Klassen mit __slots__ und Payload-Offsets in den Frame.
+Die Allokationen pro Sekunde ergeben sich aus Allokationen pro Paket mal Pakete pro Sekunde.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+from CustomLogger import logger
+from NASAPacket import NASAPacket
+from benchmark_packet_parser import LegacyNASAPacket, build_frame
+
+def measure_memory(packet_class, frames, touch_payloads=False):
+    """Liefert (Bytes pro Paket, Allokationen pro Paket) für die gehaltenen Pakete."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    packets = []
+    for frame in frames:
+        packet = packet_class()
+        packet.parse(frame)
+        if touch_payloads:
+            for msg in packet.packet_messages:
+                msg.packet_payload
+        packets.append(packet)
+
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    size = sum(stat.size_diff for stat in stats)
+    count = sum(stat.count_diff for stat in stats)
+    # die Liste selbst und die Frames zählen nicht zum Paket
+    size -= sys.getsizeof(packets)
+    return size / len(frames), count / len(frames)
+
+def measure_rate(packet_class, frames, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for frame in frames:
+            packet_class().parse(frame)
+    return rounds * len(frames) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='Speicher-Benchmark für geparste NASA-Pakete')
+    parser.add_argument('--packets', type=int, default=2000, help='Anzahl synthetischer Pakete')
+    parser.add_argument('--messages', type=int, default=10, help='Nachrichten pro Paket')
+    parser.add_argument('--rounds', type=int, default=5, help='Durchläufe für die Rate')
+    args = parser.parse_args()
+
+    logger.setLevel(logging.CRITICAL)
+    rnd = random.Random(42)
+    # wie vom NASAFrameReader: unveränderliche Frames
+    frames = [memoryview(bytes(build_frame(rnd, args.messages))) for _ in range(args.packets)]
+
+    print(f"🧠 Speicher pro Paket ({args.packets} Pakete mit je {args.messages} Nachrichten):")
+    for label, packet_class, touch in (("Instanz-Dict (vorher)", LegacyNASAPacket, False),
+                                       ("__slots__", NASAPacket, False),
+                                       ("__slots__ + Payloads gelesen", NASAPacket, True)):
+        size, count = measure_memory(packet_class, frames, touch)
+        rate = measure_rate(packet_class, frames, args.rounds)
+        print(f"   {label:<29} {size:8.0f} Bytes  {count:6.1f} Allokationen  "
+              f"{rate:9,.0f} Pakete/s  {count * rate:12,.0f} Allokationen/s")
+
+if __name__ == "__main__":
+    main()
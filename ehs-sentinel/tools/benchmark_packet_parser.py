@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Benchmark und Paritätsprüfung für NASAPacket.parse.
+
+Vergleicht den früheren rekursiven Parser (Slices pro Nachricht, Enum-Konstruktoren) mit dem
+aktuellen linearen Parser über memoryview. Zuerst wird geprüft, dass beide für gültige und
+gezielt beschädigte Pakete dieselben Felder bzw. dieselben Exceptions liefern, danach werden
+Pakete pro Sekunde für den Sample-Dump und für synthetische Pakete mit 50 Nachrichten gemessen.
+
+Die Pakete in data/sampleDump_small.txt stammen aus einem älteren Mitschnitt, dessen Längenfeld
+nicht zur Paketlänge passt. Beide Parser verwerfen sie identisch, die Zeile misst also den
+Verwerfungspfad.
+"""
+
+import argparse
+import ast
+import binascii
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import logging
+from CustomLogger import logger
+from EHSExceptions import SkipInvalidPacketException
+from NASAMessage import NASAMessage
+from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
+
+SAMPLE_DUMP = os.path.join(os.path.dirname(__file__), '..', 'data', 'sampleDump_small.txt')
+
+class LegacyNASAMessage:
+    """Frühere Nachricht mit Instanz-Dict und kopiertem Payload."""
+
+    __str__ = NASAMessage.__str__
+
+    def __init__(self, packet_message=0x000, packet_message_type=0, packet_payload=[0]):
+        self.packet_message: int = packet_message
+        self.packet_message_type: int = packet_message_type
+        self.packet_payload: bytes = bytes([int(hex(x), 16) for x in packet_payload])
+
+class LegacyNASAPacket:
+    """Früherer Parser mit Instanz-Dict als Referenz."""
+
+    __str__ = NASAPacket.__str__
+
+    def __init__(self):
+        for name in NASAPacket.__slots__:
+            setattr(self, name, None)
+
+    def parse(self, packet: bytearray):
+        self._packet_raw = packet
+        if len(packet) < 14:
+            raise ValueError("Data too short to be a valid NASAPacket")
+
+        crc_checkusm=binascii.crc_hqx(bytearray(packet[3:-3]), 0)
+
+        self.packet_start = packet[0]
+        self.packet_size = ((packet[1] << 8) | packet[2])
+
+        if self.packet_size+2 != len(packet):
+            logger.info(f"length not correct {self.packet_size+2} -> {len(packet)}")
+            logger.info(f"{packet.hex()}")
+            logger.info(f"{hex(packet[self.packet_size+1])}")
+
+        try:
+            self.packet_source_address_class = AddressClassEnum(packet[3])
+        except ValueError:
+            raise SkipInvalidPacketException(f"Source Adress Class out of enum {packet[3]}")
+        self.packet_source_channel = packet[4]
+        self.packet_source_address = packet[5]
+        try:
+            self.packet_dest_address_class = AddressClassEnum(packet[6])
+        except ValueError:
+            raise SkipInvalidPacketException(f"Destination Adress Class out of enum {packet[6]}")
+        self.packet_dest_channel = packet[7]
+        self.packet_dest_address = packet[8]
+        self.packet_information = (int(packet[9]) & 128) >> 7 == 1
+        self.packet_version = (int(packet[9]) & 96) >> 5
+        self.packet_retry_count = (int(packet[9]) & 24) >> 3
+        self.packet_type = PacketType((int(packet[10]) & 240) >> 4)
+        self.packet_data_type = DataType(int(packet[10]) & 15)
+        self.packet_number = packet[11]
+        self.packet_capacity = packet[12]
+        self.packet_crc16 = ((packet[-3] << 8) | packet[-2]) # + 2
+        self.packet_end = packet[-1]
+        self.packet_messages = self._extract_legacy(0, self.packet_capacity, packet[13:-3], [])
+
+        if crc_checkusm != self.packet_crc16:
+            raise SkipInvalidPacketException(f"Checksum for package could not be validated. Calculated: {crc_checkusm} in packet: {self.packet_crc16}: packet:{self}")
+
+    def _extract_legacy(self, depth: int, capacity: int, msg_rest: bytearray, return_list: list):
+        if depth > capacity or len(msg_rest) <= 2:
+            return return_list
+
+        message_number = (msg_rest[0] << 8) | msg_rest[1]
+        message_type = (message_number & 1536) >> 9
+
+        if message_type == 0:
+            payload_size = 1
+        elif message_type == 1:
+            payload_size = 2
+        elif message_type == 2:
+            payload_size = 4
+        elif message_type == 3:
+            payload_size = len(msg_rest)
+            if capacity != 1:
+                raise SkipInvalidPacketException("Message with structure type must have capacity of 1.")
+        else:
+            raise ValueError(f"Mssage type unknown: {message_type}")
+
+        payload = msg_rest[2:2 + payload_size]
+        if len(payload) > 255:
+            raise ValueError(f"Payload for Submessage {hex(message_number)} too large at index {depth}: {len(payload)} bytes.")
+
+        return_list.append(LegacyNASAMessage(packet_message=message_number, packet_message_type=message_type, packet_payload=payload))
+        return self._extract_legacy(depth+1, capacity, msg_rest[2 + payload_size:], return_list)
+
+def load_sample_dump(path: str = SAMPLE_DUMP) -> list:
+    """Liest Dump-Zeilen im Format ['0x32', ...] oder bytearray(b'...')."""
+    frames = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("bytearray("):
+                frames.append(bytearray(ast.literal_eval(line[len("bytearray("):-1])))
+            else:
+                frames.append(bytearray(int(x, 16) for x in ast.literal_eval(line)))
+    return frames
+
+def build_frame(rnd: random.Random, count: int) -> bytearray:
+    """Erzeugt ein gültiges Notification-Paket mit count Nachrichten gemischter Größe."""
+    packet = NASAPacket()
+    packet.set_packet_source_address_class(AddressClassEnum.Outdoor)
+    packet.set_packet_source_channel(0)
+    packet.set_packet_source_address(0)
+    packet.set_packet_dest_address_class(AddressClassEnum.BroadcastSelfLayer)
+    packet.set_packet_dest_channel(0)
+    packet.set_packet_dest_address(0xFF)
+    packet.set_packet_information(True)
+    packet.set_packet_version(2)
+    packet.set_packet_retry_count(0)
+    packet.set_packet_type(PacketType.Normal)
+    packet.set_packet_data_type(DataType.Notification)
+    packet.set_packet_number(rnd.randrange(256))
+
+    messages = []
+    for _ in range(count):
+        message_type = rnd.randrange(3)
+        size = (1, 2, 4)[message_type]
+        msg = NASAMessage()
+        msg.set_packet_message(0x4000 | (message_type << 9) | rnd.randrange(0x100))
+        msg.set_packet_payload_raw(rnd.randrange(256 ** size).to_bytes(size, byteorder='big'))
+        messages.append(msg)
+    packet.set_packet_messages(messages)
+    return bytearray(packet.to_raw())
+
+def corrupt(rnd: random.Random, frame: bytearray) -> bytearray:
+    """Beschädigt ein Paket gezielt an Header, Nachrichten oder Prüfsumme."""
+    frame = bytearray(frame)
+    kind = rnd.randrange(6)
+    if kind == 0:
+        frame[3 if rnd.random() < 0.5 else 6] = rnd.randrange(256)
+    elif kind == 1:
+        frame[10] = rnd.randrange(256)
+    elif kind == 2:
+        frame[13] |= 0x06  # Struktur-Nachricht
+    elif kind == 3:
+        frame[12] = rnd.randrange(256)
+    elif kind == 4:
+        frame[rnd.randrange(3, len(frame) - 3)] ^= 0xFF
+    else:
+        frame = frame[:rnd.randrange(14, len(frame) + 1)]
+    return frame
+
+def outcome(packet_class, frame):
+    packet = packet_class()
+    try:
+        packet.parse(frame)
+    except Exception as e:
+        return (type(e).__name__, str(e))
+    fields = {key: getattr(packet, key) for key in NASAPacket.__slots__ if key != 'packet_messages'}
+    messages = [(m.packet_message, m.packet_message_type, m.packet_payload) for m in packet.packet_messages]
+    return fields, messages
+
+def check_parity(frames: list) -> int:
+    mismatches = 0
+    for frame in frames:
+        if outcome(LegacyNASAPacket, frame) != outcome(NASAPacket, frame):
+            mismatches += 1
+            print(f"❌ Abweichung bei {frame.hex()}")
+    return mismatches
+
+def measure(packet_class, frames, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for frame in frames:
+            try:
+                packet_class().parse(frame)
+            except Exception:
+                pass  # abgeschnittene Pakete im Dump
+    return rounds * len(frames) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark und Paritätsprüfung für NASAPacket.parse')
+    parser.add_argument('--packets', type=int, default=2000, help='Anzahl synthetischer Pakete')
+    parser.add_argument('--rounds', type=int, default=5, help='Durchläufe über alle Pakete')
+    args = parser.parse_args()
+
+    logger.setLevel(logging.CRITICAL)
+    rnd = random.Random(42)
+    sample = load_sample_dump()
+    small = [build_frame(rnd, rnd.randint(1, 10)) for _ in range(args.packets)]
+    large = [build_frame(rnd, 50) for _ in range(args.packets)]
+    broken = [corrupt(rnd, rnd.choice(small + large)) for _ in range(args.packets)]
+
+    mismatches = check_parity(sample + small + large + broken)
+    if mismatches:
+        print(f"❌ {mismatches} Abweichungen zwischen altem und neuem Parser")
+        return 1
+    print(f"✅ Parität geprüft: {len(sample) + 3 * args.packets} Pakete, davon {args.packets} beschädigt")
+
+    print(f"\n⏱️ Pakete pro Sekunde ({args.rounds} Durchläufe):")
+    for label, frames in (("Sample-Dump", sample), ("1-10 Nachrichten", small), ("50 Nachrichten", large)):
+        rounds = args.rounds * max(1, args.packets // len(frames))
+        legacy = measure(LegacyNASAPacket, frames, rounds)
+        current = measure(NASAPacket, frames, rounds)
+        print(f"   {label:<17} rekursiv: {legacy:10,.0f}   memoryview: {current:10,.0f} ({current / legacy:.1f}x)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Gemeinsame Hilfen für die Unit Tests in tools/.
+Stellt eine steuerbare Uhr und die Standard-Header des MessageProducer bereit.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+from MessageProducer import MessageProducer
+from NASAPacket import NASAPacket
+
+# die Header-Methoden lesen keinen Zustand, daher ohne Singleton und EHSConfig
+_PRODUCER = object.__new__(MessageProducer)
+
+class FakeClock:
+    """Uhr für Tests, die Zeit wird direkt über now gesetzt."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def build_read_packet() -> NASAPacket:
+    """Header der Read-Anfragen aus MessageProducer._build_default_read_packet."""
+    return _PRODUCER._build_default_read_packet()
+
+def build_request_packet() -> NASAPacket:
+    """Header der Request-Anfragen (SET) aus MessageProducer._build_default_request_packet."""
+    return _PRODUCER._build_default_request_packet()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für die adaptiven Polling-Intervalle.
+Prüft die zeitgewichtete Schätzung der Änderungsrate, die Wahl der Intervalle zwischen den
+Grenzen und das Neuplanen im PollScheduler.
+"""
+
+import sys
+import os
+import math
+import random
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from helpers import FakeClock
+from AdaptiveIntervals import AdaptiveIntervals
+from PollScheduler import PollScheduler
+
+def build_tracker(**kwargs) -> AdaptiveIntervals:
+    tracker = AdaptiveIntervals()
+    tracker.configure(enabled=True, **kwargs)
+    return tracker
+
+def settle(tracker: AdaptiveIntervals, sensor: str, base: float) -> float:
+    """Intervall nach mehreren Abfragen, das Wachstum ist pro Abfrage begrenzt."""
+    for _ in range(10):
+        interval = tracker.interval(sensor, base)
+    return interval
+
+class TestAdaptiveIntervals(unittest.TestCase):
+    """Test-Suite für AdaptiveIntervals."""
+
+    def test_rate_of_linear_drift(self):
+        """Eine gleichmäßige Drift wird unabhängig vom Abfrageabstand richtig geschätzt."""
+        for step in (1, 15, 120):
+            tracker = build_tracker(relative_tolerance=0)
+            for t in range(0, 1200 + step, step):
+                tracker.observe("NASA_OUTDOOR_TW1_TEMP", 30 + 0.01 * t, now=t)
+            self.assertAlmostEqual(tracker.rate("NASA_OUTDOOR_TW1_TEMP"), 0.01, places=6)
+            self.assertAlmostEqual(settle(tracker, "NASA_OUTDOOR_TW1_TEMP", 15), 50.0, places=3)
+
+    def test_no_estimate_keeps_base(self):
+        """Ohne ausreichende Beobachtung oder bei Textwerten bleibt das Basisintervall."""
+        tracker = build_tracker(horizon=600)
+        for t in range(0, 600, 15):
+            tracker.observe("NASA_OUTDOOR_TW1_TEMP", 30.0, now=t)
+        tracker.observe("NASA_POWER", "ON", now=0)
+        tracker.observe("NASA_POWER", "OFF", now=60)
+        self.assertEqual(tracker.interval("NASA_OUTDOOR_TW1_TEMP", 15), 15)
+        self.assertEqual(tracker.interval("NASA_POWER", 15), 15)
+        self.assertIsNone(tracker.rate("NASA_POWER"))
+
+    def test_bounds_and_relative_tolerance(self):
+        """Unveränderte Werte laufen auf der Obergrenze, Leistungswerte nutzen die relative Toleranz."""
+        tracker = build_tracker(min_interval=10, max_interval=600)
+        for t in range(0, 601, 15):
+            tracker.observe("NASA_OUTDOOR_OUT_TEMP", 5.0, now=t)
+            tracker.observe("STR_OUTDOOR_MODEL", 42, now=t)
+            tracker.observe("NASA_OUTDOOR_COMP1_RUN_HZ", 50 + 5 * (t // 15 % 2), now=t)
+            tracker.observe("NASA_OUTDOOR_CONTROL_WATTMETER_ALL_UNIT", 2000 + t, now=t)
+        # höchstens Verdopplung pro Abfrage
+        self.assertEqual(tracker.interval("NASA_OUTDOOR_OUT_TEMP", 15), 30)
+        self.assertEqual(settle(tracker, "NASA_OUTDOOR_OUT_TEMP", 15), 600)
+        # statische Gruppe mit längerem Intervall wird nicht schneller
+        self.assertEqual(settle(tracker, "STR_OUTDOOR_MODEL", 3600), 3600)
+        self.assertEqual(tracker.interval("NASA_OUTDOOR_COMP1_RUN_HZ", 15), 10)
+        # Toleranz 2% von ~2600 W bei 1 W/s
+        self.assertAlmostEqual(settle(tracker, "NASA_OUTDOOR_CONTROL_WATTMETER_ALL_UNIT", 15), 52.0, places=0)
+
+        stats = tracker.get_stats()
+        self.assertEqual(stats["sensors"]["NASA_OUTDOOR_OUT_TEMP"]["interval_s"], 600)
+        self.assertGreater(stats["saved_percent"], 0)
+
+    def test_scheduler_uses_sensor_interval(self):
+        """Der PollScheduler plant jeden Sensor mit dem Intervall aus interval_for neu."""
+        clock = FakeClock()
+        intervals = {"NASA_OUTDOOR_OUT_TEMP": 300.0}
+        scheduler = PollScheduler(merge_window=0.5, clock=clock,
+                                  interval_for=lambda sensor, interval: intervals.get(sensor, interval))
+        scheduler.set_groups({"live_data": (15, ["NASA_OUTDOOR_OUT_TEMP", "NASA_OUTDOOR_COMP1_RUN_HZ"])})
+        self.assertEqual(len(scheduler.pop_due()["live_data"]), 2)
+        self.assertEqual(scheduler.base_interval("NASA_OUTDOOR_OUT_TEMP"), 15)
+
+        polled = []
+        while clock.now < 1299:
+            clock.now = scheduler.next_deadline()
+            polled.extend(scheduler.pop_due().get("live_data", []))
+        self.assertEqual(polled.count("NASA_OUTDOOR_OUT_TEMP"), 1)
+        self.assertEqual(polled.count("NASA_OUTDOOR_COMP1_RUN_HZ"), 20)
+
+    def test_skipped_sensor_keeps_interval(self):
+        """Wegen frischer Werte übersprungene Fälligkeiten zählen nicht als Abfrage für das Wachstum."""
+        clock = FakeClock()
+        tracker = build_tracker()
+        for t in range(0, 601, 15):
+            tracker.observe("NASA_OUTDOOR_OUT_TEMP", 5.0, now=t)
+        heard = {}
+        scheduler = PollScheduler(merge_window=0.5, clock=clock, last_heard=heard.get,
+                                  interval_for=tracker.interval)
+        scheduler.set_groups({"live_data": (15, ["NASA_OUTDOOR_OUT_TEMP"])})
+        self.assertEqual(scheduler.pop_due(), {"live_data": ["NASA_OUTDOOR_OUT_TEMP"]})
+        self.assertEqual(scheduler.next_deadline(), 1030.0)
+
+        # Broadcasts halten den Wert frisch, jede Fälligkeit wird übersprungen
+        for _ in range(5):
+            clock.now = scheduler.next_deadline()
+            heard["NASA_OUTDOOR_OUT_TEMP"] = clock.now - 1
+            self.assertEqual(scheduler.pop_due(), {})
+        self.assertEqual(tracker.get_stats()["sensors"]["NASA_OUTDOOR_OUT_TEMP"]["interval_s"], 30)
+
+        # ohne weitere Broadcasts wächst das Intervall bei der nächsten Abfrage nur einmal
+        clock.now = scheduler.next_deadline()
+        self.assertEqual(scheduler.pop_due(), {"live_data": ["NASA_OUTDOOR_OUT_TEMP"]})
+        self.assertEqual(tracker.get_stats()["sensors"]["NASA_OUTDOOR_OUT_TEMP"]["interval_s"], 60)
+
+def run_benchmark():
+    """Abfragen und größter Fehler zwischen zwei Abfragen über 6 Stunden mit simulierten Verläufen."""
+    rng = random.Random(7)
+    signals = {
+        "NASA_OUTDOOR_OUT_TEMP": lambda t: 5 + 3 * math.sin(t / 20000),
+        "NASA_INDOOR_DHW_CURRENT_TEMP": lambda t: 48 - 6 * ((t % 7200) / 7200),
+        "NASA_OUTDOOR_TW1_TEMP": lambda t: 30 + 2 * math.sin(t / 1500),
+        "NASA_OUTDOOR_TW2_TEMP": lambda t: 35 + 2.5 * math.sin(t / 1500),
+        "NASA_OUTDOOR_COMP1_RUN_HZ": lambda t: 45 + 15 * math.sin(t / 200),
+        "NASA_OUTDOOR_CONTROL_WATTMETER_ALL_UNIT": lambda t: 1500 + 600 * math.sin(t / 300)
+    }
+    noise = {name: rng.uniform(0, 1000) for name in signals}
+
+    def simulate(adaptive):
+        clock = FakeClock()
+        tracker = build_tracker()
+        scheduler = PollScheduler(merge_window=0.5, clock=clock,
+                                  interval_for=(lambda s, i: tracker.interval(s, i)) if adaptive else None)
+        scheduler.set_groups({"live_data": (15, list(signals))})
+        start, polls = clock.now, 0
+        last, worst = {}, {}
+        while clock.now < start + 6 * 3600:
+            clock.now = scheduler.next_deadline()
+            for sensor in scheduler.pop_due().get("live_data", []):
+                t = clock.now - start + noise[sensor]
+                value = round(signals[sensor](t), 1)
+                tracker.observe(sensor, value, now=clock.now)
+                if sensor in last:
+                    worst[sensor] = max(worst.get(sensor, 0), abs(value - last[sensor]))
+                last[sensor] = value
+                polls += 1
+        return polls, worst
+
+    fixed, fixed_worst = simulate(False)
+    adaptive, adaptive_worst = simulate(True)
+    print("\n⏱️ Abfragen über 6 Stunden, 6 simulierte Sensoren:")
+    print(f"   Feste 15 s:  {fixed}")
+    print(f"   Adaptiv:     {adaptive} ({100 * (fixed - adaptive) / fixed:.0f}% weniger)")
+    print("   Größte Änderung zwischen zwei Abfragen (fest / adaptiv):")
+    for sensor in signals:
+        print(f"     {sensor:<42} {fixed_worst[sensor]:>6.1f} / {adaptive_worst[sensor]:>6.1f}")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für AdaptiveIntervals...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestAdaptiveIntervals)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        run_benchmark()
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
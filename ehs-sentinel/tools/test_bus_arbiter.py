@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den BusArbiter.
+Prüft die Reihenfolge der Sendespuren, das Airtime-Budget der Polling-Spuren, abgebrochene
+Wartende und die Wartezeit-Statistik. Der Benchmark misst die Latenz einer Schreib-Anfrage
+(inklusive Rücklesen) während eines vollständigen Polls.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from BusArbiter import BusArbiter, Lane
+
+async def hold(arbiter, lane, order, name, seconds=0.0):
+    async with arbiter.slot(lane):
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+class TestBusArbiter(unittest.TestCase):
+    """Test-Suite für den BusArbiter."""
+
+    def test_priority_between_frames(self):
+        """Nach dem laufenden Frame bekommt die wichtigste Spur den Bus, gleiche Spuren der Reihe nach."""
+        async def scenario():
+            arbiter = BusArbiter(airtime={})
+            order = []
+            first = asyncio.create_task(hold(arbiter, Lane.LIVE, order, "live-1", 0.02))
+            await asyncio.sleep(0)
+            tasks = [
+                asyncio.create_task(hold(arbiter, Lane.STATIC, order, "static")),
+                asyncio.create_task(hold(arbiter, Lane.LIVE, order, "live-2")),
+                asyncio.create_task(hold(arbiter, Lane.LIVE, order, "live-3")),
+                asyncio.create_task(hold(arbiter, Lane.CONTROL, order, "control"))
+            ]
+            await asyncio.gather(first, *tasks)
+            return order, arbiter.get_stats()
+
+        order, stats = asyncio.run(scenario())
+        self.assertEqual(order, ["live-1", "control", "live-2", "live-3", "static"])
+        self.assertEqual(stats["lanes"]["live"]["granted"], 3)
+        self.assertGreater(stats["lanes"]["static"]["max_delay_ms"], 15)
+        self.assertFalse(stats["busy"])
+
+    def test_airtime_budget(self):
+        """Eine Spur ohne Budget wartet auf das Nachfüllen, die Steuerspur nicht."""
+        async def scenario():
+            arbiter = BusArbiter(airtime={Lane.STATIC: 0.5}, burst=0.01)
+            loop = asyncio.get_running_loop()
+            order = []
+            await hold(arbiter, Lane.STATIC, order, "static-1", 0.05)  # Budget -0,04 s
+            start = loop.time()
+            static = asyncio.create_task(hold(arbiter, Lane.STATIC, order, "static-2"))
+            await hold(arbiter, Lane.CONTROL, order, "control")
+            control_delay = loop.time() - start
+            for name in ("control-2", "control-3"):
+                await hold(arbiter, Lane.CONTROL, order, name)
+            await static
+            return order, control_delay, loop.time() - start, arbiter.get_stats()
+
+        order, control_delay, static_delay, stats = asyncio.run(scenario())
+        self.assertEqual(order, ["static-1", "control", "control-2", "control-3", "static-2"])
+        self.assertLess(control_delay, 0.03)
+        self.assertGreater(static_delay, 0.06)
+        # einmal pro Leerlaufen des Budgets, nicht bei jeder Freigabe des Busses
+        self.assertEqual(stats["lanes"]["static"]["throttled"], 1)
+        self.assertNotIn("budget_s", stats["lanes"]["control"])
+
+    def test_cancelled_waiter(self):
+        """Ein abgebrochener Wartender blockiert den Bus nicht."""
+        async def scenario():
+            arbiter = BusArbiter(airtime={})
+            order = []
+            first = asyncio.create_task(hold(arbiter, Lane.LIVE, order, "live", 0.02))
+            await asyncio.sleep(0)
+            cancelled = asyncio.create_task(hold(arbiter, Lane.CONTROL, order, "cancelled"))
+            later = asyncio.create_task(hold(arbiter, Lane.STATIC, order, "static"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await asyncio.gather(first, later)
+            return order, arbiter.get_stats()
+
+        order, stats = asyncio.run(scenario())
+        self.assertEqual(order, ["live", "static"])
+        self.assertEqual(stats["lanes"]["control"]["queued"], 0)
+
+    def test_exception_releases_bus(self):
+        """Auch nach einer Exception im Slot ist der Bus wieder frei."""
+        async def scenario():
+            arbiter = BusArbiter(airtime={})
+            with self.assertRaises(RuntimeError):
+                async with arbiter.slot(Lane.LIVE):
+                    raise RuntimeError("Schreibfehler")
+            order = []
+            await asyncio.wait_for(hold(arbiter, Lane.STATIC, order, "static"), 0.5)
+            return order
+
+        self.assertEqual(asyncio.run(scenario()), ["static"])
+
+async def poller(arbiter, lane, frames, frame_time, lock=None):
+    """Pollt frames Frames, jeder belegt den Bus frame_time Sekunden (Senden + Antwort)."""
+    for _ in range(frames):
+        if lock is None:
+            async with arbiter.slot(lane):
+                await asyncio.sleep(frame_time)
+        else:
+            async with lock:
+                await asyncio.sleep(frame_time)
+
+async def set_latency(prioritised, scale, frame_time=0.15, ack_time=0.06):
+    """Ende-zu-Ende-Latenz eines SET (Schreiben + Rücklesen) während eines vollständigen Polls."""
+    arbiter = BusArbiter(airtime={})
+    lock = None if prioritised else asyncio.Lock()
+    pollers = [asyncio.create_task(poller(arbiter, lane, frames, frame_time * scale, lock))
+               for lane, frames in ((Lane.LIVE, 2), (Lane.SETTINGS, 5), (Lane.STATIC, 12))]
+    await asyncio.sleep(0.35 * scale)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    if prioritised:
+        async with arbiter.slot(Lane.CONTROL):
+            await asyncio.sleep(ack_time * scale)  # Schreiben, bis das ACK da ist
+        async with arbiter.slot(Lane.CONTROL):
+            await asyncio.sleep(frame_time * scale)  # Rücklesen
+    else:
+        async with lock:
+            await asyncio.sleep(0.01 * scale)  # Schreiben
+        await asyncio.sleep(1.0 * scale)  # feste Pause in write_request
+        async with lock:
+            await asyncio.sleep(frame_time * scale)  # Rücklesen
+    latency = (loop.time() - start) / scale
+    await asyncio.gather(*pollers)
+    return latency
+
+def run_benchmark(scale=0.2):
+    print("\n⏱️ SET-Latenz während eines vollständigen Polls (19 Frames à 150 ms):")
+    before = asyncio.run(set_latency(False, scale))
+    after = asyncio.run(set_latency(True, scale))
+    print(f"   Gemeinsamer Lock + 1 s Pause:   {before * 1000:.0f} ms")
+    print(f"   Prioritäts-Spuren + ACK:        {after * 1000:.0f} ms ({before / after:.1f}x)")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für BusArbiter...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBusArbiter)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        run_benchmark()
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
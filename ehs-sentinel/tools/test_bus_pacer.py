@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den BusPacer.
+Prüft das Packen der Read-Anfragen nach Payload-Größe, die Selbstkalibrierung von Chunk-Limit und
+Sendeabstand sowie das Warten auf Bus-Ruhe, und vergleicht die Dauer eines vollständigen
+Poll-Zyklus (alle Sensoren des NASA Repository) mit festen 10er-Chunks und 0,5 s Pausen gegen die
+antwortgetaktete Variante an einer simulierten Wärmepumpe.
+"""
+
+import sys
+import os
+import asyncio
+import random
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import logging
+import unittest
+import yaml
+from BusArbiter import BusArbiter, Lane
+from BusPacer import BusPacer
+from CustomLogger import logger
+from EHSExceptions import SkipInvalidPacketException
+from helpers import FakeClock, build_read_packet
+from NASAEncoder import build_encoders
+from NASAFrameEncoder import NASAFrameEncoder
+from NASAMessage import NASAMessage
+from NASAPacket import NASAPacket, DataType
+from PollCorrelator import PollCorrelator
+
+logger.setLevel(logging.CRITICAL)
+
+REPO_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'NasaRepository.yml')
+
+class TestBusPacer(unittest.TestCase):
+    """Test-Suite für den BusPacer."""
+
+    def setUp(self):
+        self.pacer = BusPacer(chunk_size=4, max_chunk_size=6, frame_gap=0.05, max_frame_gap=0.4,
+                              increase_after=2, clock=FakeClock(100.0))
+
+    def test_pack_groups_by_size(self):
+        """Nachrichten werden nach Größe sortiert und bis zum Chunk-Limit gefüllt."""
+        messages = [("a", 0, 3), ("b", 2, 6), ("c", 1, 4), ("d", 2, 6), ("e", 0, 3), ("f", 1, 4)]
+        self.assertEqual(self.pacer.pack(messages), [("b", "d", "c", "f"), ("a", "e")])
+        self.assertEqual(self.pacer.pack(messages, 6), [("b", "d", "c", "f", "a", "e")])
+
+    def test_structure_messages_travel_alone(self):
+        """Strukturnachrichten (Typ 3) bekommen jeweils einen eigenen Frame."""
+        messages = [("a", 0, 3), ("s1", 3, 6), ("b", 0, 3), ("s2", 3, 6)]
+        self.assertEqual(self.pacer.pack(messages), [("s1",), ("s2",), ("a", "b")])
+
+    def test_pack_respects_frame_capacity(self):
+        """Ein Frame überschreitet nie das Größenfeld von 255 Bytes."""
+        messages = [(f"m{i}", 2, 6) for i in range(100)]
+        chunks = self.pacer.pack(messages, 255)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 100)
+        for chunk in chunks:
+            self.assertLessEqual(BusPacer.FRAME_OVERHEAD - 2 + 6 * len(chunk), BusPacer.MAX_SIZE_FIELD)
+        self.assertEqual(len(chunks[0]), (255 + 2 - BusPacer.FRAME_OVERHEAD) // 6)
+
+    def test_packed_frame_fits_reader(self):
+        """Ein voll gepackter Frame hat ein Größenfeld von höchstens 255."""
+        chunk = self.pacer.pack([(f"m{i}", 2, 6) for i in range(100)], 255)[0]
+        encoder = NASAFrameEncoder.from_packet(build_read_packet())
+        frame = encoder.encode([(0x8600 + i, 2, bytes(4)) for i in range(len(chunk))])
+        self.assertLessEqual(int.from_bytes(frame[1:3], 'big'), BusPacer.MAX_SIZE_FIELD)
+
+    def test_calibration_grows_and_backs_off(self):
+        """Beantwortete Frames erhöhen das Limit, unbeantwortete und NACKs halbieren es."""
+        for _ in range(4):
+            self.pacer.record(4, 0)
+        self.assertEqual(self.pacer.chunk_limit, 6)
+        self.assertAlmostEqual(self.pacer.frame_gap, 0.05)
+
+        self.pacer.record(6, 6)
+        self.assertEqual(self.pacer.chunk_limit, 3)
+        self.assertAlmostEqual(self.pacer.frame_gap, 0.1)
+
+        self.pacer.record(3, 0, nacked=True)
+        self.assertEqual(self.pacer.chunk_limit, 1)
+        self.assertAlmostEqual(self.pacer.frame_gap, 0.2)
+        stats = self.pacer.get_stats()
+        self.assertEqual((stats["nacks"], stats["limit_decreases"], stats["limit_increases"]), (1, 2, 2))
+
+    def test_partial_answers_are_not_overload(self):
+        """Einzelne unbeantwortete Adressen (nicht unterstützte Sensoren) senken das Limit nicht."""
+        self.pacer.record(4, 3)
+        self.assertEqual(self.pacer.chunk_limit, 4)
+        self.assertEqual(self.pacer.get_stats()["partial"], 1)
+
+    def test_response_timeout_follows_response_time(self):
+        """Die Wartezeit auf Antworten folgt dem gleitenden Mittel der Antwortzeiten."""
+        self.assertEqual(self.pacer.response_timeout, self.pacer.response_wait)
+        self.pacer.observe_response(0.1)
+        self.assertAlmostEqual(self.pacer.response_timeout, 0.4)
+        for _ in range(50):
+            self.pacer.observe_response(2.0)
+        self.assertEqual(self.pacer.response_timeout, self.pacer.response_wait)
+
+    def test_fixed_mode(self):
+        """Ohne adaptive Taktung bleiben Limit und Abstand fest."""
+        self.pacer.configure(chunk_size=4, max_chunk_size=6, adaptive=False)
+        self.pacer.record(4, 4, nacked=True)
+        self.assertEqual(self.pacer.chunk_limit, 4)
+
+    def test_wait_idle(self):
+        """Gesendet wird erst nach frame_gap Sekunden Ruhe, höchstens nach response_wait."""
+        pacer = BusPacer(frame_gap=0.05, response_wait=0.2)
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            pacer.note_activity()
+            await pacer.wait_idle()
+            quiet = loop.time() - start
+
+            # dauernd belegter Bus: spätestens nach response_wait wird trotzdem gesendet
+            busy = loop.call_soon(lambda: None)
+            def keep_busy():
+                nonlocal busy
+                pacer.note_activity()
+                busy = loop.call_later(0.01, keep_busy)
+            keep_busy()
+            start = loop.time()
+            await pacer.wait_idle()
+            busy.cancel()
+            return quiet, loop.time() - start
+
+        quiet, busy = asyncio.run(scenario())
+        self.assertGreaterEqual(quiet, 0.045)
+        self.assertLess(quiet, 0.15)
+        self.assertGreaterEqual(busy, 0.19)
+        self.assertLess(busy, 0.4)
+
+class SimulatedUnit:
+    """
+    Wärmepumpe am Bus: beantwortet Read-Anfragen nach latency Sekunden mit den unterstützten
+    Adressen und lehnt Frames mit mehr als max_messages Nachrichten per NACK ab.
+    """
+
+    def __init__(self, correlator, pacer, supported, latency, max_messages):
+        self.correlator = correlator
+        self.pacer = pacer
+        self.supported = supported
+        self.latency = latency
+        self.max_messages = max_messages
+        self.frames = 0
+        self.invalid = 0
+
+    def write(self, frame):
+        self.frames += 1
+        request = NASAPacket()
+        try:
+            request.parse(frame)
+        except SkipInvalidPacketException:
+            # ungültige Frames (z.B. Strukturnachricht mit anderen gemischt) bleiben unbeantwortet
+            self.invalid += 1
+            return
+        loop = asyncio.get_running_loop()
+        loop.call_later(self.latency, self._answer, request)
+
+    def _answer(self, request):
+        self.pacer.note_activity()
+        response = NASAPacket()
+        response.set_packet_number(request.packet_number)
+        if len(request.packet_messages) > self.max_messages:
+            response.set_packet_data_type(DataType.Nack)
+            self.correlator.match_nack(response)
+            return
+        response.set_packet_data_type(DataType.Resposne)
+        messages = []
+        for msg in request.packet_messages:
+            if msg.packet_message in self.supported:
+                answer = NASAMessage()
+                answer.set_packet_message(msg.packet_message)
+                answer.set_packet_payload_raw(msg.packet_payload)
+                messages.append(answer)
+        response.set_packet_messages(messages)
+        self.correlator.match_response(response)
+
+    async def drain(self):
+        pass
+
+async def fixed_cycle(names, encoders, unit, encoder, scale):
+    """Bisheriges read_request: feste 10er-Chunks und 0,5 s Pause vor jedem Chunk."""
+    for i in range(0, len(names), 10):
+        chunk = names[i:i + 10]
+        await asyncio.sleep(0.5 * scale)
+        unit.write(encoder.encode((encoders[x].address, encoders[x].message_type, encoders[x].payload()) for x in chunk))
+
+async def paced_cycle(names, encoders, unit, encoder, pacer, correlator, arbiter):
+    """Ablauf wie MessageProducer.read_request mit BusArbiter, BusPacer und PollCorrelator."""
+    remaining = names
+    while remaining:
+        chunks = pacer.pack([(x, encoders[x].message_type, 2 + len(encoders[x].payload())) for x in remaining])
+        remaining = None
+        for index, chunk in enumerate(chunks):
+            chunk_limit = pacer.chunk_limit
+            async with arbiter.slot(Lane.LIVE):
+                await pacer.wait_idle()
+                number = correlator.next_packet_number()
+                known = {x for x in chunk if correlator.has_answered(x)}
+                correlator.register(number, ((x, encoders[x].address) for x in chunk))
+                tracked = correlator.pending(chunk)
+                frame = encoder.encode(((encoders[x].address, encoders[x].message_type, encoders[x].payload()) for x in chunk), number)
+                unit.write(frame)
+                pacer.note_activity()
+                sent_at = pacer.clock()
+                unanswered, nacked = await correlator.settle(chunk, pacer.response_timeout)
+                if len(tracked) - len(unanswered):
+                    pacer.observe_response(pacer.clock() - sent_at)
+                if nacked or known or len(tracked) - len(unanswered):
+                    pacer.record(len(known), sum(1 for x in unanswered if x in known), nacked > 0)
+            if pacer.chunk_limit < chunk_limit and index + 1 < len(chunks):
+                remaining = [x for rest in chunks[index + 1:] for x in rest]
+                break
+
+def run_benchmark(cycles: int = 5, scale: float = 0.05):
+    """
+    Vollständiger Poll-Zyklus über alle Sensoren an einer simulierten Wärmepumpe
+    (60 ms Antwortzeit, 80 % der Adressen unterstützt, NACK ab 16 Nachrichten pro Frame).
+    Alle Zeiten werden mit scale verkürzt simuliert und auf Echtzeit hochgerechnet.
+    """
+    with open(REPO_FILE, 'r') as f:
+        repo = yaml.safe_load(f)
+    addresses = {name: int(entry['address'], 16) for name, entry in repo.items()}
+    encoders = build_encoders(addresses, repo)
+    names = [name for name in repo if not name.startswith(PollCorrelator.DERIVED_PREFIX)]
+    rnd = random.Random(3)
+    supported = {encoders[name].address for name in names if rnd.random() < 0.8}
+    encoder = NASAFrameEncoder.from_packet(build_read_packet())
+
+    async def measure(paced):
+        correlator = PollCorrelator(timeout=3.0 * scale)
+        pacer = BusPacer(frame_gap=0.05 * scale, max_frame_gap=0.5 * scale, response_wait=1.0 * scale)
+        arbiter = BusArbiter(airtime={})
+        unit = SimulatedUnit(correlator, pacer, supported, 0.06 * scale, 16)
+        durations = []
+        loop = asyncio.get_running_loop()
+        for _ in range(cycles):
+            start = loop.time()
+            if paced:
+                await paced_cycle(names, encoders, unit, encoder, pacer, correlator, arbiter)
+            else:
+                await fixed_cycle(names, encoders, unit, encoder, scale)
+            durations.append(loop.time() - start)
+        return durations, unit.frames / cycles, unit.invalid / cycles, pacer
+
+    fixed, fixed_frames, fixed_invalid, _ = asyncio.run(measure(False))
+    paced, paced_frames, paced_invalid, pacer = asyncio.run(measure(True))
+
+    print(f"\n⏱️ Vollständiger Poll-Zyklus ({len(names)} Sensoren, Zeiten auf Echtzeit hochgerechnet):")
+    print(f"   Feste 10er-Chunks + 0,5 s:   {fixed[-1] / scale:6.2f} s/Zyklus, {fixed_frames:5.1f} Frames, {fixed_invalid:.0f} ungültig")
+    print(f"   Antwortgetaktet, 1. Zyklus: {paced[0] / scale:6.2f} s/Zyklus")
+    print(f"   Antwortgetaktet, kalibriert:{paced[-1] / scale:6.2f} s/Zyklus, {paced_frames:5.1f} Frames "
+          f"{paced_invalid:.0f} ungültig ({fixed[-1] / paced[-1]:.1f}x, Limit {pacer.chunk_limit}, Abstand {pacer.frame_gap / scale * 1000:.0f} ms)")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für BusPacer...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBusPacer)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    if success:
+        run_benchmark()
+    sys.exit(0 if success else 1)
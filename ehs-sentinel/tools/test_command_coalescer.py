@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den CommandCoalescer.
+Prüft das Zusammenfassen von SET-Bursts pro Entität, gemeinsame Schreibvorgänge für mehrere
+Entitäten, das Überspringen bestätigter Werte und Request-Pakete mit mehreren Nachrichten.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from helpers import build_request_packet
+from BusPacer import BusPacer
+from MQTTCommandCoalescer import CommandCoalescer
+from NASAFrameEncoder import NASAFrameEncoder
+from NASAPacket import NASAPacket, DataType
+
+class Recorder:
+    """Merkt sich die geschriebenen Batches, optional mit Verzögerung."""
+
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+
+    async def __call__(self, batch):
+        await asyncio.sleep(self.delay)
+        self.batches.append(batch)
+
+class TestCommandCoalescer(unittest.TestCase):
+    """Test-Suite für den CommandCoalescer."""
+
+    def test_burst_writes_latest_value(self):
+        """Ein Slider-Burst auf eine Entität schreibt nur den letzten Wert."""
+        async def scenario():
+            recorder = Recorder()
+            coalescer = CommandCoalescer(recorder, window=0.02)
+            for value in range(40, 50):
+                coalescer.submit("VAR_IN_FSV_1011", f" {value} ")
+            await asyncio.sleep(0.05)
+            return recorder.batches, coalescer.get_stats()
+
+        batches, stats = asyncio.run(scenario())
+        self.assertEqual(batches, [[("VAR_IN_FSV_1011", "49")]])
+        self.assertEqual(stats["coalesced"], 9)
+        self.assertEqual(stats["written"], 1)
+
+    def test_entities_share_batch(self):
+        """Befehle für verschiedene Entitäten im selben Fenster werden gemeinsam geschrieben."""
+        async def scenario():
+            recorder = Recorder()
+            coalescer = CommandCoalescer(recorder, window=0.02)
+            coalescer.submit("NASA_POWER", "ON")
+            coalescer.submit("VAR_IN_FSV_1011", "45")
+            coalescer.submit("NASA_POWER", "OFF")
+            await asyncio.sleep(0.05)
+            return recorder.batches
+
+        self.assertEqual(asyncio.run(scenario()), [[("NASA_POWER", "OFF"), ("VAR_IN_FSV_1011", "45")]])
+
+    def test_confirmed_values_are_skipped(self):
+        """Werte, die die Wärmepumpe bereits meldet, werden nicht geschrieben."""
+        async def scenario():
+            store = {"NASA_POWER": "ON", "VAR_IN_FSV_1011": 45.0}
+            recorder = Recorder()
+            coalescer = CommandCoalescer(recorder, window=0.02, confirmed=store.get)
+            accepted = [coalescer.submit("NASA_POWER", "ON"), coalescer.submit("VAR_IN_FSV_1011", "45")]
+            # Regler verschoben und wieder zurück: am Fensterende unverändert
+            coalescer.submit("VAR_IN_FSV_1012", "30")
+            store["VAR_IN_FSV_1012"] = 30
+            coalescer.submit("VAR_IN_FSV_1012", "31")
+            coalescer.submit("VAR_IN_FSV_1012", "30")
+            await asyncio.sleep(0.05)
+            return accepted, recorder.batches, coalescer.get_stats()
+
+        accepted, batches, stats = asyncio.run(scenario())
+        self.assertEqual(accepted, [False, False])
+        self.assertEqual(batches, [])
+        self.assertEqual(stats["skipped_confirmed"], 3)
+
+    def test_in_flight_value_is_not_skipped(self):
+        """Während ein Wert geschrieben wird, ist der gemeldete Wert veraltet und zählt nicht."""
+        async def scenario():
+            store = {"VAR_IN_FSV_1011": 40}
+            recorder = Recorder(delay=0.05)
+            coalescer = CommandCoalescer(recorder, window=0.01, confirmed=store.get)
+            coalescer.submit("VAR_IN_FSV_1011", "45")
+            await asyncio.sleep(0.02)  # Schreibvorgang läuft
+            coalescer.submit("VAR_IN_FSV_1011", "40")
+            await coalescer.drain()
+            return recorder.batches
+
+        self.assertEqual(asyncio.run(scenario()), [[("VAR_IN_FSV_1011", "45")], [("VAR_IN_FSV_1011", "40")]])
+
+    def test_batches_stay_in_order(self):
+        """Ein späteres Fenster überholt einen langsamen früheren Schreibvorgang nicht."""
+        async def scenario():
+            recorder = Recorder(delay=0.03)
+            coalescer = CommandCoalescer(recorder, window=0)
+            coalescer.submit("VAR_IN_FSV_1011", "41")
+            coalescer.submit("VAR_IN_FSV_1011", "42")
+            await coalescer.drain()
+            return recorder.batches
+
+        self.assertEqual(asyncio.run(scenario()), [[("VAR_IN_FSV_1011", "41")], [("VAR_IN_FSV_1011", "42")]])
+
+    def test_multi_message_request_packet(self):
+        """Mehrere Werte gehen als ein Request-Paket raus, das der Parser wieder liest."""
+        pacer = BusPacer()
+        commands = [("NASA_POWER", 0x4000, 0, 1), ("VAR_IN_FSV_1011", 0x4254, 1, 450), ("NASA_INDOOR_OPMODE", 0x4001, 0, 4)]
+        sizes = {0: 1, 1: 2, 2: 4}
+        chunks = pacer.pack([(name, address >> 9 & 3, 2 + sizes[address >> 9 & 3]) for name, address, _, _ in commands],
+                            pacer.max_chunk_size)
+        self.assertEqual(len(chunks), 1)
+
+        encoder = NASAFrameEncoder.from_packet(build_request_packet())
+        by_name = {name: (address, value) for name, address, _, value in commands}
+        messages = [(by_name[x][0], by_name[x][0] >> 9 & 3, by_name[x][1].to_bytes(sizes[by_name[x][0] >> 9 & 3], 'big')) for x in chunks[0]]
+        frame = encoder.encode(messages, 7)
+        packet = NASAPacket()
+        packet.parse(frame)
+        self.assertEqual(packet.packet_data_type, DataType.Request)
+        self.assertEqual(packet.packet_number, 7)
+        self.assertEqual({m.packet_message for m in packet.packet_messages}, {0x4000, 0x4254, 0x4001})
+
+def run_benchmark():
+    """Frames für einen Slider-Burst mit 30 Werten auf eine Entität und 3 Entitäten gleichzeitig."""
+    async def scenario():
+        recorder = Recorder()
+        coalescer = CommandCoalescer(recorder, window=0.02)
+        for value in range(30):
+            coalescer.submit("VAR_IN_FSV_1011", str(40 + value % 10))
+            await asyncio.sleep(0.0005)
+        coalescer.submit("NASA_POWER", "ON")
+        coalescer.submit("DHW_POWER", "ON")
+        await coalescer.drain()
+        return recorder.batches
+
+    batches = asyncio.run(scenario())
+    before = 32 * 2  # bisher pro Befehl ein Request-Frame und ein Rücklese-Frame
+    after = len(batches) * 2
+    print("\n⏱️ Slider-Burst (30 SETs auf eine Entität + 2 weitere Entitäten):")
+    print(f"   Bisher, ein write_request pro Befehl: {before} Frames, je 1 s Pause vor dem Rücklesen")
+    print(f"   Zusammengefasst:                     {after} Frames in {len(batches)} Batch(es)")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für CommandCoalescer...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCommandCoalescer)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        run_benchmark()
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
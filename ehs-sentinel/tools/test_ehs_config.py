@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für die Validierung der EHSConfig.
+Prüft die Standardwerte des Bus-Abschnitts für die vom Addon erzeugte Konfiguration.
+"""
+
+import sys
+import os
+import yaml
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from EHSConfig import EHSConfig
+from EHSExceptions import ConfigException
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+def validated_config(bus: dict) -> EHSConfig:
+    """Validiert die Beispielkonfiguration mit eigenem Bus-Abschnitt, ohne das Singleton anzulegen."""
+    with open(os.path.join(DATA_DIR, 'config.yml')) as f:
+        config = yaml.safe_load(f)
+    config['general']['nasaRepositoryFile'] = os.path.join(DATA_DIR, 'NasaRepository.yml')
+    config['bus'] = bus
+    ehs_config = object.__new__(EHSConfig)
+    ehs_config._load_config(config)
+    ehs_config.validate()
+    return ehs_config
+
+class TestEHSConfig(unittest.TestCase):
+    """Test-Suite für EHSConfig.validate."""
+
+    def test_small_addon_max_chunk_size(self):
+        """Das Addon setzt nur maxChunkSize (bus_max_nachrichten), kleine Werte begrenzen die Startgröße."""
+        for max_chunk_size in (1, 5, 9):
+            bus = validated_config({'maxChunkSize': max_chunk_size, 'adaptive': True}).BUS
+            self.assertEqual(bus['chunkSize'], max_chunk_size)
+            self.assertEqual(bus['maxChunkSize'], max_chunk_size)
+
+        self.assertEqual(validated_config({'maxChunkSize': 60}).BUS['chunkSize'], 10)
+
+    def test_explicit_chunk_size_above_maximum_rejected(self):
+        """Eine ausdrücklich zu große chunkSize bleibt ein Konfigurationsfehler."""
+        with self.assertRaises(ConfigException):
+            validated_config({'chunkSize': 8, 'maxChunkSize': 5})
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für EHSConfig...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestEHSConfig)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den NASAFrameEncoder.
+Prüft die Byte-Gleichheit mit NASAPacket.to_raw() und vergleicht die Kosten eines
+Poll-Zyklus mit neu gebauten bzw. gecachten Frames.
+"""
+
+import sys
+import os
+import random
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from helpers import build_read_packet
+from NASAFrameEncoder import NASAFrameEncoder
+from NASAMessage import NASAMessage
+from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
+
+LIVE_DATA_ADDRESSES = [0x4000, 0x4001, 0x8001, 0x8204, 0x821A, 0x8206, 0x4237, 0x8238,
+                       0x8237, 0x8413, 0x42E9, 0x9999, 0x9998, 0x4046, 0x4065]
+
+def build_message(address: int) -> NASAMessage:
+    """Nachricht wie MessageProducer._build_message ohne Wert."""
+    msg = NASAMessage()
+    msg.set_packet_message(address)
+    size = (1, 2, 4, 4)[msg.packet_message_type]
+    msg.set_packet_payload_raw(bytes(size))
+    return msg
+
+def as_tuples(messages):
+    return [(m.packet_message, m.packet_message_type, m.packet_payload) for m in messages]
+
+class TestFrameEncoder(unittest.TestCase):
+    """Test-Suite für den NASAFrameEncoder."""
+
+    def test_read_request_matches_to_raw(self):
+        """Poll-Frames sind identisch zu NASAPacket.to_raw()."""
+        encoder = NASAFrameEncoder.from_packet(build_read_packet())
+        for chunk in (LIVE_DATA_ADDRESSES[:10], LIVE_DATA_ADDRESSES[10:], LIVE_DATA_ADDRESSES[:1]):
+            messages = [build_message(address) for address in chunk]
+            packet = build_read_packet()
+            packet.set_packet_messages(messages)
+            self.assertEqual(encoder.encode(as_tuples(messages)), bytes(packet.to_raw()))
+
+    def test_random_packets_match_to_raw(self):
+        """Beliebige Header, Nachrichtentypen und Payload-Längen werden wie bisher kodiert."""
+        rnd = random.Random(7)
+        classes = list(AddressClassEnum)
+        for _ in range(500):
+            packet = NASAPacket()
+            packet.set_packet_source_address_class(rnd.choice(classes))
+            packet.set_packet_source_channel(rnd.randrange(256))
+            packet.set_packet_source_address(rnd.randrange(256))
+            packet.set_packet_dest_address_class(rnd.choice(classes))
+            packet.set_packet_dest_channel(rnd.randrange(256))
+            packet.set_packet_dest_address(rnd.randrange(256))
+            packet.set_packet_information(rnd.random() < 0.5)
+            packet.set_packet_version(rnd.randrange(4))
+            packet.set_packet_retry_count(rnd.randrange(4))
+            packet.set_packet_type(rnd.choice(list(PacketType)))
+            packet.set_packet_data_type(rnd.choice(list(DataType)))
+            packet.set_packet_number(rnd.randrange(256))
+
+            messages = []
+            for _ in range(rnd.randint(1, 12)):
+                msg = NASAMessage()
+                msg.set_packet_message(rnd.randrange(0x10000))
+                # auch zu kurze und zu lange Payloads, to_raw schneidet auf die Typgröße zu
+                msg.set_packet_payload_raw(bytes(rnd.randrange(256) for _ in range(rnd.randint(1, 6))))
+                messages.append(msg)
+            packet.set_packet_messages(messages)
+
+            encoder = NASAFrameEncoder.from_packet(packet)
+            self.assertEqual(encoder.encode(as_tuples(messages)), bytes(packet.to_raw()))
+
+    def test_buffer_grows(self):
+        """Frames größer als der Puffer werden vollständig kodiert."""
+        encoder = NASAFrameEncoder(bytes([0x80, 0xFF, 0x00, 0xB2, 0x00, 0x20, 0xC0, 0x11, 0xA6]), buffer_size=16)
+        frame = encoder.encode([(0x4600, 3, bytes(range(200)))])
+        self.assertEqual(len(frame), 16 + 2 + 200)
+        parsed = NASAPacket()
+        parsed.parse(frame)
+        self.assertEqual(parsed.packet_messages[0].packet_payload, bytes(range(200)))
+
+    def test_invalid_header(self):
+        """Ein Header-Template muss genau 9 Bytes lang sein."""
+        with self.assertRaises(ValueError):
+            NASAFrameEncoder(bytes(8))
+
+def run_benchmark(cycles: int = 2000):
+    """Kosten eines live_data Poll-Zyklus (15 Sensoren, 2 Frames): neu bauen vs. Cache."""
+    chunks = [LIVE_DATA_ADDRESSES[i:i + 10] for i in range(0, len(LIVE_DATA_ADDRESSES), 10)]
+
+    def rebuild():
+        for chunk in chunks:
+            packet = build_read_packet()
+            packet.set_packet_messages([build_message(address) for address in chunk])
+            packet.to_raw()
+
+    encoder = NASAFrameEncoder.from_packet(build_read_packet())
+    cache = {}
+    key_source = list(LIVE_DATA_ADDRESSES)
+
+    def cached():
+        key = tuple(key_source)
+        frames = cache.get(key)
+        if frames is None:
+            frames = cache[key] = tuple(encoder.encode(as_tuples([build_message(a) for a in chunk])) for chunk in chunks)
+        for frame in frames:
+            pass
+
+    print(f"\n⏱️ live_data Poll-Zyklus ({cycles} Zyklen):")
+    for label, func in (("NASAPacket.to_raw", rebuild), ("gecachte Frames", cached)):
+        func()
+        start = time.perf_counter()
+        for _ in range(cycles):
+            func()
+        elapsed = (time.perf_counter() - start) / cycles
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+        print(f"   {label:<18} {elapsed * 1e6:8.2f} µs/Zyklus, Spitze {peak:6d} Bytes allokiert")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für NASAFrameEncoder...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestFrameEncoder)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    if success:
+        run_benchmark()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den NASAFrameReader.
+Prüft das Wiederaufsetzen nach Störbytes, ungültigen Längenfeldern und falschen Endbytes
+sowie Frames, die über mehrere Chunks verteilt ankommen.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from NASAFrameReader import NASAFrameReader
+
+def build_frame(body_length: int = 0, fill: int = 0x00, end: int = 0x34) -> bytes:
+    """Frame mit Startbyte, Längenfeld, Füllbytes und Endbyte (CRC wird vom Reader nicht geprüft)."""
+    length = NASAFrameReader.MIN_FRAME_LENGTH + body_length
+    size = length - 2
+    return bytes([0x32, size >> 8, size & 0xFF]) + bytes([fill]) * (length - 4) + bytes([end])
+
+class TestNASAFrameReader(unittest.TestCase):
+    """Test-Suite für NASAFrameReader."""
+
+    def test_garbage_before_start_byte(self):
+        """Bytes vor dem Startbyte werden verworfen, der folgende Frame bleibt erhalten."""
+        reader = NASAFrameReader()
+        frame = build_frame(4)
+        frames = reader.feed(b'\x01\xff\x34\x00' + frame)
+        self.assertEqual([bytes(f) for f in frames], [frame])
+        self.assertIsInstance(frames[0], memoryview)
+        self.assertEqual(reader.discarded_bytes, 4)
+
+    def test_bad_size_field(self):
+        """Zu große oder zu kleine Längenfelder werden übersprungen."""
+        reader = NASAFrameReader()
+        frame = build_frame(2)
+        frames = reader.feed(b'\x32\x01\x00' + b'\x32\x00\x05' + frame)
+        self.assertEqual([bytes(f) for f in frames], [frame])
+        self.assertEqual(reader.invalid_count, 0)
+        self.assertEqual(reader.discarded_bytes, 6)
+
+    def test_wrong_end_byte(self):
+        """Ein Kandidat ohne 0x34 am Ende wird gemeldet, danach wird ein Byte später weitergesucht."""
+        rejected = []
+        reader = NASAFrameReader(on_invalid=lambda frame, length: rejected.append((bytes(frame), length)))
+        bad = build_frame(0, end=0x00)
+        good = build_frame(3)
+        frames = reader.feed(bad + good)
+        self.assertEqual([bytes(f) for f in frames], [good])
+        self.assertEqual(rejected, [(bad, len(bad))])
+        self.assertEqual(reader.invalid_count, 1)
+
+        # ein gültiger Frame innerhalb des abgelehnten Kandidaten wird gefunden
+        inner = build_frame(0)
+        candidate = bytes([0x32, 0x00, len(inner) + 4]) + inner + b'\x00\x00\x00\x00'
+        frames = reader.feed(candidate)
+        self.assertEqual([bytes(f) for f in frames], [inner])
+
+    def test_frame_split_across_chunks(self):
+        """Frames, die an beliebiger Stelle auf zwei oder mehr Chunks verteilt sind, werden zusammengesetzt."""
+        first, second = build_frame(5, fill=0x11), build_frame(0, fill=0x22)
+        stream = b'\x00' + first + second
+        for cut in range(1, len(stream)):
+            reader = NASAFrameReader()
+            frames = reader.feed(stream[:cut]) + reader.feed(stream[cut:])
+            self.assertEqual([bytes(f) for f in frames], [first, second], f"Schnitt bei {cut}")
+
+        reader = NASAFrameReader()
+        frames = []
+        for pos in range(len(stream)):
+            frames += reader.feed(stream[pos:pos + 1])
+        self.assertEqual([bytes(f) for f in frames], [first, second])
+        self.assertEqual(reader.frame_count, 2)
+
+        reader.feed(first[:5])
+        reader.reset()
+        self.assertEqual([bytes(f) for f in reader.feed(second)], [second])
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für NASAFrameReader...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestNASAFrameReader)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den MQTT-Kommunikationsanalysator.
+Prüft die Zähler, die begrenzten Aufzeichnungen mit Stichprobe und die Zuordnung von
+SET-Kommandos zu STATE-Antworten.
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from MQTTCommunicationAnalyzer import (MQTTCommunicationAnalyzer, MQTTMessage, MQTTMessageType,
+                                       ValueConversion, ConversionDirection)
+
+def build_analyzer(**kwargs) -> MQTTCommunicationAnalyzer:
+    analyzer = MQTTCommunicationAnalyzer()
+    analyzer.configure(**kwargs)
+    return analyzer
+
+def state(analyzer: MQTTCommunicationAnalyzer, sensor: str, value):
+    analyzer.log_mqtt_message(f"ehsSentinel/entity/{sensor}/state", value, MQTTMessageType.STATE_UPDATE, sensor_name=sensor)
+
+def set_command(analyzer: MQTTCommunicationAnalyzer, sensor: str, value):
+    analyzer.log_mqtt_message(f"ehsSentinel/entity/{sensor}/set", value, MQTTMessageType.SET_COMMAND, sensor_name=sensor)
+
+class TestMQTTCommunicationAnalyzer(unittest.TestCase):
+    """Test-Suite für MQTTCommunicationAnalyzer."""
+
+    def test_counters_exact_and_stores_bounded(self):
+        """Zähler erfassen jede Nachricht, die Aufzeichnungen bleiben auf ihre Größe begrenzt."""
+        analyzer = build_analyzer(sample_rate=1, max_messages=10, max_flows=5)
+        for value in range(100):
+            state(analyzer, "NASA_OUTDOOR_TW1_TEMP", value)
+        analyzer.log_mqtt_message("homeassistant/sensor/x/config", "{}", MQTTMessageType.DISCOVERY)
+
+        stats = analyzer.get_communication_stats()
+        self.assertEqual(stats["message_stats"]["total_messages"], 101)
+        self.assertEqual(stats["message_stats"]["messages_last_hour"], 101)
+        self.assertEqual(stats["message_stats"]["by_type"]["state_update"], 100)
+        self.assertEqual(stats["message_stats"]["by_type"]["discovery"], 1)
+        self.assertEqual(stats["flow_stats"]["spontaneous_flows"], 100)
+        self.assertEqual(len(analyzer.messages), 10)
+        self.assertEqual(len(analyzer.communication_flows), 5)
+        self.assertEqual(analyzer.messages[-1].message_type, MQTTMessageType.DISCOVERY)
+
+    def test_sampling_keeps_every_failure(self):
+        """Erfolgreiche Konvertierungen werden als Stichprobe aufbewahrt, Fehler immer."""
+        analyzer = build_analyzer(sample_rate=0.1)
+        for value in range(100):
+            analyzer.log_value_conversion("NASA_EHSSENTINEL_COP", value, value / 10,
+                                          ConversionDirection.DECIMAL_TO_HEX)
+        analyzer.log_value_conversion("NASA_POWER", "X", None, ConversionDirection.HEX_TO_DECIMAL,
+                                      success=False, error_message="ungültig")
+
+        stats = analyzer.get_communication_stats()
+        self.assertEqual(stats["conversion_stats"]["successful_conversions"], 100)
+        self.assertEqual(stats["conversion_stats"]["failed_conversions"], 1)
+        self.assertAlmostEqual(stats["conversion_stats"]["conversion_success_rate"], 99.01)
+        self.assertEqual(len(analyzer.conversions), 11)
+        self.assertEqual(stats["recent_errors"][0]["sensor"], "NASA_POWER")
+
+        history = analyzer.get_sensor_communication_history("NASA_EHSSENTINEL_COP")
+        self.assertEqual(history["counters"]["conversions"], 100)
+        self.assertEqual(len(history["conversions"]), 10)
+
+        analyzer.configure(sample_rate=0)
+        state(analyzer, "NASA_OUTDOOR_TW1_TEMP", 30.0)
+        self.assertEqual(len(analyzer.messages), 0)
+        self.assertEqual(analyzer.get_communication_stats()["message_stats"]["total_messages"], 1)
+
+    def test_interleaved_streams_sampled_separately(self):
+        """Abwechselnde Konvertierungen und Nachrichten werden je Art für sich als Stichprobe aufbewahrt."""
+        analyzer = build_analyzer(sample_rate=0.5)
+        for value in range(100):
+            analyzer.log_value_conversion("NASA_OUTDOOR_TW1_TEMP", value, value / 10,
+                                          ConversionDirection.HEX_TO_DECIMAL)
+            state(analyzer, "NASA_OUTDOOR_TW1_TEMP", value / 10)
+        self.assertEqual(len(analyzer.conversions), 50)
+        self.assertEqual(len(analyzer.messages), 50)
+
+    def test_set_state_flow_matching(self):
+        """STATE-Antworten schließen den offenen SET des Sensors, ein neuerer SET ersetzt den alten."""
+        analyzer = build_analyzer(sample_rate=0)
+        set_command(analyzer, "NASA_INDOOR_DHW_SET_TEMP", "48")
+        set_command(analyzer, "NASA_INDOOR_DHW_SET_TEMP", "50")
+        set_command(analyzer, "NASA_POWER", "ON")
+        self.assertEqual(list(analyzer.pending_commands), ["NASA_INDOOR_DHW_SET_TEMP", "NASA_POWER"])
+
+        state(analyzer, "NASA_INDOOR_DHW_SET_TEMP", 50.0)
+        state(analyzer, "NASA_POWER", "OFF")
+        state(analyzer, "NASA_OUTDOOR_TW1_TEMP", 30.0)
+
+        stats = analyzer.get_communication_stats()["flow_stats"]
+        self.assertEqual(stats["command_flows"], 3)
+        self.assertEqual(stats["superseded_commands"], 1)
+        self.assertEqual(stats["successful_flows"], 1)
+        self.assertEqual(stats["failed_flows"], 1)
+        self.assertEqual(stats["spontaneous_flows"], 1)
+        self.assertEqual(stats["success_rate"], 50.0)
+        self.assertEqual(sum(stats["response_time_histogram_ms"].values()), 2)
+        self.assertEqual(stats["response_time_histogram_ms"]["<=10"], 2)
+        self.assertEqual(len(analyzer.pending_commands), 0)
+        # SET-Flows werden unabhängig von der Stichprobe aufgezeichnet
+        self.assertEqual(len(analyzer.communication_flows), 3)
+
+    def test_pending_commands_expire(self):
+        """SET-Kommandos ohne Antwort gelten nach command_timeout als fehlgeschlagen."""
+        analyzer = build_analyzer(command_timeout=30)
+        set_command(analyzer, "NASA_POWER", "ON")
+        set_command(analyzer, "NASA_INDOOR_DHW_SET_TEMP", "50")
+        analyzer.pending_commands["NASA_POWER"].set_command.timestamp = datetime.fromtimestamp(time.time() - 60)
+
+        stats = analyzer.get_communication_stats()
+        self.assertEqual(stats["message_stats"]["pending_commands"], 1)
+        self.assertEqual(stats["flow_stats"]["failed_flows"], 1)
+        self.assertIn("Timeout", stats["recent_errors"][0]["message"])
+
+        # eine späte Antwort ist spontan und zählt nicht zum abgelaufenen Flow
+        state(analyzer, "NASA_POWER", "ON")
+        self.assertEqual(analyzer.stats["spontaneous_flows"], 1)
+        self.assertEqual(analyzer.stats["successful_flows"], 0)
+
+def run_benchmark(hours: int = 2, messages_per_second: int = 5):
+    """Laufzeit und Speicherspitze gegenüber Listen, die erst vom stündlichen Cleanup gekürzt werden."""
+    total = hours * 3600 * messages_per_second
+
+    def legacy():
+        # bisheriger Ablauf: Nachrichten auf 1000 gekürzt, Konvertierungen bis zum Cleanup (24 h) in einer Liste
+        messages, conversions = [], []
+        for i in range(total):
+            now = datetime.now()
+            messages.append(MQTTMessage(topic="ehsSentinel/entity/NASA_OUTDOOR_TW1_TEMP/state", payload=i,
+                                        timestamp=now, message_type=MQTTMessageType.STATE_UPDATE,
+                                        sensor_name="NASA_OUTDOOR_TW1_TEMP"))
+            if len(messages) > 1000:
+                messages = messages[-1000:]
+            conversions.append(ValueConversion(original_value=i, converted_value=i / 10,
+                                               conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                                               timestamp=now, sensor_name="NASA_OUTDOOR_TW1_TEMP"))
+
+    def counters():
+        analyzer = build_analyzer()
+        for i in range(total):
+            state(analyzer, "NASA_OUTDOOR_TW1_TEMP", i)
+            analyzer.log_value_conversion("NASA_OUTDOOR_TW1_TEMP", i, i / 10, ConversionDirection.HEX_TO_DECIMAL)
+
+    print(f"\n⏱️ {total} STATE-Nachrichten mit Konvertierung ({hours} h bei {messages_per_second}/s):")
+    for name, run in (("Listen", legacy), ("Zähler", counters)):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        # Speicher in einem zweiten Lauf, tracemalloc verfälscht die Laufzeit
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"   {name:<7} {elapsed / total * 1e6:>6.2f} µs/Nachricht, Speicherspitze {peak / 1024 / 1024:>6.1f} MiB")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für MQTTCommunicationAnalyzer...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestMQTTCommunicationAnalyzer)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        run_benchmark()
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den MQTT PublishScheduler.
+Prüft Zusammenfassen pro Topic, Änderungserkennung mit Totzone und Heartbeat sowie QoS pro Sensor.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from MQTTPublishScheduler import ChangeFilter, PublishScheduler
+
+class TestPublishScheduler(unittest.IsolatedAsyncioTestCase):
+    """Test-Suite für den PublishScheduler."""
+
+    def setUp(self):
+        self.published = []
+
+    def publish(self, name, topic, value, qos):
+        self.published.append((name, topic, value, qos))
+
+    async def test_coalesce_within_window(self):
+        """Mehrere Updates eines Topics im Fenster ergeben einen Publish mit dem letzten Wert."""
+        scheduler = PublishScheduler(self.publish, window=0.05)
+        for value in (1.0, 2.0, 3.0):
+            scheduler.submit("NASA_EHSSENTINEL_COP", "ehsSentinel/nasaEhssentinelCop", value)
+        scheduler.submit("NASA_OUTDOOR_TW1_TEMP", "ehsSentinel/nasaOutdoorTw1Temp", 25.5)
+        self.assertEqual(self.published, [])
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.published, [
+            ("NASA_EHSSENTINEL_COP", "ehsSentinel/nasaEhssentinelCop", 3.0, 2),
+            ("NASA_OUTDOOR_TW1_TEMP", "ehsSentinel/nasaOutdoorTw1Temp", 25.5, 2),
+        ])
+        stats = scheduler.get_stats()
+        self.assertEqual(stats['coalesced'], 2)
+        self.assertEqual(stats['published'], 2)
+
+    async def test_window_zero_publishes_immediately(self):
+        """Mit Fenster 0 wird jeder Wert sofort veröffentlicht."""
+        scheduler = PublishScheduler(self.publish, window=0)
+        scheduler.submit("A", "t/a", 1)
+        scheduler.submit("A", "t/a", 2)
+        self.assertEqual([p[2] for p in self.published], [1, 2])
+
+    async def test_deadband(self):
+        """Werte innerhalb der Totzone werden übersprungen, Texte nur bei Gleichheit."""
+        change_filter = ChangeFilter(deadband=0, sensor_deadband={"TEMP": 0.5})
+        scheduler = PublishScheduler(self.publish, window=0, change_filter=change_filter)
+        for value in (20.0, 20.3, 20.6, 20.6):
+            scheduler.submit("TEMP", "t/temp", value)
+        for value in ("ON", "ON", "OFF"):
+            scheduler.submit("POWER", "t/power", value)
+
+        self.assertEqual([p[2] for p in self.published], [20.0, 20.6, "ON", "OFF"])
+        self.assertEqual(scheduler.get_stats()['skipped_deadband'], 3)
+
+    async def test_no_deadband_by_default(self):
+        """Ohne Totzone werden auch unveränderte Werte veröffentlicht."""
+        scheduler = PublishScheduler(self.publish, window=0)
+        scheduler.submit("A", "t/a", 1)
+        scheduler.submit("A", "t/a", 1)
+        self.assertEqual(len(self.published), 2)
+
+    async def test_sensor_qos(self):
+        """Die QoS kann pro Sensor abweichen."""
+        scheduler = PublishScheduler(self.publish, window=0, qos=1, sensor_qos={"FAST": 0})
+        scheduler.submit("FAST", "t/fast", 1)
+        scheduler.submit("SLOW", "t/slow", 1)
+        self.assertEqual([p[3] for p in self.published], [0, 1])
+        self.assertEqual(scheduler.get_stats()['published_by_qos'], {0: 1, 1: 1, 2: 0})
+
+    async def test_publish_error_does_not_store_value(self):
+        """Schlägt der Publish fehl, wird der Wert beim nächsten Mal erneut gesendet."""
+        calls = []
+
+        def failing_publish(name, topic, value, qos):
+            calls.append(value)
+            if len(calls) == 1:
+                raise ConnectionError("Broker nicht erreichbar")
+
+        scheduler = PublishScheduler(failing_publish, window=0, change_filter=ChangeFilter(deadband=0))
+        scheduler.submit("A", "t/a", 1)
+        scheduler.submit("A", "t/a", 1)
+        self.assertEqual(calls, [1, 1])
+
+class TestChangeFilter(unittest.TestCase):
+    """Test-Suite für die Änderungserkennung."""
+
+    def setUp(self):
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    def test_relative_deadband(self):
+        """Die relative Totzone skaliert mit dem zuletzt veröffentlichten Wert."""
+        change_filter = ChangeFilter(deadband={'absolute': 5, 'relative': 0.02}, clock=self.clock)
+        change_filter.mark_published("t/power", 2000)
+        self.assertIsNone(change_filter.check("t/power", "POWER", 2039))
+        self.assertEqual(change_filter.check("t/power", "POWER", 2041), 'change')
+
+        change_filter.mark_published("t/power", 100)
+        self.assertIsNone(change_filter.check("t/power", "POWER", 105))
+        self.assertEqual(change_filter.check("t/power", "POWER", 106), 'change')
+
+    def test_heartbeat(self):
+        """Unveränderte Werte werden nach Ablauf des Heartbeats erneut gesendet."""
+        change_filter = ChangeFilter(deadband=0, heartbeat=300, clock=self.clock)
+        change_filter.mark_published("t/temp", 21.5)
+        self.now = 299
+        self.assertIsNone(change_filter.check("t/temp", "TEMP", 21.5))
+        self.now = 300
+        self.assertEqual(change_filter.check("t/temp", "TEMP", 21.5), 'heartbeat')
+
+    def test_lookup_order(self):
+        """Sensor-Totzone vor Gruppen-Totzone vor Standard, None schaltet die Erkennung ab."""
+        change_filter = ChangeFilter(
+            deadband=0,
+            sensor_deadband={"TW1": 1.0, "COP": None},
+            group_deadband={"temperature": 0.5},
+            sensor_groups={"TW1": "temperature", "TW2": "temperature"}
+        )
+        self.assertEqual(change_filter.deadband_for("TW1"), (1.0, 0.0))
+        self.assertEqual(change_filter.deadband_for("TW2"), (0.5, 0.0))
+        self.assertEqual(change_filter.deadband_for("POWER"), (0.0, 0.0))
+        self.assertIsNone(change_filter.deadband_for("COP"))
+
+        change_filter.mark_published("t/cop", 3.2)
+        self.assertEqual(change_filter.check("t/cop", "COP", 3.2), 'change')
+
+    def test_poll_cycle_reduction(self):
+        """Ein Abfragezyklus mit überwiegend unveränderten Werten erzeugt kaum Publishes."""
+        published = []
+        change_filter = ChangeFilter(deadband=0, heartbeat=300, clock=self.clock)
+        scheduler = PublishScheduler(lambda *args: published.append(args), window=0, change_filter=change_filter)
+
+        for cycle in range(41):  # 10 Minuten mit 15 s Abfrageintervall
+            self.now = cycle * 15
+            scheduler.submit("POWER", "t/power", "ON")
+            scheduler.submit("TEMP", "t/temp", 21.5 if cycle < 20 else 22.0)
+
+        stats = scheduler.get_stats()
+        self.assertEqual(stats['submitted'], 82)
+        # POWER: erster Wert + 2 Heartbeats, TEMP: erster Wert, Änderung, 1 Heartbeat
+        self.assertEqual(stats['published'], 6)
+        self.assertEqual(stats['heartbeats'], 3)
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für PublishScheduler...")
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite([
+        loader.loadTestsFromTestCase(TestPublishScheduler),
+        loader.loadTestsFromTestCase(TestChangeFilter)
+    ])
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
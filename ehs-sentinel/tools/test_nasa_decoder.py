@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für die vorkompilierten NASA-Decoder.
+Prüft, dass die Decoder für jeden Eintrag des NASA Repository dieselben Werte liefern wie die
+frühere Interpretation in MessageProcessor.determine_value, und misst den Durchsatz beider Wege.
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import logging
+import unittest
+import yaml
+from CustomLogger import logger
+from NASADecoder import build_decoders, message_type_of, is_valid_rawvalue
+from SafeArithmetic import safe_eval_arithmetic
+from MQTTCommunicationAnalyzer import mqtt_analyzer, ConversionDirection
+
+# Unbekannte Enum-Werte werden bewusst getestet, deren Warnungen sind hier nur Rauschen
+logger.setLevel(logging.CRITICAL)
+
+REPO_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'NasaRepository.yml')
+PAYLOAD_SIZES = {0: 1, 1: 2, 2: 4}
+
+def load_repo():
+    with open(REPO_FILE, 'r') as f:
+        return yaml.safe_load(f)
+
+def legacy_determine_value(nasa_repo, rawvalue, msgname, packet_message_type):
+    """Die frühere Interpretation aus MessageProcessor.determine_value."""
+    if packet_message_type == 3:
+        value = ""
+
+        if is_valid_rawvalue(rawvalue[1:-1]):
+            for byte in rawvalue[1:-1]:
+                if byte != 0x00 and byte != 0xFF:
+                    char = chr(byte) if 32 <= byte <= 126 else f"{byte}"
+                    value += char
+                else:
+                    value += " "
+            value = value.strip()
+        else:
+            value = "".join([f"{int(x)}" for x in rawvalue])
+
+        mqtt_analyzer.log_value_conversion(
+            sensor_name=msgname,
+            original_value=rawvalue.hex(),
+            converted_value=value,
+            conversion_type=ConversionDirection.BYTES_TO_STRING,
+            success=True
+        )
+    else:
+        if 'arithmetic' in nasa_repo[msgname]:
+            arithmetic = nasa_repo[msgname]['arithmetic']
+            if 'packed_value' not in arithmetic:
+                arithmetic = arithmetic.replace("value", 'packed_value')
+        else:
+            arithmetic = ''
+
+        packed_value = int.from_bytes(rawvalue, byteorder='big', signed=True)
+
+        if len(arithmetic) > 0:
+            try:
+                value = safe_eval_arithmetic(arithmetic, packed_value=packed_value)
+                mqtt_analyzer.log_value_conversion(
+                    sensor_name=msgname,
+                    original_value=packed_value,
+                    converted_value=value,
+                    conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                    success=True
+                )
+            except Exception as e:
+                value = packed_value
+                mqtt_analyzer.log_value_conversion(
+                    sensor_name=msgname,
+                    original_value=packed_value,
+                    converted_value=value,
+                    conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                    success=False,
+                    error_message=f"Arithmetic error: {e}"
+                )
+        else:
+            value = packed_value
+
+        value = round(value, 3)
+
+        if 'type' in nasa_repo[msgname]:
+            if nasa_repo[msgname]['type'] == 'ENUM':
+                if 'enum' in nasa_repo[msgname]:
+                    raw_value = int.from_bytes(rawvalue, byteorder='big')
+                    if raw_value in nasa_repo[msgname]['enum']:
+                        enum_value = nasa_repo[msgname]['enum'][raw_value]
+                        mqtt_analyzer.log_value_conversion(
+                            sensor_name=msgname,
+                            original_value=raw_value,
+                            converted_value=enum_value,
+                            conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                            success=True
+                        )
+                        value = enum_value
+                    else:
+                        logger.warning(f"Unknown enum value {raw_value} for {msgname}, using raw value")
+                        value = raw_value
+                        mqtt_analyzer.log_value_conversion(
+                            sensor_name=msgname,
+                            original_value=raw_value,
+                            converted_value=value,
+                            conversion_type=ConversionDirection.HEX_TO_DECIMAL,
+                            success=False,
+                            error_message=f"Unknown enum value: {raw_value}"
+                        )
+                else:
+                    value = f"Unknown enum value: {value}"
+
+    return value
+
+def sample_payloads(repo_entry, message_type, rnd):
+    """Erzeugt typische und Grenzwert-Payloads für einen Repository-Eintrag."""
+    if message_type == 3:
+        return [
+            b'\x00' + b'AE160JXEDEH/EU' + b'\x00',
+            b'\x00' + b'  MODEL 12\xff\xff' + b'\x00',
+            bytes([1, 2, 3, 200, 201, 4]),
+            b'',
+        ]
+
+    size = PAYLOAD_SIZES[message_type]
+    bits = size * 8
+    values = [0, 1, -1, 2 ** (bits - 1) - 1, -(2 ** (bits - 1))]
+    values += [rnd.randrange(-(2 ** (bits - 1)), 2 ** (bits - 1)) for _ in range(20)]
+    payloads = [v.to_bytes(size, byteorder='big', signed=True) for v in values]
+    for key in repo_entry.get('enum', {}) or {}:
+        if isinstance(key, int) and 0 <= key < 2 ** bits:
+            payloads.append(key.to_bytes(size, byteorder='big'))
+    return payloads
+
+def build_cases():
+    rnd = random.Random(4711)
+    repo = load_repo()
+    cases = []
+    for msgname, repo_entry in repo.items():
+        message_type = message_type_of(int(repo_entry['address'], 16))
+        for payload in sample_payloads(repo_entry, message_type, rnd):
+            cases.append((msgname, message_type, payload))
+    return repo, cases
+
+class TestNASADecoder(unittest.TestCase):
+    """Parität zwischen vorkompilierten Decodern und der früheren Interpretation."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.repo, cls.cases = build_cases()
+        cls.decoders = build_decoders(cls.repo)
+
+    def test_decoder_for_every_entry(self):
+        """Für jeden Repository-Eintrag existiert ein Decoder."""
+        self.assertEqual(set(self.decoders), set(self.repo))
+
+    def test_parity_with_legacy_interpretation(self):
+        """Alle Einträge und Payloads liefern identische Werte und Typen."""
+        for msgname, message_type, payload in self.cases:
+            with self.subTest(sensor=msgname, payload=payload.hex()):
+                expected = legacy_determine_value(self.repo, payload, msgname, message_type)
+                actual = self.decoders[msgname](payload)
+                self.assertEqual(actual, expected)
+                self.assertIs(type(actual), type(expected))
+
+    def test_enum_values(self):
+        """ENUM-Einträge liefern den Klartext bzw. den Rohwert bei unbekannten Werten."""
+        decode = self.decoders['NASA_POWER']
+        self.assertEqual(decode(b'\x01'), "ON")
+        self.assertEqual(decode(b'\x00'), "OFF")
+        self.assertEqual(decode(b'\x07'), 7)
+
+    def test_arithmetic_values(self):
+        """Arithmetik wird angewendet und auf drei Stellen gerundet."""
+        name = next(k for k, v in self.repo.items() if v.get('arithmetic') == 'packed_value / 10'
+                    and message_type_of(int(v['address'], 16)) == 1)
+        self.assertEqual(self.decoders[name]((235).to_bytes(2, byteorder='big', signed=True)), 23.5)
+        self.assertEqual(self.decoders[name]((-15).to_bytes(2, byteorder='big', signed=True)), -1.5)
+
+def run_benchmark(rounds: int = 20):
+    """Misst den Durchsatz über alle Repository-Einträge für beide Wege."""
+    repo, cases = build_cases()
+    decoders = build_decoders(repo)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for msgname, message_type, payload in cases:
+            legacy_determine_value(repo, payload, msgname, message_type)
+        mqtt_analyzer.conversions.clear()
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for msgname, _, payload in cases:
+            decoders[msgname](payload)
+        mqtt_analyzer.conversions.clear()
+    compiled = time.perf_counter() - start
+
+    total = rounds * len(cases)
+    print(f"\n⏱️ Decoder-Benchmark ({len(repo)} Einträge, {total} Werte):")
+    print(f"   Interpretiert: {total / legacy:>12,.0f} Werte/s")
+    print(f"   Kompiliert:    {total / compiled:>12,.0f} Werte/s ({legacy / compiled:.1f}x)")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für NASADecoder...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestNASADecoder)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    if success:
+        run_benchmark()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für die vorkompilierten NASA-Encoder des Schreibpfads.
+Prüft, dass die Encoder für jeden Eintrag des NASA Repository dieselben Payloads erzeugen wie die
+frühere Kombination aus MessageProducer._decode_value und _build_message, und misst den Durchsatz
+von SET-Kommandos (Wert -> fertiger Frame) für beide Wege.
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import logging
+import unittest
+import yaml
+from CustomLogger import logger
+from helpers import build_request_packet
+from NASAEncoder import SensorEncoder, build_encoders
+from NASAFrameEncoder import NASAFrameEncoder
+from NASAMessage import NASAMessage
+from SafeArithmetic import safe_eval_arithmetic
+
+# Ungültige Werte werden bewusst getestet, deren Warnungen sind hier nur Rauschen
+logger.setLevel(logging.CRITICAL)
+
+REPO_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'NasaRepository.yml')
+
+def load_repo():
+    with open(REPO_FILE, 'r') as f:
+        repo = yaml.safe_load(f)
+    addresses = {name: int(entry['address'], 16) for name, entry in repo.items()}
+    return repo, addresses
+
+def legacy_decode_value(nasa_repo, message, value) -> int:
+    """Das frühere MessageProducer._decode_value (ohne Logging)."""
+    try:
+        if not isinstance(value, str):
+            value = str(value)
+
+        enumval = None
+        try:
+            if 'type' in nasa_repo[message] and nasa_repo[message]['type'] == 'ENUM':
+                if 'enum' in nasa_repo[message]:
+                    for key, val in nasa_repo[message]['enum'].items():
+                        if val == value:
+                            enumval = key
+                            break
+        except Exception:
+            pass
+
+        if enumval is None:
+            try:
+                float(value)
+                is_number = True
+            except (ValueError, TypeError):
+                is_number = False
+            if is_number:
+                try:
+                    numeric_value = int(float(value))
+                except (ValueError, TypeError):
+                    numeric_value = 0
+
+                if 'reverse-arithmetic' in nasa_repo[message]:
+                    arithmetic = nasa_repo[message]['reverse-arithmetic']
+                    try:
+                        return int(safe_eval_arithmetic(arithmetic, value=numeric_value))
+                    except Exception:
+                        return numeric_value
+                else:
+                    return numeric_value
+            else:
+                return 0
+        else:
+            return int(enumval)
+    except Exception:
+        return 0
+
+def legacy_build_message(addresses, message, value=None) -> NASAMessage:
+    """Das frühere MessageProducer._build_message (ohne Logging)."""
+    tmpmsg = NASAMessage()
+    tmpmsg.set_packet_message(addresses.get(message, 0))
+    if value is None:
+        value = 0
+    if not isinstance(value, int):
+        try:
+            value = int(float(value)) if isinstance(value, str) else int(value)
+        except (ValueError, TypeError):
+            value = 0
+    sizes = {0: 1, 1: 2, 2: 4}
+    if tmpmsg.packet_message_type == 3:
+        value_raw = b'\x00\x00\x00\x00'
+    else:
+        try:
+            value_raw = value.to_bytes(sizes[tmpmsg.packet_message_type], byteorder='big', signed=True)
+        except (OverflowError, ValueError):
+            value_raw = (0).to_bytes(sizes[tmpmsg.packet_message_type], byteorder='big', signed=True)
+    tmpmsg.set_packet_payload_raw(value_raw)
+    return tmpmsg
+
+def sample_values(repo_entry, rnd):
+    """Typische, ungültige und Grenzwerte für SET-Kommandos."""
+    values = ["0", "1", "-1", "21.5", " 42 ", "abc", "", "nan", "1e3", "70000", "-40000",
+              "3000000000", 17, 2.5, True]
+    values += [str(rnd.randrange(-100000, 100000)) for _ in range(10)]
+    for val in (repo_entry.get('enum') or {}).values():
+        values.append(val)
+    return values
+
+class TestNASAEncoder(unittest.TestCase):
+    """Parität zwischen vorkompilierten Encodern und dem früheren Schreibpfad."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.repo, cls.addresses = load_repo()
+        cls.encoders = build_encoders(cls.addresses, cls.repo)
+
+    def test_encoder_for_every_entry(self):
+        """Für jeden Repository-Eintrag existiert ein Encoder."""
+        self.assertEqual(set(self.encoders), set(self.repo))
+
+    def test_parity_with_legacy_write_path(self):
+        """Alle Einträge und Werte liefern identische Rohwerte und Payloads."""
+        rnd = random.Random(4711)
+        for name, repo_entry in self.repo.items():
+            encoder = self.encoders[name]
+            for value in sample_values(repo_entry, rnd):
+                with self.subTest(sensor=name, value=value):
+                    expected = legacy_decode_value(self.repo, name, value)
+                    self.assertEqual(encoder.encode_value(value), expected)
+                    legacy = legacy_build_message(self.addresses, name, expected)
+                    self.assertEqual(encoder.encode(value), (legacy.packet_message, legacy.packet_message_type, legacy.packet_payload))
+
+    def test_poll_payload(self):
+        """Ohne Wert entsteht der Poll-Payload wie bisher."""
+        for name, encoder in self.encoders.items():
+            legacy = legacy_build_message(self.addresses, name)
+            self.assertEqual(encoder.payload(), legacy.packet_payload)
+
+    def test_enum_and_reverse_arithmetic(self):
+        """Enum-Texte werden zu Codes, reverse-arithmetic wird angewendet."""
+        self.assertEqual(self.encoders['NASA_POWER'].encode_value("ON"), 1)
+        self.assertEqual(self.encoders['NASA_INDOOR_OPMODE'].encode_value("HEAT"), 1)
+        self.assertEqual(self.encoders['VAR_IN_TEMP_WATER_LAW_TARGET_F'].encode_value("35"), 350)
+
+    def test_unknown_message_falls_back_to_address_zero(self):
+        """Unbekannte Nachrichten werden wie bisher mit Adresse 0 gebaut."""
+        encoder = SensorEncoder("UNKNOWN", 0, {})
+        self.assertEqual(encoder.encode("5"), (0, 0, b'\x05'))
+
+def run_benchmark(commands: int = 20000):
+    """Durchsatz von SET-Kommandos: Wert -> fertiger Frame."""
+    repo, addresses = load_repo()
+    writable = [name for name, entry in repo.items() if (entry.get('hass_opts') or {}).get('writable')]
+    rnd = random.Random(1)
+    workload = []
+    for _ in range(commands):
+        name = rnd.choice(writable)
+        enum = repo[name].get('enum') or {}
+        workload.append((name, rnd.choice(list(enum.values())) if enum else str(rnd.randrange(10, 60))))
+
+    start = time.perf_counter()
+    for name, value in workload:
+        decoded = legacy_decode_value(repo, name, value)
+        packet = build_request_packet()
+        packet.set_packet_messages([legacy_build_message(addresses, name, decoded)])
+        packet.to_raw()
+    legacy = time.perf_counter() - start
+
+    encoders = build_encoders(addresses, repo)
+    frame_encoder = NASAFrameEncoder.from_packet(build_request_packet())
+    start = time.perf_counter()
+    for name, value in workload:
+        frame_encoder.encode([encoders[name].encode(value)])
+    compiled = time.perf_counter() - start
+
+    print(f"\n⏱️ SET-Benchmark ({len(writable)} schreibbare Einträge, {commands} Kommandos):")
+    print(f"   Bisher:       {commands / legacy:>10,.0f} Kommandos/s")
+    print(f"   Kompiliert:   {commands / compiled:>10,.0f} Kommandos/s ({legacy / compiled:.1f}x)")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für NASAEncoder...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestNASAEncoder)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    if success:
+        run_benchmark()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den PacketMonitor.
+Prüft die Stunden- und Tages-Buckets im Ring, die Berichte aus den Buckets und das
+Speichern und Laden der Statistiken.
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from helpers import FakeClock
+from PacketMonitor import PacketMonitor
+
+def build_monitor(directory: str, clock: FakeClock) -> PacketMonitor:
+    """Eigene Instanz statt des Singletons, Dateien im Testverzeichnis."""
+    monitor_class = type("TestPacketMonitor", (PacketMonitor,), {
+        "_instance": None,
+        "_stats_file": os.path.join(directory, "packet_stats.json"),
+        "_report_file": os.path.join(directory, "packet_reports.json")
+    })
+    return monitor_class(clock=clock)
+
+def log_packets(monitor: PacketMonitor, valid: int, invalid: int):
+    for _ in range(valid):
+        monitor.log_valid_packet()
+    for _ in range(invalid):
+        monitor.log_invalid_packet("Packet does not end with an x34", [], b"")
+
+class TestPacketMonitor(unittest.TestCase):
+    """Test-Suite für PacketMonitor."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        # Montag, 12.10.2026 10:15 Ortszeit
+        self.clock = FakeClock(time.mktime((2026, 10, 12, 10, 15, 0, 0, 0, -1)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_hour_and_day_buckets(self):
+        """Pakete landen im Bucket ihrer Stunde und ihres Tages, Raten werden beim Lesen berechnet."""
+        monitor = build_monitor(self.directory.name, self.clock)
+        log_packets(monitor, 90, 10)
+        self.clock.now += 3600
+        log_packets(monitor, 50, 50)
+
+        stats = monitor.get_stats()
+        self.assertEqual(stats["total_packets"], 200)
+        self.assertAlmostEqual(stats["error_rate"], 0.3)
+        self.assertEqual(list(stats["hourly"]), ["2026-10-12 10:00", "2026-10-12 11:00"])
+        self.assertEqual(stats["hourly"]["2026-10-12 10:00"],
+                         {"total": 100, "valid": 90, "invalid": 10, "error_rate": 0.1})
+        self.assertAlmostEqual(stats["hourly"]["2026-10-12 11:00"]["error_rate"], 0.5)
+        self.assertEqual(stats["daily"]["2026-10-12"]["total"], 200)
+
+    def test_rings_stay_bounded(self):
+        """Nach 60 Tagen enthalten die Statistiken nur die Stunden und Tage der Ringe."""
+        monitor = build_monitor(self.directory.name, self.clock)
+        for _ in range(60 * 24):
+            log_packets(monitor, 1, 0)
+            self.clock.now += 3600
+
+        stats = monitor.get_stats()
+        self.assertEqual(len(stats["hourly"]), PacketMonitor.HOURS_KEPT)
+        self.assertEqual(len(stats["daily"]), PacketMonitor.DAYS_KEPT)
+        self.assertEqual(stats["daily"]["2026-12-10"]["total"], 24)
+        self.assertNotIn("2026-10-12", stats["daily"])
+        self.assertEqual(stats["total_packets"], 60 * 24)
+
+    def test_reports_read_buckets(self):
+        """Berichte nehmen die abgelaufene Stunde, den Vortag und die letzten sieben Tage."""
+        monitor = build_monitor(self.directory.name, self.clock)
+        for day in range(7):
+            log_packets(monitor, 80 + day, 20 - day)
+            self.clock.now += 86400
+        log_packets(monitor, 5, 5)
+
+        # kurz vor der vollen Stunde aufgewacht, berichtet wird trotzdem die ablaufende Stunde
+        self.clock.now = time.mktime((2026, 10, 19, 10, 59, 59, 0, 0, -1))
+        hourly = monitor._create_hourly_report()
+        self.assertEqual(hourly["hour"], "2026-10-19 10:00")
+        self.assertEqual(hourly["data"]["total"], 10)
+        self.assertTrue(hourly["threshold_exceeded"])
+
+        self.clock.now = time.mktime((2026, 10, 19, 0, 0, 1, 0, 0, -1))
+        daily = monitor._create_daily_report()
+        self.assertEqual(daily["date"], "2026-10-18")
+        self.assertEqual(daily["data"]["valid"], 86)
+
+        weekly = monitor._create_weekly_report()
+        self.assertEqual((weekly["start_date"], weekly["end_date"]), ("2026-10-12", "2026-10-18"))
+        self.assertEqual(weekly["data"]["total"], 700)
+        self.assertEqual(weekly["data"]["invalid"], 119)
+        self.assertEqual(len(weekly["data"]["days"]), 7)
+        self.assertEqual(len(monitor.get_reports()["weekly"]), 1)
+
+    def test_saved_stats_are_restored(self):
+        """Gespeicherte Statistiken im bisherigen Format werden in die Ringe übernommen."""
+        with open(os.path.join(self.directory.name, "packet_stats.json"), "w") as f:
+            json.dump({
+                "total_packets": 130,
+                "valid_packets": 100,
+                "invalid_packets": 30,
+                "error_rate": 0.23,
+                "hourly": {
+                    "2026-10-12 09:00": {"total": 30, "valid": 20, "invalid": 10, "error_rate": 0.33},
+                    "2026-10-01 09:00": {"total": 100, "valid": 80, "invalid": 20, "error_rate": 0.2}
+                },
+                "daily": {"2026-10-12": {"total": 30, "valid": 20, "invalid": 10, "error_rate": 0.33}},
+                "last_reset": "2026-10-01T08:00:00"
+            }, f)
+        monitor = build_monitor(self.directory.name, self.clock)
+        log_packets(monitor, 1, 0)
+
+        stats = monitor.get_stats()
+        self.assertEqual(stats["total_packets"], 131)
+        self.assertEqual(stats["last_reset"], "2026-10-01T08:00:00")
+        self.assertEqual(list(stats["hourly"]), ["2026-10-12 09:00", "2026-10-12 10:00"])
+        self.assertEqual(stats["daily"]["2026-10-12"]["total"], 31)
+
+        monitor._save_stats()
+        restored = build_monitor(self.directory.name, self.clock)
+        self.assertEqual(restored.get_stats(), stats)
+
+def run_benchmark(days: int = 30, packets: int = 50000):
+    """Kosten pro Paket nach einigen Tagen Laufzeit gegenüber strftime-Schlüsseln mit Neuberechnung aller Raten."""
+    stats = {"total_packets": 0, "valid_packets": 0, "invalid_packets": 0, "error_rate": 0.0, "daily": {},
+             "hourly": {f"2026-09-{1 + hour // 24:02d} {hour % 24:02d}:00": {"total": 1, "valid": 1, "invalid": 0, "error_rate": 0.0}
+                        for hour in range(days * 24)}}
+
+    def legacy_log_valid_packet():
+        # bisheriger Ablauf pro Paket
+        stats["total_packets"] += 1
+        stats["valid_packets"] += 1
+        for key, period in ((datetime.now().strftime("%Y-%m-%d %H:00"), "hourly"), (datetime.now().strftime("%Y-%m-%d"), "daily")):
+            bucket = stats[period].setdefault(key, {"total": 0, "valid": 0, "invalid": 0, "error_rate": 0.0})
+            bucket["total"] += 1
+            bucket["valid"] += 1
+        stats["error_rate"] = stats["invalid_packets"] / stats["total_packets"]
+        for period in ("hourly", "daily"):
+            for data in stats[period].values():
+                if data["total"] > 0:
+                    data["error_rate"] = data["invalid"] / data["total"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        monitor = build_monitor(directory, time.time)
+        monitor._save_stats = lambda: None
+        print(f"\n⏱️ {packets} gültige Pakete nach {days} Tagen Laufzeit:")
+        for name, log in (("Schlüssel", legacy_log_valid_packet), ("Ringe", monitor.log_valid_packet)):
+            start = time.perf_counter()
+            for _ in range(packets):
+                log()
+            elapsed = time.perf_counter() - start
+            print(f"   {name:<10} {elapsed / packets * 1e6:>8.2f} µs/Paket")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für PacketMonitor...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPacketMonitor)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        run_benchmark()
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
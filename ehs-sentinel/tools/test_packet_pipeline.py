@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für die PacketPipeline.
+Prüft Reihenfolge pro Quelladresse, die Überlast-Strategien und die Kennzahlen.
+"""
+
+import sys
+import os
+import asyncio
+import random
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import logging
+import unittest
+from CustomLogger import logger
+from PacketPipeline import PacketPipeline, OverloadPolicy
+from NASAMessage import NASAMessage
+from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
+
+# Überlast-Warnungen werden bewusst provoziert
+logger.setLevel(logging.CRITICAL)
+
+def build_frame(source_address: int, packet_number: int, messages: list) -> bytes:
+    """Erzeugt ein Notification-Paket der Außeneinheit mit den angegebenen (Nummer, Payload)-Paaren."""
+    packet = NASAPacket()
+    packet.set_packet_source_address_class(AddressClassEnum.Outdoor)
+    packet.set_packet_source_channel(0)
+    packet.set_packet_source_address(source_address)
+    packet.set_packet_dest_address_class(AddressClassEnum.BroadcastSelfLayer)
+    packet.set_packet_dest_channel(0)
+    packet.set_packet_dest_address(0xFF)
+    packet.set_packet_information(True)
+    packet.set_packet_version(2)
+    packet.set_packet_retry_count(0)
+    packet.set_packet_type(PacketType.Normal)
+    packet.set_packet_data_type(DataType.Notification)
+    packet.set_packet_number(packet_number)
+
+    nasa_messages = []
+    for number, payload in messages:
+        msg = NASAMessage()
+        msg.set_packet_message(number)
+        msg.set_packet_payload_raw(payload)
+        nasa_messages.append(msg)
+    packet.set_packet_messages(nasa_messages)
+    return bytes(packet.to_raw())
+
+class TestPacketPipeline(unittest.IsolatedAsyncioTestCase):
+    """Test-Suite für die PacketPipeline."""
+
+    async def test_order_per_source(self):
+        """Pakete einer Quelladresse werden in Empfangsreihenfolge verarbeitet."""
+        rnd = random.Random(7)
+        seen = {}
+
+        async def handler(frame):
+            await asyncio.sleep(rnd.random() / 1000)
+            seen.setdefault(frame[5], []).append(frame[11])
+
+        pipeline = PacketPipeline(handler, workers=3, queue_size=30, report_interval=0)
+        pipeline.start()
+        for number in range(60):
+            await pipeline.submit(build_frame(number % 5, number, [(0x4000, b'\x01')]))
+        await pipeline.join()
+        await pipeline.stop()
+
+        self.assertEqual(sum(len(v) for v in seen.values()), 60)
+        for numbers in seen.values():
+            self.assertEqual(numbers, sorted(numbers))
+
+    async def test_drop_oldest(self):
+        """Bei voller Warteschlange werden die ältesten Pakete verworfen."""
+        processed = []
+
+        async def handler(frame):
+            processed.append(frame[11])
+
+        pipeline = PacketPipeline(handler, workers=1, queue_size=2,
+                                  overload_policy=OverloadPolicy.DROP_OLDEST, report_interval=0)
+        for number in range(5):
+            await pipeline.submit(build_frame(0, number, [(0x4000, b'\x01')]))
+        pipeline.start()
+        await pipeline.join()
+        await pipeline.stop()
+
+        self.assertEqual(processed, [3, 4])
+        self.assertEqual(pipeline.get_metrics()['dropped'], 3)
+
+    async def test_coalesce(self):
+        """Ein neueres Paket mit denselben Sensoren ersetzt das wartende Paket an seiner Position."""
+        processed = []
+
+        async def handler(frame):
+            processed.append(frame[11])
+
+        pipeline = PacketPipeline(handler, workers=1, queue_size=2,
+                                  overload_policy=OverloadPolicy.COALESCE, report_interval=0)
+        await pipeline.submit(build_frame(0, 1, [(0x4000, b'\x01'), (0x4201, b'\x00\x10')]))
+        await pipeline.submit(build_frame(0, 2, [(0x4001, b'\x01')]))
+        await pipeline.submit(build_frame(0, 3, [(0x4000, b'\x00'), (0x4201, b'\x00\x20')]))
+        pipeline.start()
+        await pipeline.join()
+        await pipeline.stop()
+
+        self.assertEqual(processed, [3, 2])
+        metrics = pipeline.get_metrics()
+        self.assertEqual(metrics['coalesced'], 1)
+        self.assertEqual(metrics['dropped'], 0)
+
+    async def test_block(self):
+        """Mit BLOCK wartet der Leser, bis der Worker wieder Platz hat."""
+        release = asyncio.Event()
+        processed = []
+
+        async def handler(frame):
+            await release.wait()
+            processed.append(frame[11])
+
+        pipeline = PacketPipeline(handler, workers=1, queue_size=1, report_interval=0)
+        pipeline.start()
+        await pipeline.submit(build_frame(0, 1, [(0x4000, b'\x01')]))
+        await asyncio.sleep(0)  # Worker übernimmt das erste Paket
+        await pipeline.submit(build_frame(0, 2, [(0x4000, b'\x01')]))
+
+        blocked = asyncio.create_task(pipeline.submit(build_frame(0, 3, [(0x4000, b'\x01')])))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+
+        release.set()
+        await blocked
+        await pipeline.join()
+        await pipeline.stop()
+
+        self.assertEqual(processed, [1, 2, 3])
+        self.assertEqual(pipeline.get_metrics()['blocked'], 1)
+
+    async def test_metrics_and_errors(self):
+        """Fehler im Handler stoppen den Worker nicht und werden gezählt."""
+        async def handler(frame):
+            if frame[11] == 1:
+                raise RuntimeError("Testfehler")
+
+        pipeline = PacketPipeline(handler, workers=2, queue_size=10, report_interval=0)
+        pipeline.start()
+        for number in range(3):
+            await pipeline.submit(build_frame(0, number, [(0x4000, b'\x01')]))
+        await pipeline.join()
+        await pipeline.stop()
+
+        metrics = pipeline.get_metrics()
+        self.assertEqual(metrics['submitted'], 3)
+        self.assertEqual(metrics['processed'], 2)
+        self.assertEqual(metrics['errors'], 1)
+        self.assertEqual(metrics['queue_depth'], 0)
+        self.assertGreaterEqual(metrics['lag_avg_ms'], 0)
+
+    async def test_stop_processes_queued_frames(self):
+        """stop() verarbeitet noch wartende Pakete, bevor die Worker beendet werden."""
+        processed = []
+
+        async def handler(frame):
+            await asyncio.sleep(0.001)
+            processed.append(frame[11])
+
+        pipeline = PacketPipeline(handler, workers=2, queue_size=20, report_interval=0)
+        pipeline.start()
+        for number in range(10):
+            await pipeline.submit(build_frame(number % 2, number, [(0x4000, b'\x01')]))
+        await pipeline.stop()
+
+        self.assertEqual(sorted(processed), list(range(10)))
+        self.assertEqual(pipeline.get_metrics()['queue_depth'], 0)
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für PacketPipeline...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPacketPipeline)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
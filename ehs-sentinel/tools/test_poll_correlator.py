@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den PollCorrelator.
+Prüft Paketnummern, Zuordnung von Antworten, Antwortzeit-Histogramme, Timeouts und das
+Umnummerieren gecachter Poll-Frames.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from helpers import FakeClock
+from NASAFrameEncoder import NASAFrameEncoder
+from NASAMessage import NASAMessage
+from NASAPacket import NASAPacket, AddressClassEnum, PacketType, DataType
+from PollCorrelator import PollCorrelator
+
+def build_response(packet_number: int, addresses) -> NASAPacket:
+    """Antwort-Paket der Inneneinheit mit den angegebenen Adressen."""
+    packet = NASAPacket()
+    packet.set_packet_source_address_class(AddressClassEnum.Indoor)
+    packet.set_packet_source_channel(0)
+    packet.set_packet_source_address(0)
+    packet.set_packet_dest_address_class(AddressClassEnum.JIGTester)
+    packet.set_packet_dest_channel(255)
+    packet.set_packet_dest_address(0)
+    packet.set_packet_information(True)
+    packet.set_packet_version(2)
+    packet.set_packet_retry_count(0)
+    packet.set_packet_type(PacketType.Normal)
+    packet.set_packet_data_type(DataType.Resposne)
+    packet.set_packet_number(packet_number)
+    messages = []
+    for address in addresses:
+        msg = NASAMessage()
+        msg.set_packet_message(address)
+        msg.set_packet_payload_raw(b'\x00\x01')
+        messages.append(msg)
+    packet.set_packet_messages(messages)
+    return packet
+
+class TestPollCorrelator(unittest.TestCase):
+    """Test-Suite für den PollCorrelator."""
+
+    def setUp(self):
+        self.clock = FakeClock(100.0)
+        self.correlator = PollCorrelator(timeout=2.0, clock=self.clock)
+
+    def test_packet_number_rolls_over(self):
+        """Paketnummern laufen von 0 bis 255 und beginnen dann von vorn."""
+        numbers = [self.correlator.next_packet_number() for _ in range(258)]
+        self.assertEqual(numbers[:3], [0, 1, 2])
+        self.assertEqual(numbers[255:], [255, 0, 1])
+
+    def test_latency_histogram(self):
+        """Antworten werden zugeordnet und in Histogramm-Buckets gezählt."""
+        self.correlator.register(7, [("NASA_POWER", 0x4000), ("NASA_OUTDOOR_TW1_TEMP", 0x8236)])
+        self.clock.now += 0.08
+        self.assertEqual(self.correlator.match_response(build_response(7, [0x4000])), 1)
+        self.clock.now += 0.4
+        self.assertEqual(self.correlator.match_response(build_response(7, [0x8236, 0x1234])), 1)
+
+        stats = self.correlator.get_stats()
+        self.assertEqual(stats["answered"], 2)
+        self.assertEqual(stats["outstanding"], 0)
+        power = stats["sensors"]["NASA_POWER"]
+        self.assertEqual(power["histogram"]["<=100ms"], 1)
+        self.assertAlmostEqual(power["avg_ms"], 80.0)
+        self.assertEqual(stats["sensors"]["NASA_OUTDOOR_TW1_TEMP"]["p95_ms"], 500)
+
+    def test_unsolicited_and_late_responses(self):
+        """Nicht angefragte Adressen zählen nicht, verspätete Antworten ergeben keine Antwortzeit."""
+        self.assertEqual(self.correlator.match_response(build_response(1, [0x4000])), 0)
+        self.correlator.register(1, [("NASA_POWER", 0x4000)])
+        self.clock.now += 2.5
+        self.assertIsNone(self.correlator.resolve(0x4000, 1))
+        self.assertEqual(self.correlator.get_stats()["late"], 1)
+
+    def test_packet_number_mismatch(self):
+        """Antworten mit anderer Paketnummer werden zugeordnet, aber gezählt."""
+        self.correlator.register(3, [("NASA_POWER", 0x4000)])
+        self.assertIsNotNone(self.correlator.resolve(0x4000, 9))
+        self.assertEqual(self.correlator.get_stats()["number_mismatch"], 1)
+
+    def test_derived_sensors_are_not_tracked(self):
+        """Berechnete Sensoren und unbekannte Adressen werden nie als ausstehend geführt."""
+        self.correlator.register(1, [("NASA_EHSSENTINEL_COP", 0x9998), ("UNKNOWN", 0)])
+        self.assertEqual(self.correlator.get_stats()["outstanding"], 0)
+
+    def test_wait_for_reports_unanswered(self):
+        """wait_for endet nach dem Timeout und liefert die unbeantworteten Sensoren."""
+        correlator = PollCorrelator(timeout=0.05)
+
+        async def scenario():
+            correlator.register(1, [("NASA_POWER", 0x4000), ("NASA_INDOOR_OPMODE", 0x4001)])
+            asyncio.get_running_loop().call_later(0.01, correlator.resolve, 0x4000, 1)
+            return await correlator.wait_for(["NASA_POWER", "NASA_INDOOR_OPMODE"])
+
+        self.assertEqual(asyncio.run(scenario()), ["NASA_INDOOR_OPMODE"])
+        stats = correlator.get_stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["outstanding"], 0)
+        self.assertEqual(stats["sensors"]["NASA_INDOOR_OPMODE"]["timeouts"], 1)
+
+    def test_wait_for_returns_early(self):
+        """wait_for kehrt zurück, sobald alle Antworten da sind."""
+        correlator = PollCorrelator(timeout=5.0)
+
+        async def scenario():
+            correlator.register(1, [("NASA_POWER", 0x4000)])
+            asyncio.get_running_loop().call_later(0.01, correlator.resolve, 0x4000, 1)
+            start = asyncio.get_running_loop().time()
+            unanswered = await correlator.wait_for(["NASA_POWER"])
+            return unanswered, asyncio.get_running_loop().time() - start
+
+        unanswered, elapsed = asyncio.run(scenario())
+        self.assertEqual(unanswered, [])
+        self.assertLess(elapsed, 1.0)
+
+    def test_renumbered_frame_matches_to_raw(self):
+        """Umnummerierte Frames sind identisch zu NASAPacket.to_raw() mit dieser Paketnummer."""
+        packet = build_response(166, [0x4000, 0x8236])
+        encoder = NASAFrameEncoder.from_packet(packet)
+        messages = [(m.packet_message, m.packet_message_type, m.packet_payload) for m in packet.packet_messages]
+        frame = encoder.encode(messages)
+        renumbered = []
+        for number in (0, 42, 255):
+            packet.set_packet_number(number)
+            expected = bytes(packet.to_raw())
+            renumbered.append((NASAFrameEncoder.renumber(frame, number), expected))
+            self.assertEqual(encoder.encode(messages, number), expected)
+        # jeder Frame ist eine eigene Kopie, spätere Aufrufe verändern ihn nicht
+        for actual, expected in renumbered:
+            self.assertEqual(actual, expected)
+        # das Header-Template bleibt unverändert
+        self.assertEqual(encoder.encode(messages), frame)
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für PollCorrelator...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPollCorrelator)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den PollScheduler.
+Prüft das Zusammenfassen gleichzeitig fälliger Gruppen, die Deduplizierung von Sensoren,
+driftfreie Fälligkeiten, übersprungene Termine, die Jitter-Statistik und das Überspringen
+von Sensoren, die die Wärmepumpe ohnehin sendet (FreshnessCache).
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from helpers import FakeClock
+from FreshnessCache import FreshnessCache
+from NASAMessage import NASAMessage
+from NASAPacket import NASAPacket, AddressClassEnum, DataType
+from PollScheduler import PollScheduler
+
+LIVE = ["NASA_POWER", "NASA_OUTDOOR_TW1_TEMP", "NASA_OUTDOOR_TW2_TEMP"]
+FSV = ["VAR_IN_FSV_1011", "VAR_IN_FSV_1012"]
+STATIC = ["STR_SERIAL_NUMBER", "LVAR_IN_TOTAL_GENERATED_POWER", "NASA_POWER"]
+
+class TestPollScheduler(unittest.TestCase):
+    """Test-Suite für den PollScheduler."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = PollScheduler(merge_window=1.0, clock=self.clock)
+        self.scheduler.set_groups(
+            {"live_data": (15, LIVE), "fsv_settings": (300, FSV), "static_data": (3600, STATIC)},
+            {"live_data": 0.0, "fsv_settings": 0.1, "static_data": 0.2}
+        )
+
+    def run_until(self, end: float):
+        """Simuliert die Scheduler-Schleife bis end und liefert alle Abrufe."""
+        dispatches = []
+        while True:
+            deadline = self.scheduler.next_deadline()
+            if deadline > end:
+                return dispatches
+            self.clock.now = max(self.clock.now, deadline)
+            dispatches.append((self.clock.now, self.scheduler.pop_due()))
+
+    def test_first_dispatch_merges_and_deduplicates(self):
+        """Zum Start fällige Gruppen kommen in einen Abruf, doppelte Sensoren nur einmal."""
+        due = self.scheduler.pop_due()
+        self.assertEqual(set(due), {"live_data", "fsv_settings", "static_data"})
+        sensors = [s for group in due.values() for s in group]
+        self.assertEqual(len(sensors), len(set(sensors)))
+        self.assertEqual(sorted(sensors), sorted(set(LIVE + FSV + STATIC)))
+        self.assertEqual(self.scheduler.get_stats()["duplicate_sensors"], 1)
+
+    def test_duplicate_uses_shortest_interval(self):
+        """Ein Sensor in mehreren Gruppen folgt dem kürzesten Intervall."""
+        dispatches = self.run_until(1000.0 + 60)
+        power_polls = sum(1 for _, due in dispatches for group in due.values() if "NASA_POWER" in group)
+        self.assertEqual(power_polls, 5)  # 0, 15, 30, 45, 60 s
+
+    def test_coinciding_groups_share_dispatch(self):
+        """live_data und fsv_settings fallen bei 300 s in denselben Abruf."""
+        dispatches = self.run_until(1000.0 + 300.5)
+        at, due = dispatches[-1]
+        self.assertAlmostEqual(at, 1300.0)
+        self.assertEqual(set(due), {"live_data", "fsv_settings"})
+        self.assertEqual(self.scheduler.get_stats()["merged_dispatches"], 2)
+
+    def test_no_drift(self):
+        """Fälligkeiten bleiben auf dem Raster, auch wenn ein Abruf verspätet startet."""
+        self.scheduler.pop_due()
+        self.clock.now = 1000.0 + 15 + 0.7  # Abruf 0,7 s zu spät
+        self.scheduler.pop_due()
+        self.assertAlmostEqual(self.scheduler.next_deadline(), 1030.0)
+        jitter = self.scheduler.get_stats()["jitter"]["live_data"]
+        self.assertEqual(jitter["max_ms"], 700.0)
+
+    def test_missed_deadlines_are_skipped(self):
+        """Wer mehrere Intervalle zurückliegt, holt die Termine nicht einzeln nach."""
+        self.scheduler.pop_due()
+        self.clock.now = 1000.0 + 100
+        due = self.scheduler.pop_due()
+        self.assertEqual(sorted(due["live_data"]), sorted(LIVE))
+        self.assertAlmostEqual(self.scheduler.next_deadline(), 1105.0)
+        self.assertEqual(self.scheduler.get_stats()["skipped_deadlines"], 5 * len(LIVE))
+
+    def test_upcoming_schedule(self):
+        """get_stats listet die nächsten Fälligkeiten pro Gruppe, früheste zuerst."""
+        self.scheduler.pop_due()
+        self.clock.now += 5
+        upcoming = self.scheduler.get_stats()["upcoming"]
+        self.assertEqual([entry["group"] for entry in upcoming], ["live_data", "fsv_settings", "static_data"])
+        self.assertAlmostEqual(upcoming[0]["due_in_s"], 10.0)
+
+def build_packet(source, dest, data_type, addresses) -> NASAPacket:
+    packet = NASAPacket()
+    packet.packet_source_address_class = source
+    packet.packet_dest_address_class = dest
+    packet.packet_data_type = data_type
+    messages = []
+    for address in addresses:
+        msg = NASAMessage()
+        msg.set_packet_message(address)
+        messages.append(msg)
+    packet.packet_messages = messages
+    return packet
+
+class TestFreshness(unittest.TestCase):
+    """Test-Suite für das Überspringen frischer Sensoren."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = FreshnessCache(clock=self.clock)
+        self.addresses = {"NASA_OUTDOOR_TW2_TEMP": 0x821A, "NASA_OUTDOOR_COMP1_RUN_HZ": 0x8218, "NASA_POWER": 0x4000}
+        self.scheduler = PollScheduler(merge_window=1.0, clock=self.clock,
+                                       last_heard=lambda s: self.cache.last_heard(self.addresses[s]))
+        self.scheduler.set_groups({"live_data": (15, list(self.addresses))})
+
+    def test_cache_ignores_own_responses(self):
+        """Broadcasts zählen, Antworten auf unsere eigenen Anfragen nicht."""
+        self.cache.record(build_packet(AddressClassEnum.Outdoor, AddressClassEnum.BroadcastSelfLayer,
+                                       DataType.Notification, [0x821A, 0x8218]))
+        self.cache.record(build_packet(AddressClassEnum.Indoor, AddressClassEnum.JIGTester,
+                                       DataType.Resposne, [0x4000]))
+        self.assertEqual(self.cache.last_heard(0x821A), 1000.0)
+        self.assertIsNone(self.cache.last_heard(0x4000))
+        self.assertEqual(self.cache.get_stats()["own_responses"], 1)
+
+    def test_fresh_sensors_are_skipped(self):
+        """Gesendete Sensoren werden erst abgefragt, wenn ihr Wert ein Intervall alt ist."""
+        self.cache.heard(0x821A, 995.0)
+        due = self.scheduler.pop_due()
+        self.assertEqual(sorted(due["live_data"]), ["NASA_OUTDOOR_COMP1_RUN_HZ", "NASA_POWER"])
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats["saved_by_group"], {"live_data": 1})
+        self.assertEqual(stats["saved_polls"], 1)
+
+        # Wert bleibt aus: 15 s nach dem letzten Empfang wieder fällig
+        self.assertAlmostEqual(self.scheduler.next_deadline(), 1010.0)
+        self.clock.now = 1010.0
+        self.assertEqual(self.scheduler.pop_due(), {"live_data": ["NASA_OUTDOOR_TW2_TEMP"]})
+
+    def test_fresh_sensor_due_within_merge_window(self):
+        """Ein frischer Sensor, der noch im Zusammenfassungs-Fenster fällig wird, wird nicht erneut entnommen."""
+        self.cache.heard(0x821A, 985.5)
+        due = self.scheduler.pop_due()
+        self.assertEqual(sorted(due["live_data"]), ["NASA_OUTDOOR_COMP1_RUN_HZ", "NASA_POWER"])
+        self.assertAlmostEqual(self.scheduler.next_deadline(), 1000.5)
+
+        self.clock.now = 1000.5
+        self.assertEqual(self.scheduler.pop_due(), {"live_data": ["NASA_OUTDOOR_TW2_TEMP"]})
+
+def run_benchmark():
+    """Vergleicht gesendete Frames einer Stunde: getrennte Gruppen-Schleifen gegen den Scheduler."""
+    chunk = 10
+    groups = {"live_data": (15, 15), "fsv_settings": (300, 50), "static_data": (3600, 12)}
+
+    def frames(count):
+        return -(-count // chunk)
+
+    separate = sum((3600 // interval) * frames(count) for interval, count in groups.values())
+    separate_rounds = sum(3600 // interval for interval, _ in groups.values())
+
+    clock = FakeClock()
+    scheduler = PollScheduler(merge_window=2.0, clock=clock)
+    scheduler.set_groups({name: (interval, [f"{name}_{i}" for i in range(count)])
+                          for name, (interval, count) in groups.items()},
+                         {"live_data": 0.0, "fsv_settings": 0.1, "static_data": 0.2})
+    merged = rounds = 0
+    end = clock.now + 3600
+    while scheduler.next_deadline() < end:
+        clock.now = max(clock.now, scheduler.next_deadline())
+        due = scheduler.pop_due()
+        merged += frames(sum(len(sensors) for sensors in due.values()))
+        rounds += 1
+
+    print("\n⏱️ Polling einer Stunde (10 Sensoren pro Frame):")
+    print(f"   Getrennte Gruppen-Schleifen: {separate} Frames in {separate_rounds} Abrufen")
+    print(f"   Gemeinsamer Scheduler:       {merged} Frames in {rounds} Abrufen")
+
+    # live_data mit 13 abfragbaren Sensoren, die Außeneinheit sendet 9 davon alle 10 s
+    clock = FakeClock()
+    cache = FreshnessCache(clock=clock)
+    live = [f"live_{i}" for i in range(13)]
+    broadcast = {name: 0x8200 + i for i, name in enumerate(live[:9])}
+    scheduler = PollScheduler(merge_window=2.0, clock=clock,
+                              last_heard=lambda s: cache.last_heard(broadcast[s]) if s in broadcast else None)
+    scheduler.set_groups({"live_data": (15, live)})
+    polled = 0
+    next_broadcast = clock.now + 3.0
+    end = clock.now + 3600
+    while True:
+        deadline = min(scheduler.next_deadline(), next_broadcast)
+        if deadline >= end:
+            break
+        clock.now = max(clock.now, deadline)
+        if clock.now >= next_broadcast:
+            for address in broadcast.values():
+                cache.heard(address)
+            next_broadcast += 10.0
+        if scheduler.next_deadline() <= clock.now:
+            polled += sum(len(sensors) for sensors in scheduler.pop_due().values())
+    saved = scheduler.get_stats()["saved_by_group"].get("live_data", 0)
+    total = 13 * 240
+    print("\n⏱️ live_data einer Stunde, 9 von 13 Sensoren alle 10 s als Broadcast:")
+    print(f"   Ohne Aktualitäts-Cache: {total} Sensor-Abfragen")
+    print(f"   Mit Aktualitäts-Cache:  {polled} Sensor-Abfragen ({saved} gespart, {100 * (total - polled) / total:.0f}% weniger)")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für PollScheduler...")
+
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestPollScheduler))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestFreshness))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        run_benchmark()
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
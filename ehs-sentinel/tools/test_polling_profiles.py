@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für die Polling-Profile.
+Prüft die Auswahl nach Betriebszustand, die Hysterese beim Verlangsamen, den sofortigen
+Wechsel beim Anlaufen und das Übertragen der Intervalle in den PollScheduler.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from helpers import FakeClock
+from PollingProfiles import PollingProfiles
+from PollScheduler import PollScheduler
+
+PROFILES = {
+    "off": {"when": {"NASA_POWER": ["OFF"]}, "intervals": {"live_data": 120, "fsv_settings": 900}},
+    "idle": {"when": {"NASA_OUTDOOR_OPERATION_STATUS": ["STOP"]}, "intervals": {"live_data": 60}}
+}
+BASE = {"live_data": 15, "fsv_settings": 300}
+LIVE = ["NASA_POWER", "NASA_OUTDOOR_OPERATION_STATUS", "NASA_OUTDOOR_COMP1_RUN_HZ", "VAR_IN_FLOW_SENSOR_CALC"]
+
+RUNNING = {"NASA_POWER": "ON", "NASA_OUTDOOR_OPERATION_STATUS": "HEATING"}
+IDLE = {"NASA_POWER": "ON", "NASA_OUTDOOR_OPERATION_STATUS": "STOP"}
+OFF = {"NASA_POWER": "OFF", "NASA_OUTDOOR_OPERATION_STATUS": "STOP"}
+
+class TestPollingProfiles(unittest.TestCase):
+    """Test-Suite für PollingProfiles."""
+
+    def setUp(self):
+        self.profiles = PollingProfiles(PROFILES, BASE, hold=120)
+
+    def test_match_first_profile(self):
+        """Das erste passende Profil gewinnt, ohne Zustandswerte gilt das Standardprofil."""
+        self.assertEqual(self.profiles.match(OFF), "off")
+        self.assertEqual(self.profiles.match(IDLE), "idle")
+        self.assertEqual(self.profiles.match(RUNNING), "running")
+        self.assertEqual(self.profiles.match({}), "running")
+        self.assertEqual(self.profiles.intervals("off"), {"live_data": 120, "fsv_settings": 900})
+        self.assertEqual(self.profiles.watched, {"NASA_POWER", "NASA_OUTDOOR_OPERATION_STATUS"})
+
+    def test_slowing_down_needs_hold(self):
+        """Verlangsamen erst, wenn der Zustand hold Sekunden anhält; kurzes Takten setzt zurück."""
+        self.assertIsNone(self.profiles.update(IDLE, 0))
+        self.assertIsNone(self.profiles.update(RUNNING, 60))
+        self.assertIsNone(self.profiles.update(IDLE, 90))
+        self.assertIsNone(self.profiles.update(IDLE, 200))
+        self.assertEqual(self.profiles.update(IDLE, 210), "idle")
+        # idle -> off ist ebenfalls langsamer und braucht die Haltezeit
+        self.assertIsNone(self.profiles.update(OFF, 300))
+        self.assertEqual(self.profiles.update(OFF, 420), "off")
+
+    def test_speeding_up_is_immediate(self):
+        """Läuft die Wärmepumpe an, gilt sofort das schnellere Profil."""
+        self.profiles.update(OFF, 0)
+        self.profiles.update(OFF, 120)
+        self.assertEqual(self.profiles.active, "off")
+        self.assertEqual(self.profiles.update(IDLE, 130), "idle")
+        self.assertEqual(self.profiles.update(RUNNING, 140), "running")
+        stats = self.profiles.get_stats(150)
+        self.assertEqual(stats["switches"], 3)
+        self.assertEqual(stats["time_in_profile_s"]["off"], 10.0)
+
+    def test_scheduler_resumes_within_one_cycle(self):
+        """Nach dem Wechsel auf running sind verlangsamte Sensoren sofort fällig, Zustandssensoren bleiben bei 15 s."""
+        clock = FakeClock()
+        scheduler = PollScheduler(merge_window=1.0, clock=clock)
+        scheduler.set_groups({"live_data": (15, LIVE)})
+        scheduler.pop_due()
+        self.profiles.update(OFF, clock.now)
+        self.profiles.update(OFF, clock.now + 120)
+        scheduler.set_group_intervals(self.profiles.intervals(), self.profiles.watched)
+
+        # bereits geplante Fälligkeit gilt noch, danach laufen nur die Zustandssensoren im 15 s Takt
+        clock.now += 15
+        self.assertEqual(len(scheduler.pop_due()["live_data"]), 4)
+        clock.now += 15
+        self.assertEqual(sorted(scheduler.pop_due()["live_data"]), ["NASA_OUTDOOR_OPERATION_STATUS", "NASA_POWER"])
+        self.assertAlmostEqual(scheduler.next_deadline(), 1045.0)
+
+        self.assertEqual(self.profiles.update(RUNNING, clock.now), "running")
+        scheduler.set_group_intervals(self.profiles.intervals(), self.profiles.watched)
+        due = scheduler.pop_due()
+        self.assertEqual(sorted(due["live_data"]), ["NASA_OUTDOOR_COMP1_RUN_HZ", "VAR_IN_FLOW_SENSOR_CALC"])
+
+def run_benchmark():
+    """Sensor-Abfragen eines Tages mit 6 h Heizbetrieb, 10 h Kompressor-Stillstand und 8 h aus."""
+    clock = FakeClock()
+    live = LIVE + [f"live_{i}" for i in range(9)]
+    fsv = [f"fsv_{i}" for i in range(50)]
+    day = [(6 * 3600, RUNNING), (10 * 3600, IDLE), (8 * 3600, OFF)]
+
+    def simulate(with_profiles):
+        clock.now = 1000.0
+        scheduler = PollScheduler(merge_window=2.0, clock=clock)
+        scheduler.set_groups({"live_data": (15, live), "fsv_settings": (300, fsv)})
+        profiles = PollingProfiles(PROFILES, BASE, hold=120)
+        polled = 0
+        start = clock.now
+        for duration, state in day:
+            end = start + duration
+            while scheduler.next_deadline() < end:
+                clock.now = max(clock.now, scheduler.next_deadline())
+                if with_profiles and profiles.update(state, clock.now):
+                    scheduler.set_group_intervals(profiles.intervals(), profiles.watched)
+                polled += sum(len(sensors) for sensors in scheduler.pop_due().values())
+            start = end
+        return polled
+
+    fixed = simulate(False)
+    profiled = simulate(True)
+    print("\n⏱️ Sensor-Abfragen (und MQTT-Updates) eines Tages, 6 h Heizen / 10 h Stillstand / 8 h aus:")
+    print(f"   Feste Intervalle:   {fixed}")
+    print(f"   Polling-Profile:    {profiled} ({100 * (fixed - profiled) / fixed:.0f}% weniger)")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für PollingProfiles...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestPollingProfiles)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        run_benchmark()
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)
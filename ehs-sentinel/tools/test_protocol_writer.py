@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den gepufferten ProtocolWriter.
+Prüft Formate, Rotation und Flush-Verhalten und vergleicht die Zeit in der Event-Loop
+mit dem früheren open/append pro Nachricht.
+"""
+
+import sys
+import os
+import asyncio
+import csv
+import tempfile
+import time
+from datetime import date, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import logging
+import unittest
+from CustomLogger import logger
+from ProtocolWriter import ProtocolWriter, read_binary_protocol
+
+logger.setLevel(logging.WARNING)
+
+SAMPLES = [
+    (0x4236, 1, "VAR_IN_TEMP_WATER_TANK_F", 48.5),
+    (0x4000, 0, "ENUM_IN_OPERATION_POWER", "ON"),
+    (0x8413, 2, "LVAR_OUT_CONTROL_WATTMETER_1W_1MIN_SUM", 1234),
+    (0x061A, 3, "STR_OUTDOOR_MODEL_NAME", "AE160JXEDEH/EU"),
+]
+
+class TestProtocolWriter(unittest.IsolatedAsyncioTestCase):
+    """Test-Suite für den ProtocolWriter."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'protocol.csv')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def _write_all(self, writer, samples=SAMPLES):
+        for sample in samples:
+            writer.write(*sample)
+        await writer.close()
+
+    async def test_text_format_matches_previous_lines(self):
+        """Das Textformat entspricht den bisherigen Zeilen der Protokoll-Datei."""
+        writer = ProtocolWriter(self.path)
+        await self._write_all(writer)
+
+        with open(self.path) as f:
+            lines = f.readlines()
+        expected = [f"{hex(number):<6},{message_type},{name:<50},{value}\n" for number, message_type, name, value in SAMPLES]
+        self.assertEqual(lines, expected)
+
+    async def test_csv_header_written_once(self):
+        """CSV-Dateien erhalten genau eine Kopfzeile, auch nach erneutem Öffnen."""
+        for _ in range(2):
+            await self._write_all(ProtocolWriter(self.path, file_format='csv'))
+
+        with open(self.path, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], list(ProtocolWriter.CSV_HEADER))
+        self.assertEqual(len(rows), 1 + 2 * len(SAMPLES))
+        self.assertEqual(rows[1][1:], ['0x4236', '1', 'VAR_IN_TEMP_WATER_TANK_F', '48.5'])
+
+    async def test_binary_roundtrip(self):
+        """Binäre Datensätze lassen sich verlustfrei zurücklesen."""
+        await self._write_all(ProtocolWriter(self.path, file_format='binary'))
+
+        records = list(read_binary_protocol(self.path))
+        self.assertEqual([(r[1], r[2], r[3]) for r in records],
+                         [(number, message_type, value) for number, message_type, _, value in SAMPLES])
+        self.assertLess(os.path.getsize(self.path), sum(len(s[2]) for s in SAMPLES))
+
+    async def test_size_rotation(self):
+        """Bei Rotation nach Größe bleiben höchstens backup_count alte Dateien erhalten."""
+        writer = ProtocolWriter(self.path, rotation='size', max_bytes=300, backup_count=2)
+        for _ in range(6):
+            for sample in SAMPLES:
+                writer.write(*sample)
+            await writer.flush()
+        await writer.close()
+
+        files = sorted(os.listdir(self.tmpdir.name))
+        self.assertEqual(files, ['protocol.csv', 'protocol.csv.1', 'protocol.csv.2'])
+        self.assertGreater(writer.get_stats()['rotations'], 2)
+        for name in files:
+            self.assertLessEqual(os.path.getsize(os.path.join(self.tmpdir.name, name)), 300)
+
+    async def test_daily_rotation(self):
+        """Beim Tageswechsel wird die Datei mit dem Datum des Vortags umbenannt."""
+        writer = ProtocolWriter(self.path, rotation='daily')
+        writer.write(*SAMPLES[0])
+        await writer.flush()
+
+        yesterday = date.today() - timedelta(days=1)
+        writer._file_day = yesterday
+        writer.write(*SAMPLES[1])
+        await writer.close()
+
+        rotated = f"{self.path}.{yesterday.isoformat()}"
+        self.assertTrue(os.path.exists(rotated))
+        with open(self.path) as f:
+            self.assertIn("ENUM_IN_OPERATION_POWER", f.read())
+
+    async def test_flush_on_size_threshold(self):
+        """Ist flush_size erreicht, wird ohne Warten auf das Intervall geschrieben."""
+        writer = ProtocolWriter(self.path, flush_interval=60, flush_size=500)
+        for _ in range(10):
+            writer.write(*SAMPLES[0])
+        await asyncio.sleep(0.2)
+        self.assertGreater(os.path.getsize(self.path), 0)
+        await writer.close()
+
+    async def test_close_waits_for_running_write(self):
+        """close() während eines laufenden Schreibvorgangs schreibt alles nacheinander und schließt danach."""
+        class SlowWriter(ProtocolWriter):
+            active = 0
+            overlaps = 0
+
+            def _write_records(self, records):
+                SlowWriter.active += 1
+                SlowWriter.overlaps += SlowWriter.active > 1
+                time.sleep(0.05)
+                super()._write_records(records)
+                SlowWriter.active -= 1
+
+        writer = SlowWriter(self.path, flush_interval=60, flush_size=1)
+        writer.write(*SAMPLES[0])
+        await asyncio.sleep(0.01)  # erster Schreibvorgang läuft im Worker-Thread
+        for sample in SAMPLES[1:]:
+            writer.write(*sample)
+        await writer.close()
+
+        self.assertEqual(SlowWriter.overlaps, 0)
+        self.assertIsNone(writer._handle)
+        with open(self.path) as f:
+            names = [line.split(',')[2].strip() for line in f]
+        self.assertEqual(names, [sample[2] for sample in SAMPLES])
+
+    async def test_disabled_without_path(self):
+        """Ohne Pfad werden keine Einträge gepuffert."""
+        writer = ProtocolWriter()
+        writer.write(*SAMPLES[0])
+        self.assertFalse(writer.enabled)
+        self.assertEqual(writer.get_stats()['buffered_lines'], 0)
+
+async def run_benchmark(messages: int = 20000):
+    """Vergleicht die Zeit in der Event-Loop pro Nachricht: open/append vs. ProtocolWriter."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'legacy.csv')
+        start = time.perf_counter()
+        for i in range(messages):
+            number, message_type, name, value = SAMPLES[i % len(SAMPLES)]
+            with open(path, "a") as protWriter:
+                protWriter.write(f"{hex(number):<6},{message_type},{name:<50},{value}\n")
+        legacy = time.perf_counter() - start
+
+        writer = ProtocolWriter(os.path.join(tmpdir, 'buffered.csv'))
+        start = time.perf_counter()
+        for i in range(messages):
+            writer.write(*SAMPLES[i % len(SAMPLES)])
+        buffered = time.perf_counter() - start
+        await writer.close()
+
+    print(f"\n⏱️ Protokoll-Benchmark ({messages} Nachrichten, Zeit in der Event-Loop):")
+    print(f"   open/append:    {legacy / messages * 1e6:8.2f} µs/Nachricht")
+    print(f"   ProtocolWriter: {buffered / messages * 1e6:8.2f} µs/Nachricht ({legacy / buffered:.0f}x)")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für ProtocolWriter...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestProtocolWriter)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    if success:
+        asyncio.run(run_benchmark())
+    sys.exit(0 if success else 1)
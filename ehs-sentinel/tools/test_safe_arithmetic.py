@@ -6,10 +6,11 @@ Testet die sichere Auswertung arithmetischer Ausdrücke.
 
 import sys
 import os
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ehs-sentinel', 'src'))
 
 import unittest
-from SafeArithmetic import SafeArithmetic, safe_eval_arithmetic
+from SafeArithmetic import SafeArithmetic, ArithmeticProgram, safe_eval_arithmetic
 
 class TestSafeArithmetic(unittest.TestCase):
     """Test-Suite für die SafeArithmetic Klasse."""
@@ -152,12 +153,100 @@ class TestSafeArithmetic(unittest.TestCase):
         self.assertEqual(self.calc.evaluate("0 - 5"), -5)
         self.assertEqual(self.calc.evaluate("10 - 15"), -5)
 
+class TestCompiledPrograms(unittest.TestCase):
+    """Test-Suite für kompilierte Ausdrücke und den Programm-Cache."""
+    
+    def setUp(self):
+        """Setup für jeden Test."""
+        self.calc = SafeArithmetic(cache_size=4)
+    
+    def test_compile_returns_reusable_program(self):
+        """Ein Programm wird einmal kompiliert und mit verschiedenen Werten ausgewertet."""
+        program = self.calc.compile("packed_value / 10")
+        self.assertIsInstance(program, ArithmeticProgram)
+        self.assertEqual(program.evaluate({"packed_value": 235}), 23.5)
+        self.assertEqual(program(packed_value=-150), -15.0)
+    
+    def test_cache_hits(self):
+        """Gleicher Ausdruckstext liefert dasselbe Programm aus dem Cache."""
+        first = self.calc.compile("packed_value / 10")
+        second = self.calc.compile("packed_value / 10")
+        self.assertIs(first, second)
+        info = self.calc.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
+    
+    def test_cache_is_bounded(self):
+        """Der Cache verdrängt die am längsten nicht genutzten Ausdrücke."""
+        for i in range(10):
+            self.calc.compile(f"packed_value / {i + 1}")
+        self.assertEqual(self.calc.cache_info().currsize, 4)
+    
+    def test_uncached_matches_cached(self):
+        """Ohne Cache werden dieselben Ergebnisse berechnet."""
+        uncached = SafeArithmetic(cache_size=0)
+        for expr in ("packed_value / 10", "(packed_value * 2) / 10", "value * 2 + 5", "2 + 3 * 4"):
+            variables = {"packed_value": 150, "value": 10}
+            self.assertEqual(uncached.evaluate(expr, variables), self.calc.evaluate(expr, variables))
+        self.assertEqual(uncached.cache_info().currsize, 0)
+    
+    def test_compiled_error_handling(self):
+        """Fehler bei der Auswertung werden weiterhin als ValueError gemeldet."""
+        # Division durch Null über eine Variable
+        program = self.calc.compile("10 / packed_value")
+        with self.assertRaises(ValueError):
+            program.evaluate({"packed_value": 0})
+        
+        # Fehlende Variable
+        with self.assertRaises(ValueError):
+            self.calc.compile("packed_value / 10").evaluate({"value": 1})
+        
+        # Syntaxfehler werden bereits beim Kompilieren erkannt
+        with self.assertRaises(ValueError):
+            self.calc.compile("2 + + 3")
+        
+        with self.assertRaises(ValueError):
+            self.calc.compile("")
+        
+        # Fehlerhafte Ausdrücke werden nicht gecacht
+        with self.assertRaises(ValueError):
+            self.calc.evaluate("10 / 0")
+        with self.assertRaises(ValueError):
+            self.calc.evaluate("10 / 0")
+
+def run_benchmark(iterations: int = 100000):
+    """Vergleicht den Durchsatz mit und ohne Programm-Cache."""
+    expressions = ["packed_value / 10", "packed_value / 1000", "packed_value / 8.6", "packed_value / 60"]
+    cached = SafeArithmetic()
+    uncached = SafeArithmetic(cache_size=0)
+    
+    results = {}
+    for name, calc in (("ohne Cache", uncached), ("mit Cache", cached)):
+        start = time.perf_counter()
+        for i in range(iterations):
+            calc.evaluate(expressions[i & 3], {"packed_value": i})
+        results[name] = time.perf_counter() - start
+    
+    program = cached.compile("packed_value / 10")
+    start = time.perf_counter()
+    for i in range(iterations):
+        program.evaluate({"packed_value": i})
+    results["kompiliert"] = time.perf_counter() - start
+    
+    print(f"\n⏱️ SafeArithmetic-Benchmark ({iterations} Auswertungen):")
+    for name, elapsed in results.items():
+        print(f"   {name:<11} {iterations / elapsed:>12,.0f} Auswertungen/s ({results['ohne Cache'] / elapsed:.1f}x)")
+
 def run_tests():
     """Führt alle Tests aus."""
     print("🧪 Starte Tests für SafeArithmetic...")
     
     # Erstelle Test-Suite
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestSafeArithmetic)
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite([
+        loader.loadTestsFromTestCase(TestSafeArithmetic),
+        loader.loadTestsFromTestCase(TestCompiledPrograms),
+    ])
     
     # Führe Tests aus
     runner = unittest.TextTestRunner(verbosity=2)
@@ -173,4 +262,6 @@ def run_tests():
 
 if __name__ == "__main__":
     success = run_tests()
+    if success:
+        run_benchmark()
     sys.exit(0 if success else 1)
\ No newline at end of file
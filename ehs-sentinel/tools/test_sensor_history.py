@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Unit Tests für den SensorHistory-Ringpuffer.
+Prüft das Überschreiben der ältesten Einträge, das Verwerfen alter Einträge, die Statistiken
+über die numerischen Werte und die Zählung der Statuscodes.
+"""
+
+import sys
+import os
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append('/app/src')
+
+import unittest
+from SensorHistory import SensorHistory
+
+OK, ERROR = 0, 2
+
+class TestSensorHistory(unittest.TestCase):
+    """Test-Suite für SensorHistory."""
+
+    def test_ring_keeps_latest(self):
+        """Nach dem Überlauf stehen die letzten capacity Einträge in zeitlicher Reihenfolge."""
+        history = SensorHistory(capacity=5)
+        for i in range(12):
+            history.append(100.0 + i, float(i), OK)
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history.count, 12)
+        self.assertEqual([v for _, v, _ in history.entries()], [7.0, 8.0, 9.0, 10.0, 11.0])
+        self.assertEqual([t for t, _, _ in history.entries(limit=2)], [110.0, 111.0])
+
+    def test_prune_after_wrap(self):
+        """Alte Einträge werden auch nach dem Überlauf korrekt verworfen."""
+        history = SensorHistory(capacity=4)
+        for i in range(6):
+            history.append(float(i), float(i), OK)
+        self.assertEqual(history.prune(4.0), 2)
+        self.assertEqual([v for _, v, _ in history.entries()], [4.0, 5.0])
+        history.append(6.0, 6.0, OK)
+        self.assertEqual([v for _, v, _ in history.entries()], [4.0, 5.0, 6.0])
+
+    def test_summary_skips_non_numeric(self):
+        """min/max/Mittelwert/Perzentile nur über numerische Werte, optional ab einem Zeitpunkt."""
+        history = SensorHistory(capacity=200)
+        for i in range(100):
+            history.append(float(i), float(i + 1), OK)
+        history.append(100.0, math.nan, ERROR)
+        summary = history.summary()
+        self.assertEqual(summary["samples"], 100)
+        self.assertEqual((summary["min"], summary["max"], summary["mean"]), (1.0, 100.0, 50.5))
+        self.assertEqual((summary["p50"], summary["p95"]), (50.0, 96.0))
+        self.assertEqual(history.summary(since=90.0)["samples"], 10)
+        self.assertEqual(SensorHistory().summary(), {"samples": 0})
+
+    def test_count_status(self):
+        """Statuscodes werden nur im Puffer gezählt."""
+        history = SensorHistory(capacity=10)
+        for i in range(15):
+            history.append(float(i), float(i), ERROR if i % 5 == 0 else OK)
+        self.assertEqual(history.count_status(ERROR), 2)
+        self.assertEqual(history.count_status(OK), 8)
+
+@dataclass
+class OldReading:
+    """Bisheriger Eintrag, eine Dataclass pro Messwert."""
+    sensor_name: str
+    raw_value: bytes
+    converted_value: Any
+    timestamp: datetime
+    status: str
+    response_time_ms: float = None
+
+def run_benchmark():
+    """Aufnahme von 200.000 Messwerten für 160 Sensoren: Liste mit Slicing gegenüber Ringpuffer."""
+    sensors = [f"SENSOR_{i}" for i in range(160)]
+    raw = b'\x01\x2c'
+    n = 200_000
+
+    readings = {name: [] for name in sensors}
+    start = time.perf_counter()
+    for i in range(n):
+        name = sensors[i % 160]
+        readings[name].append(OldReading(name, raw, i * 0.1, datetime.now(), "active", 0.2))
+        if len(readings[name]) > 100:
+            readings[name] = readings[name][-100:]
+        f"Value: {i * 0.1}, Raw: {raw.hex()}, Response: 0.2ms"
+    old = time.perf_counter() - start
+
+    histories = {name: SensorHistory(100) for name in sensors}
+    start = time.perf_counter()
+    for i in range(n):
+        histories[sensors[i % 160]].append(time.time(), i * 0.1, OK)
+    new = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for history in histories.values():
+        history.summary()
+    query = time.perf_counter() - start
+
+    print(f"\n⏱️ {n} Messwerte für 160 Sensoren:")
+    print(f"   Liste + Slicing + datetime/hex: {old * 1e6 / n:.2f} µs pro Messwert")
+    print(f"   Ringpuffer:                     {new * 1e6 / n:.2f} µs pro Messwert ({old / new:.1f}x)")
+    print(f"   Statistiken für alle 160 Sensoren: {query * 1000:.1f} ms")
+
+def run_tests():
+    """Führt alle Tests aus."""
+    print("🧪 Starte Tests für SensorHistory...")
+
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSensorHistory)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    if result.wasSuccessful():
+        print(f"\n✅ Alle {result.testsRun} Tests erfolgreich!")
+        run_benchmark()
+        return True
+    else:
+        print(f"\n❌ {len(result.failures)} Fehler, {len(result.errors)} Errors von {result.testsRun} Tests")
+        return False
+
+if __name__ == "__main__":
+    success = run_tests()
+    sys.exit(0 if success else 1)